@@ -8,10 +8,17 @@ Diseñado para correr via crontab en el servidor.
 Uso:
     python3 daily_load.py                # Usa fecha de hoy
     python3 daily_load.py 2025-06-15     # Usa fecha especifica
+    python3 daily_load.py --cache        # Reintento: reutiliza respuestas de la API ya descargadas
+    python3 daily_load.py --replay       # Reconstruye bronze solo desde la cache (sin red)
+    python3 daily_load.py --landing      # Guarda además las respuestas de ventas/stock en data/landing
 
 Logica de ventas:
-    - Siempre recarga el mes actual completo
-    - Si estamos en dia 1, 2 o 3: tambien recarga el mes anterior
+    - Siempre consulta el mes actual completo
+    - Si estamos en dia 1, 2 o 3: tambien consulta el mes anterior
+    - Bronze solo guarda las lineas nuevas/modificadas/borradas (hash de contenido)
+    - Silver y gold recargan solo los documentos que cambiaron en bronze
+    - Maestros (clientes, staff, rutas, artículos): bronze aplica solo las filas distintas y
+      silver/dim_cliente recalculan solo las claves modificadas
 
 Ejemplo crontab:
     0 5 * * * cd /srv/app/medallion-etl && /usr/bin/python3 daily_load.py >> /var/log/medallion-etl/daily.log 2>&1
@@ -29,11 +36,12 @@ load_dotenv(Path(__file__).parent / '.env')
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from config import get_logger
+from layers.run_context import RunContext
 from orchestrator import (
     bronze_masters, bronze_sales, bronze_stock,
     silver_masters, silver_sales, silver_stock,
     gold_dimensions, gold_fact_ventas, gold_fact_stock, gold_cobertura,
-    get_month_range,
+    get_month_range, apply_cache_flags,
 )
 
 logger = get_logger('daily_load')
@@ -55,9 +63,12 @@ def run_phase(name: str, fn, *args, **kwargs) -> bool:
 
 
 def main():
+    apply_cache_flags()
+
     # Determinar fecha de referencia
-    if len(sys.argv) > 1:
-        ref_date = date.fromisoformat(sys.argv[1])
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if args:
+        ref_date = date.fromisoformat(args[0])
     else:
         ref_date = date.today()
 
@@ -104,31 +115,25 @@ def main():
     if not run_phase("FASE 3: BRONZE STOCK", bronze_stock, stock_fecha, stock_fecha):
         errors.append("BRONZE STOCK")
 
-    # FASE 4: SILVER MASTERS
-    if not run_phase("FASE 4: SILVER MASTERS", silver_masters):
+    # FASE 4: SILVER MASTERS (claves modificadas en bronze)
+    if not run_phase("FASE 4: SILVER MASTERS", silver_masters, changes=True):
         errors.append("SILVER MASTERS")
 
-    # FASE 5: SILVER VENTAS
-    if include_prev_month:
-        if not run_phase("FASE 5a: SILVER VENTAS (mes anterior)", silver_sales, mes_anterior_desde, mes_anterior_hasta):
-            errors.append("SILVER VENTAS (mes anterior)")
-    if not run_phase("FASE 5b: SILVER VENTAS (mes actual)", silver_sales, mes_actual_desde, mes_actual_hasta):
-        errors.append("SILVER VENTAS (mes actual)")
+    # FASE 5: SILVER VENTAS (documentos modificados en bronze)
+    if not run_phase("FASE 5: SILVER VENTAS (documentos modificados)", silver_sales, changes=True):
+        errors.append("SILVER VENTAS")
 
     # FASE 6: SILVER STOCK
     if not run_phase("FASE 6: SILVER STOCK", silver_stock, stock_fecha, stock_fecha):
         errors.append("SILVER STOCK")
 
-    # FASE 7: GOLD DIMENSIONES
-    if not run_phase("FASE 7: GOLD DIMENSIONES", gold_dimensions):
+    # FASE 7: GOLD DIMENSIONES (dim_cliente: clientes afectados por cambios de maestros)
+    if not run_phase("FASE 7: GOLD DIMENSIONES", gold_dimensions, changes=True):
         errors.append("GOLD DIMENSIONES")
 
-    # FASE 8: GOLD FACT_VENTAS
-    if include_prev_month:
-        if not run_phase("FASE 8a: GOLD FACT_VENTAS (mes anterior)", gold_fact_ventas, mes_anterior_desde, mes_anterior_hasta):
-            errors.append("GOLD FACT_VENTAS (mes anterior)")
-    if not run_phase("FASE 8b: GOLD FACT_VENTAS (mes actual)", gold_fact_ventas, mes_actual_desde, mes_actual_hasta):
-        errors.append("GOLD FACT_VENTAS (mes actual)")
+    # FASE 8: GOLD FACT_VENTAS (documentos modificados)
+    if not run_phase("FASE 8: GOLD FACT_VENTAS (documentos modificados)", gold_fact_ventas, changes=True):
+        errors.append("GOLD FACT_VENTAS")
 
     # FASE 9: GOLD FACT_STOCK
     if not run_phase("FASE 9: GOLD FACT_STOCK", gold_fact_stock, stock_fecha, stock_fecha):
@@ -153,4 +158,6 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    # Una sesión del ERP y un pool de conexiones para todas las fases
+    with RunContext():
+        main()
@@ -8,15 +8,35 @@ Uso:
 Ejemplos:
     # BRONZE
     python orchestrator.py bronze sales 2025-01-01 2025-12-31
+    python orchestrator.py bronze sales 2025-01-01 2025-12-31 --prefetch=2   # Descarga solapada con escritura
+    python orchestrator.py bronze sales 2025-01-01 2025-12-31 --replace      # Reemplaza meses completos (sin diff por hash)
+    python orchestrator.py bronze sales 2025-01-01 2025-12-31 --fetch-days=1 --batch-size=5000  # Menos memoria por consulta
+    python orchestrator.py bronze sales 2025-01-01 2025-12-31 --passthrough  # Cuerpos crudos a jsonb, sin json en Python
+    python orchestrator.py bronze sales 2025-01-01 2025-12-31 --empresas=EMPRESA2_  # Solo esas empresas (ERP_COMPANIES)
     python orchestrator.py bronze clientes
     python orchestrator.py bronze staff
     python orchestrator.py bronze routes
     python orchestrator.py bronze articles
     python orchestrator.py bronze stock 2025-01-01 2025-12-31
+    python orchestrator.py bronze stock 2025-01-01 2025-01-31 --workers=8   # Consultas concurrentes
+    python orchestrator.py bronze stock 2025-01-01 2025-12-31 --resume      # Retoma un backfill cortado
+    python orchestrator.py bronze stock 2025-01-01 2025-12-31 --storage=delta  # Baseline mensual + cambios diarios
     python orchestrator.py bronze depositos
     python orchestrator.py bronze marketing
     python orchestrator.py bronze hectolitros
-    python orchestrator.py bronze masters                       # Todos los maestros
+    python orchestrator.py bronze masters                       # Todos los maestros (en paralelo)
+    python orchestrator.py bronze masters --workers=1           # Maestros de a uno
+    python orchestrator.py bronze retention stock 3             # Elimina particiones de más de 3 meses
+    python orchestrator.py bronze archive sales 13              # Pasa a Parquet los meses anteriores a los últimos 13
+    python orchestrator.py bronze compact 2024-01-01 2024-12-31 # Compacta ventas con diccionario de claves
+    python orchestrator.py bronze expand 2024-03-01 2024-03-31  # Descompacta (para volver a cargar el mes)
+    python orchestrator.py bronze sales 2025-01-01 2025-01-31 --landing    # Guarda además NDJSON en data/landing
+    python orchestrator.py bronze reload sales 2025-01-01 2025-12-31       # Recarga bronze desde la landing (COPY)
+    python orchestrator.py bronze reload stock 2025-01-01 2025-01-31
+
+    # CACHE DE LA API (cualquier comando bronze / all / partial-refresh-sales)
+    python orchestrator.py bronze sales 2025-01-01 2025-01-31 --cache    # Usa y guarda respuestas cacheadas
+    python orchestrator.py bronze sales 2025-01-01 2025-01-31 --replay   # Solo desde cache, sin red
 
     # SILVER (orden recomendado por dependencias)
     python orchestrator.py silver branches           # 1. Sucursales
@@ -29,8 +49,16 @@ Ejemplos:
     python orchestrator.py silver article_groupings  # 8. Agrupaciones de artículos
     python orchestrator.py silver marketing          # 9. Marketing (segmentos, canales, subcanales)
     python orchestrator.py silver sales [fecha_desde] [fecha_hasta] [--full-refresh]
+    python orchestrator.py silver sales --changes    # Solo documentos modificados en bronze
+    python orchestrator.py silver sales --incremental  # Solo lo cargado en bronze desde la marca de agua
+    python orchestrator.py silver sales --full-refresh --workers=8   # Reconstrucción por meses en paralelo
+    python orchestrator.py silver sales --full-refresh --resume      # Solo los meses que fallaron
+    python orchestrator.py silver sales --full-refresh --engine=columnar  # Casts en Python (pyarrow) + COPY
+    python orchestrator.py silver sales 2025-01-01 2025-01-31 --merge  # MERGE por línea: solo escribe lo que cambió
+    python orchestrator.py silver sales 2025-01-01 2025-01-31 --empresa=2  # Solo una empresa
     python orchestrator.py silver stock [fecha_desde] [fecha_hasta] [--full-refresh]
     python orchestrator.py silver masters            # Todos los maestros (1-9)
+    python orchestrator.py silver masters --changes  # Clientes/staff/rutas/artículos: solo claves modificadas
 
     # GOLD (orden recomendado)
     python orchestrator.py gold dim_tiempo [fecha_desde] [fecha_hasta]  # 1. Dimensión tiempo
@@ -39,6 +67,8 @@ Ejemplos:
     python orchestrator.py gold dim_articulo                            # 4. Dimensión artículo
     python orchestrator.py gold dim_cliente                             # 5. Dimensión cliente
     python orchestrator.py gold fact_ventas [fecha_desde] [fecha_hasta] [--full-refresh]
+    python orchestrator.py gold fact_ventas --changes                   # Solo documentos modificados
+    python orchestrator.py gold fact_ventas 2025-01-01 2025-01-31 --empresa=2  # Solo una empresa
     python orchestrator.py gold fact_stock [fecha_desde] [fecha_hasta] [--full-refresh]
     python orchestrator.py gold cobertura [YYYY-MM] [--full-refresh]    # Todas las coberturas
     python orchestrator.py gold cob_preventista_marca [YYYY-MM]         # Por preventista/ruta/marca
@@ -47,6 +77,7 @@ Ejemplos:
     python orchestrator.py gold cob_sucursal_generico [YYYY-MM]         # Por sucursal/genérico
     python orchestrator.py gold cob_sucursal_aguas [YYYY-MM]            # Por sucursal/subdivisión aguas
     python orchestrator.py gold dimensions                              # Solo dimensiones (1-5)
+    python orchestrator.py gold dimensions --changes                    # dim_cliente solo clientes afectados
     python orchestrator.py gold all                                     # Todo (dimensiones + fact_ventas)
 
     # ALL (pipeline completo)
@@ -56,6 +87,7 @@ Ejemplos:
     python orchestrator.py partial-refresh-sales           # Mes actual
     python orchestrator.py partial-refresh-sales 2025-01   # Mes específico
 """
+import atexit
 import sys
 from pathlib import Path
 
@@ -83,51 +115,61 @@ logger = get_logger('orchestrator')
 # BRONZE LOADERS
 # ==========================================
 
-def bronze_sales(fecha_desde: str, fecha_hasta: str):
-    """Ejecuta la carga de ventas en Bronze."""
-    from layers.bronze import load_bronze
-    logger.info(f"BRONZE SALES: Iniciando carga ({fecha_desde} - {fecha_hasta})")
-    load_bronze(fecha_desde, fecha_hasta)
+def bronze_sales(fecha_desde: str, fecha_hasta: str, prefetch: int = None, replace: bool = False,
+                 resume: bool = False, fetch_days: int = None, batch_size: int = None,
+                 passthrough: bool = None, empresas: list = None):
+    """
+    Ejecuta la carga de ventas en Bronze de las empresas configuradas (ERP_COMPANIES),
+    en paralelo. Con `empresas` (prefijos, ej: ['EMPRESA2_']) solo esas.
+    """
+    from layers.bronze.companies import configured_companies, run_companies
+    companies = configured_companies(empresas)
+    logger.info(f"BRONZE SALES: Iniciando carga ({fecha_desde} - {fecha_hasta}), "
+                f"empresa(s) {', '.join(map(str, companies.values()))}")
+    run_companies(fecha_desde, fecha_hasta, companies, prefetch=prefetch, replace=replace, resume=resume,
+                  fetch_days=fetch_days, batch_size=batch_size, passthrough=passthrough)
     logger.info("BRONZE SALES: Completado")
 
 
-def bronze_clientes():
+def bronze_clientes(client=None):
     """Ejecuta la carga de clientes en Bronze (full refresh)."""
     from layers.bronze import load_clientes
     logger.info("BRONZE CLIENTES: Iniciando carga (full refresh)")
-    load_clientes()
+    load_clientes(client)
     logger.info("BRONZE CLIENTES: Completado")
 
 
-def bronze_staff():
+def bronze_staff(client=None):
     """Ejecuta la carga de staff en Bronze (full refresh)."""
     from layers.bronze import load_staff
     logger.info("BRONZE STAFF: Iniciando carga (full refresh)")
-    load_staff()
+    load_staff(client)
     logger.info("BRONZE STAFF: Completado")
 
 
-def bronze_routes():
+def bronze_routes(client=None):
     """Ejecuta la carga de rutas en Bronze (full refresh)."""
     from layers.bronze import load_routes
     logger.info("BRONZE ROUTES: Iniciando carga (full refresh)")
-    load_routes()
+    load_routes(client)
     logger.info("BRONZE ROUTES: Completado")
 
 
-def bronze_articles():
+def bronze_articles(client=None):
     """Ejecuta la carga de artículos en Bronze (full refresh)."""
     from layers.bronze import load_articles
     logger.info("BRONZE ARTICLES: Iniciando carga (full refresh)")
-    load_articles()
+    load_articles(client)
     logger.info("BRONZE ARTICLES: Completado")
 
 
-def bronze_stock(fecha_desde: str, fecha_hasta: str):
-    """Ejecuta la carga de stock en Bronze (append)."""
+def bronze_stock(fecha_desde: str, fecha_hasta: str, workers: int = None, resume: bool = False,
+                 storage: str = None, passthrough: bool = None):
+    """Ejecuta la carga de stock en Bronze (append, días completos o delta)."""
     from layers.bronze import load_stock
     logger.info(f"BRONZE STOCK: Iniciando carga ({fecha_desde} - {fecha_hasta})")
-    load_stock(fecha_desde, fecha_hasta)
+    load_stock(fecha_desde, fecha_hasta, max_workers=workers, resume=resume, storage=storage,
+               passthrough=passthrough)
     logger.info("BRONZE STOCK: Completado")
 
 
@@ -139,11 +181,11 @@ def bronze_depositos():
     logger.info("BRONZE DEPOSITOS: Completado")
 
 
-def bronze_marketing():
+def bronze_marketing(client=None):
     """Ejecuta la carga de marketing en Bronze (full refresh)."""
     from layers.bronze import load_marketing
     logger.info("BRONZE MARKETING: Iniciando carga (full refresh)")
-    load_marketing()
+    load_marketing(client)
     logger.info("BRONZE MARKETING: Completado")
 
 
@@ -160,63 +202,158 @@ def bronze_hectolitros(full_refresh: bool = False):
     logger.info("BRONZE HECTOLITROS: Completado")
 
 
-def bronze_masters():
-    """Ejecuta la carga de todas las tablas maestras en Bronze (full refresh)."""
+def bronze_masters(workers: int = None):
+    """
+    Ejecuta la carga de todas las tablas maestras en Bronze, en paralelo.
+
+    Los loaders de la API comparten un cliente; si alguno falla los demás terminan
+    igual y se levanta MastersLoadError (ver layers/bronze/masters.py).
+    """
+    from layers.bronze.masters import master_client, run_masters
     logger.info("BRONZE MASTERS: Iniciando carga de maestros")
-    bronze_clientes()
-    bronze_staff()
-    bronze_routes()
-    bronze_articles()
-    bronze_depositos()
-    bronze_marketing()
+    client = master_client()
+    run_masters({
+        'clientes': lambda: bronze_clientes(client),
+        'staff': lambda: bronze_staff(client),
+        'routes': lambda: bronze_routes(client),
+        'articles': lambda: bronze_articles(client),
+        'depositos': bronze_depositos,
+        'marketing': lambda: bronze_marketing(client),
+    }, max_workers=workers)
     logger.info("BRONZE MASTERS: Completado")
 
 
+def bronze_retention(entidad: str, meses: int):
+    """Elimina las particiones mensuales de Bronze anteriores a los últimos `meses` meses."""
+    from layers.bronze import apply_retention
+    tablas = {'sales': 'bronze.raw_sales', 'stock': 'bronze.raw_stock'}
+    logger.info(f"BRONZE RETENTION: Conservando {meses} mes(es) de {tablas[entidad]}")
+    apply_retention(tablas[entidad], meses)
+    logger.info("BRONZE RETENTION: Completado")
+
+
+def bronze_archive(entidad: str, meses: int):
+    """Archiva en Parquet los meses de Bronze anteriores a los últimos `meses` meses y los elimina de la base."""
+    from layers.bronze.archive import archive_months
+    tablas = {'sales': 'bronze.raw_sales', 'stock': 'bronze.raw_stock'}
+    logger.info(f"BRONZE ARCHIVE: Conservando {meses} mes(es) de {tablas[entidad]} en la base")
+    archive_months(tablas[entidad], meses)
+    logger.info("BRONZE ARCHIVE: Completado")
+
+
+def bronze_compact(fecha_desde: str, fecha_hasta: str, expand: bool = False):
+    """Compacta (o descompacta) los meses de ventas de Bronze con diccionario de claves."""
+    from layers.bronze.compaction import compact_months, expand_months
+    accion = "Descompactando" if expand else "Compactando"
+    logger.info(f"BRONZE COMPACT: {accion} ventas {fecha_desde} - {fecha_hasta}")
+    if expand:
+        expand_months(fecha_desde, fecha_hasta)
+    else:
+        compact_months(fecha_desde, fecha_hasta)
+    logger.info("BRONZE COMPACT: Completado")
+
+
+def bronze_reload(entidad: str, fecha_desde: str, fecha_hasta: str, empresa: int = None):
+    """Recarga ventas o stock de Bronze desde la landing zone (sin consultar la API)."""
+    from layers.bronze.landing import reload_sales, reload_stock
+    logger.info(f"BRONZE RELOAD: {entidad} desde la landing ({fecha_desde} - {fecha_hasta})")
+    if entidad == 'sales':
+        if empresa is None:
+            reload_sales(fecha_desde, fecha_hasta)
+        else:
+            reload_sales(fecha_desde, fecha_hasta, empresa)
+    else:
+        reload_stock(fecha_desde, fecha_hasta)
+    logger.info("BRONZE RELOAD: Completado")
+
+
 # ==========================================
 # SILVER TRANSFORMERS
 # ==========================================
 
-def silver_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False):
-    """Ejecuta la transformación de ventas a Silver."""
-    from layers.silver.transformers.sales_transformer import transform_sales
+def silver_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False, changes: bool = False,
+                 empresa: int = None, incremental: bool = False, workers: int = None, resume: bool = False,
+                 motor: str = None, merge: bool = None):
+    """
+    Ejecuta la transformación de ventas a Silver (de todas las empresas o solo de `empresa`).
+
+    --full-refresh reconstruye por meses en paralelo (`workers` conexiones); con un rango
+    también, si se indica `workers` o `resume`. `motor` elige sql o columnar
+    (default: SILVER_SALES_ENGINE). `merge` aplica con MERGE por clave de línea en lugar
+    de DELETE + INSERT (default: SILVER_SALES_MERGE).
+    """
+    from layers.silver.transformers.sales_transformer import (
+        transform_sales,
+        transform_sales_changes,
+        transform_sales_incremental,
+        transform_sales_parallel,
+    )
 
     logger.info("SILVER SALES: Iniciando transformación")
-    if full_refresh:
-        logger.info("  Modo: Full Refresh")
-        transform_sales(full_refresh=True)
+    if empresa is not None and not (changes or incremental):
+        logger.info(f"  Empresa: {empresa}")
+    if motor:
+        logger.info(f"  Motor: {motor}")
+    if merge:
+        logger.info("  Aplicación: MERGE por clave de línea")
+    if incremental:
+        logger.info("  Modo: Incremental (marca de agua de bronze)")
+        transform_sales_incremental(motor=motor, merge=merge)
+    elif changes:
+        logger.info("  Modo: Documentos modificados en bronze")
+        transform_sales_changes(motor=motor, merge=merge)
+    elif full_refresh:
+        logger.info("  Modo: Full Refresh (por meses)")
+        transform_sales_parallel(id_empresa=empresa, max_workers=workers, resume=resume, motor=motor, merge=merge)
+    elif fecha_desde and fecha_hasta and (workers or resume):
+        logger.info(f"  Rango: {fecha_desde} - {fecha_hasta} (por meses)")
+        transform_sales_parallel(fecha_desde, fecha_hasta, id_empresa=empresa, max_workers=workers, resume=resume,
+                                 motor=motor, merge=merge)
     elif fecha_desde and fecha_hasta:
         logger.info(f"  Rango: {fecha_desde} - {fecha_hasta}")
-        transform_sales(fecha_desde, fecha_hasta)
+        transform_sales(fecha_desde, fecha_hasta, id_empresa=empresa, motor=motor, merge=merge)
     else:
         logger.info("  Transformando todos los datos disponibles")
-        transform_sales()
+        transform_sales(id_empresa=empresa, motor=motor, merge=merge)
     logger.info("SILVER SALES: Completado")
 
 
-def silver_clientes(full_refresh: bool = True):
-    """Ejecuta la transformación de clientes a Silver (siempre full refresh)."""
-    from layers.silver.transformers.clients_transformer import transform_clients
+def silver_clientes(full_refresh: bool = True, changes: bool = False):
+    """Ejecuta la transformación de clientes a Silver (full refresh o solo claves modificadas)."""
+    from layers.silver.transformers.clients_transformer import transform_clients, transform_clients_changes
 
-    logger.info("SILVER CLIENTS: Iniciando transformación (full refresh)")
-    transform_clients(full_refresh=full_refresh)
+    if changes:
+        logger.info("SILVER CLIENTS: Iniciando transformación (solo claves modificadas en bronze)")
+        transform_clients_changes()
+    else:
+        logger.info("SILVER CLIENTS: Iniciando transformación (full refresh)")
+        transform_clients(full_refresh=full_refresh)
     logger.info("SILVER CLIENTS: Completado")
 
 
-def silver_articles(full_refresh: bool = True):
-    """Ejecuta la transformación de artículos a Silver (siempre full refresh)."""
-    from layers.silver.transformers.articles_transformer import transform_articles
+def silver_articles(full_refresh: bool = True, changes: bool = False):
+    """Ejecuta la transformación de artículos a Silver (full refresh o solo claves modificadas)."""
+    from layers.silver.transformers.articles_transformer import transform_articles, transform_articles_changes
 
-    logger.info("SILVER ARTICLES: Iniciando transformación (full refresh)")
-    transform_articles(full_refresh=full_refresh)
+    if changes:
+        logger.info("SILVER ARTICLES: Iniciando transformación (solo claves modificadas en bronze)")
+        transform_articles_changes()
+    else:
+        logger.info("SILVER ARTICLES: Iniciando transformación (full refresh)")
+        transform_articles(full_refresh=full_refresh)
     logger.info("SILVER ARTICLES: Completado")
 
 
-def silver_client_forces(full_refresh: bool = True):
+def silver_client_forces(full_refresh: bool = True, changes: bool = False):
     """Ejecuta la transformación de fuerzas de venta de clientes a Silver."""
-    from layers.silver.transformers.client_forces_transformer import transform_client_forces
+    from layers.silver.transformers.client_forces_transformer import transform_client_forces, transform_client_forces_changes
 
-    logger.info("SILVER CLIENT_FORCES: Iniciando transformación (full refresh)")
-    transform_client_forces(full_refresh=full_refresh)
+    if changes:
+        logger.info("SILVER CLIENT_FORCES: Iniciando transformación (solo claves modificadas en bronze)")
+        transform_client_forces_changes()
+    else:
+        logger.info("SILVER CLIENT_FORCES: Iniciando transformación (full refresh)")
+        transform_client_forces(full_refresh=full_refresh)
     logger.info("SILVER CLIENT_FORCES: Completado")
 
 
@@ -238,21 +375,29 @@ def silver_sales_forces(full_refresh: bool = True):
     logger.info("SILVER SALES_FORCES: Completado")
 
 
-def silver_staff(full_refresh: bool = True):
+def silver_staff(full_refresh: bool = True, changes: bool = False):
     """Ejecuta la transformación de personal/preventistas a Silver."""
-    from layers.silver.transformers.staff_transformer import transform_staff
+    from layers.silver.transformers.staff_transformer import transform_staff, transform_staff_changes
 
-    logger.info("SILVER STAFF: Iniciando transformación (full refresh)")
-    transform_staff(full_refresh=full_refresh)
+    if changes:
+        logger.info("SILVER STAFF: Iniciando transformación (solo claves modificadas en bronze)")
+        transform_staff_changes()
+    else:
+        logger.info("SILVER STAFF: Iniciando transformación (full refresh)")
+        transform_staff(full_refresh=full_refresh)
     logger.info("SILVER STAFF: Completado")
 
 
-def silver_routes(full_refresh: bool = True):
+def silver_routes(full_refresh: bool = True, changes: bool = False):
     """Ejecuta la transformación de rutas a Silver."""
-    from layers.silver.transformers.routes_transformer import transform_routes
+    from layers.silver.transformers.routes_transformer import transform_routes, transform_routes_changes
 
-    logger.info("SILVER ROUTES: Iniciando transformación (full refresh)")
-    transform_routes(full_refresh=full_refresh)
+    if changes:
+        logger.info("SILVER ROUTES: Iniciando transformación (solo claves modificadas en bronze)")
+        transform_routes_changes()
+    else:
+        logger.info("SILVER ROUTES: Iniciando transformación (full refresh)")
+        transform_routes(full_refresh=full_refresh)
     logger.info("SILVER ROUTES: Completado")
 
 
@@ -307,16 +452,21 @@ def silver_hectolitros(full_refresh: bool = True):
     logger.info("SILVER HECTOLITROS: Completado")
 
 
-def silver_masters():
-    """Ejecuta la transformación de todas las tablas maestras en Silver (full refresh)."""
+def silver_masters(changes: bool = False):
+    """
+    Ejecuta la transformación de todas las tablas maestras en Silver.
+
+    Con changes=True, clientes, client_forces, staff, rutas y artículos aplican solo las
+    claves modificadas en bronze; el resto de los maestros (chicos) hace full refresh.
+    """
     logger.info("SILVER MASTERS: Iniciando transformación de maestros")
     silver_branches()
     silver_sales_forces()
-    silver_staff()
-    silver_routes()
-    silver_clientes()
-    silver_client_forces()
-    silver_articles()
+    silver_staff(changes=changes)
+    silver_routes(changes=changes)
+    silver_clientes(changes=changes)
+    silver_client_forces(changes=changes)
+    silver_articles(changes=changes)
     silver_article_groupings()
     silver_marketing()
     silver_deposits()
@@ -368,19 +518,26 @@ def gold_dim_articulo():
     logger.info("GOLD DIM_ARTICULO: Completado")
 
 
-def gold_dim_cliente():
-    """Carga dimensión cliente."""
-    from layers.gold.aggregators import load_dim_cliente
+def gold_dim_cliente(changes: bool = False):
+    """Carga dimensión cliente (completa o solo los clientes afectados por cambios de maestros)."""
+    from layers.gold.aggregators import load_dim_cliente, load_dim_cliente_changes
     logger.info("GOLD DIM_CLIENTE: Cargando dimensión")
-    load_dim_cliente()
+    if changes:
+        load_dim_cliente_changes()
+    else:
+        load_dim_cliente()
     logger.info("GOLD DIM_CLIENTE: Completado")
 
 
-def gold_fact_ventas(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False):
-    """Carga fact table de ventas."""
-    from layers.gold.aggregators import load_fact_ventas
+def gold_fact_ventas(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False, changes: bool = False,
+                     empresa: int = None):
+    """Carga fact table de ventas (de todas las empresas o solo de `empresa`)."""
+    from layers.gold.aggregators import load_fact_ventas, load_fact_ventas_changes
     logger.info("GOLD FACT_VENTAS: Cargando hechos")
-    load_fact_ventas(fecha_desde, fecha_hasta, full_refresh)
+    if changes:
+        load_fact_ventas_changes()
+    else:
+        load_fact_ventas(fecha_desde, fecha_hasta, full_refresh, id_empresa=empresa)
     logger.info("GOLD FACT_VENTAS: Completado")
 
 
@@ -440,15 +597,15 @@ def gold_cob_sucursal_aguas(periodo: str = '', full_refresh: bool = False):
     logger.info("GOLD COB_SUCURSAL_AGUAS: Completado")
 
 
-def gold_dimensions():
-    """Carga solo las dimensiones (sin fact_ventas)."""
+def gold_dimensions(changes: bool = False):
+    """Carga solo las dimensiones (sin fact_ventas). Con changes=True dim_cliente es incremental."""
     logger.info("GOLD DIMENSIONS: Iniciando carga de dimensiones")
     gold_dim_tiempo()
     gold_dim_sucursal()
     gold_dim_deposito()
     gold_dim_vendedor()
     gold_dim_articulo()
-    gold_dim_cliente()
+    gold_dim_cliente(changes=changes)
     logger.info("GOLD DIMENSIONS: Completado")
 
 
@@ -480,7 +637,8 @@ def run_all_sales(fecha_desde: str, fecha_hasta: str):
 def partial_refresh_sales(mes: str = None):
     """
     Ejecuta partial refresh de ventas para el mes indicado.
-    Borra y recarga el mes completo en Bronze -> Silver -> Gold.
+    Aplica en Bronze las diferencias del mes contra la API (líneas nuevas y tombstones)
+    y recarga el rango en Silver -> Gold.
 
     Args:
         mes: Formato 'YYYY-MM' o None para mes actual
@@ -494,7 +652,7 @@ def partial_refresh_sales(mes: str = None):
 
     logger.info(f"PARTIAL REFRESH SALES: Iniciando para mes {mes_display} ({fecha_desde} - {fecha_hasta})")
 
-    # Bronze: Borrar y recargar desde API
+    # Bronze: Diferencias contra la API
     logger.info("  [1/3] Bronze: Extrayendo desde API...")
     bronze_sales(fecha_desde, fecha_hasta)
 
@@ -542,6 +700,43 @@ def get_month_range(mes: str = None) -> tuple[str, str]:
     return primer_dia.isoformat(), ultimo_dia.isoformat()
 
 
+def get_option(nombre: str, default: str = None) -> str:
+    """
+    Retorna el valor de una opción '--nombre=valor' de la línea de comandos.
+
+    Ejemplos:
+        get_option('workers')       # '--workers=8' → '8'
+        get_option('workers', '1')  # sin la opción → '1'
+    """
+    prefijo = f"--{nombre}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefijo):
+            return arg[len(prefijo):]
+    return default
+
+
+def apply_cache_flags():
+    """
+    Aplica los flags de cache de la API de la línea de comandos.
+
+    --cache:  usa respuestas cacheadas vigentes y guarda las nuevas
+    --replay: reconstruye bronze solo desde la cache, sin consultar la API
+    --landing: guarda además las respuestas de ventas y stock en la landing zone
+    """
+    from layers.bronze.api_cache import set_cache_mode
+    from layers.bronze.landing import set_landing
+
+    if '--replay' in sys.argv:
+        set_cache_mode('replay')
+        logger.info("Cache API: modo replay (sin red)")
+    elif '--cache' in sys.argv:
+        set_cache_mode('on')
+        logger.info("Cache API: activada")
+    if '--landing' in sys.argv:
+        set_landing(True)
+        logger.info("Landing zone: activada")
+
+
 def print_usage():
     """Muestra el uso del script."""
     print(__doc__)
@@ -557,6 +752,11 @@ if __name__ == '__main__':
         print_usage()
 
     capa = sys.argv[1].lower()
+    apply_cache_flags()
+
+    # Una sesión del ERP y un pool de conexiones para todos los pasos del comando
+    from layers.run_context import RunContext
+    atexit.register(RunContext().activate().close)
 
     # partial-refresh-sales no requiere entidad
     if capa == 'partial-refresh-sales':
@@ -579,7 +779,16 @@ if __name__ == '__main__':
                 logger.error("bronze sales requiere <fecha_desde> <fecha_hasta>")
                 logger.error("Ejemplo: python orchestrator.py bronze sales 2025-12-01 2025-12-31")
                 sys.exit(1)
-            bronze_sales(sys.argv[3], sys.argv[4])
+            prefetch = get_option('prefetch')
+            replace = '--replace' in sys.argv
+            resume = '--resume' in sys.argv
+            fetch_days = get_option('fetch-days')
+            batch_size = get_option('batch-size')
+            passthrough = True if '--passthrough' in sys.argv else None
+            empresas = get_option('empresas')
+            bronze_sales(sys.argv[3], sys.argv[4], int(prefetch) if prefetch else None, replace, resume,
+                         int(fetch_days) if fetch_days else None, int(batch_size) if batch_size else None,
+                         passthrough, empresas.split(',') if empresas else None)
 
         elif entidad == 'clientes':
             bronze_clientes()
@@ -598,7 +807,11 @@ if __name__ == '__main__':
                 logger.error("bronze stock requiere <fecha_desde> <fecha_hasta>")
                 logger.error("Ejemplo: python orchestrator.py bronze stock 2025-12-01 2025-12-31")
                 sys.exit(1)
-            bronze_stock(sys.argv[3], sys.argv[4])
+            workers = get_option('workers')
+            resume = '--resume' in sys.argv
+            passthrough = True if '--passthrough' in sys.argv else None
+            bronze_stock(sys.argv[3], sys.argv[4], int(workers) if workers else None, resume,
+                         get_option('storage'), passthrough)
 
         elif entidad == 'depositos':
             bronze_depositos()
@@ -611,11 +824,41 @@ if __name__ == '__main__':
             bronze_hectolitros(full_refresh)
 
         elif entidad == 'masters':
-            bronze_masters()
+            workers = get_option('workers')
+            bronze_masters(int(workers) if workers else None)
+
+        elif entidad == 'retention':
+            if len(sys.argv) < 5 or sys.argv[3].lower() not in ('sales', 'stock'):
+                logger.error("bronze retention requiere <sales|stock> <meses>")
+                logger.error("Ejemplo: python orchestrator.py bronze retention stock 3")
+                sys.exit(1)
+            bronze_retention(sys.argv[3].lower(), int(sys.argv[4]))
+
+        elif entidad == 'archive':
+            if len(sys.argv) < 5 or sys.argv[3].lower() not in ('sales', 'stock'):
+                logger.error("bronze archive requiere <sales|stock> <meses>")
+                logger.error("Ejemplo: python orchestrator.py bronze archive sales 13")
+                sys.exit(1)
+            bronze_archive(sys.argv[3].lower(), int(sys.argv[4]))
+
+        elif entidad in ('compact', 'expand'):
+            if len(sys.argv) < 5:
+                logger.error(f"bronze {entidad} requiere <fecha_desde> <fecha_hasta>")
+                logger.error(f"Ejemplo: python orchestrator.py bronze {entidad} 2024-01-01 2024-12-31")
+                sys.exit(1)
+            bronze_compact(sys.argv[3], sys.argv[4], expand=(entidad == 'expand'))
+
+        elif entidad == 'reload':
+            if len(sys.argv) < 6 or sys.argv[3].lower() not in ('sales', 'stock'):
+                logger.error("bronze reload requiere <sales|stock> <fecha_desde> <fecha_hasta>")
+                logger.error("Ejemplo: python orchestrator.py bronze reload sales 2025-01-01 2025-12-31")
+                sys.exit(1)
+            empresa = get_option('empresa')
+            bronze_reload(sys.argv[3].lower(), sys.argv[4], sys.argv[5], int(empresa) if empresa else None)
 
         else:
             logger.error(f"Entidad '{entidad}' no reconocida para bronze")
-            logger.error("Entidades disponibles: sales, clientes, staff, routes, articles, stock, depositos, marketing, hectolitros, masters")
+            logger.error("Entidades disponibles: sales, clientes, staff, routes, articles, stock, depositos, marketing, hectolitros, masters, retention, archive, compact, expand, reload")
             sys.exit(1)
 
     # ==========================================
@@ -626,19 +869,25 @@ if __name__ == '__main__':
             fecha_desde = sys.argv[3] if len(sys.argv) > 3 and not sys.argv[3].startswith('--') else ''
             fecha_hasta = sys.argv[4] if len(sys.argv) > 4 and not sys.argv[4].startswith('--') else ''
             full_refresh = '--full-refresh' in sys.argv
-            silver_sales(fecha_desde, fecha_hasta, full_refresh)
+            changes = '--changes' in sys.argv
+            empresa = get_option('empresa')
+            workers = get_option('workers')
+            silver_sales(fecha_desde, fecha_hasta, full_refresh, changes, int(empresa) if empresa else None,
+                         incremental='--incremental' in sys.argv,
+                         workers=int(workers) if workers else None, resume='--resume' in sys.argv,
+                         motor=get_option('engine'), merge=True if '--merge' in sys.argv else None)
 
         elif entidad in ('clientes', 'clients'):
             full_refresh = '--full-refresh' in sys.argv or True  # Siempre full refresh
-            silver_clientes(full_refresh)
+            silver_clientes(full_refresh, '--changes' in sys.argv)
 
         elif entidad == 'articles':
             full_refresh = '--full-refresh' in sys.argv or True  # Siempre full refresh
-            silver_articles(full_refresh)
+            silver_articles(full_refresh, '--changes' in sys.argv)
 
         elif entidad == 'client_forces':
             full_refresh = '--full-refresh' in sys.argv or True  # Siempre full refresh
-            silver_client_forces(full_refresh)
+            silver_client_forces(full_refresh, '--changes' in sys.argv)
 
         elif entidad == 'branches':
             full_refresh = '--full-refresh' in sys.argv or True
@@ -650,11 +899,11 @@ if __name__ == '__main__':
 
         elif entidad == 'staff':
             full_refresh = '--full-refresh' in sys.argv or True
-            silver_staff(full_refresh)
+            silver_staff(full_refresh, '--changes' in sys.argv)
 
         elif entidad == 'routes':
             full_refresh = '--full-refresh' in sys.argv or True
-            silver_routes(full_refresh)
+            silver_routes(full_refresh, '--changes' in sys.argv)
 
         elif entidad == 'article_groupings':
             full_refresh = '--full-refresh' in sys.argv or True
@@ -679,7 +928,7 @@ if __name__ == '__main__':
             silver_hectolitros(full_refresh)
 
         elif entidad == 'masters':
-            silver_masters()
+            silver_masters('--changes' in sys.argv)
 
         else:
             logger.error(f"Entidad '{entidad}' no tiene transformer en silver")
@@ -708,13 +957,15 @@ if __name__ == '__main__':
             gold_dim_articulo()
 
         elif entidad == 'dim_cliente':
-            gold_dim_cliente()
+            gold_dim_cliente('--changes' in sys.argv)
 
         elif entidad == 'fact_ventas':
             fecha_desde = sys.argv[3] if len(sys.argv) > 3 and not sys.argv[3].startswith('--') else ''
             fecha_hasta = sys.argv[4] if len(sys.argv) > 4 and not sys.argv[4].startswith('--') else ''
             full_refresh = '--full-refresh' in sys.argv
-            gold_fact_ventas(fecha_desde, fecha_hasta, full_refresh)
+            changes = '--changes' in sys.argv
+            empresa = get_option('empresa')
+            gold_fact_ventas(fecha_desde, fecha_hasta, full_refresh, changes, int(empresa) if empresa else None)
 
         elif entidad == 'fact_stock':
             fecha_desde = sys.argv[3] if len(sys.argv) > 3 and not sys.argv[3].startswith('--') else ''
@@ -753,7 +1004,7 @@ if __name__ == '__main__':
             gold_cob_sucursal_aguas(periodo, full_refresh)
 
         elif entidad == 'dimensions':
-            gold_dimensions()
+            gold_dimensions('--changes' in sys.argv)
 
         elif entidad == 'all':
             gold_all()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escritura en Bronze: execute_values vs COPY (database.bulk).
+
+Genera un mes sintético de ventas con la forma del payload de la API
+(~80 claves por línea) y lo inserta en una tabla temporal con la misma
+estructura que bronze.raw_sales, una vez con cada método.
+
+Uso:
+    python scripts/bench_bronze_writer.py              # 150.000 líneas (un mes típico)
+    python scripts/bench_bronze_writer.py 500000       # Cantidad de líneas personalizada
+"""
+import sys
+import json
+import time
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+# Agregar src/ al path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from psycopg2.extras import execute_values
+from database import engine
+from database.bulk import copy_rows
+
+CLAVES_TEXTO = [
+    'idDocumento', 'letra', 'cajero', 'usuarioAlta', 'lineaCredito', 'planillaCarga',
+    'origen', 'acciones', 'codproviibb', 'codCuentaContable', 'proveedor', 'regimenFiscal',
+    'anulado', 'esCombo', 'informado', 'dsArticulo', 'desCliente', 'desVendedor',
+]
+CLAVES_ENTERAS = [
+    'idEmpresa', 'serie', 'nrodoc', 'idSucursal', 'idDeposito', 'idCaja', 'idCentroCosto',
+    'idVendedor', 'idSupervisor', 'idGerente', 'idFuerzaVentas', 'idCliente', 'idCanalMkt',
+    'idSegmentoMkt', 'idSubcanalMkt', 'idFleteroCarga', 'idArticulo', 'idCombo', 'idPedido',
+    'nroAsientoContable', 'nroPlanContable', 'idLiquidacion', 'idRechazo',
+]
+CLAVES_NUMERICAS = [
+    'cantidadesCorCargo', 'cantidadesSinCargo', 'cantidadesTotal', 'cantidadesRechazo',
+    'precioUnitarioBruto', 'precioUnitarioNeto', 'bonificacion', 'preciocomprabr', 'preciocomprant',
+    'subtotalBruto', 'subtotalBonificado', 'subtotalNeto', 'subtotalFinal', 'precioventabr',
+    'iva21', 'iva27', 'iva105', 'iva2', 'internos', 'per3337', 'percepcion212',
+    'percepcioniibb', 'persiibbd', 'persiibbr',
+]
+CLAVES_FECHA = [
+    'fechaAlta', 'fechaPedido', 'fechaEntrega', 'fechaVencimiento', 'fechaCaja', 'fechaAnulacion',
+    'fechaPago', 'fechaLiquidacion', 'fechaAsientoContable', 'fvigpcompra',
+]
+
+
+def generar_mes_sintetico(lineas: int, anio: int = 2025, mes: int = 1) -> list:
+    """Genera `lineas` ventas sintéticas distribuidas en un mes."""
+    rnd = random.Random(42)
+    inicio = date(anio, mes, 1)
+    ventas = []
+
+    for i in range(lineas):
+        fecha = (inicio + timedelta(days=i % 28)).isoformat()
+        venta = {'fechaComprobate': fecha}
+        venta.update({k: f"{k.upper()}-{rnd.randint(1, 500)}" for k in CLAVES_TEXTO})
+        venta.update({k: str(rnd.randint(1, 99999)) for k in CLAVES_ENTERAS})
+        venta.update({k: f"{rnd.uniform(0, 10000):.4f}" for k in CLAVES_NUMERICAS})
+        venta.update({k: fecha if rnd.random() > 0.2 else '0001-01-01' for k in CLAVES_FECHA})
+        ventas.append(venta)
+
+    return ventas
+
+
+def _preparar_tabla(cursor):
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS bench_raw_sales
+        (LIKE bronze.raw_sales INCLUDING DEFAULTS)
+    """)
+    cursor.execute("TRUNCATE bench_raw_sales")
+
+
+def bench_execute_values(cursor, raw_conn, ventas: list) -> float:
+    _preparar_tabla(cursor)
+    raw_conn.commit()
+
+    start = time.perf_counter()
+    data = [(json.dumps(v), 'API_CHESS_ERP', v['fechaComprobate']) for v in ventas]
+    execute_values(
+        cursor,
+        "INSERT INTO bench_raw_sales (data_raw, source_system, date_comprobante) VALUES %s",
+        data,
+        template="(%s::jsonb, %s, %s::date)"
+    )
+    raw_conn.commit()
+    return time.perf_counter() - start
+
+
+def bench_copy(cursor, raw_conn, ventas: list) -> float:
+    _preparar_tabla(cursor)
+    raw_conn.commit()
+
+    start = time.perf_counter()
+    copy_rows(
+        cursor,
+        'bench_raw_sales',
+        ('data_raw', 'source_system', 'date_comprobante'),
+        ((json.dumps(v), 'API_CHESS_ERP', v['fechaComprobate']) for v in ventas)
+    )
+    raw_conn.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 150_000
+
+    print(f"Generando {lineas:,} líneas de venta sintéticas...")
+    ventas = generar_mes_sintetico(lineas)
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+
+        resultados = []
+        for nombre, fn in (('execute_values', bench_execute_values), ('COPY', bench_copy)):
+            segundos = fn(cursor, raw_conn, ventas)
+            resultados.append((nombre, segundos, lineas / segundos))
+
+        cursor.execute("DROP TABLE IF EXISTS bench_raw_sales")
+        raw_conn.commit()
+        cursor.close()
+
+    print()
+    print(f"{'Método':<16}{'Tiempo (s)':>12}{'Filas/s':>14}")
+    for nombre, segundos, throughput in resultados:
+        print(f"{nombre:<16}{segundos:>12.2f}{throughput:>14,.0f}")
+
+    base = resultados[0][1]
+    print(f"\nSpeedup COPY vs execute_values: {base / resultados[1][1]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
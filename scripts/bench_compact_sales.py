@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la compactación de ventas con diccionario de claves (layers/bronze/compaction.py).
+
+Genera un mes sintético de ventas con la forma del payload de la API (~80 claves por
+línea, ver bench_bronze_writer.py), lo carga en una tabla temporal con la estructura de
+bronze.raw_sales y arma su versión compacta con las mismas consultas que
+compact_months(). Compara:
+
+  - Tamaño de cada tabla (pg_total_relation_size: heap + TOAST + índices)
+  - Tiempo del INSERT ... SELECT de transform_sales sobre cada representación
+    (la compacta leída como en bronze.raw_sales_all, con bronze.expand_keys())
+  - Que el jsonb rearmado sea idéntico al original
+
+Todo se hace en tablas temporales: no toca bronze ni silver. Requiere la migración
+de compactación aplicada (función bronze.expand_keys).
+
+Uso:
+    python scripts/bench_compact_sales.py              # 150.000 líneas (un mes típico)
+    python scripts/bench_compact_sales.py 500000       # Cantidad de líneas personalizada
+"""
+import sys
+import json
+import time
+from pathlib import Path
+
+# Agregar src/ y scripts/ al path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_bronze_writer import generar_mes_sintetico
+from database import engine
+from database.bulk import copy_rows
+from layers.bronze.compaction import compact_sql, register_schemas_sql
+from layers.silver.transformers.sales_transformer import _build_insert_query
+
+FUENTE_COMPACTA = """(
+    SELECT c.*, e.data_raw, NULL::timestamp AS deleted_at,
+           e.data_raw->>'idDocumento' AS id_documento, e.data_raw->>'letra' AS letra,
+           bronze.json_int(e.data_raw->>'serie') AS serie, bronze.json_int(e.data_raw->>'nrodoc') AS nro_doc,
+           bronze.json_int(e.data_raw->>'idCliente') AS id_cliente,
+           bronze.json_int(e.data_raw->>'idArticulo') AS id_articulo
+    FROM bench_compacto c JOIN bench_claves k ON k.schema_id = c.schema_id
+    CROSS JOIN LATERAL (SELECT bronze.expand_keys(k.keys, c.data_values) AS data_raw) e
+) AS s"""
+
+
+def _preparar_tablas(cursor):
+    cursor.execute("CREATE TEMP TABLE bench_plano (LIKE bronze.raw_sales INCLUDING DEFAULTS INCLUDING GENERATED)")
+    cursor.execute("CREATE TEMP TABLE bench_claves (schema_id SERIAL PRIMARY KEY, keys TEXT[] NOT NULL UNIQUE)")
+    cursor.execute("CREATE TEMP TABLE bench_compacto (LIKE bronze.raw_sales_compact INCLUDING DEFAULTS)")
+    cursor.execute("CREATE TEMP TABLE bench_fact (LIKE silver.fact_ventas INCLUDING DEFAULTS)")
+
+
+def _tamanio(cursor, tabla: str) -> int:
+    cursor.execute("SELECT pg_total_relation_size(%s::regclass)", (tabla,))
+    return cursor.fetchone()[0]
+
+
+def _transformar(cursor, raw_conn, fuente: str) -> float:
+    """Tiempo del INSERT de transform_sales leyendo de `fuente` (en bench_fact)."""
+    cursor.execute("TRUNCATE bench_fact")
+    raw_conn.commit()
+    query = _build_insert_query("WHERE deleted_at IS NULL", fuente).replace(
+        'INSERT INTO silver.fact_ventas', 'INSERT INTO bench_fact'
+    )
+    start = time.perf_counter()
+    cursor.execute(query)
+    raw_conn.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 150_000
+
+    print(f"Generando {lineas:,} líneas de venta sintéticas...")
+    ventas = generar_mes_sintetico(lineas)
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+        cursor.execute("SET work_mem = '1GB'")
+        _preparar_tablas(cursor)
+
+        copy_rows(
+            cursor,
+            'bench_plano',
+            ('data_raw', 'source_system', 'date_comprobante'),
+            ((json.dumps(v), 'API_CHESS_ERP', v['fechaComprobate']) for v in ventas)
+        )
+        raw_conn.commit()
+
+        start = time.perf_counter()
+        cursor.execute(register_schemas_sql('bench_plano', 'bench_claves'))
+        cursor.execute(compact_sql('bench_plano', 'bench_compacto', 'bench_claves'))
+        raw_conn.commit()
+        compactar = time.perf_counter() - start
+
+        cursor.execute("ANALYZE bench_plano")
+        cursor.execute("ANALYZE bench_compacto")
+        raw_conn.commit()
+
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM bench_plano p
+            JOIN {FUENTE_COMPACTA} ON s.id = p.id
+            WHERE s.data_raw IS DISTINCT FROM p.data_raw
+        """)
+        distintas = cursor.fetchone()[0]
+
+        resultados = []
+        for nombre, tabla, fuente in (('jsonb plano', 'bench_plano', 'bench_plano'),
+                                      ('compacto', 'bench_compacto', FUENTE_COMPACTA)):
+            segundos = _transformar(cursor, raw_conn, fuente)
+            resultados.append((nombre, _tamanio(cursor, tabla), segundos))
+
+        cursor.execute("SELECT COUNT(*) FROM bench_claves")
+        esquemas = cursor.fetchone()[0]
+
+        for tabla in ('bench_fact', 'bench_compacto', 'bench_claves', 'bench_plano'):
+            cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+        raw_conn.commit()
+        cursor.close()
+
+    print(f"\nCompactación: {compactar:.2f}s, {esquemas} conjunto(s) de claves, "
+          f"{distintas} línea(s) distintas al rearmar")
+    print()
+    print(f"{'Representación':<16}{'Tamaño (MB)':>14}{'Silver (s)':>12}{'Filas/s':>14}")
+    for nombre, tamanio, segundos in resultados:
+        print(f"{nombre:<16}{tamanio / 1024 / 1024:>14.1f}{segundos:>12.2f}{lineas / segundos:>14,.0f}")
+
+    (_, tam_plano, seg_plano), (_, tam_compacto, seg_compacto) = resultados
+    print(f"\nTamaño compacto / plano: {tam_compacto / tam_plano:.0%}")
+    print(f"Silver compacto / plano: {seg_compacto / seg_plano:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
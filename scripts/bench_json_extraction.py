@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las estrategias de extracción de data_raw en silver: operator vs record.
+
+Para cada transformer ejecuta su INSERT ... SELECT con cada estrategia
+(layers/silver/transformers/extraction.py) sobre los datos actuales de bronze:
+
+  - operator: data_raw->>'clave' por columna
+  - record: un jsonb_to_record(data_raw) por fila
+
+Cada ejecución corre en una transacción que borra antes las filas de silver que va a
+insertar (como el transformer) y termina con ROLLBACK: silver no cambia, pero las tablas
+quedan bloqueadas mientras dura cada INSERT (correr fuera de la ventana de carga).
+Ventas y stock usan el último mes y la última semana con datos. Se informa la mejor de
+N repeticiones, alternando las estrategias.
+
+Uso:
+    python scripts/bench_json_extraction.py                 # Todos los transformers, 3 repeticiones
+    python scripts/bench_json_extraction.py sales stock     # Solo algunos
+    python scripts/bench_json_extraction.py --repeticiones=5
+"""
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+# Agregar src/ al path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import engine
+from layers.bronze.partitions import month_bounds
+from layers.silver.transformers import (
+    articles_transformer,
+    clients_transformer,
+    routes_transformer,
+    sales_transformer,
+    staff_transformer,
+    stock_transformer,
+)
+from layers.silver.transformers.extraction import STRATEGIES
+
+
+def _ultimo_mes_ventas(cursor) -> tuple:
+    cursor.execute("SELECT MAX(date_comprobante) FROM bronze.raw_sales WHERE deleted_at IS NULL")
+    ultimo = cursor.fetchone()[0]
+    if ultimo is None:
+        return None
+    desde, siguiente = month_bounds(ultimo)
+    return str(desde), str(siguiente - timedelta(days=1))
+
+
+def _ultima_semana_stock(cursor) -> tuple:
+    cursor.execute("SELECT MAX(date_stock) FROM bronze.raw_stock_days")
+    ultimo = cursor.fetchone()[0]
+    if ultimo is None:
+        return None
+    return str(ultimo - timedelta(days=6)), str(ultimo)
+
+
+def _ventas(cursor):
+    rango = _ultimo_mes_ventas(cursor)
+    if rango is None:
+        return None
+    where = "WHERE deleted_at IS NULL AND date_comprobante >= %s AND date_comprobante <= %s"
+    return (
+        ("DELETE FROM silver.fact_ventas WHERE fecha_comprobante >= %s AND fecha_comprobante <= %s", rango),
+        lambda s: sales_transformer._build_insert_query(where, 'bronze.raw_sales_all', strategy=s),
+        rango,
+    )
+
+
+def _stock(cursor):
+    rango = _ultima_semana_stock(cursor)
+    if rango is None:
+        return None
+    return (
+        ("DELETE FROM silver.fact_stock WHERE date_stock >= %s AND date_stock <= %s", rango),
+        lambda s: stock_transformer._build_insert_query(strategy=s),
+        rango,
+    )
+
+
+def _maestro(tabla: str, modulo):
+    def preparar(cursor):
+        return (f"DELETE FROM {tabla}", None), lambda s: modulo._build_insert_query(strategy=s), None
+    return preparar
+
+
+TRANSFORMERS = {
+    'sales': _ventas,
+    'stock': _stock,
+    'clients': _maestro('silver.clients', clients_transformer),
+    'articles': _maestro('silver.articles', articles_transformer),
+    'routes': _maestro('silver.routes', routes_transformer),
+    'staff': _maestro('silver.staff', staff_transformer),
+}
+
+
+def _medir(cursor, raw_conn, borrar: tuple, query: str, params) -> tuple[int, float]:
+    """(filas, segundos) del INSERT, en una transacción que se descarta."""
+    try:
+        cursor.execute(*borrar)
+        inicio = time.perf_counter()
+        cursor.execute(query, params)
+        return cursor.rowcount, time.perf_counter() - inicio
+    finally:
+        raw_conn.rollback()
+
+
+def main():
+    repeticiones = 3
+    nombres = []
+    for arg in sys.argv[1:]:
+        if arg.startswith('--repeticiones='):
+            repeticiones = int(arg.split('=', 1)[1])
+        else:
+            nombres.append(arg)
+    nombres = nombres or list(TRANSFORMERS)
+
+    resultados = []
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+
+        for nombre in nombres:
+            preparado = TRANSFORMERS[nombre](cursor)
+            raw_conn.rollback()
+            if preparado is None:
+                print(f"{nombre}: sin datos en bronze")
+                continue
+            borrar, construir, params = preparado
+
+            mejores = {}
+            for _ in range(repeticiones):
+                for strategy in STRATEGIES:
+                    filas, segundos = _medir(cursor, raw_conn, borrar, construir(strategy), params)
+                    if strategy not in mejores or segundos < mejores[strategy][1]:
+                        mejores[strategy] = (filas, segundos)
+            for strategy in STRATEGIES:
+                filas, segundos = mejores[strategy]
+                print(f"{nombre} / {strategy}: {filas:,} filas en {segundos:.2f}s")
+                resultados.append((nombre, strategy, filas, segundos))
+
+        cursor.close()
+
+    print()
+    print(f"{'Transformer':<12}{'Estrategia':<12}{'Filas':>12}{'Tiempo (s)':>12}{'Filas/s':>14}")
+    for nombre, strategy, filas, segundos in resultados:
+        throughput = filas / segundos if segundos > 0 else 0
+        print(f"{nombre:<12}{strategy:<12}{filas:>12,}{segundos:>12.2f}{throughput:>14,.0f}")
+
+    print()
+    for i in range(0, len(resultados), 2):
+        (nombre, _, _, operador), (_, _, _, registro) = resultados[i:i + 2]
+        if operador > 0:
+            print(f"{nombre:<12} tiempo record / operator = {registro / operador:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los motores de la transformación de ventas a silver: sql vs columnar.
+
+Genera líneas de venta sintéticas con la forma del payload de la API (~80 claves por
+línea, ver bench_bronze_writer.py), las carga en una tabla temporal con la estructura
+de bronze.raw_sales y las transforma en otra con la estructura de silver.fact_ventas,
+una vez con cada motor:
+
+  - sql: el INSERT ... SELECT de transform_sales (casts de jsonb en PostgreSQL)
+  - columnar: sales_columnar.copy_sales (pyarrow en el cliente + COPY)
+
+Informa el tiempo total, el CPU del proceso de Python (lo que el motor columnar le
+saca al servidor de base) y que ambos resultados sean idénticos (EXCEPT ALL).
+Todo se hace en tablas temporales: no toca bronze ni silver. Requiere pyarrow.
+
+Uso:
+    python scripts/bench_sales_engines.py                      # 1.000.000 y 10.000.000 de líneas
+    python scripts/bench_sales_engines.py 150000 1000000       # Cantidades personalizadas
+"""
+import sys
+import json
+import time
+from pathlib import Path
+
+# Agregar src/ y scripts/ al path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_bronze_writer import generar_mes_sintetico
+from database import engine
+from database.bulk import copy_rows
+from layers.silver.transformers.sales_columnar import copy_sales
+from layers.silver.transformers.sales_transformer import _build_insert_query
+
+# Líneas generadas por vez (el total no se arma en memoria)
+BLOQUE_GENERACION = 500_000
+WHERE = "WHERE deleted_at IS NULL"
+
+
+def _cargar_bronze(cursor, raw_conn, lineas: int):
+    """Carga `lineas` ventas sintéticas en bench_raw_sales, un mes por bloque."""
+    cursor.execute("DROP TABLE IF EXISTS bench_raw_sales")
+    cursor.execute("CREATE TEMP TABLE bench_raw_sales (LIKE bronze.raw_sales INCLUDING DEFAULTS INCLUDING GENERATED)")
+    cargadas = 0
+    mes = 0
+    while cargadas < lineas:
+        cantidad = min(BLOQUE_GENERACION, lineas - cargadas)
+        ventas = generar_mes_sintetico(cantidad, 2020 + mes // 12, mes % 12 + 1)
+        copy_rows(
+            cursor,
+            'bench_raw_sales',
+            ('data_raw', 'source_system', 'date_comprobante'),
+            ((json.dumps(v), 'API_CHESS_ERP', v['fechaComprobate']) for v in ventas)
+        )
+        cargadas += cantidad
+        mes += 1
+    cursor.execute("ANALYZE bench_raw_sales")
+    raw_conn.commit()
+
+
+def _preparar_fact(cursor, raw_conn, tabla: str):
+    cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+    cursor.execute(f"CREATE TEMP TABLE {tabla} (LIKE silver.fact_ventas INCLUDING DEFAULTS)")
+    raw_conn.commit()
+
+
+def motor_sql(cursor) -> int:
+    cursor.execute(_build_insert_query(WHERE, 'bench_raw_sales').replace(
+        'INSERT INTO silver.fact_ventas', 'INSERT INTO bench_fact_sql'
+    ))
+    return cursor.rowcount
+
+
+def motor_columnar(cursor) -> int:
+    return copy_sales(cursor, WHERE, source='bench_raw_sales', target='bench_fact_columnar')
+
+
+def _medir(cursor, raw_conn, fn) -> tuple[int, float, float]:
+    """(filas, segundos, segundos de CPU del cliente)"""
+    inicio, cpu = time.perf_counter(), time.process_time()
+    filas = fn(cursor)
+    raw_conn.commit()
+    return filas, time.perf_counter() - inicio, time.process_time() - cpu
+
+
+def _diferencias(cursor) -> int:
+    """Líneas que están en un resultado y no en el otro (sin las columnas generadas por silver)."""
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = 'silver' AND table_name = 'fact_ventas'
+          AND column_default IS NULL
+        ORDER BY ordinal_position
+    """)
+    columnas = ', '.join(c for (c,) in cursor.fetchall())
+    cursor.execute(f"""
+        SELECT (SELECT COUNT(*) FROM (SELECT {columnas} FROM bench_fact_sql
+                                      EXCEPT ALL SELECT {columnas} FROM bench_fact_columnar) a)
+             + (SELECT COUNT(*) FROM (SELECT {columnas} FROM bench_fact_columnar
+                                      EXCEPT ALL SELECT {columnas} FROM bench_fact_sql) b)
+    """)
+    return cursor.fetchone()[0]
+
+
+def main():
+    tamanios = [int(a) for a in sys.argv[1:]] or [1_000_000, 10_000_000]
+
+    resultados = []
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+        cursor.execute("SET work_mem = '1GB'")
+
+        for lineas in tamanios:
+            print(f"Cargando {lineas:,} líneas de venta sintéticas...")
+            _cargar_bronze(cursor, raw_conn, lineas)
+
+            for nombre, tabla, fn in (('sql', 'bench_fact_sql', motor_sql),
+                                      ('columnar', 'bench_fact_columnar', motor_columnar)):
+                _preparar_fact(cursor, raw_conn, tabla)
+                filas, segundos, cpu = _medir(cursor, raw_conn, fn)
+                print(f"  {nombre}: {filas:,} líneas en {segundos:.2f}s")
+                resultados.append((lineas, nombre, segundos, cpu))
+
+            distintas = _diferencias(cursor)
+            print(f"  {distintas} línea(s) distintas entre motores")
+
+            for tabla in ('bench_fact_sql', 'bench_fact_columnar', 'bench_raw_sales'):
+                cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+            raw_conn.commit()
+
+        cursor.close()
+
+    print()
+    print(f"{'Líneas':>12}  {'Motor':<10}{'Tiempo (s)':>12}{'CPU cliente (s)':>17}{'Filas/s':>14}")
+    for lineas, nombre, segundos, cpu in resultados:
+        print(f"{lineas:>12,}  {nombre:<10}{segundos:>12.2f}{cpu:>17.2f}{lineas / segundos:>14,.0f}")
+
+    print()
+    for i in range(0, len(resultados), 2):
+        (lineas, _, seg_sql, _), (_, _, seg_columnar, _) = resultados[i:i + 2]
+        print(f"{lineas:>12,} líneas: columnar / sql = {seg_columnar / seg_sql:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria de la ingesta de ventas en Bronze (layers/bronze/loaders/sales_loader.py).
+
+Mide con tracemalloc el pico de memoria de consultar y escribir un mes de ventas
+con distintas combinaciones de días por consulta (SALES_FETCH_DAYS) y líneas por
+bloque de COPY (SALES_BATCH_SIZE), para dos volúmenes diarios. Con el mes en una
+sola consulta el pico crece con el volumen del mes; por sub-rangos queda acotado
+por la respuesta de un sub-rango.
+
+No necesita base de datos ni API: el cliente genera líneas sintéticas con la forma
+del payload real (ver bench_bronze_writer.py) y el cursor consume el COPY sin enviarlo.
+
+Uso:
+    python scripts/bench_sales_memory.py              # 250 y 1.000 líneas por día
+    python scripts/bench_sales_memory.py 1000 4000    # Volúmenes diarios personalizados
+"""
+import sys
+import time
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Agregar src/ y scripts/ al path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_bronze_writer import CLAVES_TEXTO, CLAVES_ENTERAS, CLAVES_NUMERICAS, CLAVES_FECHA
+from layers.bronze.loaders.sales_loader import _insert_partes, _iter_partes
+from layers.bronze.range_planner import RangePlanner
+
+MES = ('2025-01-01', '2025-01-31')
+
+# (etiqueta, días por consulta, líneas por bloque)
+CONFIGURACIONES = [
+    ('mes completo', 0, 1_000_000),
+    ('7 días / 10.000', 7, 10_000),
+    ('1 día / 10.000', 1, 10_000),
+    ('1 día / 1.000', 1, 1_000),
+]
+
+
+class ClienteSintetico:
+    """Cliente falso: `por_dia` líneas de venta por cada día del rango consultado."""
+
+    def __init__(self, por_dia: int):
+        self.por_dia = por_dia
+
+    def get_sales(self, fecha_desde, fecha_hasta, **kwargs):
+        rnd = random.Random(fecha_desde)
+        dia = datetime.strptime(fecha_desde, '%Y-%m-%d')
+        fin = datetime.strptime(fecha_hasta, '%Y-%m-%d')
+        ventas = []
+        while dia <= fin:
+            fecha = dia.strftime('%Y-%m-%d')
+            for _ in range(self.por_dia):
+                venta = {'fechaComprobate': fecha}
+                venta.update({k: f"{k.upper()}-{rnd.randint(1, 500)}" for k in CLAVES_TEXTO})
+                venta.update({k: str(rnd.randint(1, 99999)) for k in CLAVES_ENTERAS})
+                venta.update({k: f"{rnd.uniform(0, 10000):.4f}" for k in CLAVES_NUMERICAS})
+                venta.update({k: fecha for k in CLAVES_FECHA})
+                ventas.append(venta)
+            dia += timedelta(days=1)
+        return ventas
+
+
+class CursorNulo:
+    """Cursor que lee el COPY completo por bloques (como PostgreSQL) y lo descarta."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def copy_expert(self, query, stream, size=8192):
+        while True:
+            bloque = stream.read(size)
+            if not bloque:
+                break
+            self.bytes += len(bloque)
+
+
+def medir(por_dia: int, dias: int, batch_size: int) -> tuple[float, float, int]:
+    """Retorna (pico en MB, segundos, líneas escritas) de ingerir el mes."""
+    cliente = ClienteSintetico(por_dia)
+    cursor = CursorNulo()
+    planner = RangePlanner(initial_days=dias, adaptive=False)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    lineas = _insert_partes(cursor, _iter_partes(cliente, planner, *MES), 'tmp_raw_sales', batch_size)
+    segundos = time.perf_counter() - start
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return pico / 1024 / 1024, segundos, lineas
+
+
+def main():
+    volumenes = [int(v) for v in sys.argv[1:]] or [250, 1_000]
+
+    print(f"{'Líneas/día':>10}  {'Configuración':<18}{'Líneas':>10}{'Pico (MB)':>12}{'Tiempo (s)':>12}")
+    for por_dia in volumenes:
+        for etiqueta, dias, batch_size in CONFIGURACIONES:
+            pico, segundos, lineas = medir(por_dia, dias, batch_size)
+            print(f"{por_dia:>10,}  {etiqueta:<18}{lineas:>10,}{pico:>12.1f}{segundos:>12.2f}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+-- migrate:up
+-- Particionado mensual (RANGE por fecha) de bronze.raw_sales y bronze.raw_stock.
+-- Las recargas de un mes completo reemplazan la particion (ATTACH/DETACH) en lugar de
+-- DELETE + INSERT, y la retencion elimina particiones enteras (ver src/layers/bronze/partitions.py).
+-- Las particiones de meses nuevos las crea el loader antes de insertar.
+-- La clave de particion es NOT NULL: si hay filas con fecha NULL la migracion falla sin
+-- tocar nada (corregir o eliminar esas filas a mano y volver a migrar).
+
+DO $$
+DECLARE
+    ventas BIGINT;
+    stock BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO ventas FROM bronze.raw_sales WHERE date_comprobante IS NULL;
+    SELECT COUNT(*) INTO stock FROM bronze.raw_stock WHERE date_stock IS NULL;
+    IF ventas > 0 OR stock > 0 THEN
+        RAISE EXCEPTION 'Filas con fecha NULL: % en bronze.raw_sales, % en bronze.raw_stock (corregirlas o eliminarlas antes de particionar)',
+            ventas, stock;
+    END IF;
+END $$;
+
+-- ------------------------------------------
+-- bronze.raw_sales (por date_comprobante)
+-- ------------------------------------------
+ALTER TABLE bronze.raw_sales RENAME TO raw_sales_legacy;
+ALTER TABLE bronze.raw_sales_legacy RENAME CONSTRAINT raw_sales_pkey TO raw_sales_legacy_pkey;
+ALTER INDEX bronze.idx_bronze_sales_date RENAME TO idx_bronze_sales_date_legacy;
+ALTER SEQUENCE bronze.raw_sales_id_seq OWNED BY NONE;
+
+CREATE TABLE bronze.raw_sales (
+    id INTEGER NOT NULL DEFAULT nextval('bronze.raw_sales_id_seq'),
+    ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    source_system VARCHAR(50),
+    data_raw JSONB,
+    date_comprobante DATE NOT NULL,
+    PRIMARY KEY (id, date_comprobante)
+) PARTITION BY RANGE (date_comprobante);
+
+ALTER SEQUENCE bronze.raw_sales_id_seq OWNED BY bronze.raw_sales.id;
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_date ON bronze.raw_sales(date_comprobante);
+
+DO $$
+DECLARE
+    mes DATE;
+BEGIN
+    FOR mes IN
+        SELECT DISTINCT date_trunc('month', date_comprobante)::date
+        FROM bronze.raw_sales_legacy
+        WHERE date_comprobante IS NOT NULL
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS bronze.%I PARTITION OF bronze.raw_sales FOR VALUES FROM (%L) TO (%L)',
+            'raw_sales_p' || to_char(mes, 'YYYY_MM'), mes, (mes + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO bronze.raw_sales (id, ingestion_at, source_system, data_raw, date_comprobante)
+SELECT id, ingestion_at, source_system, data_raw, date_comprobante
+FROM bronze.raw_sales_legacy;
+
+DROP TABLE bronze.raw_sales_legacy;
+
+-- ------------------------------------------
+-- bronze.raw_stock (por date_stock)
+-- ------------------------------------------
+ALTER TABLE bronze.raw_stock RENAME TO raw_stock_legacy;
+ALTER TABLE bronze.raw_stock_legacy RENAME CONSTRAINT raw_stock_pkey TO raw_stock_legacy_pkey;
+ALTER INDEX bronze.idx_stock_date RENAME TO idx_stock_date_legacy;
+ALTER INDEX bronze.idx_stock_deposito RENAME TO idx_stock_deposito_legacy;
+ALTER INDEX bronze.idx_stock_ingestion RENAME TO idx_stock_ingestion_legacy;
+ALTER SEQUENCE bronze.raw_stock_id_seq OWNED BY NONE;
+
+CREATE TABLE bronze.raw_stock (
+    id INTEGER NOT NULL DEFAULT nextval('bronze.raw_stock_id_seq'),
+    ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    source_system VARCHAR(50),
+    data_raw JSONB,
+    date_stock DATE NOT NULL,
+    id_deposito INTEGER,
+    PRIMARY KEY (id, date_stock)
+) PARTITION BY RANGE (date_stock);
+
+ALTER SEQUENCE bronze.raw_stock_id_seq OWNED BY bronze.raw_stock.id;
+CREATE INDEX IF NOT EXISTS idx_stock_date ON bronze.raw_stock(date_stock);
+CREATE INDEX IF NOT EXISTS idx_stock_deposito ON bronze.raw_stock(id_deposito);
+CREATE INDEX IF NOT EXISTS idx_stock_ingestion ON bronze.raw_stock(ingestion_at);
+
+DO $$
+DECLARE
+    mes DATE;
+BEGIN
+    FOR mes IN
+        SELECT DISTINCT date_trunc('month', date_stock)::date
+        FROM bronze.raw_stock_legacy
+        WHERE date_stock IS NOT NULL
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS bronze.%I PARTITION OF bronze.raw_stock FOR VALUES FROM (%L) TO (%L)',
+            'raw_stock_p' || to_char(mes, 'YYYY_MM'), mes, (mes + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO bronze.raw_stock (id, ingestion_at, source_system, data_raw, date_stock, id_deposito)
+SELECT id, ingestion_at, source_system, data_raw, date_stock, id_deposito
+FROM bronze.raw_stock_legacy;
+
+DROP TABLE bronze.raw_stock_legacy;
+
+-- migrate:down
+ALTER TABLE bronze.raw_sales RENAME TO raw_sales_partitioned;
+ALTER TABLE bronze.raw_sales_partitioned RENAME CONSTRAINT raw_sales_pkey TO raw_sales_partitioned_pkey;
+ALTER INDEX bronze.idx_bronze_sales_date RENAME TO idx_bronze_sales_date_partitioned;
+ALTER SEQUENCE bronze.raw_sales_id_seq OWNED BY NONE;
+
+CREATE TABLE bronze.raw_sales (
+    id INTEGER PRIMARY KEY DEFAULT nextval('bronze.raw_sales_id_seq'),
+    ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    source_system VARCHAR(50),
+    data_raw JSONB,
+    date_comprobante DATE
+);
+ALTER SEQUENCE bronze.raw_sales_id_seq OWNED BY bronze.raw_sales.id;
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_date ON bronze.raw_sales(date_comprobante);
+
+INSERT INTO bronze.raw_sales (id, ingestion_at, source_system, data_raw, date_comprobante)
+SELECT id, ingestion_at, source_system, data_raw, date_comprobante
+FROM bronze.raw_sales_partitioned;
+
+DROP TABLE bronze.raw_sales_partitioned;
+
+ALTER TABLE bronze.raw_stock RENAME TO raw_stock_partitioned;
+ALTER TABLE bronze.raw_stock_partitioned RENAME CONSTRAINT raw_stock_pkey TO raw_stock_partitioned_pkey;
+ALTER INDEX bronze.idx_stock_date RENAME TO idx_stock_date_partitioned;
+ALTER INDEX bronze.idx_stock_deposito RENAME TO idx_stock_deposito_partitioned;
+ALTER INDEX bronze.idx_stock_ingestion RENAME TO idx_stock_ingestion_partitioned;
+ALTER SEQUENCE bronze.raw_stock_id_seq OWNED BY NONE;
+
+CREATE TABLE bronze.raw_stock (
+    id INTEGER PRIMARY KEY DEFAULT nextval('bronze.raw_stock_id_seq'),
+    ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    source_system VARCHAR(50),
+    data_raw JSONB,
+    date_stock DATE,
+    id_deposito INTEGER
+);
+ALTER SEQUENCE bronze.raw_stock_id_seq OWNED BY bronze.raw_stock.id;
+CREATE INDEX IF NOT EXISTS idx_stock_date ON bronze.raw_stock(date_stock);
+CREATE INDEX IF NOT EXISTS idx_stock_deposito ON bronze.raw_stock(id_deposito);
+CREATE INDEX IF NOT EXISTS idx_stock_ingestion ON bronze.raw_stock(ingestion_at);
+
+INSERT INTO bronze.raw_stock (id, ingestion_at, source_system, data_raw, date_stock, id_deposito)
+SELECT id, ingestion_at, source_system, data_raw, date_stock, id_deposito
+FROM bronze.raw_stock_partitioned;
+
+DROP TABLE bronze.raw_stock_partitioned;
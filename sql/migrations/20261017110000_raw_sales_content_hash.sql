@@ -0,0 +1,36 @@
+-- migrate:up
+-- Hash de contenido por línea de venta: la recarga diaria inserta solo las líneas nuevas
+-- o modificadas y marca como borradas (deleted_at) las que ya no devuelve la API.
+-- md5 sobre data_raw::text: jsonb normaliza el orden de las claves, el hash no depende
+-- del orden en que la API serializa los campos.
+ALTER TABLE bronze.raw_sales
+    ADD COLUMN content_hash CHAR(32) GENERATED ALWAYS AS (md5(data_raw::text)) STORED,
+    ADD COLUMN deleted_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_hash
+ON bronze.raw_sales(date_comprobante, content_hash) WHERE deleted_at IS NULL;
+
+-- Documentos con líneas insertadas o borradas por la carga de bronze.
+-- Silver los aplica y marca silver_applied_at; gold los aplica y elimina la fila.
+CREATE TABLE IF NOT EXISTS bronze.raw_sales_changes (
+    id SERIAL PRIMARY KEY,
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    date_comprobante DATE NOT NULL,
+    id_empresa INTEGER,
+    id_documento VARCHAR(20),
+    letra CHAR(1),
+    serie INTEGER,
+    nro_doc INTEGER,
+    silver_applied_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_changes_silver
+ON bronze.raw_sales_changes(id) WHERE silver_applied_at IS NULL;
+
+-- migrate:down
+DROP TABLE IF EXISTS bronze.raw_sales_changes;
+DROP INDEX IF EXISTS bronze.idx_bronze_sales_hash;
+DELETE FROM bronze.raw_sales WHERE deleted_at IS NOT NULL;
+ALTER TABLE bronze.raw_sales
+    DROP COLUMN IF EXISTS deleted_at,
+    DROP COLUMN IF EXISTS content_hash;
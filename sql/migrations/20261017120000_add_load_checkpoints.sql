@@ -0,0 +1,15 @@
+-- migrate:up
+-- Unidades completadas de las cargas de Bronze (ver src/layers/bronze/checkpoints.py).
+-- Permite retomar un backfill con --resume desde la última unidad confirmada.
+CREATE TABLE IF NOT EXISTS bronze.load_checkpoints (
+    entity VARCHAR(50) NOT NULL,
+    range_desde DATE NOT NULL,
+    range_hasta DATE NOT NULL,
+    id_deposito INTEGER NOT NULL DEFAULT 0,  -- 0 = unidad sin depósito (ventas)
+    rows_loaded INTEGER,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity, range_desde, range_hasta, id_deposito)
+);
+
+-- migrate:down
+DROP TABLE IF EXISTS bronze.load_checkpoints;
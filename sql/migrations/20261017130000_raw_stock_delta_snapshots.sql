@@ -0,0 +1,75 @@
+-- migrate:up
+-- Snapshots de stock delta (ver src/layers/bronze/stock_snapshots.py).
+-- snapshot_kind: F = día completo, B = baseline del mes, D = fila nueva/modificada, X = baja.
+-- Las filas existentes quedan como días completos (F).
+ALTER TABLE bronze.raw_stock ADD COLUMN IF NOT EXISTS snapshot_kind CHAR(1) NOT NULL DEFAULT 'F';
+
+CREATE INDEX IF NOT EXISTS idx_stock_deposito_date ON bronze.raw_stock(id_deposito, date_stock);
+
+-- Días cargados por depósito (ancla de la reconstrucción y conteo de filas completas)
+CREATE TABLE IF NOT EXISTS bronze.raw_stock_days (
+    date_stock DATE NOT NULL,
+    id_deposito INTEGER NOT NULL,
+    snapshot_kind CHAR(1) NOT NULL,        -- F, B o D
+    rows_stored INTEGER NOT NULL,          -- filas guardadas en bronze.raw_stock
+    rows_total INTEGER NOT NULL,           -- filas del inventario completo del día
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date_stock, id_deposito)
+);
+
+INSERT INTO bronze.raw_stock_days (date_stock, id_deposito, snapshot_kind, rows_stored, rows_total)
+SELECT date_stock, id_deposito, 'F', COUNT(*), COUNT(*)
+FROM bronze.raw_stock
+WHERE id_deposito IS NOT NULL
+GROUP BY date_stock, id_deposito
+ON CONFLICT (date_stock, id_deposito) DO NOTHING;
+
+-- Identidad de una fila de stock (mismo criterio que stock_key() en Python)
+CREATE OR REPLACE FUNCTION bronze.stock_key(data_raw JSONB)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT concat_ws('|',
+        COALESCE(data_raw->>'idAlmacen', ''),
+        COALESCE(data_raw->>'idArticulo', ''),
+        COALESCE(data_raw->>'fecVtoLote', ''))
+$$;
+
+-- Inventario completo de cada día cargado: última versión de cada fila entre el último
+-- día completo (F o B) del mes y el día pedido, sin las bajas. NULL = sin filtro.
+CREATE OR REPLACE FUNCTION bronze.raw_stock_snapshot(
+    p_desde DATE DEFAULT NULL,
+    p_hasta DATE DEFAULT NULL,
+    p_id_deposito INTEGER DEFAULT NULL
+)
+RETURNS TABLE (date_stock DATE, id_deposito INTEGER, data_raw JSONB)
+LANGUAGE sql STABLE AS $$
+    WITH dias AS (
+        SELECT d.date_stock, d.id_deposito,
+               (SELECT MAX(a.date_stock) FROM bronze.raw_stock_days a
+                WHERE a.id_deposito = d.id_deposito
+                  AND a.snapshot_kind IN ('F', 'B')
+                  AND a.date_stock <= d.date_stock
+                  AND a.date_stock >= date_trunc('month', d.date_stock)::date) AS ancla
+        FROM bronze.raw_stock_days d
+        WHERE (p_desde IS NULL OR d.date_stock >= p_desde)
+          AND (p_hasta IS NULL OR d.date_stock <= p_hasta)
+          AND (p_id_deposito IS NULL OR d.id_deposito = p_id_deposito)
+    ),
+    ultimas AS (
+        SELECT DISTINCT ON (dias.date_stock, dias.id_deposito, bronze.stock_key(r.data_raw))
+               dias.date_stock, dias.id_deposito, r.data_raw, r.snapshot_kind
+        FROM dias
+        JOIN bronze.raw_stock r
+          ON r.id_deposito = dias.id_deposito
+         AND r.date_stock BETWEEN dias.ancla AND dias.date_stock
+        ORDER BY dias.date_stock, dias.id_deposito, bronze.stock_key(r.data_raw), r.date_stock DESC, r.id DESC
+    )
+    SELECT u.date_stock, u.id_deposito, u.data_raw FROM ultimas u WHERE u.snapshot_kind <> 'X'
+$$;
+
+-- migrate:down
+DROP FUNCTION IF EXISTS bronze.raw_stock_snapshot(DATE, DATE, INTEGER);
+DROP FUNCTION IF EXISTS bronze.stock_key(JSONB);
+DROP TABLE IF EXISTS bronze.raw_stock_days;
+DROP INDEX IF EXISTS bronze.idx_stock_deposito_date;
+ALTER TABLE bronze.raw_stock DROP COLUMN IF EXISTS snapshot_kind;
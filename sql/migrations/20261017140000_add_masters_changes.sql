@@ -0,0 +1,33 @@
+-- migrate:up
+-- Claves de maestros modificadas por la carga de bronze (ver src/layers/bronze/master_changes.py).
+-- operation: I alta, U modificación, D baja.
+CREATE TABLE IF NOT EXISTS bronze.raw_masters_changes (
+    id BIGSERIAL PRIMARY KEY,
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    entity VARCHAR(30) NOT NULL,           -- clients, staff, routes, articles
+    entity_key VARCHAR(100) NOT NULL,      -- clave de negocio (partes separadas por '|')
+    operation CHAR(1) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_bronze_masters_changes_entity
+ON bronze.raw_masters_changes(entity, id);
+
+-- Último cambio aplicado por cada tabla de silver/gold que consume el log
+CREATE TABLE IF NOT EXISTS bronze.master_change_consumers (
+    consumer VARCHAR(50) PRIMARY KEY,
+    last_change_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO bronze.master_change_consumers (consumer) VALUES
+    ('silver.clients'),
+    ('silver.client_forces'),
+    ('silver.staff'),
+    ('silver.routes'),
+    ('silver.articles'),
+    ('gold.dim_cliente')
+ON CONFLICT (consumer) DO NOTHING;
+
+-- migrate:down
+DROP TABLE IF EXISTS bronze.master_change_consumers;
+DROP TABLE IF EXISTS bronze.raw_masters_changes;
@@ -0,0 +1,16 @@
+-- migrate:up
+-- Granularidad de consulta de ventas recordada por mes (ver src/layers/bronze/range_planner.py).
+-- fetch_days: 0 = mes completo, 7 = semana, 1 = día.
+CREATE TABLE IF NOT EXISTS bronze.sales_fetch_plan (
+    period DATE PRIMARY KEY,               -- primer día del mes
+    fetch_days SMALLINT NOT NULL,
+    rows_received INTEGER,
+    requests INTEGER,
+    max_request_rows INTEGER,
+    max_request_seconds NUMERIC(10,2),
+    splits INTEGER DEFAULT 0,              -- veces que se partió el mes durante la última carga
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- migrate:down
+DROP TABLE IF EXISTS bronze.sales_fetch_plan;
@@ -0,0 +1,44 @@
+-- migrate:up
+-- Ventas de varias empresas del ERP (ver src/layers/bronze/companies.py).
+-- Las líneas, los checkpoints y el plan de consultas quedan etiquetados con id_empresa;
+-- las filas existentes corresponden a la empresa 1.
+ALTER TABLE bronze.raw_sales ADD COLUMN IF NOT EXISTS id_empresa INTEGER NOT NULL DEFAULT 1;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_empresa
+ON bronze.raw_sales(id_empresa, date_comprobante);
+
+ALTER TABLE bronze.load_checkpoints ADD COLUMN IF NOT EXISTS id_empresa INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE bronze.load_checkpoints DROP CONSTRAINT IF EXISTS load_checkpoints_pkey;
+ALTER TABLE bronze.load_checkpoints ADD PRIMARY KEY (entity, id_empresa, range_desde, range_hasta, id_deposito);
+
+ALTER TABLE bronze.sales_fetch_plan ADD COLUMN IF NOT EXISTS id_empresa INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE bronze.sales_fetch_plan DROP CONSTRAINT IF EXISTS sales_fetch_plan_pkey;
+ALTER TABLE bronze.sales_fetch_plan ADD PRIMARY KEY (period, id_empresa);
+
+CREATE INDEX IF NOT EXISTS idx_silver_ventas_empresa
+ON silver.fact_ventas(id_empresa, fecha_comprobante);
+
+ALTER TABLE gold.fact_ventas ADD COLUMN IF NOT EXISTS id_empresa INTEGER;
+UPDATE gold.fact_ventas SET id_empresa = 1 WHERE id_empresa IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_gold_fact_empresa
+ON gold.fact_ventas(id_empresa, fecha_comprobante);
+
+-- migrate:down
+DROP INDEX IF EXISTS gold.idx_gold_fact_empresa;
+ALTER TABLE gold.fact_ventas DROP COLUMN IF EXISTS id_empresa;
+
+DROP INDEX IF EXISTS silver.idx_silver_ventas_empresa;
+
+DELETE FROM bronze.sales_fetch_plan WHERE id_empresa <> 1;
+ALTER TABLE bronze.sales_fetch_plan DROP CONSTRAINT IF EXISTS sales_fetch_plan_pkey;
+ALTER TABLE bronze.sales_fetch_plan DROP COLUMN IF EXISTS id_empresa;
+ALTER TABLE bronze.sales_fetch_plan ADD PRIMARY KEY (period);
+
+DELETE FROM bronze.load_checkpoints WHERE id_empresa <> 1;
+ALTER TABLE bronze.load_checkpoints DROP CONSTRAINT IF EXISTS load_checkpoints_pkey;
+ALTER TABLE bronze.load_checkpoints DROP COLUMN IF EXISTS id_empresa;
+ALTER TABLE bronze.load_checkpoints ADD PRIMARY KEY (entity, range_desde, range_hasta, id_deposito);
+
+DROP INDEX IF EXISTS bronze.idx_bronze_sales_empresa;
+ALTER TABLE bronze.raw_sales DROP COLUMN IF EXISTS id_empresa;
@@ -0,0 +1,14 @@
+-- migrate:up
+-- Meses de bronze archivados en Parquet y eliminados de la base (ver src/layers/bronze/archive.py).
+CREATE TABLE IF NOT EXISTS bronze.archived_months (
+    table_name VARCHAR(50) NOT NULL,       -- bronze.raw_sales / bronze.raw_stock
+    period DATE NOT NULL,                  -- primer día del mes
+    path TEXT NOT NULL,
+    rows_archived INTEGER,
+    bytes BIGINT,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, period)
+);
+
+-- migrate:down
+DROP TABLE IF EXISTS bronze.archived_months;
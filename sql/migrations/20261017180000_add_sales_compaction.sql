@@ -0,0 +1,47 @@
+-- migrate:up
+-- Representación compacta opcional de bronze.raw_sales (ver src/layers/bronze/compaction.py):
+-- cada conjunto de claves se guarda una vez y cada línea solo sus valores, en ese orden.
+CREATE TABLE IF NOT EXISTS bronze.sales_key_schemas (
+    schema_id SERIAL PRIMARY KEY,
+    keys TEXT[] NOT NULL UNIQUE,           -- en el orden de jsonb_object_keys()
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS bronze.raw_sales_compact (
+    id INTEGER NOT NULL,                   -- mismo id que tenía en bronze.raw_sales
+    ingestion_at TIMESTAMP,
+    source_system VARCHAR(50),
+    schema_id INTEGER NOT NULL,            -- bronze.sales_key_schemas
+    data_values JSONB NOT NULL,            -- array de valores en el orden de keys
+    date_comprobante DATE NOT NULL,
+    content_hash CHAR(32),                 -- md5 del data_raw original
+    id_empresa INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (id, date_comprobante)
+) PARTITION BY RANGE (date_comprobante);
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_compact_empresa
+ON bronze.raw_sales_compact(id_empresa, date_comprobante);
+
+-- Rearma el objeto jsonb a partir de las claves y el array de valores
+CREATE OR REPLACE FUNCTION bronze.expand_keys(p_keys TEXT[], p_values JSONB)
+RETURNS JSONB
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT COALESCE(jsonb_object_agg(k.clave, p_values -> (k.pos::integer - 1)), '{}'::jsonb)
+    FROM unnest(p_keys) WITH ORDINALITY AS k(clave, pos)
+$$;
+
+-- Todas las ventas de bronze (planas y compactadas) con el data_raw de siempre
+CREATE OR REPLACE VIEW bronze.raw_sales_all AS
+SELECT id, ingestion_at, source_system, data_raw, date_comprobante, content_hash, deleted_at, id_empresa
+FROM bronze.raw_sales
+UNION ALL
+SELECT c.id, c.ingestion_at, c.source_system, bronze.expand_keys(k.keys, c.data_values),
+       c.date_comprobante, c.content_hash, NULL::timestamp, c.id_empresa
+FROM bronze.raw_sales_compact c
+JOIN bronze.sales_key_schemas k ON k.schema_id = c.schema_id;
+
+-- migrate:down
+DROP VIEW IF EXISTS bronze.raw_sales_all;
+DROP FUNCTION IF EXISTS bronze.expand_keys(TEXT[], JSONB);
+DROP TABLE IF EXISTS bronze.raw_sales_compact;
+DROP TABLE IF EXISTS bronze.sales_key_schemas;
@@ -0,0 +1,173 @@
+-- migrate:up
+-- Claves más usadas de data_raw como columnas generadas tipadas e indexadas: silver filtra,
+-- deduplica (DISTINCT ON) y cruza por estas columnas sin decodificar el jsonb de cada fila.
+-- Agregar una columna STORED reescribe la tabla (en raw_sales/raw_stock, cada partición):
+-- aplicar fuera del horario de carga.
+
+-- Entero de un valor de data_raw; NULL si está vacío o no es un entero (en lugar de fallar
+-- el INSERT en bronze como haría ::integer)
+CREATE OR REPLACE FUNCTION bronze.json_int(p_value TEXT)
+RETURNS INTEGER
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE WHEN p_value ~ '^\s*[-+]?[0-9]{1,9}\s*$' THEN p_value::integer END
+$$;
+
+-- Ventas: identidad del documento (cambios por documento) y dimensiones de consulta
+ALTER TABLE bronze.raw_sales
+    ADD COLUMN IF NOT EXISTS id_documento TEXT GENERATED ALWAYS AS (data_raw->>'idDocumento') STORED,
+    ADD COLUMN IF NOT EXISTS letra TEXT GENERATED ALWAYS AS (data_raw->>'letra') STORED,
+    ADD COLUMN IF NOT EXISTS serie INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'serie')) STORED,
+    ADD COLUMN IF NOT EXISTS nro_doc INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'nrodoc')) STORED,
+    ADD COLUMN IF NOT EXISTS id_cliente INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idCliente')) STORED,
+    ADD COLUMN IF NOT EXISTS id_articulo INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idArticulo')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_documento
+ON bronze.raw_sales(date_comprobante, nro_doc, serie, letra, id_documento) WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_cliente
+ON bronze.raw_sales(id_cliente, date_comprobante);
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_articulo
+ON bronze.raw_sales(id_articulo, date_comprobante);
+
+-- La vista de todas las ventas expone las mismas columnas; en las compactadas se calculan
+-- con las mismas expresiones sobre el data_raw rearmado
+CREATE OR REPLACE VIEW bronze.raw_sales_all AS
+SELECT id, ingestion_at, source_system, data_raw, date_comprobante, content_hash, deleted_at, id_empresa,
+       id_documento, letra, serie, nro_doc, id_cliente, id_articulo
+FROM bronze.raw_sales
+UNION ALL
+SELECT c.id, c.ingestion_at, c.source_system, e.data_raw,
+       c.date_comprobante, c.content_hash, NULL::timestamp, c.id_empresa,
+       e.data_raw->>'idDocumento', e.data_raw->>'letra',
+       bronze.json_int(e.data_raw->>'serie'), bronze.json_int(e.data_raw->>'nrodoc'),
+       bronze.json_int(e.data_raw->>'idCliente'), bronze.json_int(e.data_raw->>'idArticulo')
+FROM bronze.raw_sales_compact c
+JOIN bronze.sales_key_schemas k ON k.schema_id = c.schema_id
+CROSS JOIN LATERAL (SELECT bronze.expand_keys(k.keys, c.data_values) AS data_raw) e;
+
+-- Stock: identidad de la fila (reconstrucción de días delta) y artículo
+ALTER TABLE bronze.raw_stock
+    ADD COLUMN IF NOT EXISTS id_almacen INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idAlmacen')) STORED,
+    ADD COLUMN IF NOT EXISTS id_articulo INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idArticulo')) STORED,
+    ADD COLUMN IF NOT EXISTS stock_key TEXT GENERATED ALWAYS AS (bronze.stock_key(data_raw)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_stock_deposito_key
+ON bronze.raw_stock(id_deposito, stock_key, date_stock);
+
+CREATE INDEX IF NOT EXISTS idx_stock_articulo
+ON bronze.raw_stock(id_articulo, date_stock);
+
+-- Maestros: claves de los DISTINCT ON / ORDER BY de silver
+ALTER TABLE bronze.raw_staff
+    ADD COLUMN IF NOT EXISTS id_personal INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idPersonal')) STORED,
+    ADD COLUMN IF NOT EXISTS id_sucursal INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idSucursal')) STORED,
+    ADD COLUMN IF NOT EXISTS id_fuerza_ventas INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idFuerzaVentas')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_staff_personal
+ON bronze.raw_staff(id_personal, id_sucursal, id DESC);
+
+ALTER TABLE bronze.raw_clients
+    ADD COLUMN IF NOT EXISTS id_cliente INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idCliente')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_clients_cliente
+ON bronze.raw_clients(id_cliente);
+
+ALTER TABLE bronze.raw_articles
+    ADD COLUMN IF NOT EXISTS id_articulo INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idArticulo')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_articles_articulo
+ON bronze.raw_articles(id_articulo);
+
+-- La reconstrucción de stock usa la columna stock_key en lugar de calcularla por fila
+CREATE OR REPLACE FUNCTION bronze.raw_stock_snapshot(
+    p_desde DATE DEFAULT NULL,
+    p_hasta DATE DEFAULT NULL,
+    p_id_deposito INTEGER DEFAULT NULL
+)
+RETURNS TABLE (date_stock DATE, id_deposito INTEGER, data_raw JSONB)
+LANGUAGE sql STABLE AS $$
+    WITH dias AS (
+        SELECT d.date_stock, d.id_deposito,
+               (SELECT MAX(a.date_stock) FROM bronze.raw_stock_days a
+                WHERE a.id_deposito = d.id_deposito
+                  AND a.snapshot_kind IN ('F', 'B')
+                  AND a.date_stock <= d.date_stock
+                  AND a.date_stock >= date_trunc('month', d.date_stock)::date) AS ancla
+        FROM bronze.raw_stock_days d
+        WHERE (p_desde IS NULL OR d.date_stock >= p_desde)
+          AND (p_hasta IS NULL OR d.date_stock <= p_hasta)
+          AND (p_id_deposito IS NULL OR d.id_deposito = p_id_deposito)
+    ),
+    ultimas AS (
+        SELECT DISTINCT ON (dias.date_stock, dias.id_deposito, r.stock_key)
+               dias.date_stock, dias.id_deposito, r.data_raw, r.snapshot_kind
+        FROM dias
+        JOIN bronze.raw_stock r
+          ON r.id_deposito = dias.id_deposito
+         AND r.date_stock BETWEEN dias.ancla AND dias.date_stock
+        ORDER BY dias.date_stock, dias.id_deposito, r.stock_key, r.date_stock DESC, r.id DESC
+    )
+    SELECT u.date_stock, u.id_deposito, u.data_raw FROM ultimas u WHERE u.snapshot_kind <> 'X'
+$$;
+
+-- migrate:down
+CREATE OR REPLACE FUNCTION bronze.raw_stock_snapshot(
+    p_desde DATE DEFAULT NULL,
+    p_hasta DATE DEFAULT NULL,
+    p_id_deposito INTEGER DEFAULT NULL
+)
+RETURNS TABLE (date_stock DATE, id_deposito INTEGER, data_raw JSONB)
+LANGUAGE sql STABLE AS $$
+    WITH dias AS (
+        SELECT d.date_stock, d.id_deposito,
+               (SELECT MAX(a.date_stock) FROM bronze.raw_stock_days a
+                WHERE a.id_deposito = d.id_deposito
+                  AND a.snapshot_kind IN ('F', 'B')
+                  AND a.date_stock <= d.date_stock
+                  AND a.date_stock >= date_trunc('month', d.date_stock)::date) AS ancla
+        FROM bronze.raw_stock_days d
+        WHERE (p_desde IS NULL OR d.date_stock >= p_desde)
+          AND (p_hasta IS NULL OR d.date_stock <= p_hasta)
+          AND (p_id_deposito IS NULL OR d.id_deposito = p_id_deposito)
+    ),
+    ultimas AS (
+        SELECT DISTINCT ON (dias.date_stock, dias.id_deposito, bronze.stock_key(r.data_raw))
+               dias.date_stock, dias.id_deposito, r.data_raw, r.snapshot_kind
+        FROM dias
+        JOIN bronze.raw_stock r
+          ON r.id_deposito = dias.id_deposito
+         AND r.date_stock BETWEEN dias.ancla AND dias.date_stock
+        ORDER BY dias.date_stock, dias.id_deposito, bronze.stock_key(r.data_raw), r.date_stock DESC, r.id DESC
+    )
+    SELECT u.date_stock, u.id_deposito, u.data_raw FROM ultimas u WHERE u.snapshot_kind <> 'X'
+$$;
+
+DROP VIEW IF EXISTS bronze.raw_sales_all;
+CREATE VIEW bronze.raw_sales_all AS
+SELECT id, ingestion_at, source_system, data_raw, date_comprobante, content_hash, deleted_at, id_empresa
+FROM bronze.raw_sales
+UNION ALL
+SELECT c.id, c.ingestion_at, c.source_system, bronze.expand_keys(k.keys, c.data_values),
+       c.date_comprobante, c.content_hash, NULL::timestamp, c.id_empresa
+FROM bronze.raw_sales_compact c
+JOIN bronze.sales_key_schemas k ON k.schema_id = c.schema_id;
+
+ALTER TABLE bronze.raw_articles DROP COLUMN IF EXISTS id_articulo;
+ALTER TABLE bronze.raw_clients DROP COLUMN IF EXISTS id_cliente;
+ALTER TABLE bronze.raw_staff
+    DROP COLUMN IF EXISTS id_personal,
+    DROP COLUMN IF EXISTS id_sucursal,
+    DROP COLUMN IF EXISTS id_fuerza_ventas;
+ALTER TABLE bronze.raw_stock
+    DROP COLUMN IF EXISTS id_almacen,
+    DROP COLUMN IF EXISTS id_articulo,
+    DROP COLUMN IF EXISTS stock_key;
+ALTER TABLE bronze.raw_sales
+    DROP COLUMN IF EXISTS id_documento,
+    DROP COLUMN IF EXISTS letra,
+    DROP COLUMN IF EXISTS serie,
+    DROP COLUMN IF EXISTS nro_doc,
+    DROP COLUMN IF EXISTS id_cliente,
+    DROP COLUMN IF EXISTS id_articulo;
+DROP FUNCTION IF EXISTS bronze.json_int(TEXT);
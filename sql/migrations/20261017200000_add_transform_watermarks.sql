@@ -0,0 +1,17 @@
+-- migrate:up
+-- Marca de agua de la transformación incremental de silver (ver transform_sales_incremental()):
+-- última línea de bronze.raw_sales (id) y último tombstone (deleted_at) ya transformados.
+CREATE TABLE IF NOT EXISTS silver.transform_watermarks (
+    target VARCHAR(50) PRIMARY KEY,        -- silver.fact_ventas
+    last_id BIGINT NOT NULL DEFAULT 0,
+    last_deleted_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Líneas marcadas como borradas desde la marca de agua (solo las que tienen deleted_at)
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_deleted_at
+ON bronze.raw_sales(deleted_at) WHERE deleted_at IS NOT NULL;
+
+-- migrate:down
+DROP INDEX IF EXISTS bronze.idx_bronze_sales_deleted_at;
+DROP TABLE IF EXISTS silver.transform_watermarks;
@@ -0,0 +1,55 @@
+-- migrate:up
+-- Identidad estable de cada línea de silver.fact_ventas: documento + artículo + nro_linea
+-- (ordinal de las líneas del mismo artículo en el documento, ver sales_transformer.LINE_NUMBER_SQL).
+-- Permite recargar con MERGE (silver sales --merge) tocando solo las líneas que cambiaron.
+ALTER TABLE silver.fact_ventas ADD COLUMN IF NOT EXISTS nro_linea INTEGER;
+
+-- Líneas existentes: misma numeración que sales_transformer.LINE_NUMBER_SQL (orden por la
+-- fila completa, en el orden de columnas del INSERT), así la primera recarga con --merge
+-- no renumera las líneas repetidas de un mismo artículo.
+UPDATE silver.fact_ventas f
+SET nro_linea = n.nro_linea
+FROM (
+    SELECT id, ROW_NUMBER() OVER (
+        PARTITION BY id_empresa, id_documento, letra, serie, nro_doc, fecha_comprobante, id_articulo
+        ORDER BY ROW(
+            id_empresa, id_documento, letra, serie, nro_doc, anulado,
+            fecha_comprobante, fecha_alta, fecha_pedido, fecha_entrega, fecha_vencimiento, fecha_caja,
+            fecha_anulacion, fecha_pago, fecha_liquidacion, fecha_asiento_contable,
+            id_sucursal, id_deposito, id_caja, cajero, id_centro_costo,
+            id_vendedor, id_supervisor, id_gerente, id_fuerza_ventas, usuario_alta,
+            id_cliente, linea_credito,
+            id_canal_mkt, id_segmento_mkt, id_subcanal_mkt,
+            id_fletero_carga, planilla_carga,
+            id_articulo, es_combo, id_combo, id_pedido, id_origen, origen, acciones,
+            cantidades_con_cargo, cantidades_sin_cargo, cantidades_total, cantidades_rechazo,
+            precio_unitario_bruto, precio_unitario_neto, bonificacion, precio_compra_bruto, precio_compra_neto,
+            subtotal_bruto, subtotal_bonificado, subtotal_neto, subtotal_final, facturacion_neta,
+            iva21, iva27, iva105, iva2, internos, per3337, percepcion212, percepcion_iibb,
+            pers_iibb_d, pers_iibb_r, cod_prov_iibb,
+            cod_cuenta_contable, nro_asiento_contable, nro_plan_contable, id_liquidacion,
+            proveedor, fvig_pcompra,
+            id_rechazo, informado, regimen_fiscal
+        )
+    ) AS nro_linea
+    FROM silver.fact_ventas
+) n
+WHERE f.id = n.id;
+
+ALTER TABLE silver.fact_ventas ALTER COLUMN nro_linea SET NOT NULL;
+
+-- Clave de línea; empieza por (id_documento, serie, nro_doc), así que reemplaza al índice de documento
+DROP INDEX IF EXISTS silver.idx_silver_ventas_documento;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_silver_ventas_linea ON silver.fact_ventas
+    (id_documento, serie, nro_doc, letra, id_empresa, fecha_comprobante, id_articulo, nro_linea)
+    NULLS NOT DISTINCT;
+
+-- Espacio libre por página: los UPDATE del MERGE que no cambian columnas indexadas quedan HOT
+-- (sin tocar los índices)
+ALTER TABLE silver.fact_ventas SET (fillfactor = 90);
+
+-- migrate:down
+ALTER TABLE silver.fact_ventas RESET (fillfactor);
+DROP INDEX IF EXISTS silver.idx_silver_ventas_linea;
+CREATE INDEX IF NOT EXISTS idx_silver_ventas_documento ON silver.fact_ventas(id_documento, serie, nro_doc);
+ALTER TABLE silver.fact_ventas DROP COLUMN IF EXISTS nro_linea;
@@ -37,42 +37,195 @@ GRANT USAGE, CREATE ON SCHEMA bronze TO :etl_user;
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA bronze TO :etl_user;
 ALTER DEFAULT PRIVILEGES IN SCHEMA bronze GRANT ALL PRIVILEGES ON TABLES TO :etl_user;
 
+-- Claves más usadas de data_raw como columnas generadas tipadas e indexadas (raw_sales,
+-- raw_stock y maestros): silver filtra y deduplica por ellas sin decodificar el jsonb.
+-- Entero de un valor de data_raw; NULL si está vacío o no es un entero
+CREATE OR REPLACE FUNCTION bronze.json_int(p_value TEXT)
+RETURNS INTEGER
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE WHEN p_value ~ '^\s*[-+]?[0-9]{1,9}\s*$' THEN p_value::integer END
+$$;
+
+-- Identidad de una fila de stock (mismo criterio que stock_key() en Python)
+CREATE OR REPLACE FUNCTION bronze.stock_key(data_raw JSONB)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT concat_ws('|',
+        COALESCE(data_raw->>'idAlmacen', ''),
+        COALESCE(data_raw->>'idArticulo', ''),
+        COALESCE(data_raw->>'fecVtoLote', ''))
+$$;
+
+-- Particionada por mes: las particiones (raw_sales_pYYYY_MM) las crea el loader
+-- y la recarga de un mes reemplaza su partición (src/layers/bronze/partitions.py)
 CREATE TABLE IF NOT EXISTS bronze.raw_sales (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     source_system VARCHAR(50),
     data_raw JSONB,  -- <--- LA JOYA DE LA CORONA
-    date_comprobante DATE
-);
+    date_comprobante DATE NOT NULL,
+    content_hash CHAR(32) GENERATED ALWAYS AS (md5(data_raw::text)) STORED,
+    deleted_at TIMESTAMP,  -- Línea que la API dejó de devolver (tombstone)
+    id_empresa INTEGER NOT NULL DEFAULT 1,  -- Empresa del ERP (src/layers/bronze/companies.py)
+    id_documento TEXT GENERATED ALWAYS AS (data_raw->>'idDocumento') STORED,
+    letra TEXT GENERATED ALWAYS AS (data_raw->>'letra') STORED,
+    serie INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'serie')) STORED,
+    nro_doc INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'nrodoc')) STORED,
+    id_cliente INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idCliente')) STORED,
+    id_articulo INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idArticulo')) STORED,
+    PRIMARY KEY (id, date_comprobante)
+) PARTITION BY RANGE (date_comprobante);
 
--- Creación del Índice (Vital para que el DELETE por fecha sea instantáneo)
 CREATE INDEX IF NOT EXISTS idx_bronze_sales_date
 ON bronze.raw_sales(date_comprobante);
 
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_hash
+ON bronze.raw_sales(date_comprobante, content_hash) WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_empresa
+ON bronze.raw_sales(id_empresa, date_comprobante);
+
+-- Líneas marcadas como borradas desde la marca de agua de silver (solo las que tienen deleted_at)
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_deleted_at
+ON bronze.raw_sales(deleted_at) WHERE deleted_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_documento
+ON bronze.raw_sales(date_comprobante, nro_doc, serie, letra, id_documento) WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_cliente
+ON bronze.raw_sales(id_cliente, date_comprobante);
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_articulo
+ON bronze.raw_sales(id_articulo, date_comprobante);
+
+-- Representación compacta opcional de ventas (ver src/layers/bronze/compaction.py):
+-- cada conjunto de claves se guarda una vez y cada línea solo sus valores, en ese orden.
+CREATE TABLE IF NOT EXISTS bronze.sales_key_schemas (
+    schema_id SERIAL PRIMARY KEY,
+    keys TEXT[] NOT NULL UNIQUE,           -- en el orden de jsonb_object_keys()
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS bronze.raw_sales_compact (
+    id INTEGER NOT NULL,                   -- mismo id que tenía en bronze.raw_sales
+    ingestion_at TIMESTAMP,
+    source_system VARCHAR(50),
+    schema_id INTEGER NOT NULL,            -- bronze.sales_key_schemas
+    data_values JSONB NOT NULL,            -- array de valores en el orden de keys
+    date_comprobante DATE NOT NULL,
+    content_hash CHAR(32),                 -- md5 del data_raw original
+    id_empresa INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (id, date_comprobante)
+) PARTITION BY RANGE (date_comprobante);
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_compact_empresa
+ON bronze.raw_sales_compact(id_empresa, date_comprobante);
+
+-- Rearma el objeto jsonb a partir de las claves y el array de valores
+CREATE OR REPLACE FUNCTION bronze.expand_keys(p_keys TEXT[], p_values JSONB)
+RETURNS JSONB
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT COALESCE(jsonb_object_agg(k.clave, p_values -> (k.pos::integer - 1)), '{}'::jsonb)
+    FROM unnest(p_keys) WITH ORDINALITY AS k(clave, pos)
+$$;
+
+-- Todas las ventas de bronze (planas y compactadas) con el data_raw de siempre
+-- (columnas generadas de raw_sales; en las compactadas, las mismas expresiones sobre el data_raw rearmado)
+CREATE OR REPLACE VIEW bronze.raw_sales_all AS
+SELECT id, ingestion_at, source_system, data_raw, date_comprobante, content_hash, deleted_at, id_empresa,
+       id_documento, letra, serie, nro_doc, id_cliente, id_articulo
+FROM bronze.raw_sales
+UNION ALL
+SELECT c.id, c.ingestion_at, c.source_system, e.data_raw,
+       c.date_comprobante, c.content_hash, NULL::timestamp, c.id_empresa,
+       e.data_raw->>'idDocumento', e.data_raw->>'letra',
+       bronze.json_int(e.data_raw->>'serie'), bronze.json_int(e.data_raw->>'nrodoc'),
+       bronze.json_int(e.data_raw->>'idCliente'), bronze.json_int(e.data_raw->>'idArticulo')
+FROM bronze.raw_sales_compact c
+JOIN bronze.sales_key_schemas k ON k.schema_id = c.schema_id
+CROSS JOIN LATERAL (SELECT bronze.expand_keys(k.keys, c.data_values) AS data_raw) e;
+
+-- Documentos modificados por la carga de bronze, pendientes de aplicar en silver/gold
+CREATE TABLE IF NOT EXISTS bronze.raw_sales_changes (
+    id SERIAL PRIMARY KEY,
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    date_comprobante DATE NOT NULL,
+    id_empresa INTEGER,
+    id_documento VARCHAR(20),
+    letra CHAR(1),
+    serie INTEGER,
+    nro_doc INTEGER,
+    silver_applied_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_bronze_sales_changes_silver
+ON bronze.raw_sales_changes(id) WHERE silver_applied_at IS NULL;
+
+-- Claves de maestros modificadas por la carga de bronze (ver src/layers/bronze/master_changes.py).
+-- operation: I alta, U modificación, D baja.
+CREATE TABLE IF NOT EXISTS bronze.raw_masters_changes (
+    id BIGSERIAL PRIMARY KEY,
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    entity VARCHAR(30) NOT NULL,           -- clients, staff, routes, articles
+    entity_key VARCHAR(100) NOT NULL,      -- clave de negocio (partes separadas por '|')
+    operation CHAR(1) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_bronze_masters_changes_entity
+ON bronze.raw_masters_changes(entity, id);
+
+-- Último cambio aplicado por cada tabla de silver/gold que consume el log
+CREATE TABLE IF NOT EXISTS bronze.master_change_consumers (
+    consumer VARCHAR(50) PRIMARY KEY,
+    last_change_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO bronze.master_change_consumers (consumer) VALUES
+    ('silver.clients'),
+    ('silver.client_forces'),
+    ('silver.staff'),
+    ('silver.routes'),
+    ('silver.articles'),
+    ('gold.dim_cliente')
+ON CONFLICT (consumer) DO NOTHING;
+
 CREATE TABLE IF NOT EXISTS bronze.raw_clients (
       id SERIAL PRIMARY KEY,
       ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
       source_system VARCHAR(50),
       data_raw JSONB,
-      date_carga DATE
+      date_carga DATE,
+      id_cliente INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idCliente')) STORED
   );
 
+CREATE INDEX IF NOT EXISTS idx_bronze_clients_cliente
+ON bronze.raw_clients(id_cliente);
+
 CREATE TABLE IF NOT EXISTS bronze.raw_articles(
     id SERIAL PRIMARY KEY,
     ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     source_system VARCHAR(50),
-    data_raw JSONB
-
+    data_raw JSONB,
+    id_articulo INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idArticulo')) STORED
 );
 
+CREATE INDEX IF NOT EXISTS idx_bronze_articles_articulo
+ON bronze.raw_articles(id_articulo);
+
 CREATE TABLE IF NOT EXISTS bronze.raw_staff(
     id SERIAL PRIMARY KEY,
     ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     source_system VARCHAR(50),
-    data_raw JSONB
-
+    data_raw JSONB,
+    id_personal INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idPersonal')) STORED,
+    id_sucursal INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idSucursal')) STORED,
+    id_fuerza_ventas INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idFuerzaVentas')) STORED
 );
 
+CREATE INDEX IF NOT EXISTS idx_bronze_staff_personal
+ON bronze.raw_staff(id_personal, id_sucursal, id DESC);
+
 CREATE TABLE IF NOT EXISTS bronze.raw_routes(
     id SERIAL PRIMARY KEY,
     ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -81,18 +234,108 @@ CREATE TABLE IF NOT EXISTS bronze.raw_routes(
 
 );
 
+-- Particionada por mes (raw_stock_pYYYY_MM); la retención elimina particiones enteras
 CREATE TABLE IF NOT EXISTS bronze.raw_stock (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     ingestion_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     source_system VARCHAR(50),
     data_raw JSONB,
-    date_stock DATE,
-    id_deposito INTEGER
-);
+    date_stock DATE NOT NULL,
+    id_deposito INTEGER,
+    snapshot_kind CHAR(1) NOT NULL DEFAULT 'F',  -- F completo, B baseline, D delta, X baja
+    id_almacen INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idAlmacen')) STORED,
+    id_articulo INTEGER GENERATED ALWAYS AS (bronze.json_int(data_raw->>'idArticulo')) STORED,
+    stock_key TEXT GENERATED ALWAYS AS (bronze.stock_key(data_raw)) STORED,
+    PRIMARY KEY (id, date_stock)
+) PARTITION BY RANGE (date_stock);
 
 CREATE INDEX IF NOT EXISTS idx_stock_date ON bronze.raw_stock(date_stock);
 CREATE INDEX IF NOT EXISTS idx_stock_deposito ON bronze.raw_stock(id_deposito);
 CREATE INDEX IF NOT EXISTS idx_stock_ingestion ON bronze.raw_stock(ingestion_at);
+CREATE INDEX IF NOT EXISTS idx_stock_deposito_date ON bronze.raw_stock(id_deposito, date_stock);
+CREATE INDEX IF NOT EXISTS idx_stock_deposito_key ON bronze.raw_stock(id_deposito, stock_key, date_stock);
+CREATE INDEX IF NOT EXISTS idx_stock_articulo ON bronze.raw_stock(id_articulo, date_stock);
+
+-- Días cargados por depósito (ancla de la reconstrucción y conteo de filas completas)
+CREATE TABLE IF NOT EXISTS bronze.raw_stock_days (
+    date_stock DATE NOT NULL,
+    id_deposito INTEGER NOT NULL,
+    snapshot_kind CHAR(1) NOT NULL,        -- F, B o D
+    rows_stored INTEGER NOT NULL,          -- filas guardadas en bronze.raw_stock
+    rows_total INTEGER NOT NULL,           -- filas del inventario completo del día
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date_stock, id_deposito)
+);
+
+-- Inventario completo de cada día cargado: última versión de cada fila entre el último
+-- día completo (F o B) del mes y el día pedido, sin las bajas. NULL = sin filtro.
+CREATE OR REPLACE FUNCTION bronze.raw_stock_snapshot(
+    p_desde DATE DEFAULT NULL,
+    p_hasta DATE DEFAULT NULL,
+    p_id_deposito INTEGER DEFAULT NULL
+)
+RETURNS TABLE (date_stock DATE, id_deposito INTEGER, data_raw JSONB)
+LANGUAGE sql STABLE AS $$
+    WITH dias AS (
+        SELECT d.date_stock, d.id_deposito,
+               (SELECT MAX(a.date_stock) FROM bronze.raw_stock_days a
+                WHERE a.id_deposito = d.id_deposito
+                  AND a.snapshot_kind IN ('F', 'B')
+                  AND a.date_stock <= d.date_stock
+                  AND a.date_stock >= date_trunc('month', d.date_stock)::date) AS ancla
+        FROM bronze.raw_stock_days d
+        WHERE (p_desde IS NULL OR d.date_stock >= p_desde)
+          AND (p_hasta IS NULL OR d.date_stock <= p_hasta)
+          AND (p_id_deposito IS NULL OR d.id_deposito = p_id_deposito)
+    ),
+    ultimas AS (
+        SELECT DISTINCT ON (dias.date_stock, dias.id_deposito, r.stock_key)
+               dias.date_stock, dias.id_deposito, r.data_raw, r.snapshot_kind
+        FROM dias
+        JOIN bronze.raw_stock r
+          ON r.id_deposito = dias.id_deposito
+         AND r.date_stock BETWEEN dias.ancla AND dias.date_stock
+        ORDER BY dias.date_stock, dias.id_deposito, r.stock_key, r.date_stock DESC, r.id DESC
+    )
+    SELECT u.date_stock, u.id_deposito, u.data_raw FROM ultimas u WHERE u.snapshot_kind <> 'X'
+$$;
+
+-- Unidades completadas de las cargas largas (checkpoints para --resume)
+CREATE TABLE IF NOT EXISTS bronze.load_checkpoints (
+    entity VARCHAR(50) NOT NULL,
+    id_empresa INTEGER NOT NULL DEFAULT 1,
+    range_desde DATE NOT NULL,
+    range_hasta DATE NOT NULL,
+    id_deposito INTEGER NOT NULL DEFAULT 0,  -- 0 = unidad sin depósito (ventas)
+    rows_loaded INTEGER,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity, id_empresa, range_desde, range_hasta, id_deposito)
+);
+
+-- Granularidad de consulta de ventas por mes (0 = mes completo, 7 = semana, 1 = día)
+CREATE TABLE IF NOT EXISTS bronze.sales_fetch_plan (
+    period DATE NOT NULL,                  -- primer día del mes
+    id_empresa INTEGER NOT NULL DEFAULT 1,
+    fetch_days SMALLINT NOT NULL,
+    rows_received INTEGER,
+    requests INTEGER,
+    max_request_rows INTEGER,
+    max_request_seconds NUMERIC(10,2),
+    splits INTEGER DEFAULT 0,              -- veces que se partió el mes durante la última carga
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period, id_empresa)
+);
+
+-- Meses archivados en Parquet y eliminados de la base (ver src/layers/bronze/archive.py)
+CREATE TABLE IF NOT EXISTS bronze.archived_months (
+    table_name VARCHAR(50) NOT NULL,       -- bronze.raw_sales / bronze.raw_stock
+    period DATE NOT NULL,                  -- primer día del mes
+    path TEXT NOT NULL,
+    rows_archived INTEGER,
+    bytes BIGINT,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, period)
+);
 
 CREATE TABLE IF NOT EXISTS bronze.raw_deposits (
     id SERIAL PRIMARY KEY,
@@ -436,6 +679,7 @@ CREATE TABLE IF NOT EXISTS silver.fact_ventas (
     letra CHAR(1),
     serie INTEGER,
     nro_doc INTEGER NOT NULL,
+    nro_linea INTEGER NOT NULL,  -- Ordinal de las líneas del mismo artículo en el documento
     anulado BOOLEAN DEFAULT FALSE,
 
     -- === FECHAS ===
@@ -533,7 +777,7 @@ CREATE TABLE IF NOT EXISTS silver.fact_ventas (
     id_rechazo INTEGER,
     informado BOOLEAN,
     regimen_fiscal VARCHAR(50)
-);
+) WITH (fillfactor = 90);  -- Espacio para que los UPDATE del MERGE queden HOT
 
 -- Índices para consultas frecuentes
 CREATE INDEX IF NOT EXISTS idx_silver_ventas_fecha ON silver.fact_ventas(fecha_comprobante);
@@ -542,7 +786,21 @@ CREATE INDEX IF NOT EXISTS idx_silver_ventas_articulo ON silver.fact_ventas(id_a
 CREATE INDEX IF NOT EXISTS idx_silver_ventas_vendedor ON silver.fact_ventas(id_vendedor);
 CREATE INDEX IF NOT EXISTS idx_silver_ventas_sucursal ON silver.fact_ventas(id_sucursal);
 CREATE INDEX IF NOT EXISTS idx_silver_ventas_fuerza ON silver.fact_ventas(id_fuerza_ventas);
-CREATE INDEX IF NOT EXISTS idx_silver_ventas_documento ON silver.fact_ventas(id_documento, serie, nro_doc);
+CREATE INDEX IF NOT EXISTS idx_silver_ventas_empresa ON silver.fact_ventas(id_empresa, fecha_comprobante);
+
+-- Identidad de línea (documento + artículo + nro_linea): recargas con MERGE (silver sales --merge)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_silver_ventas_linea ON silver.fact_ventas
+    (id_documento, serie, nro_doc, letra, id_empresa, fecha_comprobante, id_articulo, nro_linea)
+    NULLS NOT DISTINCT;
+
+-- Marca de agua de la transformación incremental de silver (ver transform_sales_incremental()):
+-- última línea de bronze.raw_sales (id) y último tombstone (deleted_at) ya transformados.
+CREATE TABLE IF NOT EXISTS silver.transform_watermarks (
+    target VARCHAR(50) PRIMARY KEY,        -- silver.fact_ventas
+    last_id BIGINT NOT NULL DEFAULT 0,
+    last_deleted_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 
 -- Tabla de stock (fact table)
 CREATE TABLE IF NOT EXISTS silver.fact_stock (
@@ -725,6 +983,7 @@ CREATE TABLE IF NOT EXISTS gold.fact_ventas (
     fecha_comprobante DATE,
 
     -- Identificación documento
+    id_empresa INTEGER,
     id_documento VARCHAR(20),
     letra CHAR(1),
     serie INTEGER,
@@ -746,6 +1005,7 @@ CREATE INDEX IF NOT EXISTS idx_gold_fact_cliente ON gold.fact_ventas(id_cliente)
 CREATE INDEX IF NOT EXISTS idx_gold_fact_articulo ON gold.fact_ventas(id_articulo);
 CREATE INDEX IF NOT EXISTS idx_gold_fact_vendedor ON gold.fact_ventas(id_vendedor);
 CREATE INDEX IF NOT EXISTS idx_gold_fact_sucursal ON gold.fact_ventas(id_sucursal);
+CREATE INDEX IF NOT EXISTS idx_gold_fact_empresa ON gold.fact_ventas(id_empresa, fecha_comprobante);
 
 -- Fact Table Stock
 CREATE TABLE IF NOT EXISTS gold.fact_stock (
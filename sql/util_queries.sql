@@ -26,17 +26,38 @@ SELECT * FROM bronze.raw_stock
 WHERE ingestion_at >= CURRENT_DATE - INTERVAL '7 days';
 
 -- Snapshot más reciente por artículo (útil para Silver)
-SELECT DISTINCT ON (data_raw->>'idArticulo') *
+-- id_articulo, id_almacen y stock_key son columnas generadas desde data_raw (indexadas)
+SELECT DISTINCT ON (id_articulo) *
 FROM bronze.raw_stock
-ORDER BY data_raw->>'idArticulo', ingestion_at DESC;
+ORDER BY id_articulo, ingestion_at DESC;
+
+-- Ventas de un cliente en un rango (usa idx_bronze_sales_cliente)
+SELECT * FROM bronze.raw_sales
+WHERE id_cliente = 1234
+  AND date_comprobante BETWEEN '2025-01-01' AND '2025-01-31'
+  AND deleted_at IS NULL;
 
 -- Último snapshot completo
 SELECT * FROM bronze.raw_stock
 WHERE ingestion_at = (SELECT MAX(ingestion_at) FROM bronze.raw_stock);
 
--- Borrar snapshots viejos (más de 30 días)
-DELETE FROM bronze.raw_stock
-WHERE ingestion_at < CURRENT_DATE - INTERVAL '30 days';
+-- Inventario completo de un día (reconstruye los días guardados como baseline + delta)
+SELECT * FROM bronze.raw_stock_snapshot('2025-12-29', '2025-12-29');
+
+-- Días cargados por depósito y ahorro del modo delta
+SELECT snapshot_kind, COUNT(*) AS dias, SUM(rows_stored) AS guardadas, SUM(rows_total) AS completas
+FROM bronze.raw_stock_days
+GROUP BY snapshot_kind;
+
+-- Borrar snapshots viejos: raw_stock está particionada por mes, no usar DELETE.
+-- python orchestrator.py bronze retention stock 3
+
+-- Particiones existentes y su tamaño
+SELECT c.relname AS particion, pg_size_pretty(pg_total_relation_size(c.oid)) AS tamanio
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'bronze.raw_stock'::regclass
+ORDER BY c.relname;
 
 
 -- ==========================================
@@ -52,10 +73,10 @@ SELECT * FROM bronze.raw_sales
 WHERE date_comprobante >= '2025-12-01'
   AND date_comprobante < '2026-01-01';
 
--- Borrar ventas de un mes (para recarga)
-DELETE FROM bronze.raw_sales
-WHERE date_comprobante >= '2025-12-01'
-  AND date_comprobante < '2026-01-01';
+-- Borrar ventas de un mes (para recarga): eliminar la partición completa
+-- (bronze sales recarga el mes reemplazando la partición, no hace falta borrar antes)
+ALTER TABLE bronze.raw_sales DETACH PARTITION bronze.raw_sales_p2025_12;
+DROP TABLE bronze.raw_sales_p2025_12;
 
 
 -- ==========================================
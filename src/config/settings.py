@@ -25,5 +25,65 @@ class Settings(BaseSettings):
     DATABASE: str = Field(..., description="Nombre de la base de datos PostgreSQL")
     IP_SERVER: str = Field(..., description="Direccion ip del servidor")
 
+    # Pool de conexiones a PostgreSQL (compartido por todos los pasos de una corrida)
+    DB_POOL_SIZE: int = Field(8, description="Conexiones que el pool mantiene abiertas")
+    DB_MAX_OVERFLOW: int = Field(8, description="Conexiones adicionales temporales por encima de DB_POOL_SIZE")
+    DB_POOL_TIMEOUT: int = Field(30, description="Segundos de espera por una conexión libre antes de fallar")
+    DB_POOL_RECYCLE: int = Field(1800, description="Segundos tras los cuales una conexión del pool se renueva")
+
+    # Sesión HTTP con el ERP (una por corrida, ver layers/run_context.py)
+    ERP_HTTP_POOL_SIZE: int = Field(16, description="Conexiones keep-alive reutilizadas con la API del ERP")
+    ERP_COMPANIES: dict[str, int] = Field(default_factory=lambda: {"EMPRESA1_": 1}, description='Empresas cuyas ventas se cargan: prefijo de credenciales -> id_empresa, ej: {"EMPRESA1_": 1, "EMPRESA2_": 2}')
+    COMPANIES_MAX_WORKERS: int = Field(4, description="Empresas cuyas ventas se cargan en paralelo (1 = secuencial)")
+
+    # Extracción
+    STOCK_MAX_WORKERS: int = Field(1, description="Consultas de stock concurrentes a la API (1 = secuencial)")
+    SALES_PREFETCH_MONTHS: int = Field(0, description="Consultas de ventas (mes o sub-rango) descargadas por adelantado mientras se escribe la anterior (0 = secuencial)")
+    SALES_FETCH_DAYS: int = Field(7, description="Días por consulta de ventas a la API para los meses sin plan en bronze.sales_fetch_plan (0 = mes completo, 7 = semana, 1 = día)")
+    SALES_ADAPTIVE_SPLIT: bool = Field(True, description="Partir el resto del mes en semanas o días ante respuestas grandes, lentas o fallidas y recordar la granularidad por mes")
+    SALES_SPLIT_MAX_ROWS: int = Field(50000, description="Líneas por consulta de ventas a partir de las cuales se parte el resto del mes")
+    SALES_SPLIT_MAX_SECONDS: float = Field(120, description="Segundos por consulta de ventas a partir de los cuales se parte el resto del mes")
+    SALES_BATCH_SIZE: int = Field(10000, description="Líneas de venta por bloque de COPY; cada bloque escrito se libera de memoria")
+    BRONZE_RAW_PASSTHROUGH: bool = Field(False, description="Ventas y stock: copiar el cuerpo crudo de la API a jsonb sin json.loads/json.dumps en Python")
+    BRONZE_MASTERS_WORKERS: int = Field(6, description="Loaders de maestros de bronze ejecutados en paralelo por bronze masters (1 = secuencial)")
+    STOCK_STORAGE_MODE: str = Field('full', description="Snapshots de stock en bronze: full (inventario completo por día) o delta (baseline mensual + cambios diarios)")
+
+    # Scheduler de requests a la API (concurrencia adaptativa y reintentos)
+    API_MAX_RETRIES: int = Field(4, description="Reintentos por request ante errores de la API")
+    API_RETRY_BASE_SECONDS: float = Field(1.0, description="Espera base del backoff exponencial (con jitter)")
+    API_RETRY_MAX_SECONDS: float = Field(60.0, description="Espera máxima entre reintentos")
+    API_CONCURRENCY_INITIAL: int = Field(2, description="Requests concurrentes iniciales por endpoint")
+    API_CONCURRENCY_MAX: int = Field(8, description="Máximo de requests concurrentes por endpoint (default)")
+    API_CONCURRENCY_LIMITS: dict[str, int] = Field(default_factory=dict, description='Máximo por endpoint, ej: {"get_stock": 16, "get_sales": 2}')
+    API_SLOW_FACTOR: float = Field(3.0, description="Respuesta lenta = latencia mayor a factor x latencia de referencia (reduce concurrencia)")
+
+    # Cache de respuestas de la API
+    API_CACHE_MODE: str = Field('off', description="Cache de respuestas de la API: off, on (lee y escribe) o replay (solo cache, sin red)")
+    API_CACHE_DIR: str = Field(os.path.join(PROJECT_ROOT, 'data', 'cache', 'api'), description="Directorio de la cache de respuestas")
+    API_CACHE_TTL_HOURS: float = Field(12, description="Antigüedad máxima de una respuesta cacheada (no aplica en replay)")
+    API_CACHE_MAX_MB: int = Field(2048, description="Tamaño máximo de la cache; se eliminan primero las respuestas más antiguas")
+
+    # Landing zone de bronze: respuestas de ventas y stock en NDJSON comprimido (ver layers/bronze/landing.py)
+    LANDING_ENABLED: bool = Field(False, description="Guardar además cada respuesta de ventas y stock en la landing zone")
+    LANDING_DIR: str = Field(os.path.join(PROJECT_ROOT, 'data', 'landing'), description="Directorio de la landing zone")
+    LANDING_COMPRESS_LEVEL: int = Field(6, description="Nivel de compresión gzip de los archivos de la landing (1-9)")
+
+    # Archivo de meses fríos de bronze en Parquet (ver layers/bronze/archive.py, requiere pyarrow)
+    ARCHIVE_DIR: str = Field(os.path.join(PROJECT_ROOT, 'data', 'archive'), description="Directorio de los archivos Parquet")
+    ARCHIVE_COMPRESSION: str = Field('zstd', description="Compresión de los archivos Parquet (zstd, snappy, gzip)")
+    ARCHIVE_BATCH_SIZE: int = Field(50000, description="Filas por bloque al exportar y leer (un row group por bloque)")
+
+    # Reconstrucción de silver.fact_ventas por meses (ver transform_sales_parallel)
+    SILVER_SALES_WORKERS: int = Field(4, description="Meses de ventas reconstruidos en paralelo por silver sales --full-refresh, una conexión cada uno (1 = secuencial)")
+    SILVER_SALES_RETRIES: int = Field(1, description="Reintentos de un mes de la reconstrucción de ventas antes de darlo por fallido")
+
+    # Motor de la transformación de ventas (ver layers/silver/transformers/sales_columnar.py, columnar requiere pyarrow)
+    SILVER_SALES_ENGINE: str = Field('sql', description="Motor de la transformación de ventas: sql (INSERT ... SELECT en PostgreSQL) o columnar (pyarrow + COPY)")
+    SILVER_COLUMNAR_BATCH_SIZE: int = Field(50000, description="Líneas de bronze por bloque del motor columnar de ventas")
+    SILVER_SALES_MERGE: bool = Field(False, description="Aplicar las ventas en silver con MERGE por clave de línea (solo escribe las líneas que cambiaron) en lugar de DELETE + INSERT")
+
+    # Extracción de los campos de data_raw en los transformers de silver (ver layers/silver/transformers/extraction.py)
+    SILVER_JSON_EXTRACTION: str = Field('operator', description="operator (data_raw->>'clave' por columna) o record (un jsonb_to_record por fila)")
+
 # Crear una instancia de Settings para ser usada en toda la aplicación
 settings = Settings()
@@ -0,0 +1,163 @@
+"""
+Escritura masiva con COPY ... FROM STDIN.
+
+Reemplaza a psycopg2.extras.execute_values en los loaders: en lugar de enviar
+muchos INSERT multi-fila, las filas se serializan en formato texto de COPY y se
+transmiten en un único comando. El tipado (jsonb, date, integer) lo aplica
+PostgreSQL al parsear cada columna según la definición de la tabla destino,
+igual que hacían los casts del template de execute_values.
+
+Uso:
+    from database.bulk import copy_rows
+
+    copy_rows(
+        cursor,
+        'bronze.raw_sales',
+        ('data_raw', 'source_system', 'date_comprobante'),
+        ((json.dumps(sale), 'API_CHESS_ERP', sale['fechaComprobate']) for sale in sales)
+    )
+
+    # Documentos JSON ya serializados (ej: cuerpo de una respuesta HTTP), sin decodificar
+    copy_documents(cursor, 'tmp_raw_bodies', 'body', [resp.content])
+
+    # ... con columnas de valor constante para todas las filas (ej: líneas NDJSON de un día)
+    copy_documents(cursor, 'bronze.raw_stock', 'data_raw', lineas, {'date_stock': '2025-01-15', 'id_deposito': 3})
+"""
+from typing import Iterable, Sequence
+
+
+# Tamaño de los bloques que se entregan a copy_expert
+COPY_BUFFER_SIZE = 1 << 16
+
+_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def format_copy_value(value) -> str:
+    """Serializa un valor al formato texto de COPY (NULL como \\N, escapes de control)."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(_ESCAPES)
+    return str(value).translate(_ESCAPES)
+
+
+def format_copy_row(row: Sequence) -> str:
+    """Serializa una fila completa (columnas separadas por TAB, terminada en salto de línea)."""
+    return '\t'.join(format_copy_value(v) for v in row) + '\n'
+
+
+class CopyStream:
+    """
+    Objeto tipo archivo que genera el contenido de COPY a demanda.
+
+    copy_expert lee por bloques con read(size), así que las filas se serializan
+    a medida que PostgreSQL las consume y nunca se arma el payload completo en memoria.
+    """
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self.rowcount = 0
+
+    def read(self, size: int = -1) -> str:
+        if size is None or size < 0:
+            size = COPY_BUFFER_SIZE
+
+        while len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += format_copy_row(row)
+            self.rowcount += 1
+
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def format_copy_bytes(value: bytes) -> bytes:
+    """Serializa un valor ya codificado en UTF-8 al formato texto de COPY, sin decodificarlo."""
+    return (
+        value.replace(b'\\', b'\\\\')
+        .replace(b'\t', b'\\t')
+        .replace(b'\n', b'\\n')
+        .replace(b'\r', b'\\r')
+    )
+
+
+class DocumentStream:
+    """
+    Igual que CopyStream, pero para documentos ya serializados (bytes UTF-8), uno por fila.
+
+    Los documentos no se decodifican: solo se escapan los caracteres que COPY
+    interpreta (barra invertida, TAB y saltos de línea). Un documento grande se
+    entrega por bloques desde un offset, sin recortar el buffer en cada lectura.
+    `suffix` (ya en formato COPY) se agrega a cada fila: columnas constantes.
+    """
+
+    def __init__(self, documents: Iterable[bytes], suffix: bytes = b''):
+        self._documents = iter(documents)
+        self._suffix = suffix
+        self._buffer = b''
+        self._offset = 0
+        self.rowcount = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = COPY_BUFFER_SIZE
+
+        while self._offset >= len(self._buffer):
+            document = next(self._documents, None)
+            if document is None:
+                return b''
+            self._buffer = format_copy_bytes(document) + self._suffix + b'\n'
+            self._offset = 0
+            self.rowcount += 1
+
+        chunk = self._buffer[self._offset:self._offset + size]
+        self._offset += len(chunk)
+        return chunk
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """
+    Inserta filas en una tabla via COPY ... FROM STDIN.
+
+    Args:
+        cursor: Cursor psycopg2
+        table: Tabla destino calificada (ej: 'bronze.raw_sales')
+        columns: Columnas destino, en el orden de cada fila
+        rows: Iterable de tuplas (puede ser un generador)
+
+    Returns:
+        Cantidad de filas enviadas
+    """
+    stream = CopyStream(rows)
+    query = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    cursor.copy_expert(query, stream, size=COPY_BUFFER_SIZE)
+    return stream.rowcount
+
+
+def copy_documents(cursor, table: str, column: str, documents: Iterable[bytes], extra: dict = None) -> int:
+    """
+    Inserta documentos ya serializados (bytes) en una columna via COPY ... FROM STDIN.
+
+    PostgreSQL parsea cada documento según el tipo de la columna (ej: jsonb) sin
+    pasar por Python: sirve para guardar cuerpos de respuestas de la API tal cual.
+
+    Args:
+        extra: {columna: valor} con el mismo valor para todas las filas (opcional)
+
+    Returns:
+        Cantidad de documentos enviados
+    """
+    extra = extra or {}
+    suffix = b''.join(b'\t' + format_copy_value(v).encode() for v in extra.values())
+    stream = DocumentStream(documents, suffix)
+    columnas = ', '.join((column, *extra))
+    cursor.copy_expert(f"COPY {table} ({columnas}) FROM STDIN", stream, size=COPY_BUFFER_SIZE)
+    return stream.rowcount
@@ -20,7 +20,16 @@ SQLALCHEMY_DATABASE_URL = URL.create(
 if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("No se encontró la DATABASE_URL. Asegúrate de configurar el archivo .env.")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Pool explícito: una corrida reutiliza estas conexiones en todos sus pasos
+# (pool_pre_ping descarta las que el servidor cerró entre pasos largos)
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -1,7 +1,7 @@
 """
 Modelos ORM para la capa Bronze
 """
-from sqlalchemy import Column, Date, Integer, String, DateTime, Index
+from sqlalchemy import Column, Computed, Date, Integer, String, DateTime, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from database.engine import Base
@@ -12,14 +12,16 @@ class RawSales(Base):
     __tablename__ = 'raw_sales'
     __table_args__ = (
         Index('idx_bronze_sales_date', 'date_comprobante'),
-        {'schema': 'bronze'}
+        {'schema': 'bronze', 'postgresql_partition_by': 'RANGE (date_comprobante)'}
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     ingestion_at = Column(DateTime, server_default=func.now())
     source_system = Column(String(50))
     data_raw = Column(JSONB)
-    date_comprobante = Column(Date)
+    date_comprobante = Column(Date, primary_key=True)  # Columna de partición (mensual)
+    content_hash = Column(String(32), Computed("md5(data_raw::text)", persisted=True))
+    deleted_at = Column(DateTime)
 
     def __repr__(self):
         return f"<RawSales(id={self.id}, source_system='{self.source_system}')>"
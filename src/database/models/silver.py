@@ -28,7 +28,8 @@ class FactVentas(Base):
         Index('idx_silver_ventas_cliente', 'id_cliente'),
         Index('idx_silver_ventas_articulo', 'id_articulo'),
         Index('idx_silver_ventas_vendedor', 'id_vendedor'),
-        Index('idx_silver_ventas_documento', 'id_documento', 'serie', 'nro_doc'),
+        Index('idx_silver_ventas_linea', 'id_documento', 'serie', 'nro_doc', 'letra', 'id_empresa',
+              'fecha_comprobante', 'id_articulo', 'nro_linea', unique=True, postgresql_nulls_not_distinct=True),
         {'schema': 'silver'}
     )
 
@@ -41,6 +42,7 @@ class FactVentas(Base):
     letra = Column(String(1))                                 # letra
     serie = Column(Integer)                                   # serie
     nro_doc = Column(Integer, nullable=False)                 # nrodoc
+    nro_linea = Column(Integer, nullable=False)               # ordinal del artículo en el documento
     anulado = Column(Boolean, default=False)                  # anulado
 
     # === FECHAS ===
@@ -1,3 +1,4 @@
 from layers.bronze.loaders import load_bronze, load_clientes, load_staff, load_routes, load_articles, load_stock, load_depositos, load_marketing, load_hectolitros, load_hectolitros_full
 
 __all__ = ['load_bronze', 'load_clientes', 'load_staff', 'load_routes', 'load_articles', 'load_stock', 'load_depositos', 'load_marketing', 'load_hectolitros', 'load_hectolitros_full']
+from layers.bronze.partitions import apply_retention
@@ -0,0 +1,237 @@
+"""
+Cache en disco de respuestas de la API de Chess ERP.
+
+Cada respuesta de un método get_* del cliente se guarda comprimida en
+<API_CACHE_DIR>/<endpoint>/<hash>.json.gz, con clave = cliente + endpoint + parámetros.
+
+Modos (settings.API_CACHE_MODE o set_cache_mode()):
+  - off:    sin cache, el cliente se usa directo
+  - on:     si hay una respuesta vigente (TTL) se usa, si no se consulta la API y se guarda
+  - replay: solo cache, nunca consulta la API; una respuesta faltante es un error
+
+Uso en los loaders:
+    client = cached_client(ChessClient.from_env(prefix="EMPRESA1_"))
+    sales = client.get_sales(fecha_desde=..., fecha_hasta=..., raw=True)
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from config import get_logger, settings
+
+logger = get_logger(__name__)
+
+
+CACHE_MODES = ('off', 'on', 'replay')
+
+# evict() deja la cache en esta fracción de max_bytes: margen para que las escrituras
+# siguientes no vuelvan a recorrer el directorio en cada put()
+EVICT_TARGET = 0.9
+
+_mode = None
+_lock = threading.Lock()
+# Tamaño estimado de cada directorio de cache (bytes) y directorios con un evict() en curso;
+# compartidos por todas las instancias del proceso (una por cliente)
+_sizes = {}
+_evicting = set()
+
+
+class CacheMissError(Exception):
+    """Respuesta no disponible en cache en modo replay."""
+
+
+def get_cache_mode() -> str:
+    """Modo de cache vigente (el de set_cache_mode() o, si no se fijó, el de settings)."""
+    return _mode or settings.API_CACHE_MODE
+
+
+def set_cache_mode(mode: str) -> None:
+    """Fija el modo de cache para el proceso (ej: desde los flags del orchestrator)."""
+    global _mode
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Modo de cache inválido: {mode} (opciones: {', '.join(CACHE_MODES)})")
+    _mode = mode
+
+
+class ApiCache:
+    """Almacén de respuestas comprimidas con TTL y límite de tamaño."""
+
+    def __init__(self, directory: str = None, ttl_hours: float = None, max_mb: int = None):
+        self.directory = Path(directory or settings.API_CACHE_DIR)
+        self.ttl_seconds = (settings.API_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        self.max_bytes = (settings.API_CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+
+    @staticmethod
+    def make_key(client_name: str, endpoint: str, params: dict) -> str:
+        """Clave estable: hash de cliente + endpoint + parámetros ordenados."""
+        payload = json.dumps(
+            {'client': client_name, 'endpoint': endpoint, 'params': params},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, endpoint: str, key: str) -> Path:
+        return self.directory / endpoint / f"{key}.json.gz"
+
+    def get(self, endpoint: str, key: str, ignore_ttl: bool = False):
+        """Retorna (True, respuesta) si hay una entrada vigente, (False, None) si no."""
+        path = self.path_for(endpoint, key)
+        try:
+            edad = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return False, None
+
+        if not ignore_ttl and edad > self.ttl_seconds:
+            logger.debug(f"Cache vencida: {path.name} ({edad / 3600:.1f}h)")
+            return False, None
+
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entrada = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entrada de cache ilegible, se ignora: {path} ({e})")
+            return False, None
+
+        try:
+            data = entrada['data']
+            # Cuerpos crudos (get_*_body, ver raw_passthrough.py): se guardan como texto
+            return True, data.encode('utf-8') if entrada.get('bytes') else data
+        except (AttributeError, KeyError) as e:
+            logger.warning(f"Entrada de cache ilegible, se ignora: {path} ({e})")
+            return False, None
+
+    def put(self, endpoint: str, key: str, params: dict, data) -> None:
+        """
+        Guarda una respuesta (escritura atómica) y aplica el límite de tamaño.
+
+        El tamaño de la cache se lleva en memoria: el directorio solo se recorre la primera
+        vez en el proceso y cuando se pasa de max_bytes.
+        """
+        path = self.path_for(endpoint, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        entrada = {'endpoint': endpoint, 'params': params, 'data': data}
+        if isinstance(data, bytes):
+            entrada.update(data=data.decode('utf-8'), bytes=True)
+
+        with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(entrada, f, default=str)
+        try:
+            anterior = path.stat().st_size
+        except FileNotFoundError:
+            anterior = 0
+        tamanio = tmp.stat().st_size
+        os.replace(tmp, path)
+
+        if self._track(tamanio - anterior) > self.max_bytes:
+            self.evict()
+
+    def _scan(self) -> tuple[list, int]:
+        """([(mtime, tamaño, path)], bytes totales) de las entradas en disco."""
+        entradas = []
+        total = 0
+        for path in self.directory.glob('*/*.json.gz'):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        return entradas, total
+
+    def _track(self, delta: int) -> int:
+        """Suma delta al tamaño estimado de la cache y lo retorna (la primera vez recorre el directorio)."""
+        with _lock:
+            total = _sizes.get(self.directory)
+            if total is not None:
+                total = _sizes[self.directory] = total + delta
+                return total
+        # Fuera del lock: la entrada recién escrita ya está incluida
+        _, total = self._scan()
+        with _lock:
+            return _sizes.setdefault(self.directory, total)
+
+    def evict(self) -> int:
+        """
+        Elimina las entradas más antiguas hasta quedar bajo EVICT_TARGET * max_bytes.
+        Retorna cuántas eliminó (0 si otro hilo ya está eliminando en el mismo directorio).
+        """
+        with _lock:
+            if self.directory in _evicting:
+                return 0
+            _evicting.add(self.directory)
+
+        try:
+            # El recorrido y los unlink van sin el lock: los put() de otros hilos no esperan
+            entradas, total = self._scan()
+            objetivo = self.max_bytes * EVICT_TARGET
+            eliminadas = 0
+            for _, size, path in sorted(entradas):
+                if total <= objetivo:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                eliminadas += 1
+            with _lock:
+                _sizes[self.directory] = total
+        finally:
+            with _lock:
+                _evicting.discard(self.directory)
+
+        if eliminadas:
+            logger.debug(f"Cache: {eliminadas} entrada(s) antiguas eliminadas por tamaño")
+        return eliminadas
+
+
+class CachedClient:
+    """
+    Envuelve un ChessClient: los métodos get_* pasan por la cache, el resto se delega.
+
+    En modo replay el cliente envuelto nunca se usa (no hay login ni requests).
+    """
+
+    def __init__(self, client, mode: str, cache: ApiCache = None):
+        self._client = client
+        self._mode = mode
+        self._cache = cache or ApiCache()
+        self._name = getattr(client, 'name', None) or ''
+
+    def __getattr__(self, nombre):
+        if not nombre.startswith('get_'):
+            return getattr(self._client, nombre)
+
+        def llamada(*args, **kwargs):
+            params = {'args': list(args), 'kwargs': kwargs}
+            key = ApiCache.make_key(self._name, nombre, params)
+
+            encontrada, data = self._cache.get(nombre, key, ignore_ttl=self._mode == 'replay')
+            if encontrada:
+                logger.debug(f"Cache hit: {nombre} {kwargs}")
+                return data
+
+            if self._mode == 'replay':
+                raise CacheMissError(f"Sin respuesta en cache para {nombre} {kwargs} (modo replay)")
+
+            data = getattr(self._client, nombre)(*args, **kwargs)
+            self._cache.put(nombre, key, params, data)
+            return data
+
+        return llamada
+
+
+def cached_client(client, mode: str = None):
+    """Retorna el cliente envuelto en la cache según el modo vigente (o el cliente tal cual si es off)."""
+    mode = mode or get_cache_mode()
+    if mode == 'off':
+        return client
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Modo de cache inválido: {mode} (opciones: {', '.join(CACHE_MODES)})")
+    return CachedClient(client, mode)
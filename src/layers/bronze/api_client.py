@@ -0,0 +1,18 @@
+"""
+Cliente de la API tal como lo usan los loaders de Bronze.
+
+wrap_client() compone, de afuera hacia adentro:
+  cache (api_cache) -> scheduler (concurrencia adaptativa y reintentos)
+    -> RawClient (get_*_body crudos, raw_passthrough) -> ChessClient
+
+Así una respuesta cacheada no consume cupo de concurrencia ni reintentos, y en modo
+replay el scheduler y el cliente real nunca se invocan.
+"""
+from layers.bronze.api_cache import cached_client
+from layers.bronze.raw_passthrough import raw_client
+from layers.bronze.scheduler import scheduled_client
+
+
+def wrap_client(client):
+    """Retorna el ChessClient envuelto en el scheduler compartido y la cache."""
+    return cached_client(scheduled_client(raw_client(client)))
@@ -0,0 +1,326 @@
+"""
+Archivo de meses fríos de bronze en Parquet, con lectura transparente desde silver.
+
+Los meses cerrados de bronze.raw_sales / bronze.raw_stock solo se vuelven a leer en
+un --full-refresh de silver. archive_months() los saca de PostgreSQL:
+
+  - Exporta el mes a <ARCHIVE_DIR>/<tabla>/<YYYY-MM>.parquet (columnar, comprimido),
+    con las claves más usadas ya aplanadas en columnas tipadas y el JSON completo en
+    data_raw (texto), leyendo la partición con un cursor del lado del servidor
+  - Registra el archivo en bronze.archived_months y elimina la partición (DETACH +
+    DROP, sin DELETE ni VACUUM), todo en la misma transacción
+  - Ventas: solo las líneas vigentes (las marcadas como borradas no se archivan). Los
+    meses compactados (bronze.raw_sales_compact) también se archivan: se leen desde
+    bronze.raw_sales_all, que rearma su data_raw, y se elimina la partición compacta
+    Stock: el inventario completo de cada día ya reconstruido (bronze.raw_stock_snapshot),
+    así el archivo no depende de baselines ni deltas
+
+transform_sales / transform_stock consultan archived_months() y, con --full-refresh o
+un rango de fechas, cargan cada mes archivado en una tabla temporal (restore_month) y
+le aplican el mismo INSERT ... SELECT que a la tabla viva.
+
+Un mes archivado no se vuelve a cargar en bronze: el archivo ya es su copia y silver
+leería ambos (líneas duplicadas). Los loaders lo verifican con check_not_archived().
+Requiere pyarrow (dependencia opcional, solo para archivar y leer lo archivado).
+
+Uso:
+    archive_months('bronze.raw_sales', 13)     # deja en la base los últimos 13 meses
+"""
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+from dateutil.relativedelta import relativedelta
+
+from database import engine
+from database.bulk import copy_rows
+from config import get_logger, settings
+from layers.bronze.compaction import COMPACT_TABLE
+from layers.bronze.partitions import PARTITIONED_TABLES, list_partitions, month_bounds
+
+logger = get_logger(__name__)
+
+
+# Columnas de cada archivo: (nombre, tipo pyarrow, expresión SQL sobre la fuente)
+ARCHIVE_COLUMNS = {
+    'bronze.raw_sales': (
+        ('date_comprobante', 'date32', "date_comprobante"),
+        ('id_empresa', 'int32', "id_empresa"),
+        ('source_system', 'string', "source_system"),
+        ('ingestion_at', 'timestamp', "ingestion_at"),
+        ('id_documento', 'string', "id_documento"),
+        ('letra', 'string', "letra"),
+        ('serie', 'int32', "serie"),
+        ('nro_doc', 'int32', "nro_doc"),
+        ('id_cliente', 'int32', "id_cliente"),
+        ('id_articulo', 'int32', "id_articulo"),
+        ('id_vendedor', 'int32', "NULLIF(data_raw->>'idVendedor', '')::integer"),
+        ('id_sucursal', 'int32', "NULLIF(data_raw->>'idSucursal', '')::integer"),
+        ('cantidades_total', 'float64', "NULLIF(data_raw->>'cantidadesTotal', '')::float8"),
+        ('subtotal_final', 'float64', "NULLIF(data_raw->>'subtotalFinal', '')::float8"),
+        ('data_raw', 'string', "data_raw::text"),
+    ),
+    'bronze.raw_stock': (
+        ('date_stock', 'date32', "date_stock"),
+        ('id_deposito', 'int32', "id_deposito"),
+        ('id_almacen', 'int32', "NULLIF(data_raw->>'idAlmacen', '')::integer"),
+        ('id_articulo', 'int32', "NULLIF(data_raw->>'idArticulo', '')::integer"),
+        ('cant_bultos', 'float64', "NULLIF(data_raw->>'cantBultos', '')::float8"),
+        ('cant_unidades', 'float64', "NULLIF(data_raw->>'cantUnidades', '')::float8"),
+        ('data_raw', 'string', "data_raw::text"),
+    ),
+}
+
+# Tablas particionadas cuyos meses se archivan en el archivo de cada tabla
+ARCHIVE_SOURCES = {
+    'bronze.raw_sales': ('bronze.raw_sales', COMPACT_TABLE),
+    'bronze.raw_stock': ('bronze.raw_stock',),
+}
+
+# Tabla temporal de lectura: columnas del archivo que usa el INSERT de silver
+RESTORE_COLUMNS = {
+    'bronze.raw_sales': (
+        ('data_raw', 'JSONB'), ('source_system', 'VARCHAR(50)'), ('date_comprobante', 'DATE'),
+        ('id_empresa', 'INTEGER'), ('deleted_at', 'TIMESTAMP'),
+        ('id_documento', 'TEXT'), ('letra', 'TEXT'), ('serie', 'INTEGER'), ('nro_doc', 'INTEGER'),
+        ('id_cliente', 'INTEGER'), ('id_articulo', 'INTEGER'),
+    ),
+    'bronze.raw_stock': (
+        ('data_raw', 'JSONB'), ('date_stock', 'DATE'), ('id_deposito', 'INTEGER'),
+    ),
+}
+
+
+def _pyarrow():
+    """Importa pyarrow (dependencia opcional)."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("El archivo en Parquet requiere pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def archive_path(table: str, mes) -> Path:
+    """Archivo de un mes: <ARCHIVE_DIR>/raw_sales/2024-01.parquet."""
+    inicio, _ = month_bounds(mes)
+    return Path(settings.ARCHIVE_DIR) / table.split('.')[-1] / f"{inicio:%Y-%m}.parquet"
+
+
+def _source_sql(table: str, mes) -> tuple[str, tuple]:
+    """SELECT de las columnas del archivo para un mes (ventas: planas o compactadas)."""
+    inicio, siguiente = month_bounds(mes)
+    columnas = ', '.join(sql for _, _, sql in ARCHIVE_COLUMNS[table])
+    if table == 'bronze.raw_sales':
+        return (
+            f"SELECT {columnas} FROM bronze.raw_sales_all "
+            f"WHERE date_comprobante >= %s AND date_comprobante < %s AND deleted_at IS NULL "
+            f"ORDER BY date_comprobante, id",
+            (inicio, siguiente)
+        )
+    fin = siguiente - relativedelta(days=1)
+    return (
+        f"SELECT {columnas} FROM bronze.raw_stock_snapshot(%s::date, %s::date) ORDER BY date_stock, id_deposito",
+        (inicio, fin)
+    )
+
+
+def export_month(raw_conn, table: str, mes, path: Path) -> int:
+    """
+    Escribe un mes en Parquet (un row group por bloque de ARCHIVE_BATCH_SIZE filas).
+
+    Lee con un cursor con nombre (del lado del servidor): la memoria queda acotada
+    por un bloque. El archivo se escribe en un temporal y se renombra al terminar.
+
+    Returns:
+        Filas escritas
+    """
+    pa, pq = _pyarrow()
+    tipos = {'date32': pa.date32(), 'int32': pa.int32(), 'string': pa.string(),
+             'float64': pa.float64(), 'timestamp': pa.timestamp('us')}
+    columnas = ARCHIVE_COLUMNS[table]
+    schema = pa.schema([(nombre, tipos[tipo]) for nombre, tipo, _ in columnas])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    sql, params = _source_sql(table, mes)
+
+    filas = 0
+    cursor = raw_conn.cursor(name=f"archivo_{table.split('.')[-1]}")
+    cursor.itersize = settings.ARCHIVE_BATCH_SIZE
+    try:
+        cursor.execute(sql, params)
+        with pq.ParquetWriter(tmp, schema, compression=settings.ARCHIVE_COMPRESSION) as writer:
+            while True:
+                bloque = cursor.fetchmany(settings.ARCHIVE_BATCH_SIZE)
+                if not bloque:
+                    break
+                datos = {nombre: [fila[i] for fila in bloque] for i, (nombre, _, _) in enumerate(columnas)}
+                writer.write_table(pa.Table.from_pydict(datos, schema=schema))
+                filas += len(bloque)
+    finally:
+        cursor.close()
+
+    os.replace(tmp, path)
+    return filas
+
+
+def archive_month(raw_conn, table: str, particion: str, mes, parent: str = None) -> int:
+    """
+    Archiva un mes: Parquet, registro en bronze.archived_months y eliminación de la
+    partición, confirmados juntos. `parent` es la tabla de la partición si no es
+    `table` (ej: bronze.raw_sales_compact). Retorna las filas archivadas.
+    """
+    parent = parent or table
+    path = archive_path(table, mes)
+    filas = export_month(raw_conn, table, mes, path)
+
+    cursor = raw_conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO bronze.archived_months (table_name, period, path, rows_archived, bytes)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (table_name, period) DO UPDATE SET
+                path = EXCLUDED.path,
+                rows_archived = EXCLUDED.rows_archived,
+                bytes = EXCLUDED.bytes,
+                archived_at = CURRENT_TIMESTAMP
+            """,
+            (table, month_bounds(mes)[0], str(path), filas, path.stat().st_size)
+        )
+        cursor.execute(f"ALTER TABLE {parent} DETACH PARTITION {particion}")
+        cursor.execute(f"DROP TABLE {particion}")
+        if table == 'bronze.raw_stock':
+            inicio, siguiente = month_bounds(mes)
+            cursor.execute(
+                "DELETE FROM bronze.raw_stock_days WHERE date_stock >= %s AND date_stock < %s",
+                (inicio, siguiente)
+            )
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return filas
+
+
+def archive_months(table: str, meses: int) -> list[str]:
+    """
+    Archiva en Parquet los meses de `table` anteriores a los últimos `meses` meses
+    (incluyendo el actual), un mes por transacción. En ventas incluye los meses
+    compactados.
+
+    Returns:
+        Archivos escritos
+    """
+    if table not in ARCHIVE_COLUMNS:
+        raise ValueError(f"Tabla sin archivo en Parquet: {table}")
+    if meses < 1:
+        raise ValueError("Hay que conservar al menos 1 mes en la base")
+    _pyarrow()
+
+    inicio_mes_actual, _ = month_bounds(date.today())
+    fecha_limite = inicio_mes_actual - relativedelta(months=meses - 1)
+
+    archivos = []
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+        particiones = sorted(
+            ((p, mes, fuente) for fuente in ARCHIVE_SOURCES[table]
+             for p, mes in list_partitions(cursor, fuente) if mes < fecha_limite),
+            key=lambda p: p[1]
+        )
+        raw_conn.commit()
+        cursor.close()
+
+        for particion, mes, fuente in particiones:
+            inicio = datetime.now()
+            filas = archive_month(raw_conn, table, particion, mes, fuente)
+            path = archive_path(table, mes)
+            logger.info(
+                f"Archivado {particion} -> {path} ({filas:,} filas, {path.stat().st_size / 1024 / 1024:.1f} MB, "
+                f"{(datetime.now() - inicio).total_seconds():.1f}s)"
+            )
+            archivos.append(str(path))
+
+    logger.info(f"{table}: {len(archivos)} mes(es) archivados en Parquet (antes de {fecha_limite})")
+    return archivos
+
+
+class ArchivedMonthError(Exception):
+    """Se intentó cargar en bronze un mes que está archivado en Parquet."""
+
+
+def check_not_archived(cursor, table: str, fecha_desde, fecha_hasta) -> None:
+    """Falla si algún mes del rango de `table` está archivado (cargarlo duplicaría sus líneas en silver)."""
+    archivados = archived_months(cursor, table, str(fecha_desde), str(fecha_hasta))
+    if archivados:
+        meses = ', '.join(f"{mes:%Y-%m}" for mes, _ in archivados)
+        raise ArchivedMonthError(
+            f"Meses de {table} archivados en Parquet: {meses}. El archivo ya es su copia: "
+            f"no se vuelven a cargar en bronze"
+        )
+
+
+def archived_months(cursor, table: str, fecha_desde: str = '', fecha_hasta: str = '') -> list[tuple[date, str]]:
+    """[(primer día del mes, archivo)] de los meses archivados de `table` que tocan el rango."""
+    cursor.execute(
+        """
+        SELECT period, path FROM bronze.archived_months
+        WHERE table_name = %s
+          AND (%s::date IS NULL OR period >= date_trunc('month', %s::date))
+          AND (%s::date IS NULL OR period <= %s::date)
+        ORDER BY period
+        """,
+        (table, fecha_desde or None, fecha_desde or None, fecha_hasta or None, fecha_hasta or None)
+    )
+    return [(period, path) for period, path in cursor.fetchall()]
+
+
+def restore_month(cursor, table: str, path: str, temp_table: str, fecha_desde: str = '',
+                  fecha_hasta: str = '') -> int:
+    """
+    Carga un mes archivado (filtrado al rango) en una tabla temporal con las columnas
+    de bronze que usa silver (RESTORE_COLUMNS), via COPY. Se elimina al commit.
+
+    El archivo se lee por bloques de ARCHIVE_BATCH_SIZE filas (iter_batches) y cada
+    bloque se copia antes de leer el siguiente: la memoria queda acotada por un bloque,
+    no por el mes.
+
+    Returns:
+        Filas cargadas
+    """
+    pa, pq = _pyarrow()
+    import pyarrow.compute as pc
+    columna_fecha = PARTITIONED_TABLES[table]
+    columnas = RESTORE_COLUMNS[table]
+
+    filtros = []
+    if fecha_desde:
+        filtros.append((pc.greater_equal, date.fromisoformat(fecha_desde)))
+    if fecha_hasta:
+        filtros.append((pc.less_equal, date.fromisoformat(fecha_hasta)))
+
+    cursor.execute(
+        f"CREATE TEMP TABLE {temp_table} ({', '.join(f'{c} {t}' for c, t in columnas)}) ON COMMIT DROP"
+    )
+    # deleted_at no se archiva: las líneas archivadas están todas vigentes
+    leidas = [c for c, _ in columnas if c != 'deleted_at']
+
+    filas = 0
+    archivo = pq.ParquetFile(path)
+    try:
+        for lote in archivo.iter_batches(batch_size=settings.ARCHIVE_BATCH_SIZE, columns=leidas):
+            for comparar, fecha in filtros:
+                lote = lote.filter(comparar(lote.column(columna_fecha), pa.scalar(fecha, pa.date32())))
+            if lote.num_rows == 0:
+                continue
+            datos = lote.to_pydict()
+            filas += copy_rows(cursor, temp_table, leidas, zip(*(datos[c] for c in leidas)))
+    finally:
+        archivo.close()
+    logger.debug(f"Leído {path}: {filas:,} filas")
+    return filas
@@ -0,0 +1,52 @@
+"""
+Checkpoints de cargas largas de Bronze (backfills de ventas y stock).
+
+Cada unidad de trabajo confirmada se registra en bronze.load_checkpoints dentro de la
+misma transacción que sus datos: si el proceso muere, lo registrado es exactamente lo
+que quedó cargado. Con resume=True los loaders saltean las unidades ya registradas.
+
+Unidades:
+  - sales: un mes (o parte de mes) del rango, id_deposito = 0, por empresa
+  - stock: un día x depósito
+"""
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+# id_deposito de las unidades que no son por depósito
+SIN_DEPOSITO = 0
+
+# Empresa de las unidades de entidades que no se cargan por empresa
+EMPRESA_DEFAULT = 1
+
+
+def completed_units(cursor, entity: str, fecha_desde: str, fecha_hasta: str,
+                    id_empresa: int = EMPRESA_DEFAULT) -> set[tuple[str, str, int]]:
+    """Retorna {(desde, hasta, id_deposito)} de las unidades completadas dentro del rango."""
+    cursor.execute(
+        """
+        SELECT range_desde, range_hasta, id_deposito
+        FROM bronze.load_checkpoints
+        WHERE entity = %s AND id_empresa = %s AND range_desde >= %s AND range_hasta <= %s
+        """,
+        (entity, id_empresa, fecha_desde, fecha_hasta)
+    )
+    return {
+        (str(desde), str(hasta), id_deposito)
+        for desde, hasta, id_deposito in cursor.fetchall()
+    }
+
+
+def mark_completed(cursor, entity: str, fecha_desde: str, fecha_hasta: str,
+                   id_deposito: int = SIN_DEPOSITO, rows: int = 0, id_empresa: int = EMPRESA_DEFAULT) -> None:
+    """Registra una unidad como completada (se confirma con el commit de sus datos)."""
+    cursor.execute(
+        """
+        INSERT INTO bronze.load_checkpoints (entity, id_empresa, range_desde, range_hasta, id_deposito, rows_loaded)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (entity, id_empresa, range_desde, range_hasta, id_deposito)
+        DO UPDATE SET rows_loaded = EXCLUDED.rows_loaded, completed_at = CURRENT_TIMESTAMP
+        """,
+        (entity, id_empresa, fecha_desde, fecha_hasta, id_deposito, rows)
+    )
@@ -0,0 +1,205 @@
+"""
+Compactación de bronze.raw_sales con diccionario de claves.
+
+Cada línea de ventas repite ~80 claves largas en su jsonb (precioUnitarioBruto,
+fechaAsientoContable, ...). La representación compacta guarda cada conjunto de claves
+una sola vez en bronze.sales_key_schemas y, por línea, solo los valores en ese orden
+(un array jsonb en bronze.raw_sales_compact.data_values):
+
+    sales_key_schemas: schema_id=1, keys={idDocumento, letra, serie, ...}
+    raw_sales_compact: schema_id=1, data_values=["FCVTA", "A", 1, ...]
+
+La vista bronze.raw_sales_all expone las líneas planas y las compactadas con el mismo
+data_raw de siempre (bronze.expand_keys() rearma el objeto), así silver lee ambas
+representaciones sin cambios en sus expresiones. content_hash se conserva.
+
+Se compacta por mes completo (opcional, pensado para meses cerrados):
+
+  - compact_months(): arma la partición compacta del mes en una tabla staging con las
+    líneas vigentes (las marcadas como borradas no se conservan), verifica la cantidad
+    y elimina la partición plana, en una sola transacción por mes
+  - expand_months(): la operación inversa, para volver a cargar el mes desde la API
+
+Un mes compactado no admite cargas: load_bronze y reload_sales fallan con
+CompactedMonthError hasta que se descompacta (ver check_not_compacted()).
+
+Uso:
+    compact_months('2024-01-01', '2024-12-31')
+    expand_months('2024-03-01', '2024-03-31')
+"""
+from datetime import datetime
+
+from database import engine
+from config import get_logger
+from layers.bronze.partitions import (
+    create_staging_partition,
+    list_partitions,
+    months_in_range,
+    partition_name,
+    swap_partition,
+)
+
+logger = get_logger(__name__)
+
+
+SALES_TABLE = 'bronze.raw_sales'
+COMPACT_TABLE = 'bronze.raw_sales_compact'
+KEY_SCHEMAS = 'bronze.sales_key_schemas'
+
+
+class CompactedMonthError(Exception):
+    """Se intentó cargar un mes de ventas que está compactado."""
+
+
+def register_schemas_sql(source: str, schemas: str = KEY_SCHEMAS) -> str:
+    """Registra los conjuntos de claves (en el orden del jsonb) de las líneas vigentes de `source`."""
+    return f"""
+        INSERT INTO {schemas} (keys)
+        SELECT DISTINCT ARRAY(SELECT jsonb_object_keys(data_raw))
+        FROM {source}
+        WHERE deleted_at IS NULL
+        ON CONFLICT (keys) DO NOTHING
+    """
+
+
+def compact_sql(source: str, target: str, schemas: str = KEY_SCHEMAS) -> str:
+    """INSERT de las líneas vigentes de `source` (planas) en `target` (compacta)."""
+    return f"""
+        INSERT INTO {target} (
+            id, ingestion_at, source_system, schema_id, data_values, date_comprobante, content_hash, id_empresa
+        )
+        SELECT r.id, r.ingestion_at, r.source_system, k.schema_id,
+               (SELECT jsonb_agg(r.data_raw -> c.clave ORDER BY c.pos)
+                FROM unnest(k.keys) WITH ORDINALITY AS c(clave, pos)),
+               r.date_comprobante, r.content_hash, r.id_empresa
+        FROM {source} r
+        JOIN {schemas} k ON k.keys = ARRAY(SELECT jsonb_object_keys(r.data_raw))
+        WHERE r.deleted_at IS NULL
+    """
+
+
+def expand_sql(source: str, target: str, schemas: str = KEY_SCHEMAS) -> str:
+    """INSERT de las líneas de `source` (compacta) en `target` (plana), con el jsonb original."""
+    return f"""
+        INSERT INTO {target} (id, ingestion_at, source_system, data_raw, date_comprobante, id_empresa)
+        SELECT c.id, c.ingestion_at, c.source_system, bronze.expand_keys(k.keys, c.data_values),
+               c.date_comprobante, c.id_empresa
+        FROM {source} c
+        JOIN {schemas} k ON k.schema_id = c.schema_id
+    """
+
+
+def compacted_months(cursor, fecha_desde, fecha_hasta) -> list:
+    """Primer día de cada mes compactado que toca el rango."""
+    meses = set(months_in_range(fecha_desde, fecha_hasta))
+    return [mes for _, mes in list_partitions(cursor, COMPACT_TABLE) if mes in meses]
+
+
+def check_not_compacted(cursor, fecha_desde, fecha_hasta) -> None:
+    """Falla si algún mes del rango está compactado (cargarlo duplicaría sus líneas)."""
+    compactados = compacted_months(cursor, fecha_desde, fecha_hasta)
+    if compactados:
+        meses = ', '.join(f"{mes:%Y-%m}" for mes in compactados)
+        raise CompactedMonthError(
+            f"Meses de ventas compactados: {meses}. Descompactarlos antes de cargar "
+            f"(python orchestrator.py bronze expand <desde> <hasta>)"
+        )
+
+
+def _size(cursor, table: str) -> int:
+    cursor.execute("SELECT COALESCE(pg_total_relation_size(to_regclass(%s)), 0)", (table,))
+    return cursor.fetchone()[0]
+
+
+def compact_month(cursor, particion: str, mes) -> int:
+    """
+    Pasa un mes de la partición plana a la compacta (se confirma con el commit del llamador).
+
+    Returns:
+        Líneas compactadas
+    """
+    staging = create_staging_partition(cursor, COMPACT_TABLE, mes)
+    cursor.execute(register_schemas_sql(particion))
+    cursor.execute(compact_sql(particion, staging))
+    filas = cursor.rowcount
+
+    cursor.execute(f"SELECT COUNT(*) FROM {particion} WHERE deleted_at IS NULL")
+    vigentes = cursor.fetchone()[0]
+    if filas != vigentes:
+        raise RuntimeError(f"{particion}: {vigentes:,} líneas vigentes pero se compactaron {filas:,}")
+
+    swap_partition(cursor, COMPACT_TABLE, mes, staging)
+    cursor.execute(f"ALTER TABLE {SALES_TABLE} DETACH PARTITION {particion}")
+    cursor.execute(f"DROP TABLE {particion}")
+    return filas
+
+
+def expand_month(cursor, particion: str, mes) -> int:
+    """
+    Vuelve a pasar un mes compactado a la partición plana (reemplazándola) y elimina
+    la partición compacta. Se confirma con el commit del llamador.
+
+    Returns:
+        Líneas descompactadas
+    """
+    staging = create_staging_partition(cursor, SALES_TABLE, mes)
+    cursor.execute(expand_sql(particion, staging))
+    filas = cursor.rowcount
+
+    swap_partition(cursor, SALES_TABLE, mes, staging)
+    cursor.execute(f"ALTER TABLE {COMPACT_TABLE} DETACH PARTITION {particion}")
+    cursor.execute(f"DROP TABLE {particion}")
+    return filas
+
+
+def _run(fecha_desde: str, fecha_hasta: str, origen: str, destino: str, operacion, nombre: str) -> int:
+    """Aplica `operacion` a cada mes del rango con partición en `origen`, un mes por transacción."""
+    meses = set(months_in_range(fecha_desde, fecha_hasta))
+    total = 0
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+        particiones = [(p, mes) for p, mes in list_partitions(cursor, origen) if mes in meses]
+        raw_conn.commit()
+
+        for particion, mes in particiones:
+            inicio = datetime.now()
+            antes = _size(cursor, particion)
+            try:
+                filas = operacion(cursor, particion, mes)
+                despues = _size(cursor, partition_name(destino, mes))
+                raw_conn.commit()
+            except Exception:
+                raw_conn.rollback()
+                raise
+            total += filas
+            logger.info(
+                f"{nombre} {mes:%Y-%m}: {filas:,} líneas, {antes / 1024 / 1024:.1f} MB -> "
+                f"{despues / 1024 / 1024:.1f} MB ({(datetime.now() - inicio).total_seconds():.1f}s)"
+            )
+
+        cursor.close()
+
+    logger.info(f"{nombre}: {len(particiones)} mes(es), {total:,} líneas")
+    return total
+
+
+def compact_months(fecha_desde: str, fecha_hasta: str) -> int:
+    """
+    Compacta los meses de bronze.raw_sales que toca el rango (meses completos).
+
+    Returns:
+        Líneas compactadas
+    """
+    return _run(fecha_desde, fecha_hasta, SALES_TABLE, COMPACT_TABLE, compact_month, "Compactado")
+
+
+def expand_months(fecha_desde: str, fecha_hasta: str) -> int:
+    """
+    Descompacta los meses de bronze.raw_sales_compact que toca el rango (meses completos).
+
+    Returns:
+        Líneas descompactadas
+    """
+    return _run(fecha_desde, fecha_hasta, COMPACT_TABLE, SALES_TABLE, expand_month, "Descompactado")
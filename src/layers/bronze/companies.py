@@ -0,0 +1,125 @@
+"""
+Carga de ventas de varias empresas (id_empresa) del ERP en paralelo.
+
+Cada empresa tiene sus propias credenciales en el .env (prefijo EMPRESA1_, EMPRESA2_,
+...) y se configura en settings.ERP_COMPANIES ({prefijo: id_empresa}).
+run_companies() ejecuta load_bronze() de cada empresa en su propio hilo:
+
+  - Cada empresa usa su propio cliente (current_client(prefix)): su sesión, su login y
+    sus límites de concurrencia en el scheduler, que se llevan por nombre de cliente
+    (una empresa lenta o con errores no frena a las demás)
+  - Las líneas, los checkpoints y el plan de consultas quedan etiquetados con
+    id_empresa: el resume y el merge por hash de cada empresa son independientes
+  - Las particiones mensuales se crean una sola vez antes de lanzar los hilos
+  - Con replace las empresas se cargan de a una: el reemplazo intercambia la partición
+    completa del mes (conservando las líneas de las otras empresas)
+  - Una empresa que falla no corta a las demás; al terminar se informa el tiempo de
+    cada una y, si alguna falló, se levanta CompaniesLoadError con todos los errores
+
+Uso:
+    run_companies('2025-01-01', '2025-01-31')
+    run_companies('2025-01-01', '2025-01-31', companies={'EMPRESA2_': 2})
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from database import engine
+from config import get_logger, settings
+from layers.bronze.archive import check_not_archived
+from layers.bronze.loaders.sales_loader import load_bronze
+from layers.bronze.partitions import ensure_partitions
+
+logger = get_logger(__name__)
+
+
+class CompaniesLoadError(Exception):
+    """La carga de ventas de una o más empresas falló."""
+
+    def __init__(self, errores: dict):
+        self.errores = errores
+        detalle = ', '.join(f"empresa {id_empresa} ({error})" for id_empresa, error in errores.items())
+        super().__init__(f"Fallaron {len(errores)} empresa(s): {detalle}")
+
+
+def configured_companies(prefixes: list = None) -> dict:
+    """
+    Empresas configuradas en settings.ERP_COMPANIES ({prefijo: id_empresa}).
+
+    Con `prefixes` retorna solo esas (ej: ['EMPRESA2_']); un prefijo no configurado es un error.
+    """
+    companies = dict(settings.ERP_COMPANIES)
+    if prefixes is None:
+        return companies
+    faltantes = [p for p in prefixes if p not in companies]
+    if faltantes:
+        raise ValueError(f"Empresa(s) no configuradas en ERP_COMPANIES: {', '.join(faltantes)}")
+    return {p: companies[p] for p in prefixes}
+
+
+def _run(prefix: str, id_empresa: int, fecha_desde: str, fecha_hasta: str, kwargs: dict):
+    """Carga las ventas de una empresa y retorna (segundos, error o None)."""
+    inicio = time.perf_counter()
+    try:
+        load_bronze(fecha_desde, fecha_hasta, prefix=prefix, id_empresa=id_empresa, **kwargs)
+        return time.perf_counter() - inicio, None
+    except Exception as e:
+        logger.error(f"Empresa {id_empresa} ({prefix}): {e}")
+        return time.perf_counter() - inicio, e
+
+
+def run_companies(fecha_desde: str, fecha_hasta: str, companies: dict = None, max_workers: int = None,
+                  **kwargs) -> dict:
+    """
+    Carga las ventas de varias empresas en paralelo (ver load_bronze).
+
+    Args:
+        fecha_desde: Fecha inicial (YYYY-MM-DD)
+        fecha_hasta: Fecha final (YYYY-MM-DD)
+        companies: {prefijo: id_empresa}. Default: settings.ERP_COMPANIES
+        max_workers: Empresas simultáneas. Default: settings.COMPANIES_MAX_WORKERS (1 = secuencial)
+        **kwargs: Opciones de load_bronze (replace, resume, prefetch, ...)
+
+    Returns:
+        {id_empresa: segundos} de cada empresa
+
+    Raises:
+        CompaniesLoadError: si alguna empresa falló (después de que terminaron todas)
+    """
+    if companies is None:
+        companies = configured_companies()
+    if max_workers is None:
+        max_workers = settings.COMPANIES_MAX_WORKERS
+    if kwargs.get('replace'):
+        max_workers = 1
+    max_workers = max(1, min(max_workers, len(companies)))
+
+    if max_workers > 1:
+        # Evita que dos hilos creen a la vez la misma partición mensual
+        with engine.connect() as conn:
+            raw_conn = conn.connection.dbapi_connection
+            cursor = raw_conn.cursor()
+            check_not_archived(cursor, 'bronze.raw_sales', fecha_desde, fecha_hasta)
+            ensure_partitions(cursor, 'bronze.raw_sales', fecha_desde, fecha_hasta)
+            raw_conn.commit()
+            cursor.close()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='empresa') as executor:
+        futuros = {
+            id_empresa: executor.submit(_run, prefix, id_empresa, fecha_desde, fecha_hasta, kwargs)
+            for prefix, id_empresa in companies.items()
+        }
+        resultados = {id_empresa: futuro.result() for id_empresa, futuro in futuros.items()}
+    total = time.perf_counter() - inicio
+
+    for id_empresa, (segundos, error) in resultados.items():
+        logger.info(f"  empresa {id_empresa:<4} {'ERROR' if error else 'OK':<6} {segundos:>7.1f}s")
+    logger.info(
+        f"Ventas de {len(companies)} empresa(s): {total:.1f}s con {max_workers} hilo(s) "
+        f"(suma de las empresas: {sum(s for s, _ in resultados.values()):.1f}s)"
+    )
+
+    errores = {id_empresa: error for id_empresa, (_, error) in resultados.items() if error is not None}
+    if errores:
+        raise CompaniesLoadError(errores)
+    return {id_empresa: segundos for id_empresa, (segundos, _) in resultados.items()}
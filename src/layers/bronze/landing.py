@@ -0,0 +1,362 @@
+"""
+Landing zone de bronze: copia en disco de lo que devolvió la API, en NDJSON comprimido.
+
+Con la landing activada (settings.LANDING_ENABLED o set_landing()) cada respuesta de
+ventas y de stock se guarda además en archivos locales, una línea JSON por ítem:
+
+    <LANDING_DIR>/sales/2025-01-15/empresa_1.ndjson.gz     # ventas de un día de una empresa
+    <LANDING_DIR>/stock/2025-01-15/deposito_3.ndjson.gz    # inventario de un depósito en un día
+    <LANDING_DIR>/<entidad>/<fecha>/manifest.json          # filas, sha256 y tamaño de cada archivo
+
+Las ventas se agrupan por fechaComprobate: cada consulta (mes, semana o día) reescribe
+los archivos de todos los días que cubre, incluidos los días sin ventas (archivo vacío),
+así el día queda registrado como consultado. Los archivos se escriben en un temporal y
+se renombran: un archivo presente siempre está completo.
+
+reload_sales() / reload_stock() (re)cargan bronze desde los archivos con COPY, sin
+consultar la API: las líneas van tal cual a la columna jsonb (PostgreSQL las parsea) y
+cada archivo se verifica contra el manifiesto (filas y sha256) antes del commit.
+
+Las respuestas crudas (passthrough) se decodifican para separar los ítems: los números
+con ceros no significativos (ej: 1.10) quedan como en el modo sin passthrough.
+
+Uso:
+    set_landing(True)
+    load_bronze('2025-01-01', '2025-12-31')            # además escribe la landing
+    reload_sales('2025-01-01', '2025-12-31')           # re-bronze desde los archivos
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from database import engine
+from database.bulk import copy_documents
+from config import get_logger, settings
+from layers.bronze.archive import check_not_archived
+from layers.bronze.checkpoints import EMPRESA_DEFAULT, mark_completed
+from layers.bronze.compaction import check_not_compacted
+from layers.bronze.partitions import (
+    carry_over_rows,
+    create_staging_partition,
+    ensure_partitions,
+    month_bounds,
+    months_in_range,
+    swap_partition,
+)
+from layers.bronze.raw_passthrough import SALES_ITEMS_PATH, STOCK_ITEMS_PATH
+from layers.bronze.sales_changes import begin_sales_write, record_replaced_documents
+from layers.bronze.stock_snapshots import KIND_FULL, delete_day, register_day
+
+logger = get_logger(__name__)
+
+
+SOURCE_SYSTEM = 'API_CHESS_ERP'
+MANIFEST = 'manifest.json'
+
+_enabled = None
+_lock = threading.Lock()
+
+
+class LandingError(Exception):
+    """Archivos de la landing zone faltantes o que no coinciden con su manifiesto."""
+
+
+def landing_enabled() -> bool:
+    """True si se escribe la landing (set_landing() o, si no se fijó, settings.LANDING_ENABLED)."""
+    return settings.LANDING_ENABLED if _enabled is None else _enabled
+
+
+def set_landing(enabled: bool) -> None:
+    """Activa o desactiva la landing para el proceso (ej: desde los flags del orchestrator)."""
+    global _enabled
+    _enabled = enabled
+
+
+def sales_file(id_empresa: int) -> str:
+    return f"empresa_{id_empresa}.ndjson.gz"
+
+
+def stock_file(id_deposito: int) -> str:
+    return f"deposito_{id_deposito}.ndjson.gz"
+
+
+def landing_dir(entity: str, fecha) -> Path:
+    """Directorio de un día de una entidad: <LANDING_DIR>/<entity>/<YYYY-MM-DD>."""
+    return Path(settings.LANDING_DIR) / entity / str(fecha)[:10]
+
+
+def _days(fecha_desde, fecha_hasta) -> list[str]:
+    """Días (YYYY-MM-DD) del rango [fecha_desde, fecha_hasta]."""
+    actual = date.fromisoformat(str(fecha_desde)[:10])
+    fin = date.fromisoformat(str(fecha_hasta)[:10])
+    dias = []
+    while actual <= fin:
+        dias.append(actual.isoformat())
+        actual += timedelta(days=1)
+    return dias
+
+
+def _items(data, path: tuple) -> list:
+    """Ítems de una respuesta: lista de dicts, o cuerpos crudos (bytes / RawPages) que se decodifican."""
+    if not data:
+        return []
+    if isinstance(data, bytes):
+        data = [data]
+    if not isinstance(data[0], bytes):
+        return data
+
+    items = []
+    for body in data:
+        nodo = json.loads(body)
+        for clave in path:
+            nodo = nodo.get(clave) if isinstance(nodo, dict) else None
+        if isinstance(nodo, list):
+            items.extend(nodo)
+    return items
+
+
+# ==========================================
+# ESCRITURA
+# ==========================================
+
+def read_manifest(entity: str, fecha) -> dict:
+    """Manifiesto de un día ({archivo: {rows, sha256, bytes, written_at}}); vacío si no existe."""
+    path = landing_dir(entity, fecha) / MANIFEST
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _update_manifest(entity: str, fecha, nombre: str, entrada: dict) -> None:
+    directorio = landing_dir(entity, fecha)
+    with _lock:
+        manifiesto = read_manifest(entity, fecha)
+        manifiesto[nombre] = entrada
+        tmp = directorio / f"{MANIFEST}.tmp"
+        tmp.write_text(json.dumps(manifiesto, indent=2, sort_keys=True))
+        os.replace(tmp, directorio / MANIFEST)
+
+
+def write_file(entity: str, fecha, nombre: str, items: list) -> dict:
+    """
+    Escribe los ítems como NDJSON comprimido y los registra en el manifiesto del día.
+
+    Returns:
+        Entrada del manifiesto: filas, sha256 del NDJSON sin comprimir, bytes en disco
+    """
+    directorio = landing_dir(entity, fecha)
+    directorio.mkdir(parents=True, exist_ok=True)
+    path = directorio / nombre
+    tmp = directorio / f"{nombre}.tmp"
+
+    sha = hashlib.sha256()
+    with gzip.open(tmp, 'wb', compresslevel=settings.LANDING_COMPRESS_LEVEL) as f:
+        for item in items:
+            linea = json.dumps(item).encode() + b'\n'
+            sha.update(linea)
+            f.write(linea)
+    os.replace(tmp, path)
+
+    entrada = {
+        'rows': len(items),
+        'sha256': sha.hexdigest(),
+        'bytes': path.stat().st_size,
+        'written_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    _update_manifest(entity, fecha, nombre, entrada)
+    return entrada
+
+
+def land_sales(fecha_desde: str, fecha_hasta: str, id_empresa: int, data) -> int:
+    """
+    Guarda la respuesta de una consulta de ventas: un archivo por día del rango
+    (vacío si el día no tuvo ventas). Retorna las líneas escritas.
+    """
+    por_dia = {dia: [] for dia in _days(fecha_desde, fecha_hasta)}
+    for item in _items(data, SALES_ITEMS_PATH):
+        por_dia.setdefault(str(item.get('fechaComprobate', ''))[:10], []).append(item)
+
+    total = 0
+    for dia, items in por_dia.items():
+        total += write_file('sales', dia, sales_file(id_empresa), items)['rows']
+    logger.debug(f"Landing ventas {fecha_desde} - {fecha_hasta} (empresa {id_empresa}): {total} líneas")
+    return total
+
+
+def land_stock(fecha: str, id_deposito: int, data) -> int:
+    """Guarda el inventario de un depósito en un día. Retorna las filas escritas."""
+    return write_file('stock', fecha, stock_file(id_deposito), _items(data, STOCK_ITEMS_PATH))['rows']
+
+
+# ==========================================
+# LECTURA Y RECARGA
+# ==========================================
+
+class LandingFile:
+    """
+    Líneas de un archivo de la landing, para pasar directo a copy_documents().
+
+    Mientras se leen se cuentan y se calcula el sha256; verify() los compara con el
+    manifiesto (se llama después del COPY y antes del commit).
+    """
+
+    def __init__(self, entity: str, fecha, nombre: str, entrada: dict):
+        self.path = landing_dir(entity, fecha) / nombre
+        self.entrada = entrada
+        self.rows = 0
+        self._sha = hashlib.sha256()
+
+    def __iter__(self):
+        with gzip.open(self.path, 'rb') as f:
+            for linea in f:
+                self._sha.update(linea)
+                self.rows += 1
+                yield linea.rstrip(b'\n')
+
+    def verify(self) -> int:
+        """Retorna las filas leídas; LandingError si no coinciden con el manifiesto."""
+        if self.rows != self.entrada['rows'] or self._sha.hexdigest() != self.entrada['sha256']:
+            raise LandingError(
+                f"{self.path}: {self.rows} filas leídas, el manifiesto registra {self.entrada['rows']} "
+                f"(o el sha256 no coincide)"
+            )
+        return self.rows
+
+
+def _sales_files(fecha_desde: str, fecha_hasta: str, id_empresa: int) -> dict:
+    """{día: entrada del manifiesto} del rango; LandingError si falta algún día."""
+    nombre = sales_file(id_empresa)
+    entradas = {dia: read_manifest('sales', dia).get(nombre) for dia in _days(fecha_desde, fecha_hasta)}
+    faltantes = [dia for dia, entrada in entradas.items() if entrada is None]
+    if faltantes:
+        raise LandingError(
+            f"Sin archivos de ventas de la empresa {id_empresa} para {len(faltantes)} día(s): "
+            f"{', '.join(faltantes[:5])}{' ...' if len(faltantes) > 5 else ''}"
+        )
+    return entradas
+
+
+def reload_sales(fecha_desde: str, fecha_hasta: str, id_empresa: int = EMPRESA_DEFAULT) -> int:
+    """
+    Recarga bronze.raw_sales de una empresa desde la landing, mes a mes.
+
+    Cada mes se arma en una tabla staging (con los días fuera del rango y las líneas de
+    otras empresas de la partición actual) y reemplaza a la partición, como load_bronze
+    con replace=True: se confirma junto con su checkpoint y los documentos que
+    desaparecen quedan en bronze.raw_sales_changes. Antes de tocar la base se verifica
+    que estén todos los días.
+
+    Returns:
+        Líneas cargadas
+    """
+    entradas = _sales_files(fecha_desde, fecha_hasta, id_empresa)
+    total = 0
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+
+        check_not_compacted(cursor, fecha_desde, fecha_hasta)
+        check_not_archived(cursor, 'bronze.raw_sales', fecha_desde, fecha_hasta)
+        ensure_partitions(cursor, 'bronze.raw_sales', fecha_desde, fecha_hasta)
+        raw_conn.commit()
+
+        for mes in months_in_range(fecha_desde, fecha_hasta):
+            inicio, siguiente = month_bounds(mes)
+            mes_desde = max(inicio.isoformat(), fecha_desde)
+            mes_hasta = min((siguiente - timedelta(days=1)).isoformat(), fecha_hasta)
+
+            try:
+                begin_sales_write(cursor)
+                staging = create_staging_partition(cursor, 'bronze.raw_sales', mes_desde)
+                carry_over_rows(cursor, 'bronze.raw_sales', staging, mes_desde, mes_hasta, id_empresa)
+
+                lineas = 0
+                for dia in _days(mes_desde, mes_hasta):
+                    archivo = LandingFile('sales', dia, sales_file(id_empresa), entradas[dia])
+                    copy_documents(cursor, staging, 'data_raw', archivo, {
+                        'source_system': SOURCE_SYSTEM, 'date_comprobante': dia, 'id_empresa': id_empresa,
+                    })
+                    lineas += archivo.verify()
+
+                record_replaced_documents(cursor, staging, mes_desde, mes_hasta, id_empresa)
+                swap_partition(cursor, 'bronze.raw_sales', mes_desde, staging)
+                mark_completed(cursor, 'sales', mes_desde, mes_hasta, rows=lineas, id_empresa=id_empresa)
+                raw_conn.commit()
+            except Exception:
+                raw_conn.rollback()
+                raise
+
+            logger.info(f"Landing -> bronze.raw_sales {mes_desde} - {mes_hasta}: {lineas:,} líneas")
+            total += lineas
+
+        cursor.close()
+
+    logger.info(f"Total: {total:,} líneas recargadas desde la landing (empresa {id_empresa})")
+    return total
+
+
+def reload_stock(fecha_desde: str, fecha_hasta: str, depositos: list = None) -> int:
+    """
+    Recarga bronze.raw_stock desde la landing, un día por transacción.
+
+    Cada (día, depósito) con archivo reemplaza lo cargado como inventario completo (F),
+    con su registro en bronze.raw_stock_days y su checkpoint. Con `depositos` solo esos ids.
+    Antes de tocar la base se verifica que todos los días del rango tengan manifiesto.
+
+    Returns:
+        Filas cargadas
+    """
+    nombres = None if depositos is None else {stock_file(d): d for d in depositos}
+    dias = {}
+    for dia in _days(fecha_desde, fecha_hasta):
+        manifiesto = read_manifest('stock', dia)
+        if nombres is not None:
+            manifiesto = {n: e for n, e in manifiesto.items() if n in nombres}
+        dias[dia] = manifiesto
+    faltantes = [dia for dia, manifiesto in dias.items() if not manifiesto]
+    if faltantes:
+        raise LandingError(
+            f"Sin archivos de stock para {len(faltantes)} día(s): "
+            f"{', '.join(faltantes[:5])}{' ...' if len(faltantes) > 5 else ''}"
+        )
+
+    total = 0
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+
+        check_not_archived(cursor, 'bronze.raw_stock', fecha_desde, fecha_hasta)
+        ensure_partitions(cursor, 'bronze.raw_stock', fecha_desde, fecha_hasta)
+        raw_conn.commit()
+
+        for dia, manifiesto in dias.items():
+            filas_dia = 0
+            try:
+                for nombre, entrada in sorted(manifiesto.items()):
+                    id_deposito = int(nombre.removeprefix('deposito_').split('.')[0])
+                    delete_day(cursor, dia, id_deposito)
+                    archivo = LandingFile('stock', dia, nombre, entrada)
+                    copy_documents(cursor, 'bronze.raw_stock', 'data_raw', archivo, {
+                        'source_system': SOURCE_SYSTEM, 'date_stock': dia, 'id_deposito': id_deposito,
+                    })
+                    filas = archivo.verify()
+                    register_day(cursor, dia, id_deposito, KIND_FULL, filas, filas)
+                    mark_completed(cursor, 'stock', dia, dia, id_deposito, filas)
+                    filas_dia += filas
+                raw_conn.commit()
+            except Exception:
+                raw_conn.rollback()
+                raise
+
+            logger.debug(f"Landing -> bronze.raw_stock {dia}: {len(manifiesto)} depósito(s), {filas_dia:,} filas")
+            total += filas_dia
+
+        cursor.close()
+
+    logger.info(f"Total: {total:,} filas de stock recargadas desde la landing")
+    return total
@@ -1,15 +1,17 @@
-import json
-from psycopg2.extras import execute_values
 from chesserp.client import ChessClient
 from database import engine
 from config import get_logger
+from layers.bronze.api_client import wrap_client
+from layers.run_context import current_client
+from layers.bronze.master_changes import merge_master
 
 logger = get_logger(__name__)
 
 
-def load_articles():
-    """Carga datos de artículos (full refresh: DELETE + INSERT)."""
-    client = ChessClient.from_env(prefix="EMPRESA1_")
+def load_articles(client=None):
+    """Carga datos de artículos (solo diferencias: ver layers/bronze/master_changes.py)."""
+    if client is None:
+        client = current_client() or wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))
 
     logger.info("Consultando artículos desde API...")
 
@@ -25,32 +27,17 @@ def load_articles():
         raw_conn = conn.connection.dbapi_connection
         cursor = raw_conn.cursor()
 
-        # Full refresh: DELETE + INSERT
-        logger.debug("Eliminando datos anteriores...")
-        cursor.execute("DELETE FROM bronze.raw_articles")
-
-        logger.debug("Insertando datos nuevos...")
-        data = [
-            (json.dumps(article), 'API_CHESS_ERP')
-            for article in articles
-        ]
-
-        query = """
-            INSERT INTO bronze.raw_articles (data_raw, source_system)
-            VALUES %s
-        """
-
-        execute_values(
-            cursor,
-            query,
-            data,
-            template="(%s::jsonb, %s)"
-        )
+        # Solo se borran/insertan las filas que cambiaron; las claves quedan en el log de cambios
+        logger.debug("Aplicando diferencias...")
+        cambios = merge_master(cursor, 'articles', articles)
 
         raw_conn.commit()
         cursor.close()
 
-    logger.info(f"Insertados {len(articles)} artículos en bronze.raw_articles")
+    logger.info(
+        f"bronze.raw_articles: {len(articles)} registros recibidos, "
+        f"{cambios['I']} nuevos, {cambios['U']} modificados, {cambios['D']} eliminados"
+    )
 
 
 if __name__ == '__main__':
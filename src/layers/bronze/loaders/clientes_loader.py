@@ -1,14 +1,16 @@
-import json
-from psycopg2.extras import execute_values
 from chesserp.client import ChessClient
 from database import engine
 from config import get_logger
+from layers.bronze.api_client import wrap_client
+from layers.run_context import current_client
+from layers.bronze.master_changes import merge_master
 
 logger = get_logger(__name__)
 
-def load_clientes():
-    """Carga datos de clientes (full refresh: DELETE + INSERT)."""
-    client = ChessClient.from_env(prefix="EMPRESA1_")
+def load_clientes(client=None):
+    """Carga datos de clientes (solo diferencias: ver layers/bronze/master_changes.py)."""
+    if client is None:
+        client = current_client() or wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))
 
     logger.info("Consultando clientes desde API...")
 
@@ -24,32 +26,17 @@ def load_clientes():
         raw_conn = conn.connection.dbapi_connection
         cursor = raw_conn.cursor()
 
-        # Full refresh: DELETE + INSERT
-        logger.debug("Eliminando datos anteriores...")
-        cursor.execute("DELETE FROM bronze.raw_clients")
-
-        logger.debug("Insertando datos nuevos...")
-        data = [
-            (json.dumps(cliente), 'API_CHESS_ERP')
-            for cliente in clientes
-        ]
-
-        query = """
-            INSERT INTO bronze.raw_clients (data_raw, source_system)
-            VALUES %s
-        """
-
-        execute_values(
-            cursor,
-            query,
-            data,
-            template="(%s::jsonb, %s)"
-        )
+        # Solo se borran/insertan las filas que cambiaron; las claves quedan en el log de cambios
+        logger.debug("Aplicando diferencias...")
+        cambios = merge_master(cursor, 'clients', clientes)
 
         raw_conn.commit()
         cursor.close()
 
-    logger.info(f"Insertados {len(clientes)} clientes en bronze.raw_clients")
+    logger.info(
+        f"bronze.raw_clients: {len(clientes)} registros recibidos, "
+        f"{cambios['I']} nuevos, {cambios['U']} modificados, {cambios['D']} eliminados"
+    )
 
 if __name__ == '__main__':
     load_clientes()
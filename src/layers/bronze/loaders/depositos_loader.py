@@ -1,8 +1,8 @@
 import csv
 from pathlib import Path
 
-from psycopg2.extras import execute_values
 from database import engine
+from database.bulk import copy_rows
 from config import get_logger
 
 logger = get_logger(__name__)
@@ -43,16 +43,11 @@ def load_depositos():
         cursor.execute("DELETE FROM bronze.raw_deposits")
 
         logger.debug("Insertando datos nuevos...")
-        query = """
-            INSERT INTO bronze.raw_deposits (id_deposito, descripcion, sucursal, source_system)
-            VALUES %s
-        """
-
-        execute_values(
+        copy_rows(
             cursor,
-            query,
-            depositos,
-            template="(%s, %s, %s, %s)"
+            'bronze.raw_deposits',
+            ('id_deposito', 'descripcion', 'sucursal', 'source_system'),
+            depositos
         )
 
         raw_conn.commit()
@@ -9,8 +9,8 @@ Dos modos:
 from pathlib import Path
 
 import openpyxl
-from psycopg2.extras import execute_values
 from database import engine
+from database.bulk import copy_rows
 from config import get_logger
 
 logger = get_logger(__name__)
@@ -77,12 +77,12 @@ def load_hectolitros():
             cursor.close()
             return
 
-        query = """
-            INSERT INTO bronze.raw_hectolitros (id_articulo, descripcion, factor_hectolitros, source_system)
-            VALUES %s
-        """
-
-        execute_values(cursor, query, nuevos, template="(%s, %s, %s, %s)")
+        copy_rows(
+            cursor,
+            'bronze.raw_hectolitros',
+            ('id_articulo', 'descripcion', 'factor_hectolitros', 'source_system'),
+            nuevos
+        )
         raw_conn.commit()
         cursor.close()
 
@@ -110,12 +110,12 @@ def load_hectolitros_full():
         cursor.execute("DELETE FROM bronze.raw_hectolitros")
 
         logger.debug("Insertando datos nuevos...")
-        query = """
-            INSERT INTO bronze.raw_hectolitros (id_articulo, descripcion, factor_hectolitros, source_system)
-            VALUES %s
-        """
-
-        execute_values(cursor, query, registros, template="(%s, %s, %s, %s)")
+        copy_rows(
+            cursor,
+            'bronze.raw_hectolitros',
+            ('id_articulo', 'descripcion', 'factor_hectolitros', 'source_system'),
+            registros
+        )
         raw_conn.commit()
         cursor.close()
 
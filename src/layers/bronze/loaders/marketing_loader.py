@@ -1,15 +1,18 @@
 import json
-from psycopg2.extras import execute_values
 from chesserp.client import ChessClient
 from database import engine
+from database.bulk import copy_rows
 from config import get_logger
+from layers.bronze.api_client import wrap_client
+from layers.run_context import current_client
 
 logger = get_logger(__name__)
 
 
-def load_marketing():
+def load_marketing(client=None):
     """Carga datos de marketing - segmentos, canales y subcanales (full refresh: DELETE + INSERT)."""
-    client = ChessClient.from_env(prefix="EMPRESA1_")
+    if client is None:
+        client = current_client() or wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))
 
     logger.info("Consultando marketing desde API...")
 
@@ -30,21 +33,16 @@ def load_marketing():
         cursor.execute("DELETE FROM bronze.raw_marketing")
 
         logger.debug("Insertando datos nuevos...")
-        data = [
+        data = (
             (json.dumps(record), 'API_CHESS_ERP')
             for record in marketing
-        ]
-
-        query = """
-            INSERT INTO bronze.raw_marketing (data_raw, source_system)
-            VALUES %s
-        """
+        )
 
-        execute_values(
+        copy_rows(
             cursor,
-            query,
-            data,
-            template="(%s::jsonb, %s)"
+            'bronze.raw_marketing',
+            ('data_raw', 'source_system'),
+            data
         )
 
         raw_conn.commit()
@@ -1,16 +1,18 @@
-import json
-from psycopg2.extras import execute_values
 from chesserp.client import ChessClient
 from database import engine
 from config import get_logger
+from layers.bronze.api_client import wrap_client
+from layers.run_context import current_client
+from layers.bronze.master_changes import merge_master
 
 logger = get_logger(__name__)
 
 
-def load_routes():
-    """Carga datos de rutas de FV1 y FV4 (full refresh: DELETE + INSERT)."""
+def load_routes(client=None):
+    """Carga datos de rutas de FV1 y FV4 (solo diferencias: ver layers/bronze/master_changes.py)."""
     # Future refact, the function load N routes force_sales
-    client = ChessClient.from_env(prefix="EMPRESA1_")
+    if client is None:
+        client = current_client() or wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))
 
     fuerzas = [1, 4]
     all_routes = []
@@ -32,32 +34,17 @@ def load_routes():
         raw_conn = conn.connection.dbapi_connection
         cursor = raw_conn.cursor()
 
-        # Full refresh: DELETE + INSERT
-        logger.debug("Eliminando datos anteriores...")
-        cursor.execute("DELETE FROM bronze.raw_routes")
-
-        logger.debug("Insertando datos nuevos...")
-        data = [
-            (json.dumps(route), 'API_CHESS_ERP')
-            for route in all_routes
-        ]
-
-        query = """
-            INSERT INTO bronze.raw_routes (data_raw, source_system)
-            VALUES %s
-        """
-
-        execute_values(
-            cursor,
-            query,
-            data,
-            template="(%s::jsonb, %s)"
-        )
+        # Solo se borran/insertan las filas que cambiaron; las claves quedan en el log de cambios
+        logger.debug("Aplicando diferencias...")
+        cambios = merge_master(cursor, 'routes', all_routes)
 
         raw_conn.commit()
         cursor.close()
 
-    logger.info(f"Insertados {len(all_routes)} rutas en bronze.raw_routes")
+    logger.info(
+        f"bronze.raw_routes: {len(all_routes)} registros recibidos, "
+        f"{cambios['I']} nuevos, {cambios['U']} modificados, {cambios['D']} eliminados"
+    )
 
 
 if __name__ == '__main__':
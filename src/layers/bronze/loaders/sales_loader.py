@@ -1,12 +1,43 @@
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from calendar import monthrange
+import itertools
 import json
+import queue
+import threading
 
-from psycopg2.extras import execute_values
 from chesserp.client import ChessClient
 from database import engine
-from config import get_logger
+from database.bulk import copy_rows
+from config import get_logger, settings
+from layers.bronze.api_client import wrap_client
+from layers.run_context import current_client
+from layers.bronze.archive import check_not_archived
+from layers.bronze.checkpoints import EMPRESA_DEFAULT, completed_units, mark_completed
+from layers.bronze.compaction import check_not_compacted
+from layers.bronze.landing import land_sales, landing_enabled
+from layers.bronze.raw_passthrough import (
+    SALES_COLUMNS,
+    SALES_ITEMS_PATH,
+    SALES_SELECT,
+    RawPages,
+    fetch_sales_pages,
+    insert_raw_items,
+)
+from layers.bronze.range_planner import (
+    MONTH,
+    RangePlanner,
+    granularity_name,
+    load_plan,
+    save_plan,
+)
+from layers.bronze.partitions import (
+    carry_over_rows,
+    create_staging_partition,
+    ensure_partitions,
+    swap_partition,
+)
+from layers.bronze.sales_changes import DOCUMENT_KEY, begin_sales_write, record_replaced_documents
 
 logger = get_logger(__name__)
 
@@ -48,74 +79,439 @@ def generar_rangos_mensuales(fecha_desde: str, fecha_hasta: str):
     return rangos
 
 
-def load_bronze(fecha_desde: str, fecha_hasta: str):
-    """Carga datos de ventas mes a mes entre las fechas especificadas (delete + insert)."""
-    client = ChessClient.from_env(prefix="EMPRESA1_")
+def _fetch_month(client, mes_desde: str, mes_hasta: str, passthrough: bool = False, empresa: int = 1) -> list:
+    """
+    Consulta a la API las ventas detalladas de un rango (un mes o parte de él) de una empresa.
+
+    Con passthrough retorna los cuerpos crudos de los lotes (RawPages) en lugar de dicts.
+    """
+    if passthrough:
+        sales = fetch_sales_pages(client, mes_desde, mes_hasta, empresas=str(empresa))
+    else:
+        sales = client.get_sales(
+            fecha_desde=mes_desde,
+            fecha_hasta=mes_hasta,
+            detallado=True,
+            empresas=str(empresa),
+            raw=True
+        )
+    if landing_enabled():
+        land_sales(mes_desde, mes_hasta, empresa, sales)
+    return sales
+
+
+def _iter_partes(client, planner: RangePlanner, mes_desde: str, mes_hasta: str, passthrough: bool = False,
+                 empresa: int = 1):
+    """
+    Consulta el mes por sub-rangos (ver layers/bronze/range_planner.py), de a uno: el
+    siguiente se pide cuando el anterior ya se escribió.
+    """
+    return planner.iter_month(
+        lambda desde, hasta: _fetch_month(client, desde, hasta, passthrough, empresa), mes_desde, mes_hasta
+    )
+
+
+def _iter_meses_secuencial(client, rangos: list, planner: RangePlanner, passthrough: bool = False,
+                           empresa: int = 1):
+    """Consulta cada mes (por sub-rangos) recién cuando el anterior ya fue escrito."""
+    for i, (mes_desde, mes_hasta) in enumerate(rangos, 1):
+        logger.info(f"[{i}/{len(rangos)}] Consultando: {mes_desde} - {mes_hasta}")
+        yield mes_desde, mes_hasta, _iter_partes(client, planner, mes_desde, mes_hasta, passthrough, empresa)
+
+
+def _iter_meses_prefetch(client, rangos: list, planner: RangePlanner, prefetch: int, passthrough: bool = False,
+                         empresa: int = 1):
+    """
+    Productor/consumidor: un hilo consulta la API y deja cada sub-rango en una cola acotada.
+
+    Mientras el consumidor escribe un sub-rango, el productor ya está consultando los
+    siguientes (del mismo mes o del próximo). La cola admite como máximo `prefetch`
+    respuestas descargadas y sin escribir, lo que acota la memoria. Un error del
+    productor se re-lanza en el consumidor; si el consumidor se detiene, el productor
+    deja de consultar.
+    """
+    cola = queue.Queue(maxsize=prefetch)
+    detener = threading.Event()
+    fin = object()
+
+    def encolar(item) -> bool:
+        while not detener.is_set():
+            try:
+                cola.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def productor():
+        try:
+            for i, (mes_desde, mes_hasta) in enumerate(rangos, 1):
+                logger.info(f"[{i}/{len(rangos)}] Consultando: {mes_desde} - {mes_hasta}")
+                for sales in _iter_partes(client, planner, mes_desde, mes_hasta, passthrough, empresa):
+                    if not encolar((mes_desde, mes_hasta, sales)):
+                        return
+                    if detener.is_set():
+                        return
+            encolar(fin)
+        except BaseException as e:
+            encolar(e)
+
+    # Cada respuesta viaja con su mes; la primera del mes siguiente queda pendiente
+    # hasta que el consumidor termina el mes actual.
+    pendiente = []
+
+    def siguiente():
+        if pendiente:
+            return pendiente.pop()
+        item = cola.get()
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def partes_del_mes(mes_desde):
+        while True:
+            item = siguiente()
+            if item is fin or item[0] != mes_desde:
+                pendiente.append(item)
+                return
+            yield item[2]
+
+    hilo = threading.Thread(target=productor, name=f'sales-prefetch-{empresa}', daemon=True)
+    hilo.start()
+
+    try:
+        while True:
+            item = siguiente()
+            if item is fin:
+                break
+            pendiente.append(item)
+            partes = partes_del_mes(item[0])
+            yield item[0], item[1], partes
+            # Descarta lo que el consumidor no haya leído del mes
+            for _ in partes:
+                pass
+    finally:
+        detener.set()
+        hilo.join()
+
+
+def _insert_sales(cursor, sales: list, table: str = 'bronze.raw_sales') -> int:
+    """Inserta ventas crudas en bronze.raw_sales (o en la tabla staging de un mes). Retorna cantidad insertada."""
+    data = (
+        (
+            json.dumps(sale),
+            'API_CHESS_ERP',
+            sale['fechaComprobate']
+        )
+        for sale in sales
+    )
+
+    return copy_rows(
+        cursor,
+        table,
+        ('data_raw', 'source_system', 'date_comprobante'),
+        data
+    )
+
+
+def _insert_partes(cursor, partes, table: str, batch_size: int) -> int:
+    """
+    Escribe las respuestas de un mes en bloques de `batch_size` líneas (un COPY por bloque).
+
+    Cada respuesta se consume de forma destructiva: las líneas de un bloque se quitan
+    de la lista antes de escribirlo, así la memoria se libera a medida que avanza la
+    escritura y el pico queda acotado por una respuesta (sub-rango) más un bloque.
+
+    Las respuestas crudas (RawPages, modo passthrough) se copian tal cual y PostgreSQL
+    separa las líneas (ver layers/bronze/raw_passthrough.py).
+
+    Returns:
+        Cantidad de líneas escritas
+    """
+    total = 0
+    for sales in partes:
+        if isinstance(sales, RawPages):
+            total += insert_raw_items(cursor, sales, SALES_ITEMS_PATH, table, SALES_COLUMNS, SALES_SELECT)
+            sales.clear()
+            continue
+        # Se invierte en el lugar para quitar los bloques del final sin copiar la lista
+        sales.reverse()
+        while sales:
+            bloque = sales[-batch_size:]
+            del sales[-batch_size:]
+            bloque.reverse()
+            total += _insert_sales(cursor, bloque, table)
+            del bloque
+    return total
+
+
+_DOCUMENTO_SQL = ', '.join(DOCUMENT_KEY)
+
+
+def _merge_month(cursor, mes_desde: str, mes_hasta: str, partes, batch_size: int,
+                 id_empresa: int = EMPRESA_DEFAULT) -> tuple[int, int, int, int]:
+    """
+    Aplica en bronze.raw_sales solo las diferencias del rango contra lo ya cargado
+    de la empresa (las líneas de otras empresas no se comparan ni se tocan).
+
+    Las respuestas (`partes`) se escriben por bloques en una tabla temporal y la
+    comparación se hace en PostgreSQL, así el mes completo nunca está en memoria.
+
+    Las líneas se comparan por content_hash (md5 del jsonb). Si la misma línea aparece
+    N veces, se compara también la ocurrencia (1..N) para no perder duplicados legítimos.
+      - Línea nueva o modificada (hash que no existía): se inserta
+      - Línea que la API ya no devuelve: se marca deleted_at (tombstone)
+      - Línea idéntica: no se toca
+    Los documentos afectados se registran en bronze.raw_sales_changes para que silver
+    y gold recarguen solo esos documentos. Se confirma con el commit del llamador.
+
+    Returns:
+        (líneas recibidas, líneas insertadas, líneas marcadas como borradas, documentos modificados)
+    """
+    marca = begin_sales_write(cursor)
+    ensure_partitions(cursor, 'bronze.raw_sales', mes_desde, mes_hasta)
+
+    cursor.execute("""
+        CREATE TEMP TABLE tmp_raw_sales (
+            data_raw JSONB,
+            source_system VARCHAR(50),
+            date_comprobante DATE
+        ) ON COMMIT DROP
+    """)
+    recibidas = _insert_partes(cursor, partes, 'tmp_raw_sales', batch_size)
+
+    vigentes_cte = """
+        WITH vigentes AS (
+            SELECT id, date_comprobante, content_hash,
+                   ROW_NUMBER() OVER (PARTITION BY content_hash ORDER BY id) AS ocurrencia
+            FROM bronze.raw_sales
+            WHERE date_comprobante BETWEEN %(desde)s AND %(hasta)s
+              AND id_empresa = %(empresa)s
+              AND deleted_at IS NULL
+        ),
+        recibidas AS (
+            SELECT data_raw, source_system, date_comprobante, md5(data_raw::text) AS content_hash,
+                   ROW_NUMBER() OVER (PARTITION BY md5(data_raw::text)) AS ocurrencia
+            FROM tmp_raw_sales
+        )
+    """
+    params = {'desde': mes_desde, 'hasta': mes_hasta, 'empresa': id_empresa, 'marca': marca}
+
+    # ingestion_at y deleted_at toman la marca de la escritura (ver layers/bronze/sales_changes.py):
+    # así se identifican abajo las líneas tocadas por esta carga.
+    cursor.execute(vigentes_cte + """
+        UPDATE bronze.raw_sales r
+        SET deleted_at = %(marca)s
+        FROM vigentes v
+        WHERE r.id = v.id
+          AND r.date_comprobante = v.date_comprobante
+          AND NOT EXISTS (
+              SELECT 1 FROM recibidas n
+              WHERE n.content_hash = v.content_hash AND n.ocurrencia = v.ocurrencia
+          )
+    """, params)
+    eliminados = cursor.rowcount
+
+    cursor.execute(vigentes_cte + """
+        INSERT INTO bronze.raw_sales (data_raw, source_system, date_comprobante, id_empresa, ingestion_at)
+        SELECT n.data_raw, n.source_system, n.date_comprobante, %(empresa)s, %(marca)s
+        FROM recibidas n
+        WHERE NOT EXISTS (
+            SELECT 1 FROM vigentes v
+            WHERE v.content_hash = n.content_hash AND v.ocurrencia = n.ocurrencia
+        )
+    """, params)
+    insertados = cursor.rowcount
+
+    documentos = 0
+    if insertados or eliminados:
+        cursor.execute(f"""
+            INSERT INTO bronze.raw_sales_changes (
+                date_comprobante, id_empresa, id_documento, letra, serie, nro_doc
+            )
+            SELECT DISTINCT date_comprobante, {_DOCUMENTO_SQL}
+            FROM bronze.raw_sales
+            WHERE date_comprobante BETWEEN %(desde)s AND %(hasta)s
+              AND id_empresa = %(empresa)s
+              AND (deleted_at = %(marca)s OR (ingestion_at = %(marca)s AND deleted_at IS NULL))
+        """, params)
+        documentos = cursor.rowcount
+
+    return recibidas, insertados, eliminados, documentos
+
+
+def _replace_month(cursor, mes_desde: str, mes_hasta: str, partes, batch_size: int,
+                   id_empresa: int = EMPRESA_DEFAULT) -> int:
+    """
+    Reemplaza en bronze.raw_sales el rango de un mes de una empresa (se confirma con
+    el commit del llamador).
+
+    Las ventas se cargan en una tabla staging que luego reemplaza a la partición del mes.
+    Los días restantes del mes (si el rango no lo cubre completo) y las líneas de las
+    otras empresas se copian antes desde la partición actual. Los documentos que
+    desaparecen del rango se registran en bronze.raw_sales_changes antes del swap (las
+    líneas que quedan son nuevas y las toma la marca de agua de silver).
+    """
+    begin_sales_write(cursor)
+    staging = create_staging_partition(cursor, 'bronze.raw_sales', mes_desde)
+    # Las líneas que se copian de la API toman la empresa del default de la columna
+    cursor.execute(f"ALTER TABLE {staging} ALTER COLUMN id_empresa SET DEFAULT %s", (id_empresa,))
+
+    conservados = carry_over_rows(cursor, 'bronze.raw_sales', staging, mes_desde, mes_hasta, id_empresa)
+    if conservados:
+        logger.debug(f"Conservados {conservados} registros del mes fuera de {mes_desde} - {mes_hasta} "
+                     f"o de otras empresas")
+
+    insertados = _insert_partes(cursor, partes, staging, batch_size)
+    record_replaced_documents(cursor, staging, mes_desde, mes_hasta, id_empresa)
+    swap_partition(cursor, 'bronze.raw_sales', mes_desde, staging)
+    return insertados
+
+
+def _save_plan(cursor, planner: RangePlanner, mes_desde: str, id_empresa: int = EMPRESA_DEFAULT) -> None:
+    """Guarda la granularidad recomendada para la próxima carga del mes."""
+    stats = planner.stats(mes_desde)
+    dias = planner.recommended_days(mes_desde)
+    if stats is not None and dias != stats.dias:
+        logger.info(f"Próxima carga de {mes_desde[:7]}: consultas por {granularity_name(dias)}")
+    save_plan(cursor, mes_desde, dias, stats, id_empresa=id_empresa)
+
+
+def load_bronze(fecha_desde: str, fecha_hasta: str, prefetch: int = None, replace: bool = False,
+                resume: bool = False, fetch_days: int = None, batch_size: int = None,
+                passthrough: bool = None, prefix: str = "EMPRESA1_", id_empresa: int = EMPRESA_DEFAULT):
+    """
+    Carga datos de ventas de una empresa mes a mes entre las fechas especificadas.
+
+    Por defecto cada mes se compara contra lo ya cargado por hash de contenido: solo se
+    insertan las líneas nuevas o modificadas, se marcan como borradas las que la API ya
+    no devuelve y los documentos afectados quedan en bronze.raw_sales_changes.
+    Con replace=True cada mes se reemplaza completo intercambiando la partición
+    (compacta las líneas borradas; los documentos que desaparecen quedan en
+    bronze.raw_sales_changes).
+    Cada mes se confirma en su propia transacción junto con su checkpoint
+    (bronze.load_checkpoints). Un mes sin datos en la API se aplica vacío: las líneas
+    ya cargadas del rango se marcan como borradas (o se quitan con replace).
+
+    Cada mes se consulta por sub-rangos y cada respuesta se escribe y libera por
+    bloques de `batch_size` líneas: la memoria queda acotada por la respuesta de un
+    sub-rango (más las del prefetch), no por el volumen del mes. La granularidad de
+    cada mes (mes completo, semana o día) sale de bronze.sales_fetch_plan y se ajusta
+    durante la consulta si las respuestas son grandes, lentas o fallan (ver
+    layers/bronze/range_planner.py).
+
+    Args:
+        fecha_desde: Fecha inicial (YYYY-MM-DD)
+        fecha_hasta: Fecha final (YYYY-MM-DD)
+        prefetch: Consultas (sub-rangos) que se pueden descargar por adelantado mientras
+            se escribe la anterior. Default: settings.SALES_PREFETCH_MONTHS. Con 0 la
+            consulta y la escritura se alternan de forma secuencial.
+        replace: Reemplazar cada mes completo en lugar de aplicar diferencias
+        resume: Saltear los meses ya completados por una ejecución anterior del mismo rango
+        fetch_days: Días por consulta con los que arranca cada mes (0 = mes completo),
+            ignorando el plan guardado. Default: el plan de cada mes o settings.SALES_FETCH_DAYS
+        batch_size: Líneas por bloque de COPY. Default: settings.SALES_BATCH_SIZE
+        passthrough: Copiar los cuerpos crudos de la API a jsonb sin decodificarlos en
+            Python (ver layers/bronze/raw_passthrough.py). Default: settings.BRONZE_RAW_PASSTHROUGH
+        prefix: Prefijo de las credenciales de la empresa en el .env (ej: EMPRESA2_)
+        id_empresa: Empresa que se consulta y con la que se etiquetan las líneas, el
+            checkpoint y el plan. Para varias empresas en paralelo ver layers/bronze/companies.py
+    """
+    if prefetch is None:
+        prefetch = settings.SALES_PREFETCH_MONTHS
+    if batch_size is None:
+        batch_size = settings.SALES_BATCH_SIZE
+    if passthrough is None:
+        passthrough = settings.BRONZE_RAW_PASSTHROUGH
+    if batch_size < 1:
+        raise ValueError(f"batch_size debe ser mayor a 0: {batch_size}")
+
+    client = current_client(prefix) or wrap_client(ChessClient.from_env(prefix=prefix))
 
     rangos = generar_rangos_mensuales(fecha_desde, fecha_hasta)
-    logger.info(f"Procesando {len(rangos)} mes(es)")
 
     total_registros = 0
+    total_eliminados = 0
+    total_documentos = 0
 
     with engine.connect() as conn:
         raw_conn = conn.connection.dbapi_connection
         cursor = raw_conn.cursor()
 
-        # DELETE: Eliminar registros existentes en el rango de fechas
-        delete_query = """
-            DELETE FROM bronze.raw_sales
-            WHERE date_comprobante BETWEEN %s AND %s
-        """
-        cursor.execute(delete_query, (fecha_desde, fecha_hasta))
-        deleted_count = cursor.rowcount
-        raw_conn.commit()
-        logger.info(f"Eliminados {deleted_count} registros existentes en rango {fecha_desde} - {fecha_hasta}")
-
-        for i, (mes_desde, mes_hasta) in enumerate(rangos, 1):
-            logger.info(f"[{i}/{len(rangos)}] Consultando: {mes_desde} - {mes_hasta}")
-
-            sales = client.get_sales(
-                fecha_desde=mes_desde,
-                fecha_hasta=mes_hasta,
-                detallado=True,
-                empresas='1',
-                raw=True
-            )
+        check_not_compacted(cursor, fecha_desde, fecha_hasta)
+        check_not_archived(cursor, 'bronze.raw_sales', fecha_desde, fecha_hasta)
 
-            if not sales:
-                logger.warning(f"Sin datos para este período")
-                continue
-
-            logger.info(f"Obtenidos {len(sales)} registros")
+        if resume:
+            completados = completed_units(cursor, 'sales', fecha_desde, fecha_hasta, id_empresa)
+            raw_conn.commit()
+            rangos = [(d, h) for d, h in rangos if (d, h, 0) not in completados]
+            logger.info(f"Resume: {len(completados)} mes(es) ya completados, quedan {len(rangos)}")
 
-            data = [
-                (
-                    json.dumps(sale),
-                    'API_CHESS_ERP',
-                    sale['fechaComprobate']
-                )
-                for sale in sales
-            ]
-
-            query = """
-                INSERT INTO bronze.raw_sales (data_raw, source_system, date_comprobante)
-                VALUES %s
-            """
-
-            execute_values(
-                cursor,
-                query,
-                data,
-                template="(%s::jsonb, %s, %s::date)"
-            )
+        if fetch_days is None:
+            planner = RangePlanner(load_plan(cursor, fecha_desde, fecha_hasta, id_empresa=id_empresa))
             raw_conn.commit()
+        else:
+            planner = RangePlanner(initial_days=fetch_days)
+        granularidades = {planner.days_for(d) for d, _ in rangos}
 
-            total_registros += len(data)
-            logger.debug(f"Insertados correctamente")
+        logger.info(f"Empresa {id_empresa}: procesando {len(rangos)} mes(es) ({'reemplazo de partición' if replace else 'diferencias por hash'})")
+        logger.info(
+            "Consultas por " + ", ".join(sorted(granularity_name(g) for g in granularidades))
+            + (" (adaptativo)" if planner.adaptive else "")
+            + (", cuerpos crudos (passthrough)" if passthrough else f", bloques de {batch_size:,} líneas")
+        )
+
+        if prefetch > 0 and (len(rangos) > 1 or granularidades != {MONTH} or planner.adaptive):
+            logger.info(f"Modo pipeline: hasta {prefetch} consulta(s) descargadas por adelantado")
+            meses = _iter_meses_prefetch(client, rangos, planner, prefetch, passthrough, id_empresa)
+        else:
+            meses = _iter_meses_secuencial(client, rangos, planner, passthrough, id_empresa)
+
+        for mes_desde, mes_hasta, partes in meses:
+            # Las respuestas vacías se descartan. Un mes sin ninguna con datos se aplica
+            # igual (vacío): las líneas ya cargadas del rango se marcan como borradas, o
+            # con replace el rango de la empresa queda vacío en la partición.
+            partes = (p for p in partes if p)
+            primera = next(partes, None)
+            if primera is None:
+                logger.warning(f"Sin datos para el período {mes_desde} - {mes_hasta}: se quitan las líneas cargadas")
+                partes = iter(())
+            else:
+                partes = itertools.chain([primera], partes)
+            del primera
+
+            try:
+                if replace:
+                    recibidas = insertados = _replace_month(
+                        cursor, mes_desde, mes_hasta, partes, batch_size, id_empresa
+                    )
+                    eliminados = documentos = 0
+                else:
+                    recibidas, insertados, eliminados, documentos = _merge_month(
+                        cursor, mes_desde, mes_hasta, partes, batch_size, id_empresa
+                    )
+                _save_plan(cursor, planner, mes_desde, id_empresa)
+                mark_completed(cursor, 'sales', mes_desde, mes_hasta, rows=recibidas, id_empresa=id_empresa)
+                raw_conn.commit()
+            except Exception:
+                raw_conn.rollback()
+                raise
+
+            logger.info(f"Obtenidos {recibidas} registros ({mes_desde} - {mes_hasta})")
+            total_registros += insertados
+            total_eliminados += eliminados
+            total_documentos += documentos
+            if not replace:
+                logger.info(
+                    f"Sin cambios: {recibidas - insertados}, nuevas/modificadas: {insertados}, "
+                    f"borradas: {eliminados}, documentos afectados: {documentos}"
+                )
 
         cursor.close()
 
-    logger.info(f"Total: {total_registros} registros insertados en bronze.raw_sales")
+    logger.info(f"Total empresa {id_empresa}: {total_registros} registros insertados en bronze.raw_sales")
+    if not replace:
+        logger.info(f"Total: {total_eliminados} líneas marcadas como borradas, {total_documentos} documentos modificados")
 
 
 if __name__ == '__main__':
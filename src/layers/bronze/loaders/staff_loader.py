@@ -1,14 +1,16 @@
-import json
-from psycopg2.extras import execute_values
 from chesserp.client import ChessClient
 from database import engine
 from config import get_logger
+from layers.bronze.api_client import wrap_client
+from layers.run_context import current_client
+from layers.bronze.master_changes import merge_master
 
 logger = get_logger(__name__)
 
-def load_staff():
-    """Carga datos de staff (full refresh: DELETE + INSERT)."""
-    client = ChessClient.from_env(prefix="EMPRESA1_")
+def load_staff(client=None):
+    """Carga datos de staff (solo diferencias: ver layers/bronze/master_changes.py)."""
+    if client is None:
+        client = current_client() or wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))
 
     logger.info("Consultando staff desde API...")
 
@@ -24,32 +26,17 @@ def load_staff():
         raw_conn = conn.connection.dbapi_connection
         cursor = raw_conn.cursor()
 
-        # Full refresh: DELETE + INSERT
-        logger.debug("Eliminando datos anteriores...")
-        cursor.execute("DELETE FROM bronze.raw_staff")
-
-        logger.debug("Insertando datos nuevos...")
-        data = [
-            (json.dumps(record), 'API_CHESS_ERP')
-            for record in staff
-        ]
-
-        query = """
-            INSERT INTO bronze.raw_staff(data_raw, source_system)
-            VALUES %s
-        """
-
-        execute_values(
-            cursor,
-            query,
-            data,
-            template="(%s::jsonb, %s)"
-        )
+        # Solo se borran/insertan las filas que cambiaron; las claves quedan en el log de cambios
+        logger.debug("Aplicando diferencias...")
+        cambios = merge_master(cursor, 'staff', staff)
 
         raw_conn.commit()
         cursor.close()
 
-    logger.info(f"Insertados {len(staff)} staff en bronze.raw_staff")
+    logger.info(
+        f"bronze.raw_staff: {len(staff)} registros recibidos, "
+        f"{cambios['I']} nuevos, {cambios['U']} modificados, {cambios['D']} eliminados"
+    )
 
 if __name__ == '__main__':
     load_staff()
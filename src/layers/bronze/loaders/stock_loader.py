@@ -1,12 +1,22 @@
 import json
 import csv
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from psycopg2.extras import execute_values
 from chesserp.client import ChessClient
 from database import engine
-from config import get_logger
+from database.bulk import copy_rows
+from config import get_logger, settings
+from layers.bronze.api_client import wrap_client
+from layers.run_context import current_client
+from layers.bronze.archive import check_not_archived
+from layers.bronze.checkpoints import completed_units, mark_completed
+from layers.bronze.landing import land_stock, landing_enabled
+from layers.bronze.partitions import ensure_partitions
+from layers.bronze.raw_passthrough import STOCK_COLUMNS, STOCK_ITEMS_PATH, STOCK_SELECT, has_items, insert_raw_items
+from layers.bronze.stock_snapshots import STORAGE_MODES, KIND_FULL, DeltaEncoder, register_day
 
 logger = get_logger(__name__)
 
@@ -14,6 +24,9 @@ logger = get_logger(__name__)
 # Ruta al archivo de depósitos
 DEPOSITS_FILE = Path(__file__).parent.parent.parent.parent.parent / 'data' / 'deposits_b.csv'
 
+# Un ChessClient por hilo del pool (la sesión HTTP no se comparte entre hilos)
+_thread_local = threading.local()
+
 
 def cargar_depositos():
     """Carga la lista de depósitos desde el archivo CSV."""
@@ -42,66 +55,249 @@ def generar_rangos_diarios(fecha_desde: str, fecha_hasta: str):
 
     return fechas
 
-def load_stock(fecha_desde: str, fecha_hasta: str):
-    """Carga datos de stock día a día por depósito (append: mantiene historial)."""
-    client = ChessClient.from_env(prefix="EMPRESA1_")
+
+def _get_thread_client():
+    """
+    Retorna el cliente de la corrida activa (compartido por los hilos) o, sin corrida,
+    el ChessClient del hilo actual, creándolo la primera vez.
+    """
+    client = current_client()
+    if client is not None:
+        return client
+    client = getattr(_thread_local, 'client', None)
+    if client is None:
+        client = wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))
+        _thread_local.client = client
+    return client
+
+
+def _get_stock(client, fecha: str, id_deposito: int, passthrough: bool = False):
+    """
+    Consulta el stock de un depósito en una fecha.
+
+    Returns:
+        Lista de dicts, o con passthrough el cuerpo crudo (bytes) de la respuesta
+        (None si no trae ítems)
+    """
+    if passthrough:
+        body = client.get_stock_body(id_deposito=id_deposito, fecha=fecha)
+        stock = body if has_items(body, STOCK_ITEMS_PATH) else None
+    else:
+        stock = client.get_stock(
+            fecha=fecha,
+            id_deposito=id_deposito,
+            raw=True
+        )
+    if landing_enabled():
+        land_stock(fecha, id_deposito, stock)
+    return stock
+
+
+def _fetch_stock(fecha: str, deposito: dict, passthrough: bool = False):
+    """Consulta el stock de un depósito en una fecha (ejecutado en un hilo del pool)."""
+    return fecha, deposito, _get_stock(_get_thread_client(), fecha, deposito['id'], passthrough)
+
+
+def _insert_stock(cursor, stock: list, fecha: str, id_deposito: int) -> int:
+    """Inserta los registros de un (fecha, depósito) en bronze.raw_stock. Retorna cantidad insertada."""
+    data = (
+        (json.dumps(item), 'API_CHESS_ERP', fecha, id_deposito)
+        for item in stock
+    )
+
+    return copy_rows(
+        cursor,
+        'bronze.raw_stock',
+        ('data_raw', 'source_system', 'date_stock', 'id_deposito'),
+        data
+    )
+
+
+def _insert_stock_delta(cursor, filas: list, fecha: str, id_deposito: int) -> int:
+    """Inserta las filas [(tipo, item)] de un (fecha, depósito) codificado como baseline/delta."""
+    data = (
+        (json.dumps(item), 'API_CHESS_ERP', fecha, id_deposito, tipo)
+        for tipo, item in filas
+    )
+
+    return copy_rows(
+        cursor,
+        'bronze.raw_stock',
+        ('data_raw', 'source_system', 'date_stock', 'id_deposito', 'snapshot_kind'),
+        data
+    )
+
+
+def load_stock(fecha_desde: str, fecha_hasta: str, max_workers: int = None, resume: bool = False,
+               storage: str = None, passthrough: bool = None):
+    """
+    Carga datos de stock día a día por depósito (append: mantiene historial).
+
+    Cada (día, depósito) se confirma en su propia transacción junto con su checkpoint
+    (bronze.load_checkpoints) y su registro en bronze.raw_stock_days. Las escrituras
+    se hacen en orden cronológico (requisito del modo delta).
+
+    Args:
+        fecha_desde: Fecha inicial (YYYY-MM-DD)
+        fecha_hasta: Fecha final (YYYY-MM-DD)
+        max_workers: Consultas concurrentes a la API. Default: settings.STOCK_MAX_WORKERS.
+            Con 1 las consultas son secuenciales; con N > 1 un pool de N hilos consulta
+            la API y el hilo principal es el único que escribe en la BD.
+        resume: Saltear los (día, depósito) ya completados por una ejecución anterior
+        storage: 'full' (inventario completo por día) o 'delta' (baseline mensual + cambios,
+            ver layers/bronze/stock_snapshots.py). Default: settings.STOCK_STORAGE_MODE.
+        passthrough: Copiar el cuerpo crudo de la API a jsonb sin decodificarlo en Python
+            (ver layers/bronze/raw_passthrough.py). Solo con storage='full': el modo delta
+            necesita las filas decodificadas para compararlas. Default: settings.BRONZE_RAW_PASSTHROUGH
+    """
+    if max_workers is None:
+        max_workers = settings.STOCK_MAX_WORKERS
+    if storage is None:
+        storage = settings.STOCK_STORAGE_MODE
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Modo de almacenamiento de stock inválido: {storage} (opciones: {', '.join(STORAGE_MODES)})")
+    encoder = DeltaEncoder() if storage == 'delta' else None
+    if passthrough is None:
+        passthrough = settings.BRONZE_RAW_PASSTHROUGH
+    if passthrough and encoder is not None:
+        logger.warning("Passthrough no aplica al almacenamiento delta: el stock se decodifica para calcular las diferencias")
+        passthrough = False
 
     depositos = cargar_depositos()
     fechas = generar_rangos_diarios(fecha_desde, fecha_hasta)
+    unidades = [(fecha, deposito) for fecha in fechas for deposito in depositos]
 
-    total_consultas = len(fechas) * len(depositos)
-    logger.info(f"Procesando {len(fechas)} día(s) x {len(depositos)} depósitos = {total_consultas} consultas")
-
-    total_registros = 0
-    consulta_actual = 0
+    logger.info(f"Procesando {len(fechas)} día(s) x {len(depositos)} depósitos = {len(unidades)} consultas (almacenamiento: {storage})")
 
     with engine.connect() as conn:
         raw_conn = conn.connection.dbapi_connection
         cursor = raw_conn.cursor()
 
-        for fecha in fechas:
+        check_not_archived(cursor, 'bronze.raw_stock', fecha_desde, fecha_hasta)
+        ensure_partitions(cursor, 'bronze.raw_stock', fecha_desde, fecha_hasta)
+        raw_conn.commit()
+
+        if resume:
+            completados = completed_units(cursor, 'stock', fecha_desde, fecha_hasta)
+            raw_conn.commit()
+            unidades = [(f, d) for f, d in unidades if (f, f, d['id']) not in completados]
+            logger.info(f"Resume: {len(completados)} consulta(s) ya completadas, quedan {len(unidades)}")
+
+        if max_workers > 1:
+            total_registros = _load_stock_concurrent(cursor, raw_conn, unidades, max_workers, encoder, passthrough)
+        else:
+            total_registros = _load_stock_sequential(cursor, raw_conn, unidades, encoder, passthrough)
+
+        cursor.close()
+
+    logger.info(f"Total: {total_registros} registros insertados en bronze.raw_stock")
+
+
+def _write_unit(cursor, raw_conn, stock, fecha: str, id_deposito: int, encoder: DeltaEncoder = None) -> int:
+    """
+    Inserta un (fecha, depósito), su registro de día y su checkpoint en una misma transacción.
+
+    `stock` es la lista de filas o, en modo passthrough, el cuerpo crudo de la respuesta.
+    """
+    if isinstance(stock, bytes):
+        tipo = KIND_FULL
+        insertados = insert_raw_items(
+            cursor, [stock], STOCK_ITEMS_PATH, 'bronze.raw_stock', STOCK_COLUMNS, STOCK_SELECT,
+            (fecha, id_deposito)
+        )
+        recibidos = insertados
+    elif encoder is None:
+        tipo = KIND_FULL
+        insertados = _insert_stock(cursor, stock, fecha, id_deposito) if stock else 0
+        recibidos = len(stock or [])
+    else:
+        tipo, filas = encoder.encode(cursor, fecha, id_deposito, stock or [])
+        insertados = _insert_stock_delta(cursor, filas, fecha, id_deposito) if filas else 0
+        recibidos = len(stock or [])
+
+    register_day(cursor, fecha, id_deposito, tipo, insertados, recibidos)
+    mark_completed(cursor, 'stock', fecha, fecha, id_deposito, insertados)
+    raw_conn.commit()
+    return insertados
+
+
+def _load_stock_sequential(cursor, raw_conn, unidades: list, encoder: DeltaEncoder = None,
+                           passthrough: bool = False) -> int:
+    """Consulta e inserta cada (fecha, depósito) uno detrás de otro."""
+    client = current_client() or wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))
+
+    total_consultas = len(unidades)
+    total_registros = 0
+    fecha_actual = None
+
+    for consulta_actual, (fecha, deposito) in enumerate(unidades, 1):
+        if fecha != fecha_actual:
             logger.info(f"--- Fecha: {fecha} ---")
+            fecha_actual = fecha
 
-            for deposito in depositos:
-                consulta_actual += 1
-                logger.debug(f"[{consulta_actual}/{total_consultas}] Depósito {deposito['id']}: {deposito['nombre']}")
+        logger.debug(f"[{consulta_actual}/{total_consultas}] Depósito {deposito['id']}: {deposito['nombre']}")
 
-                stock = client.get_stock(
-                    fecha=fecha,
-                    id_deposito=deposito['id'],
-                    raw=True
-                )
+        stock = _get_stock(client, fecha, deposito['id'], passthrough)
+        insertados = _write_unit(cursor, raw_conn, stock, fecha, deposito['id'], encoder)
 
-                if not stock:
-                    logger.debug(f"Sin datos para depósito {deposito['id']}")
-                    continue
+        if stock:
+            logger.debug(f"Insertados {insertados} registros")
+        else:
+            logger.debug(f"Sin datos para depósito {deposito['id']}")
 
-                logger.debug(f"Obtenidos {len(stock)} registros")
+        total_registros += insertados
 
-                data = [
-                    (json.dumps(item), 'API_CHESS_ERP', fecha, deposito['id'])
-                    for item in stock
-                ]
+    return total_registros
 
-                query = """
-                    INSERT INTO bronze.raw_stock (data_raw, source_system, date_stock, id_deposito)
-                    VALUES %s
-                """
 
-                execute_values(
-                    cursor,
-                    query,
-                    data,
-                    template="(%s::jsonb, %s, %s::date, %s)"
-                )
+def _load_stock_concurrent(cursor, raw_conn, unidades: list, max_workers: int, encoder: DeltaEncoder = None,
+                           passthrough: bool = False) -> int:
+    """
+    Consulta los (fecha, depósito) con un pool acotado de hilos.
 
-                raw_conn.commit()
-                total_registros += len(data)
+    Como máximo hay 2 * max_workers consultas en vuelo o esperando escritura. Las
+    respuestas se escriben en el orden de `unidades` (el delta de un día depende del
+    anterior): el hilo principal inserta cada unidad en la única conexión de escritura
+    en cuanto están escritas todas las anteriores, y por cada una encola la siguiente consulta.
+    """
+    total_consultas = len(unidades)
+    max_en_vuelo = max_workers * 2
 
-        cursor.close()
+    logger.info(f"Modo concurrente: {max_workers} workers")
 
-    logger.info(f"Total: {total_registros} registros insertados en bronze.raw_stock")
+    total_registros = 0
+    completadas = 0
+    pendientes = enumerate(unidades)
+    en_vuelo = {}       # future -> índice de la unidad
+    respuestas = {}     # índice -> (fecha, depósito, stock) esperando su turno de escritura
+    proxima = 0         # índice de la próxima unidad a escribir
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stock') as executor:
+        for indice, (fecha, deposito) in pendientes:
+            en_vuelo[executor.submit(_fetch_stock, fecha, deposito, passthrough)] = indice
+            if len(en_vuelo) >= max_en_vuelo:
+                break
+
+        while en_vuelo:
+            terminadas, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for future in terminadas:
+                respuestas[en_vuelo.pop(future)] = future.result()
+
+            while proxima in respuestas:
+                fecha, deposito, stock = respuestas.pop(proxima)
+                proxima += 1
+                completadas += 1
+
+                insertados = _write_unit(cursor, raw_conn, stock, fecha, deposito['id'], encoder)
+                total_registros += insertados
+                if stock:
+                    logger.debug(f"[{completadas}/{total_consultas}] {fecha} depósito {deposito['id']}: {insertados} registros insertados")
+                else:
+                    logger.debug(f"[{completadas}/{total_consultas}] {fecha} depósito {deposito['id']}: sin datos")
 
+                siguiente = next(pendientes, None)
+                if siguiente is not None:
+                    indice, (fecha, deposito) = siguiente
+                    en_vuelo[executor.submit(_fetch_stock, fecha, deposito, passthrough)] = indice
 
-if __name__ == '__main__':
-    load_stock('2025-12-01', '2025-12-01')
+    return total_registros
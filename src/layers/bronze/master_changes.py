@@ -0,0 +1,238 @@
+"""
+Cambios por fila de los maestros de Bronze (clientes, staff, rutas, artículos).
+
+En lugar de DELETE + INSERT de todo el maestro, la carga compara la respuesta de la
+API contra lo que ya está en bronze por md5 del jsonb y solo borra/inserta las filas
+distintas. Las claves de negocio afectadas quedan en bronze.raw_masters_changes con su
+operación (I alta, U modificación, D baja).
+
+Cada consumidor (tabla de silver o gold) guarda en bronze.master_change_consumers el
+último id de cambio que aplicó, así varios consumidores leen el mismo log:
+
+    apply_changes('silver.clients', [
+        "DELETE FROM silver.clients WHERE id_cliente IN (SELECT ... FROM tmp_master_keys)",
+        "INSERT INTO silver.clients ... WHERE <clave> IN (SELECT entity_key FROM tmp_master_keys)",
+    ])
+
+Al avanzar un consumidor se eliminan los cambios que ya aplicaron todos (purge_consumed).
+"""
+import json
+
+from database import engine
+from database.bulk import copy_rows
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Entidad -> (tabla bronze, expresión SQL de la clave de negocio sobre data_raw).
+# La clave es la misma que usa silver para identificar la fila (UNIQUE / upsert).
+MASTER_ENTITIES = {
+    'clients': ('bronze.raw_clients', "COALESCE(data_raw->>'idCliente', '')"),
+    'staff': (
+        'bronze.raw_staff',
+        "concat_ws('|', COALESCE(data_raw->>'idPersonal', ''), COALESCE(data_raw->>'idSucursal', ''))"
+    ),
+    'routes': (
+        'bronze.raw_routes',
+        "concat_ws('|', COALESCE(data_raw->>'idRuta', ''), COALESCE(data_raw->>'idSucursal', ''), "
+        "COALESCE(data_raw->>'idFuerzaVentas', ''))"
+    ),
+    'articles': ('bronze.raw_articles', "COALESCE(data_raw->>'idArticulo', '')"),
+}
+
+# Consumidores del log y entidades que leen
+CONSUMERS = {
+    'silver.clients': ('clients',),
+    'silver.client_forces': ('clients',),
+    'silver.staff': ('staff',),
+    'silver.routes': ('routes',),
+    'silver.articles': ('articles',),
+    'gold.dim_cliente': ('clients', 'staff', 'routes'),
+}
+
+
+def merge_master(cursor, entity: str, records: list, source_system: str = 'API_CHESS_ERP') -> dict:
+    """
+    Aplica en la tabla bronze del maestro solo las diferencias contra la respuesta de la API.
+
+    Las filas se comparan por md5 del jsonb (y número de ocurrencia, para conservar
+    duplicados idénticos): las que ya no están se borran, las nuevas o modificadas se
+    insertan y las idénticas no se tocan. Se confirma con el commit del llamador.
+
+    Returns:
+        {'I': claves nuevas, 'U': claves modificadas, 'D': claves eliminadas}
+    """
+    table, key_sql = MASTER_ENTITIES[entity]
+
+    cursor.execute("CREATE TEMP TABLE tmp_master (data_raw JSONB) ON COMMIT DROP")
+    copy_rows(cursor, 'tmp_master', ('data_raw',), ((json.dumps(r),) for r in records))
+
+    cursor.execute(f"""
+        WITH vigentes AS (
+            SELECT id, md5(data_raw::text) AS content_hash,
+                   ROW_NUMBER() OVER (PARTITION BY md5(data_raw::text) ORDER BY id) AS ocurrencia
+            FROM {table}
+        ),
+        recibidas AS (
+            SELECT data_raw, md5(data_raw::text) AS content_hash,
+                   ROW_NUMBER() OVER (PARTITION BY md5(data_raw::text)) AS ocurrencia
+            FROM tmp_master
+        ),
+        borradas AS (
+            DELETE FROM {table} r
+            USING vigentes v
+            WHERE r.id = v.id
+              AND NOT EXISTS (
+                  SELECT 1 FROM recibidas n
+                  WHERE n.content_hash = v.content_hash AND n.ocurrencia = v.ocurrencia
+              )
+            RETURNING {key_sql} AS entity_key
+        ),
+        insertadas AS (
+            INSERT INTO {table} (data_raw, source_system)
+            SELECT n.data_raw, %s
+            FROM recibidas n
+            WHERE NOT EXISTS (
+                SELECT 1 FROM vigentes v
+                WHERE v.content_hash = n.content_hash AND v.ocurrencia = n.ocurrencia
+            )
+            RETURNING {key_sql} AS entity_key
+        ),
+        claves AS (
+            SELECT entity_key, true AS borrada, false AS insertada FROM borradas
+            UNION ALL
+            SELECT entity_key, false, true FROM insertadas
+        )
+        INSERT INTO bronze.raw_masters_changes (entity, entity_key, operation)
+        SELECT %s, entity_key,
+               CASE WHEN bool_or(insertada) AND bool_or(borrada) THEN 'U'
+                    WHEN bool_or(insertada) THEN 'I'
+                    ELSE 'D' END
+        FROM claves
+        GROUP BY entity_key
+        RETURNING operation
+    """, (source_system, entity))
+
+    resumen = {'I': 0, 'U': 0, 'D': 0}
+    for (operacion,) in cursor.fetchall():
+        resumen[operacion] += 1
+    return resumen
+
+
+def consumer_position(cursor, consumer: str) -> int:
+    """Último id de bronze.raw_masters_changes aplicado por el consumidor (0 si nunca aplicó)."""
+    cursor.execute(
+        "SELECT last_change_id FROM bronze.master_change_consumers WHERE consumer = %s",
+        (consumer,)
+    )
+    fila = cursor.fetchone()
+    return fila[0] if fila else 0
+
+
+def changed_keys(cursor, consumer: str, entities: tuple, hasta: int = None):
+    """
+    Carga en TEMP tmp_master_keys (entity, entity_key, operation) las claves pendientes
+    del consumidor: cambios de `entities` posteriores a su posición (y <= hasta, si se indica).
+
+    Si una clave cambió varias veces queda una sola fila con la última operación.
+
+    Returns:
+        Id del último cambio incluido (para advance_consumer) o None si no hay pendientes
+    """
+    desde = consumer_position(cursor, consumer)
+
+    if hasta is None:
+        hasta = last_change_id(cursor)
+    if hasta <= desde:
+        return None
+
+    cursor.execute("""
+        CREATE TEMP TABLE tmp_master_keys ON COMMIT DROP AS
+        SELECT DISTINCT ON (entity, entity_key) entity, entity_key, operation
+        FROM bronze.raw_masters_changes
+        WHERE id > %s AND id <= %s AND entity = ANY(%s)
+        ORDER BY entity, entity_key, id DESC
+    """, (desde, hasta, list(entities)))
+
+    if cursor.rowcount == 0:
+        # Sin cambios de estas entidades: solo avanza la posición
+        advance_consumer(cursor, consumer, hasta)
+        return None
+    logger.debug(f"{consumer}: {cursor.rowcount:,} clave(s) modificadas en {', '.join(entities)}")
+    return hasta
+
+
+def last_change_id(cursor) -> int:
+    """Id del último cambio registrado (0 si el log está vacío)."""
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM bronze.raw_masters_changes")
+    return cursor.fetchone()[0]
+
+
+def advance_consumer(cursor, consumer: str, change_id: int) -> None:
+    """
+    Registra que el consumidor aplicó los cambios hasta `change_id` y purga el log.
+
+    Un full refresh toma last_change_id() antes de leer bronze y avanza hasta ahí.
+    """
+    cursor.execute(
+        """
+        INSERT INTO bronze.master_change_consumers (consumer, last_change_id)
+        VALUES (%s, %s)
+        ON CONFLICT (consumer) DO UPDATE SET
+            last_change_id = GREATEST(bronze.master_change_consumers.last_change_id, EXCLUDED.last_change_id),
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (consumer, change_id)
+    )
+    purge_consumed(cursor)
+
+
+def purge_consumed(cursor) -> int:
+    """Elimina los cambios que ya aplicaron todos los consumidores. Retorna cantidad eliminada."""
+    cursor.execute("""
+        DELETE FROM bronze.raw_masters_changes
+        WHERE id <= (SELECT MIN(last_change_id) FROM bronze.master_change_consumers)
+    """)
+    return cursor.rowcount
+
+
+def apply_changes(consumer: str, statements: list, after: tuple = ()):
+    """
+    Aplica en una transacción las claves pendientes de un consumidor.
+
+    Carga tmp_master_keys con changed_keys(), ejecuta `statements` (que filtran por
+    esa tabla) y avanza la posición del consumidor.
+
+    Args:
+        consumer: Consumidor registrado en CONSUMERS
+        statements: Sentencias SQL a ejecutar en orden
+        after: Consumidores que deben haber aplicado los cambios antes (ej: gold solo
+            aplica los cambios que ya aplicaron sus tablas de silver)
+
+    Returns:
+        rowcount de cada sentencia, o None si no había cambios pendientes
+    """
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+        try:
+            hasta = min(consumer_position(cursor, previo) for previo in after) if after else None
+            hasta = changed_keys(cursor, consumer, CONSUMERS[consumer], hasta)
+            if hasta is None:
+                raw_conn.commit()
+                return None
+
+            filas = []
+            for sql in statements:
+                cursor.execute(sql)
+                filas.append(cursor.rowcount)
+
+            advance_consumer(cursor, consumer, hasta)
+            raw_conn.commit()
+            return filas
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            cursor.close()
@@ -0,0 +1,106 @@
+"""
+Carga concurrente de los maestros de Bronze (clientes, staff, rutas, artículos, depósitos, marketing).
+
+Los loaders de maestros no dependen entre sí: cada uno espera su propia consulta a
+la API y escribe su propia tabla. run_masters() los ejecuta en hilos, así la carga
+tarda lo que el maestro más lento y no la suma de todos.
+
+  - Los loaders de la API comparten un cliente (master_client): un solo login y el
+    mismo scheduler/cache de wrap_client()
+  - Las escrituras usan el pool de conexiones del engine compartido (una conexión
+    por loader en curso)
+  - Un loader que falla no corta a los demás; al terminar se informa el tiempo de
+    cada uno y, si alguno falló, se levanta MastersLoadError con todos los errores
+
+Uso:
+    client = master_client()
+    run_masters({
+        'clientes': lambda: load_clientes(client),
+        'depositos': load_depositos,
+    })
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from chesserp.client import ChessClient
+
+from config import get_logger, settings
+from layers.bronze.api_cache import get_cache_mode
+from layers.bronze.api_client import wrap_client
+from layers.run_context import current_client
+
+logger = get_logger(__name__)
+
+
+class MastersLoadError(Exception):
+    """Uno o más loaders de maestros fallaron."""
+
+    def __init__(self, errores: dict):
+        self.errores = errores
+        detalle = ', '.join(f"{nombre} ({error})" for nombre, error in errores.items())
+        super().__init__(f"Fallaron {len(errores)} maestro(s): {detalle}")
+
+
+def master_client():
+    """
+    Cliente de la API compartido por los loaders de maestros: el de la corrida activa
+    (layers/run_context.py) o uno propio.
+
+    Se autentica antes de lanzar los hilos para que no se haga un login por loader
+    (en modo replay el cliente real no se usa y no hay login).
+    """
+    client = current_client()
+    if client is not None:
+        return client
+    client = wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))
+    if get_cache_mode() != 'replay':
+        client.login()
+    return client
+
+
+def _run(nombre: str, fn):
+    """Ejecuta un loader y retorna (segundos, error o None)."""
+    inicio = time.perf_counter()
+    try:
+        fn()
+        return time.perf_counter() - inicio, None
+    except Exception as e:
+        logger.error(f"Maestro {nombre}: {e}")
+        return time.perf_counter() - inicio, e
+
+
+def run_masters(loaders: dict, max_workers: int = None) -> dict:
+    """
+    Ejecuta los loaders de maestros en paralelo.
+
+    Args:
+        loaders: {nombre: función sin argumentos}
+        max_workers: Loaders simultáneos. Default: settings.BRONZE_MASTERS_WORKERS (1 = secuencial)
+
+    Returns:
+        {nombre: segundos} de cada loader
+
+    Raises:
+        MastersLoadError: si algún loader falló (después de que terminaron todos)
+    """
+    if max_workers is None:
+        max_workers = settings.BRONZE_MASTERS_WORKERS
+    max_workers = max(1, min(max_workers, len(loaders)))
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='masters') as executor:
+        futuros = {nombre: executor.submit(_run, nombre, fn) for nombre, fn in loaders.items()}
+        resultados = {nombre: futuro.result() for nombre, futuro in futuros.items()}
+    total = time.perf_counter() - inicio
+
+    for nombre, (segundos, error) in resultados.items():
+        logger.info(f"  {nombre:<12} {'ERROR' if error else 'OK':<6} {segundos:>7.1f}s")
+    logger.info(
+        f"Maestros: {total:.1f}s con {max_workers} hilo(s) "
+        f"(suma de los loaders: {sum(s for s, _ in resultados.values()):.1f}s)"
+    )
+
+    errores = {nombre: error for nombre, (_, error) in resultados.items() if error is not None}
+    if errores:
+        raise MastersLoadError(errores)
+    return {nombre: segundos for nombre, (segundos, _) in resultados.items()}
@@ -0,0 +1,248 @@
+"""
+Gestión de particiones mensuales de las tablas Bronze particionadas por fecha.
+
+bronze.raw_sales (por date_comprobante) y bronze.raw_stock (por date_stock) están
+particionadas por RANGE en meses: bronze.raw_sales_p2025_01 contiene
+[2025-01-01, 2025-02-01).
+
+Operaciones:
+  - ensure_partitions(): crea las particiones faltantes de un rango de fechas
+  - create_staging_partition() + swap_partition(): recarga de un mes cargando una
+    tabla nueva y reemplazando la partición en una sola transacción (sin DELETE,
+    sin tuplas muertas ni VACUUM sobre la tabla viva). Si la recarga cubre solo
+    parte del mes, carry_over_rows() copia antes el resto del mes a la tabla nueva.
+  - drop_partitions_before() / apply_retention(): retención, elimina particiones
+    completas antiguas
+"""
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
+
+from database import engine
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Tabla particionada -> columna de partición
+PARTITIONED_TABLES = {
+    'bronze.raw_sales': 'date_comprobante',
+    'bronze.raw_stock': 'date_stock',
+    'bronze.raw_sales_compact': 'date_comprobante',  # ver layers/bronze/compaction.py
+}
+
+
+def _to_date(fecha) -> date:
+    if isinstance(fecha, datetime):
+        return fecha.date()
+    if isinstance(fecha, date):
+        return fecha
+    return datetime.strptime(fecha, '%Y-%m-%d').date()
+
+
+def month_bounds(fecha) -> tuple[date, date]:
+    """Retorna (primer_dia, primer_dia_mes_siguiente) del mes de la fecha."""
+    inicio = _to_date(fecha).replace(day=1)
+    return inicio, inicio + relativedelta(months=1)
+
+
+def months_in_range(fecha_desde, fecha_hasta) -> list[date]:
+    """Primer día de cada mes que toca el rango [fecha_desde, fecha_hasta]."""
+    actual, _ = month_bounds(fecha_desde)
+    fin = _to_date(fecha_hasta)
+    meses = []
+    while actual <= fin:
+        meses.append(actual)
+        actual += relativedelta(months=1)
+    return meses
+
+
+def is_full_month(fecha_desde, fecha_hasta) -> bool:
+    """True si el rango cubre exactamente un mes calendario completo."""
+    inicio, siguiente = month_bounds(fecha_desde)
+    return _to_date(fecha_desde) == inicio and _to_date(fecha_hasta) == siguiente - relativedelta(days=1)
+
+
+def partition_name(table: str, mes) -> str:
+    """Nombre calificado de la partición mensual. Ej: bronze.raw_sales_p2025_01."""
+    inicio, _ = month_bounds(mes)
+    return f"{table}_p{inicio.year:04d}_{inicio.month:02d}"
+
+
+def _bounds_clause(mes) -> str:
+    inicio, siguiente = month_bounds(mes)
+    return f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{siguiente.isoformat()}')"
+
+
+def ensure_partitions(cursor, table: str, fecha_desde, fecha_hasta) -> None:
+    """Crea (si no existen) las particiones mensuales que cubren el rango."""
+    for mes in months_in_range(fecha_desde, fecha_hasta):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(table, mes)} "
+            f"PARTITION OF {table} {_bounds_clause(mes)}"
+        )
+
+
+def create_staging_partition(cursor, table: str, mes) -> str:
+    """
+    Crea una tabla vacía con la estructura de `table` para cargar un mes completo.
+
+    Incluye un CHECK con los límites del mes para que el ATTACH posterior no
+    tenga que escanear la tabla para validarla. Retorna el nombre de la tabla.
+    """
+    columna = PARTITIONED_TABLES[table]
+    inicio, siguiente = month_bounds(mes)
+    staging = f"{partition_name(table, mes)}_swap"
+
+    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+    cursor.execute(f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED)")
+    cursor.execute(
+        f"ALTER TABLE {staging} ADD CONSTRAINT {staging.split('.')[-1]}_rango "
+        f"CHECK ({columna} >= '{inicio.isoformat()}' AND {columna} < '{siguiente.isoformat()}')"
+    )
+    return staging
+
+
+def _partition_exists(cursor, particion: str) -> bool:
+    cursor.execute("SELECT to_regclass(%s)", (particion,))
+    return cursor.fetchone()[0] is not None
+
+
+def carry_over_rows(cursor, table: str, staging: str, fecha_desde, fecha_hasta, id_empresa: int = None) -> int:
+    """
+    Copia a la tabla staging las filas del mes que quedan fuera de [fecha_desde, fecha_hasta].
+
+    Permite recargar un rango parcial (ej: del 1 del mes a hoy) con swap de partición
+    sin perder los días del mes que no se recargan. Con id_empresa (tablas con columna
+    id_empresa) se conservan además todas las filas de las otras empresas, así se
+    recarga solo la porción de una empresa. Retorna la cantidad de filas copiadas.
+    """
+    columna = PARTITIONED_TABLES[table]
+    particion = partition_name(table, fecha_desde)
+    if not _partition_exists(cursor, particion):
+        return 0
+
+    # Columnas generadas (ej: content_hash) no admiten valores explícitos
+    schema, nombre = table.split('.')
+    cursor.execute(
+        """
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+        """,
+        (schema, nombre)
+    )
+    columnas = ', '.join(c for (c,) in cursor.fetchall())
+
+    condicion = f"{columna} < %s OR {columna} > %s"
+    params = [_to_date(fecha_desde).isoformat(), _to_date(fecha_hasta).isoformat()]
+    if id_empresa is not None:
+        condicion += " OR id_empresa <> %s"
+        params.append(id_empresa)
+
+    cursor.execute(
+        f"INSERT INTO {staging} ({columnas}) SELECT {columnas} FROM {particion} WHERE {condicion}",
+        tuple(params)
+    )
+    return cursor.rowcount
+
+
+def swap_partition(cursor, table: str, mes, staging: str) -> None:
+    """
+    Reemplaza la partición del mes por la tabla staging ya cargada.
+
+    Se ejecuta dentro de la transacción del cursor: el commit del llamador hace
+    visible el mes nuevo de forma atómica (los lectores ven el mes viejo o el nuevo,
+    nunca un mes vacío o a medias).
+    """
+    particion = partition_name(table, mes)
+    check = f"{staging.split('.')[-1]}_rango"
+
+    if _partition_exists(cursor, particion):
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {particion}")
+        cursor.execute(f"DROP TABLE {particion}")
+
+    cursor.execute(f"ALTER TABLE {staging} RENAME TO {particion.split('.')[-1]}")
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {particion} {_bounds_clause(mes)}")
+    cursor.execute(f"ALTER TABLE {particion} DROP CONSTRAINT IF EXISTS {check}")
+
+
+def list_partitions(cursor, table: str) -> list[tuple[str, date]]:
+    """Retorna [(nombre_particion, primer_dia_mes)] de las particiones mensuales de `table`."""
+    schema, nombre = table.split('.')
+    cursor.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_namespace n ON n.oid = p.relnamespace
+        WHERE n.nspname = %s AND p.relname = %s
+        ORDER BY c.relname
+        """,
+        (schema, nombre)
+    )
+    particiones = []
+    prefijo = f"{nombre}_p"
+    for (relname,) in cursor.fetchall():
+        sufijo = relname[len(prefijo):] if relname.startswith(prefijo) else ''
+        try:
+            mes = datetime.strptime(sufijo, '%Y_%m').date()
+        except ValueError:
+            continue
+        particiones.append((f"{schema}.{relname}", mes))
+    return particiones
+
+
+def drop_partitions_before(cursor, table: str, fecha_limite) -> list[str]:
+    """
+    Elimina las particiones de meses completamente anteriores a fecha_limite.
+
+    Returns:
+        Nombres de las particiones eliminadas
+    """
+    limite = _to_date(fecha_limite)
+    eliminadas = []
+    for particion, mes in list_partitions(cursor, table):
+        _, siguiente = month_bounds(mes)
+        if siguiente <= limite:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {particion}")
+            cursor.execute(f"DROP TABLE {particion}")
+            eliminadas.append(particion)
+            logger.debug(f"Partición eliminada: {particion}")
+    return eliminadas
+
+
+def apply_retention(table: str, meses: int) -> list[str]:
+    """
+    Conserva solo los últimos `meses` meses de `table` (incluyendo el actual).
+
+    Ej: con meses=3 en octubre se eliminan las particiones anteriores a agosto.
+
+    Returns:
+        Nombres de las particiones eliminadas
+    """
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"Tabla no particionada: {table}")
+    if meses < 1:
+        raise ValueError("La retención debe ser de al menos 1 mes")
+
+    inicio_mes_actual, _ = month_bounds(date.today())
+    fecha_limite = inicio_mes_actual - relativedelta(months=meses - 1)
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+        try:
+            eliminadas = drop_partitions_before(cursor, table, fecha_limite)
+            if table == 'bronze.raw_stock':
+                # Registro de días cargados (ver stock_snapshots.py)
+                cursor.execute("DELETE FROM bronze.raw_stock_days WHERE date_stock < %s", (fecha_limite,))
+            raw_conn.commit()
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    logger.info(f"Retención {table}: {len(eliminadas)} partición(es) anteriores a {fecha_limite} eliminadas")
+    return eliminadas
@@ -0,0 +1,264 @@
+"""
+División adaptativa de los rangos de consulta de ventas (mes -> semana -> día).
+
+Un mes se consulta a la API con la granularidad recordada para ese período en
+bronze.sales_fetch_plan (o settings.SALES_FETCH_DAYS si es la primera vez). Durante
+la extracción se observa cada respuesta:
+
+  - Si una consulta trae más de SALES_SPLIT_MAX_ROWS líneas o tarda más de
+    SALES_SPLIT_MAX_SECONDS, el resto del mes se consulta con la granularidad siguiente
+  - Si una consulta falla (después de los reintentos del scheduler), ese rango y el
+    resto del mes se vuelven a pedir con la granularidad siguiente; solo falla la
+    carga si ya se estaba consultando por día
+
+Al confirmar el mes se guarda la granularidad a usar la próxima vez: la más fina que
+hizo falta o, si el mes fue tranquilo (la tasa observada proyecta menos de la mitad de
+los umbrales en una consulta más grande), la inmediata más gruesa. Así los meses pico
+dejan de causar timeouts y picos de memoria y los meses tranquilos vuelven a una sola
+consulta.
+
+Granularidades (días por consulta): 0 = mes completo, 7 = semana, 1 = día.
+"""
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from config import get_logger, settings
+from layers.bronze.scheduler import NON_RETRYABLE
+
+logger = get_logger(__name__)
+
+
+MONTH, WEEK, DAY = 0, 7, 1
+GRANULARITIES = (MONTH, WEEK, DAY)
+
+_NOMBRES = {MONTH: 'mes completo', WEEK: 'semana', DAY: 'día'}
+
+
+def granularity_name(dias: int) -> str:
+    return _NOMBRES.get(dias, f"{dias} días")
+
+
+def finer(dias: int):
+    """Granularidad inmediata más fina (None si ya es por día)."""
+    if dias == MONTH or dias > WEEK:
+        return WEEK
+    if dias > DAY:
+        return DAY
+    return None
+
+
+def coarser(dias: int):
+    """Granularidad inmediata más gruesa (None si ya es el mes completo)."""
+    if dias == MONTH:
+        return None
+    if dias < WEEK:
+        return WEEK
+    return MONTH
+
+
+def generar_subrangos(mes_desde: str, mes_hasta: str, dias: int) -> list:
+    """
+    Divide un rango (dentro de un mes) en consultas de `dias` días. Con dias <= 0 retorna el rango completo.
+
+    Ejemplo con dias=7: 2025-01-01 a 2025-01-31 genera 01-07, 08-14, 15-21, 22-28, 29-31.
+    """
+    if dias <= 0:
+        return [(mes_desde, mes_hasta)]
+
+    inicio = datetime.strptime(mes_desde, '%Y-%m-%d')
+    fin = datetime.strptime(mes_hasta, '%Y-%m-%d')
+
+    subrangos = []
+    actual = inicio
+    while actual <= fin:
+        hasta = min(actual + timedelta(days=dias - 1), fin)
+        subrangos.append((actual.strftime('%Y-%m-%d'), hasta.strftime('%Y-%m-%d')))
+        actual = hasta + timedelta(days=1)
+    return subrangos
+
+
+def _span_days(desde: str, hasta: str) -> int:
+    return (datetime.strptime(hasta, '%Y-%m-%d') - datetime.strptime(desde, '%Y-%m-%d')).days + 1
+
+
+def _period(mes_desde: str) -> str:
+    return mes_desde[:8] + '01'
+
+
+def count_rows(sales) -> int:
+    """
+    Líneas de una respuesta. Para cuerpos crudos (passthrough) se cuentan las
+    apariciones de fechaComprobate, que está una vez por línea, sin decodificar.
+    """
+    if sales and isinstance(sales[0], bytes):
+        return sum(body.count(b'"fechaComprobate"') for body in sales)
+    return len(sales)
+
+
+class MonthStats:
+    """Observaciones de las consultas de un mes."""
+
+    def __init__(self, dias: int):
+        self.dias = dias            # granularidad con la que terminó el mes
+        self.requests = 0
+        self.rows = 0
+        self.max_rows = 0
+        self.max_seconds = 0.0
+        self.rows_per_day = 0.0     # máxima tasa observada (líneas / día consultado)
+        self.seconds_per_day = 0.0
+        self.splits = 0
+        self.exceeded = False       # alguna consulta con la granularidad final superó los umbrales
+
+    def record(self, desde: str, hasta: str, filas: int, segundos: float) -> None:
+        dias = _span_days(desde, hasta)
+        self.requests += 1
+        self.rows += filas
+        self.max_rows = max(self.max_rows, filas)
+        self.max_seconds = max(self.max_seconds, segundos)
+        self.rows_per_day = max(self.rows_per_day, filas / dias)
+        self.seconds_per_day = max(self.seconds_per_day, segundos / dias)
+
+
+class RangePlanner:
+    """
+    Decide los sub-rangos de cada mes y los ajusta según las respuestas observadas.
+
+    Uso:
+        planner = RangePlanner(load_plan(cursor, desde, hasta))
+        for sales in planner.iter_month(fetch, mes_desde, mes_hasta):
+            ...
+        save_plan(cursor, mes_desde, planner.recommended_days(mes_desde), planner.stats(mes_desde))
+
+    iter_month() puede ejecutarse en otro hilo (prefetch): las estadísticas de un mes
+    están completas cuando el consumidor terminó de leer sus respuestas.
+    """
+
+    def __init__(self, plan: dict = None, initial_days: int = None, max_rows: int = None,
+                 max_seconds: float = None, adaptive: bool = None):
+        self.plan = dict(plan or {})
+        self.initial_days = settings.SALES_FETCH_DAYS if initial_days is None else initial_days
+        self.max_rows = settings.SALES_SPLIT_MAX_ROWS if max_rows is None else max_rows
+        self.max_seconds = settings.SALES_SPLIT_MAX_SECONDS if max_seconds is None else max_seconds
+        self.adaptive = settings.SALES_ADAPTIVE_SPLIT if adaptive is None else adaptive
+        self._stats = {}
+
+    def days_for(self, mes_desde: str) -> int:
+        """Granularidad inicial del mes: la recordada o la configurada."""
+        return self.plan.get(_period(mes_desde), self.initial_days)
+
+    def _excede(self, filas: int, segundos: float) -> bool:
+        return filas > self.max_rows or segundos > self.max_seconds
+
+    def iter_month(self, fetch, mes_desde: str, mes_hasta: str):
+        """
+        Consulta el rango de un mes con fetch(desde, hasta) y genera cada respuesta.
+
+        Ajusta la granularidad del resto del mes ante respuestas grandes, lentas o fallidas.
+        """
+        dias = self.days_for(mes_desde)
+        stats = self._stats[_period(mes_desde)] = MonthStats(dias)
+        pendientes = deque(generar_subrangos(mes_desde, mes_hasta, dias))
+
+        while pendientes:
+            desde, hasta = pendientes.popleft()
+            inicio = time.perf_counter()
+            try:
+                sales = fetch(desde, hasta)
+            except NON_RETRYABLE:
+                raise
+            except Exception as e:
+                mas_fino = finer(dias)
+                if not self.adaptive or mas_fino is None:
+                    raise
+                logger.warning(
+                    f"Ventas {desde} - {hasta}: falló la consulta ({e}); "
+                    f"el resto del mes se consulta por {granularity_name(mas_fino)}"
+                )
+                dias = stats.dias = mas_fino
+                stats.splits += 1
+                stats.exceeded = False
+                pendientes = deque(generar_subrangos(desde, mes_hasta, dias))
+                continue
+
+            segundos = time.perf_counter() - inicio
+            filas = count_rows(sales)
+            stats.record(desde, hasta, filas, segundos)
+
+            if self.adaptive and self._excede(filas, segundos):
+                mas_fino = finer(dias)
+                if pendientes and mas_fino is not None:
+                    logger.info(
+                        f"Ventas {desde} - {hasta}: {filas:,} líneas en {segundos:.1f}s; "
+                        f"el resto del mes se consulta por {granularity_name(mas_fino)}"
+                    )
+                    dias = stats.dias = mas_fino
+                    stats.splits += 1
+                    stats.exceeded = False
+                    pendientes = deque(generar_subrangos(pendientes[0][0], mes_hasta, dias))
+                else:
+                    stats.exceeded = True
+
+            yield sales
+
+    def stats(self, mes_desde: str):
+        """Estadísticas del mes consultado (None si no se consultó)."""
+        return self._stats.get(_period(mes_desde))
+
+    def recommended_days(self, mes_desde: str) -> int:
+        """Granularidad a recordar para el mes según lo observado."""
+        stats = self.stats(mes_desde)
+        if stats is None:
+            return self.days_for(mes_desde)
+        if not self.adaptive:
+            return stats.dias
+
+        if stats.exceeded:
+            return finer(stats.dias) or stats.dias
+
+        mas_grueso = coarser(stats.dias)
+        if mas_grueso is not None and stats.requests:
+            dias = 31 if mas_grueso == MONTH else mas_grueso
+            if (stats.rows_per_day * dias < self.max_rows / 2
+                    and stats.seconds_per_day * dias < self.max_seconds / 2):
+                return mas_grueso
+        return stats.dias
+
+
+def load_plan(cursor, fecha_desde: str, fecha_hasta: str, id_empresa: int = 1) -> dict:
+    """Retorna {período (YYYY-MM-01): granularidad} recordados para los meses del rango de la empresa."""
+    cursor.execute(
+        """
+        SELECT period, fetch_days FROM bronze.sales_fetch_plan
+        WHERE id_empresa = %s AND period BETWEEN date_trunc('month', %s::date) AND %s::date
+        """,
+        (id_empresa, fecha_desde, fecha_hasta)
+    )
+    return {str(period): fetch_days for period, fetch_days in cursor.fetchall()}
+
+
+def save_plan(cursor, mes_desde: str, dias: int, stats: MonthStats = None, id_empresa: int = 1) -> None:
+    """Guarda la granularidad del mes de la empresa (se confirma con el commit del mes)."""
+    cursor.execute(
+        """
+        INSERT INTO bronze.sales_fetch_plan (period, id_empresa, fetch_days, rows_received, requests,
+                                             max_request_rows, max_request_seconds, splits)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (period, id_empresa) DO UPDATE SET
+            fetch_days = EXCLUDED.fetch_days,
+            rows_received = EXCLUDED.rows_received,
+            requests = EXCLUDED.requests,
+            max_request_rows = EXCLUDED.max_request_rows,
+            max_request_seconds = EXCLUDED.max_request_seconds,
+            splits = EXCLUDED.splits,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (
+            _period(mes_desde), id_empresa, dias,
+            stats.rows if stats else None,
+            stats.requests if stats else None,
+            stats.max_rows if stats else None,
+            round(stats.max_seconds, 2) if stats else None,
+            stats.splits if stats else 0,
+        )
+    )
@@ -0,0 +1,218 @@
+"""
+Passthrough de respuestas crudas de la API a bronze (sin json.loads / json.dumps).
+
+Con raw=True el ChessClient decodifica cada respuesta a dicts de Python y los loaders
+los vuelven a serializar con json.dumps para enviarlos a PostgreSQL, que los parsea de
+nuevo a jsonb. En modo passthrough (settings.BRONZE_RAW_PASSTHROUGH o --passthrough):
+
+  - RawClient pide los mismos endpoints y retorna el cuerpo HTTP (bytes) sin decodificar
+  - Del cuerpo solo se "espían" con expresiones regulares la paginación de ventas
+    (cantComprobantesVentas) y si el array de ítems viene vacío
+  - insert_raw_items() copia los cuerpos tal cual a una tabla temporal jsonb
+    (database.bulk.copy_documents) y PostgreSQL separa los ítems con
+    jsonb_array_elements; las columnas de bronze (fechaComprobate, depósito) se
+    extraen en el mismo INSERT ... SELECT
+
+El jsonb resultante es el mismo, salvo números con ceros no significativos (ej: 1.10):
+json.loads los convierte a float y passthrough los conserva como vinieron.
+
+Uso:
+    client = wrap_client(ChessClient.from_env(prefix="EMPRESA1_"))   # incluye RawClient
+    paginas = fetch_sales_pages(client, '2025-01-01', '2025-01-07')
+    insert_raw_items(cursor, paginas, SALES_ITEMS_PATH, 'tmp_raw_sales', SALES_COLUMNS, SALES_SELECT)
+"""
+import re
+
+import requests
+from chesserp.exceptions import ApiError
+
+from database.bulk import copy_documents
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Ubicación de los ítems dentro de cada respuesta
+SALES_ITEMS_PATH = ('dsReporteComprobantesApi', 'VentasResumen')
+STOCK_ITEMS_PATH = ('dsStockFisicoApi', 'dsStock')
+
+# Columnas de bronze y su expresión sobre cada ítem (`item` jsonb)
+SALES_COLUMNS = ('data_raw', 'source_system', 'date_comprobante')
+SALES_SELECT = "item, 'API_CHESS_ERP', (item->>'fechaComprobate')::date"
+STOCK_COLUMNS = ('data_raw', 'source_system', 'date_stock', 'id_deposito')
+STOCK_SELECT = "item, 'API_CHESS_ERP', %s::date, %s"
+
+# Internos de chesserp.ChessClient que usan RawClient y run_context (la librería no expone
+# el cuerpo HTTP crudo ni la sesión de requests). Verificados contra chesserp-api 0.1.x,
+# la versión fijada en requirements.txt: revisar ambos módulos antes de subirla
+CLIENT_INTERNALS = ('_session', '_authenticated', 'base_url', 'timeout', 'login')
+
+_LOTES_VENTAS = re.compile(rb'"cantComprobantesVentas"\s*:\s*"(\d+)/(\d[\d.]*)"')
+
+
+class UnsupportedClientError(Exception):
+    """El ChessClient instalado no tiene los internos de CLIENT_INTERNALS (otra versión de chesserp-api)."""
+
+
+def client_session(client):
+    """
+    Sesión de requests del ChessClient, verificando antes los internos que se usan.
+
+    Raises:
+        UnsupportedClientError: si la versión de chesserp-api no los tiene
+    """
+    faltantes = [nombre for nombre in CLIENT_INTERNALS if not hasattr(client, nombre)]
+    if faltantes:
+        raise UnsupportedClientError(
+            f"{type(client).__name__} no tiene {', '.join(faltantes)}: versión de chesserp-api "
+            f"no soportada (ver requirements.txt)"
+        )
+    return client._session
+
+
+class RawPages(list):
+    """Cuerpos (bytes) de los lotes de una consulta que traen ítems, sin decodificar."""
+
+
+def has_items(body: bytes, path: tuple) -> bool:
+    """True si el array de ítems (última clave de `path`) existe y no está vacío."""
+    patron = rb'"' + re.escape(path[-1].encode()) + rb'"\s*:\s*\[\s*[^\s\]]'
+    return re.search(patron, body) is not None
+
+
+def sales_lotes(body: bytes) -> int:
+    """Total de lotes de una consulta de ventas ('1/5' -> 5). 1 si no se informa."""
+    match = _LOTES_VENTAS.search(body)
+    if not match:
+        return 1
+    return int(match.group(2).replace(b'.', b''))
+
+
+def _to_ddmmyyyy(fecha: str) -> str:
+    """YYYY-MM-DD -> DD-MM-YYYY (formato de fechastock en la API)."""
+    if re.match(r"^\d{4}-\d{2}-\d{2}$", fecha):
+        y, m, d = fecha.split("-")
+        return f"{d}-{m}-{y}"
+    return fecha
+
+
+class RawClient:
+    """
+    Envuelve un ChessClient agregando métodos get_*_body que retornan el cuerpo HTTP crudo.
+
+    Usa la sesión y el login del cliente envuelto (mismo manejo de 401 y errores que
+    ChessClient._get). Como son métodos get_*, pasan por el scheduler y la cache de
+    wrap_client() igual que el resto; cada lote de ventas es una llamada.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    @property
+    def name(self):
+        return getattr(self._client, 'name', None)
+
+    def __getattr__(self, nombre):
+        return getattr(self._client, nombre)
+
+    def _get_body(self, endpoint: str, params: dict) -> bytes:
+        client = self._client
+        session = client_session(client)
+        if not client._authenticated:
+            client.login()
+
+        url = client.base_url + endpoint
+        try:
+            resp = session.get(url, params=params, timeout=client.timeout)
+
+            if resp.status_code == 401:
+                logger.warning("Sesión vencida (401). Reintentando login...")
+                client.login()
+                resp = session.get(url, params=params, timeout=client.timeout)
+
+            if resp.status_code != 200:
+                raise ApiError(resp.status_code, f"Request to {endpoint} failed", resp.text)
+
+            return resp.content
+
+        except requests.RequestException as e:
+            raise ApiError(500, f"Connection error: {str(e)}")
+
+    def get_sales_body(self, fecha_desde: str, fecha_hasta: str, nro_lote: int = 1,
+                       detallado: bool = True, empresas: str = '1') -> bytes:
+        """Un lote de ventas, tal como lo devuelve la API."""
+        return self._get_body('ventas/', {
+            'fechaDesde': fecha_desde,
+            'fechaHasta': fecha_hasta,
+            'empresas': empresas,
+            'detallado': str(detallado).lower(),
+            'nroLote': nro_lote,
+        })
+
+    def get_stock_body(self, id_deposito: int, fecha: str) -> bytes:
+        """Stock de un depósito en una fecha, tal como lo devuelve la API."""
+        return self._get_body('stock/', {
+            'idDeposito': id_deposito,
+            'fechastock': _to_ddmmyyyy(fecha),
+        })
+
+
+def raw_client(client) -> RawClient:
+    """Retorna el ChessClient con los métodos get_*_body (ver wrap_client)."""
+    return RawClient(client)
+
+
+def fetch_sales_pages(client, fecha_desde: str, fecha_hasta: str, empresas: str = '1') -> RawPages:
+    """
+    Consulta todos los lotes de ventas de un rango sin decodificarlos.
+
+    Del primer lote solo se lee la cantidad de lotes; los lotes sin ítems se descartan,
+    así una consulta sin ventas retorna una lista vacía.
+    """
+    # La empresa default no se pasa: mantiene las claves de cache de las consultas ya guardadas
+    extra = {} if empresas == '1' else {'empresas': empresas}
+    primero = client.get_sales_body(fecha_desde=fecha_desde, fecha_hasta=fecha_hasta, nro_lote=1, **extra)
+    total = sales_lotes(primero)
+
+    paginas = RawPages()
+    if has_items(primero, SALES_ITEMS_PATH):
+        paginas.append(primero)
+    del primero
+
+    for nro_lote in range(2, total + 1):
+        body = client.get_sales_body(fecha_desde=fecha_desde, fecha_hasta=fecha_hasta, nro_lote=nro_lote, **extra)
+        if has_items(body, SALES_ITEMS_PATH):
+            paginas.append(body)
+
+    logger.debug(f"Ventas {fecha_desde} - {fecha_hasta}: {total} lote(s), {sum(map(len, paginas)):,} bytes")
+    return paginas
+
+
+def insert_raw_items(cursor, bodies, path: tuple, table: str, columns: tuple, select_sql: str,
+                     params: tuple = ()) -> int:
+    """
+    Inserta en `table` los ítems de cuerpos JSON crudos, en el orden recibido.
+
+    Los cuerpos se copian a TEMP tmp_raw_bodies (PostgreSQL los parsea una sola vez a
+    jsonb) y se expanden con jsonb_array_elements sobre `path`. `select_sql` arma cada
+    fila a partir de `item` (ej: SALES_SELECT) y puede usar `params`.
+
+    Returns:
+        Cantidad de ítems insertados
+    """
+    cursor.execute("CREATE TEMP TABLE tmp_raw_bodies (nro BIGSERIAL, body JSONB) ON COMMIT DROP")
+    copy_documents(cursor, 'tmp_raw_bodies', 'body', bodies)
+
+    cursor.execute(f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        SELECT {select_sql}
+        FROM tmp_raw_bodies b
+        CROSS JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(b.body #> %s) = 'array' THEN b.body #> %s ELSE '[]'::jsonb END
+        ) WITH ORDINALITY AS e(item, orden)
+        ORDER BY b.nro, e.orden
+    """, (*params, list(path), list(path)))
+    insertados = cursor.rowcount
+
+    cursor.execute("DROP TABLE tmp_raw_bodies")
+    return insertados
@@ -0,0 +1,102 @@
+"""
+Coordinación entre las escrituras de bronze.raw_sales y la marca de agua de silver.
+
+El modo incremental de silver (transform_sales_incremental) sigue desde el último id y
+el último deleted_at de bronze.raw_sales que ya transformó. Los ids salen de un SERIAL,
+que se asigna al insertar y no al confirmar: una carga en curso puede confirmar después
+ids menores a un MAX(id) ya leído, y esas líneas quedarían detrás de la marca.
+
+Para evitarlo, cada transacción que escribe bronze.raw_sales toma primero un advisory
+lock compartido (las cargas de varias empresas o meses no se bloquean entre sí) y la
+posición de bronze se lee con el mismo lock en modo exclusivo, que solo se obtiene
+cuando no hay ninguna escritura en curso:
+
+    marca = begin_sales_write(cursor)          # primera sentencia de la transacción
+    ... UPDATE ... SET deleted_at = %(marca)s ...
+    raw_conn.commit()                          # libera el lock
+
+    ultimo_id, ultimo_borrado, ultimo_cambio = read_sales_position(cursor)
+
+Las escrituras que empiezan después toman ids mayores y una marca de tiempo posterior
+(clock_timestamp() al obtener el lock, no el inicio de la transacción).
+
+Un reemplazo de partición (load_bronze con replace=True, reload_sales de la landing) no
+deja tombstones: los documentos que desaparecen del mes se registran en
+bronze.raw_sales_changes antes del swap (record_replaced_documents), así el modo
+incremental y los consumidores del log los borran de silver y gold.
+"""
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Claves del documento: columnas generadas de bronze.raw_sales, las mismas que lee silver.fact_ventas
+DOCUMENT_KEY = ('id_empresa', 'id_documento', 'letra', 'serie', 'nro_doc')
+
+# Clave del advisory lock de las escrituras de ventas (cualquier entero de 64 bits fijo)
+SALES_WRITES_LOCK = 7_345_001
+
+
+def begin_sales_write(cursor):
+    """
+    Toma el lock compartido de escrituras de ventas hasta el fin de la transacción.
+
+    Debe ejecutarse antes de insertar o marcar líneas en bronze.raw_sales. Retorna la
+    marca de tiempo de la escritura (para ingestion_at y deleted_at), tomada después
+    de obtener el lock.
+    """
+    cursor.execute("SELECT pg_advisory_xact_lock_shared(%s)", (SALES_WRITES_LOCK,))
+    cursor.execute("SELECT clock_timestamp()::timestamp")
+    return cursor.fetchone()[0]
+
+
+def read_sales_position(cursor) -> tuple:
+    """
+    (último id, último deleted_at) de bronze.raw_sales y último cambio pendiente de
+    bronze.raw_sales_changes, sin escrituras de ventas en curso.
+
+    Se lee en una transacción propia con el lock exclusivo, que se libera con el commit:
+    el cursor no debe tener cambios sin confirmar.
+    """
+    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SALES_WRITES_LOCK,))
+    cursor.execute("""
+        SELECT (SELECT COALESCE(MAX(id), 0) FROM bronze.raw_sales),
+               (SELECT MAX(deleted_at) FROM bronze.raw_sales),
+               (SELECT MAX(id) FROM bronze.raw_sales_changes WHERE silver_applied_at IS NULL)
+    """)
+    posicion = cursor.fetchone()
+    cursor.connection.commit()
+    return posicion
+
+
+def record_replaced_documents(cursor, staging: str, fecha_desde: str, fecha_hasta: str, id_empresa: int) -> int:
+    """
+    Registra en bronze.raw_sales_changes los documentos del rango de la empresa que no
+    tienen ninguna línea vigente en la tabla `staging` que va a reemplazar a la partición.
+
+    Se llama con la staging ya cargada y antes de swap_partition. Los documentos que
+    siguen en la staging no hace falta registrarlos: sus líneas del rango son nuevas
+    (ids posteriores a la marca de agua de silver). Se confirma con el commit del llamador.
+
+    Returns:
+        Documentos registrados
+    """
+    columnas = ', '.join(DOCUMENT_KEY)
+    mismo_documento = ' AND '.join(f"s.{c} IS NOT DISTINCT FROM r.{c}" for c in DOCUMENT_KEY)
+    cursor.execute(f"""
+        INSERT INTO bronze.raw_sales_changes (date_comprobante, {columnas})
+        SELECT DISTINCT date_comprobante, {columnas}
+        FROM bronze.raw_sales r
+        WHERE date_comprobante BETWEEN %(desde)s AND %(hasta)s
+          AND id_empresa = %(empresa)s
+          AND NOT EXISTS (
+              SELECT 1 FROM {staging} s
+              WHERE s.deleted_at IS NULL
+                AND s.date_comprobante = r.date_comprobante
+                AND {mismo_documento}
+          )
+    """, {'desde': fecha_desde, 'hasta': fecha_hasta, 'empresa': id_empresa})
+    documentos = cursor.rowcount
+    if documentos:
+        logger.debug(f"{documentos} documento(s) de {fecha_desde} - {fecha_hasta} sin líneas después del reemplazo")
+    return documentos
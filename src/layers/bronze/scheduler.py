@@ -0,0 +1,202 @@
+"""
+Scheduler compartido de requests a la API de Chess ERP.
+
+Todas las llamadas get_* de los loaders pasan por un límite de concurrencia
+adaptativo por endpoint (AIMD) y reintentos con backoff exponencial + jitter:
+
+  - Respuesta OK con latencia estable: el límite crece de a +1 por "ventana"
+    (limit += 1 / limit), hasta el máximo configurado del endpoint
+  - Error o respuesta lenta (latencia > API_SLOW_FACTOR x latencia de referencia):
+    el límite se reduce a la mitad, hasta 1
+  - Error: se reintenta hasta API_MAX_RETRIES veces, esperando
+    random(0, min(API_RETRY_MAX_SECONDS, API_RETRY_BASE_SECONDS * 2^intento))
+
+Solo cuentan como congestión (reintento + baja del límite) los 429, 5xx y errores de
+conexión; los demás 4xx (credenciales, request inválido) y los errores de login se
+propagan de inmediato.
+
+Los límites son compartidos por proceso (get_scheduler()), así los hilos del loader
+de stock y el resto de los loaders respetan el mismo cupo por endpoint.
+
+Uso:
+    client = scheduled_client(ChessClient.from_env(prefix="EMPRESA1_"))
+"""
+import random
+import threading
+import time
+
+from chesserp.exceptions import AuthError
+
+from config import get_logger, settings
+
+logger = get_logger(__name__)
+
+
+# Errores de programación/parámetros: reintentar no cambia el resultado
+NON_RETRYABLE = (ValueError, TypeError, KeyError, AuthError)
+
+
+def is_retryable(error: Exception) -> bool:
+    """True si el error es transitorio: 429, 5xx o de conexión (sin status HTTP)."""
+    if isinstance(error, NON_RETRYABLE):
+        return False
+    status = getattr(error, 'status_code', None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status == 429
+    return True
+
+
+class AdaptiveLimiter:
+    """Límite de concurrencia AIMD para un endpoint."""
+
+    def __init__(self, name: str, initial: int, maximum: int, minimum: int = 1,
+                 slow_factor: float = 3.0, decrease: float = 0.5):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.slow_factor = slow_factor
+        self.decrease = decrease
+        self.baseline = None
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        """Bloquea hasta que haya cupo para un request más."""
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float = None, ok: bool = True) -> None:
+        """Libera el cupo y ajusta el límite según el resultado del request."""
+        with self._cond:
+            self._in_flight -= 1
+
+            lenta = latency is not None and self.baseline is not None \
+                and latency > self.baseline * self.slow_factor
+
+            if not ok or lenta:
+                anterior = self.limit
+                self.limit = max(float(self.minimum), self.limit * self.decrease)
+                if int(anterior) != int(self.limit):
+                    logger.debug(f"[{self.name}] concurrencia {int(anterior)} -> {int(self.limit)} "
+                                 f"({'error' if not ok else f'lenta {latency:.2f}s'})")
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+
+            if latency is not None:
+                # Referencia: promedio móvil; las respuestas lentas pesan poco para que
+                # un cambio sostenido de latencia termine siendo la nueva referencia
+                if self.baseline is None:
+                    self.baseline = latency
+                else:
+                    alpha = 0.05 if lenta else 0.2
+                    self.baseline += alpha * (latency - self.baseline)
+
+            self._cond.notify_all()
+
+
+class RequestScheduler:
+    """Limita y reintenta llamadas a la API, con un AdaptiveLimiter por (cliente, endpoint)."""
+
+    def __init__(self, max_retries: int = None, retry_base: float = None, retry_max: float = None,
+                 initial: int = None, maximum: int = None, limits: dict = None,
+                 slow_factor: float = None, sleep=time.sleep):
+        self.max_retries = settings.API_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base = settings.API_RETRY_BASE_SECONDS if retry_base is None else retry_base
+        self.retry_max = settings.API_RETRY_MAX_SECONDS if retry_max is None else retry_max
+        self.initial = settings.API_CONCURRENCY_INITIAL if initial is None else initial
+        self.maximum = settings.API_CONCURRENCY_MAX if maximum is None else maximum
+        self.limits = settings.API_CONCURRENCY_LIMITS if limits is None else limits
+        self.slow_factor = settings.API_SLOW_FACTOR if slow_factor is None else slow_factor
+        self._sleep = sleep
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, client_name: str, endpoint: str) -> AdaptiveLimiter:
+        """Retorna (creándolo la primera vez) el limitador del endpoint."""
+        clave = (client_name, endpoint)
+        with self._lock:
+            if clave not in self._limiters:
+                self._limiters[clave] = AdaptiveLimiter(
+                    name=f"{client_name}:{endpoint}" if client_name else endpoint,
+                    initial=self.initial,
+                    maximum=self.limits.get(endpoint, self.maximum),
+                    slow_factor=self.slow_factor,
+                )
+            return self._limiters[clave]
+
+    def backoff(self, intento: int) -> float:
+        """Espera antes del reintento `intento` (0 = primer reintento): full jitter."""
+        return random.uniform(0, min(self.retry_max, self.retry_base * (2 ** intento)))
+
+    def call(self, client_name: str, endpoint: str, fn, *args, **kwargs):
+        """Ejecuta fn(*args, **kwargs) respetando el límite del endpoint y reintentando errores."""
+        limiter = self.limiter(client_name, endpoint)
+
+        for intento in range(self.max_retries + 1):
+            limiter.acquire()
+            inicio = time.perf_counter()
+            try:
+                resultado = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    limiter.release(ok=True)
+                    raise
+                limiter.release(ok=False)
+                if intento == self.max_retries:
+                    logger.error(f"{endpoint}: falló tras {self.max_retries + 1} intentos - {e}")
+                    raise
+                espera = self.backoff(intento)
+                logger.warning(f"{endpoint}: error ({e}), reintento {intento + 1}/{self.max_retries} en {espera:.1f}s")
+                self._sleep(espera)
+                continue
+
+            limiter.release(latency=time.perf_counter() - inicio, ok=True)
+            return resultado
+
+
+class ScheduledClient:
+    """Envuelve un ChessClient: los métodos get_* pasan por el scheduler, el resto se delega."""
+
+    def __init__(self, client, scheduler: RequestScheduler):
+        self._client = client
+        self._scheduler = scheduler
+        self._name = getattr(client, 'name', None) or ''
+
+    @property
+    def name(self):
+        return self._name
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._client, nombre)
+        if not nombre.startswith('get_') or not callable(atributo):
+            return atributo
+
+        def llamada(*args, **kwargs):
+            return self._scheduler.call(self._name, nombre, atributo, *args, **kwargs)
+
+        return llamada
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Scheduler compartido del proceso (creado con la configuración de settings)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
+
+
+def scheduled_client(client, scheduler: RequestScheduler = None) -> ScheduledClient:
+    """Retorna el cliente envuelto en el scheduler (compartido si no se indica otro)."""
+    return ScheduledClient(client, scheduler or get_scheduler())
@@ -0,0 +1,182 @@
+"""
+Almacenamiento de snapshots de stock en bronze.raw_stock (completo o delta).
+
+La API devuelve el inventario completo de un depósito por día, pero la mayoría de
+los artículos no cambia de un día al otro. Con STOCK_STORAGE_MODE=delta se guarda:
+
+  - B (baseline): el inventario completo del primer día cargado de cada mes
+  - D (delta): en los días siguientes, solo las filas nuevas o modificadas
+  - X (baja): las filas que la API dejó de devolver (data_raw = la fila anterior)
+
+El modo full guarda cada día completo (F), como antes. Los días cargados de cada
+(fecha, depósito) se registran en bronze.raw_stock_days, y la función SQL
+bronze.raw_stock_snapshot(desde, hasta, id_deposito) reconstruye el inventario
+completo de cada día: para cada fila toma la última versión entre el último día
+completo (F o B) del mes y el día pedido, descartando las bajas. Los meses son
+independientes (coinciden con las particiones), así que la retención por partición
+no rompe la reconstrucción.
+
+Identidad de una fila: idAlmacen | idArticulo | fecVtoLote (bronze.stock_key()).
+"""
+from datetime import date, datetime, timedelta
+
+from config import get_logger
+
+logger = get_logger(__name__)
+
+
+STORAGE_MODES = ('full', 'delta')
+
+KIND_FULL = 'F'
+KIND_BASELINE = 'B'
+KIND_DELTA = 'D'
+KIND_REMOVED = 'X'
+
+# Campos que identifican una fila de stock (mismo orden que bronze.stock_key())
+KEY_FIELDS = ('idAlmacen', 'idArticulo', 'fecVtoLote')
+
+
+def _key_text(value) -> str:
+    """Texto de un valor JSON tal como lo devuelve el operador ->> de PostgreSQL."""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def stock_key(item: dict) -> str:
+    """Identidad de una fila de stock (equivalente en Python de bronze.stock_key())."""
+    return '|'.join(_key_text(item.get(campo)) for campo in KEY_FIELDS)
+
+
+def _to_date(fecha) -> date:
+    if isinstance(fecha, datetime):
+        return fecha.date()
+    if isinstance(fecha, date):
+        return fecha
+    return datetime.strptime(fecha, '%Y-%m-%d').date()
+
+
+def diff_snapshot(anterior: dict, actual: list) -> list[tuple[str, dict]]:
+    """
+    Compara el inventario del día con el del día anterior.
+
+    Args:
+        anterior: {stock_key: fila} del día anterior
+        actual: Filas devueltas por la API para el día
+
+    Returns:
+        [(tipo, fila)]: D para filas nuevas o modificadas, X para las que ya no están
+    """
+    cambios = []
+    vistas = set()
+    for item in actual:
+        clave = stock_key(item)
+        vistas.add(clave)
+        if anterior.get(clave) != item:
+            cambios.append((KIND_DELTA, item))
+    for clave, item in anterior.items():
+        if clave not in vistas:
+            cambios.append((KIND_REMOVED, item))
+    return cambios
+
+
+def register_day(cursor, fecha: str, id_deposito: int, kind: str, rows_stored: int, rows_total: int) -> None:
+    """Registra un (fecha, depósito) cargado en bronze.raw_stock_days."""
+    cursor.execute(
+        """
+        INSERT INTO bronze.raw_stock_days (date_stock, id_deposito, snapshot_kind, rows_stored, rows_total)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (date_stock, id_deposito) DO UPDATE SET
+            snapshot_kind = EXCLUDED.snapshot_kind,
+            rows_stored = EXCLUDED.rows_stored,
+            rows_total = EXCLUDED.rows_total,
+            loaded_at = CURRENT_TIMESTAMP
+        """,
+        (fecha, id_deposito, kind, rows_stored, rows_total)
+    )
+
+
+def delete_day(cursor, fecha: str, id_deposito: int) -> bool:
+    """Elimina un (fecha, depósito) ya cargado (filas y registro). Retorna True si existía."""
+    cursor.execute(
+        "DELETE FROM bronze.raw_stock_days WHERE date_stock = %s AND id_deposito = %s RETURNING snapshot_kind",
+        (fecha, id_deposito)
+    )
+    if cursor.fetchone() is None:
+        return False
+    cursor.execute(
+        "DELETE FROM bronze.raw_stock WHERE date_stock = %s AND id_deposito = %s",
+        (fecha, id_deposito)
+    )
+    return True
+
+
+def previous_state(cursor, fecha: str, id_deposito: int):
+    """
+    Inventario reconstruido del último día cargado anterior a `fecha` dentro del mismo mes.
+
+    Returns:
+        (fecha_anterior, {stock_key: fila}) o None si es el primer día cargado del mes
+    """
+    cursor.execute(
+        """
+        SELECT MAX(date_stock) FROM bronze.raw_stock_days
+        WHERE id_deposito = %s AND date_stock < %s
+          AND date_stock >= date_trunc('month', %s::date)::date
+        """,
+        (id_deposito, fecha, fecha)
+    )
+    fila = cursor.fetchone()
+    if fila is None or fila[0] is None:
+        return None
+
+    fecha_anterior = fila[0]
+    cursor.execute(
+        "SELECT data_raw FROM bronze.raw_stock_snapshot(%s, %s, %s)",
+        (fecha_anterior, fecha_anterior, id_deposito)
+    )
+    return _to_date(fecha_anterior), {stock_key(item): item for (item,) in cursor.fetchall()}
+
+
+class DeltaEncoder:
+    """
+    Codifica cada (fecha, depósito) como baseline o delta respecto del día anterior.
+
+    Guarda en memoria el último inventario de cada depósito: en una carga día a día
+    el día anterior ya está en memoria y solo se consulta la BD al empezar, al cambiar
+    de mes o si hay días salteados (ej: --resume). Los días de un mismo depósito
+    deben codificarse en orden cronológico.
+    """
+
+    def __init__(self):
+        self._estado = {}
+
+    def encode(self, cursor, fecha: str, id_deposito: int, stock: list) -> tuple[str, list[tuple[str, dict]]]:
+        """
+        Returns:
+            (tipo_del_día, [(tipo, fila)]) con tipo_del_día B o D
+        """
+        dia = _to_date(fecha)
+
+        if delete_day(cursor, fecha, id_deposito):
+            logger.warning(
+                f"Stock {fecha} depósito {id_deposito} ya estaba cargado: se reemplaza. "
+                f"Los días posteriores del mes deben recargarse para que sus deltas sigan siendo válidos"
+            )
+            self._estado.pop(id_deposito, None)
+
+        cache = self._estado.get(id_deposito)
+        if cache is not None and cache[0] == dia - timedelta(days=1) and cache[0].month == dia.month:
+            anterior = cache
+        else:
+            anterior = previous_state(cursor, fecha, id_deposito)
+
+        self._estado[id_deposito] = (dia, {stock_key(item): item for item in stock})
+
+        if anterior is None:
+            return KIND_BASELINE, [(KIND_BASELINE, item) for item in stock]
+        return KIND_DELTA, diff_snapshot(anterior[1], stock)
@@ -3,8 +3,8 @@ from layers.gold.aggregators.dim_sucursal import load_dim_sucursal
 from layers.gold.aggregators.dim_deposito import load_dim_deposito
 from layers.gold.aggregators.dim_vendedor import load_dim_vendedor
 from layers.gold.aggregators.dim_articulo import load_dim_articulo
-from layers.gold.aggregators.dim_cliente import load_dim_cliente
-from layers.gold.aggregators.fact_ventas import load_fact_ventas
+from layers.gold.aggregators.dim_cliente import load_dim_cliente, load_dim_cliente_changes
+from layers.gold.aggregators.fact_ventas import load_fact_ventas, load_fact_ventas_changes
 from layers.gold.aggregators.fact_stock import load_fact_stock
 from layers.gold.aggregators.cobertura import (
     load_cobertura,
@@ -22,7 +22,9 @@ __all__ = [
     'load_dim_vendedor',
     'load_dim_articulo',
     'load_dim_cliente',
+    'load_dim_cliente_changes',
     'load_fact_ventas',
+    'load_fact_ventas_changes',
     'load_fact_stock',
     'load_cobertura',
     'load_cob_preventista_marca',
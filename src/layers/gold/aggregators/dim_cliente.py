@@ -5,10 +5,206 @@ Desnormaliza clientes con sucursal, marketing y rutas/preventistas por fuerza de
 from database import engine
 from datetime import datetime
 from config import get_logger
+from layers.bronze.master_changes import apply_changes, advance_consumer, consumer_position
 
 logger = get_logger(__name__)
 
 
+# Tablas de silver que alimentan dim_cliente: solo se aplican los cambios que ya aplicaron todas
+UPSTREAM = ('silver.clients', 'silver.client_forces', 'silver.routes', 'silver.staff')
+
+# Clientes afectados por los cambios de maestros pendientes (tmp_master_keys):
+# los modificados, los asignados a rutas modificadas y los de rutas cuyo preventista cambió
+_CLIENTES_AFECTADOS_SQL = """
+    CREATE TEMP TABLE tmp_dim_clientes ON COMMIT DROP AS
+    SELECT NULLIF(k.entity_key, '')::integer AS id_cliente
+    FROM tmp_master_keys k
+    WHERE k.entity = 'clients'
+    UNION
+    SELECT cf.id_cliente
+    FROM silver.client_forces cf
+    JOIN tmp_master_keys k
+      ON k.entity = 'routes'
+     AND cf.id_ruta = NULLIF(split_part(k.entity_key, '|', 1), '')::integer
+    UNION
+    SELECT cf.id_cliente
+    FROM silver.client_forces cf
+    JOIN silver.routes r ON cf.id_ruta = r.id_ruta
+    JOIN tmp_master_keys k
+      ON k.entity = 'staff'
+     AND r.id_personal = NULLIF(split_part(k.entity_key, '|', 1), '')::integer
+     AND r.id_sucursal = NULLIF(split_part(k.entity_key, '|', 2), '')::integer
+"""
+
+# Descripciones de sucursal y marketing (maestros chicos, siempre full refresh en silver)
+_DESCRIPCIONES_SQL = [
+    """
+    UPDATE gold.dim_cliente d SET des_sucursal = b.descripcion
+    FROM silver.branches b
+    WHERE d.id_sucursal = b.id_sucursal AND d.des_sucursal IS DISTINCT FROM b.descripcion
+    """,
+    """
+    UPDATE gold.dim_cliente d SET des_canal_mkt = mc.des_canal_mkt
+    FROM silver.marketing_channels mc
+    WHERE d.id_canal_mkt = mc.id_canal_mkt AND d.des_canal_mkt IS DISTINCT FROM mc.des_canal_mkt
+    """,
+    """
+    UPDATE gold.dim_cliente d SET des_segmento_mkt = ms.des_segmento_mkt
+    FROM silver.marketing_segments ms
+    WHERE d.id_segmento_mkt = ms.id_segmento_mkt AND d.des_segmento_mkt IS DISTINCT FROM ms.des_segmento_mkt
+    """,
+    """
+    UPDATE gold.dim_cliente d SET des_subcanal_mkt = msc.des_subcanal_mkt
+    FROM silver.marketing_subchannels msc
+    WHERE d.id_subcanal_mkt = msc.id_subcanal_mkt AND d.des_subcanal_mkt IS DISTINCT FROM msc.des_subcanal_mkt
+    """,
+]
+
+
+def _build_insert_query(clientes: str = '') -> str:
+    """
+    INSERT ... SELECT de dim_cliente desde silver.
+
+    Args:
+        clientes: Subconsulta con los id_cliente a cargar (vacío = todos)
+    """
+    condicion_forces = f"AND cf.id_cliente IN ({clientes})" if clientes else ''
+    condicion_clientes = f"AND c.id_cliente IN ({clientes})" if clientes else ''
+    return f"""
+        WITH rutas_fv1 AS (
+            -- Ruta y preventista para Fuerza de Ventas 1
+            SELECT DISTINCT ON (cf.id_cliente)
+                cf.id_cliente,
+                cf.id_ruta,
+                s.des_personal
+            FROM silver.client_forces cf
+            JOIN silver.routes r ON cf.id_ruta = r.id_ruta
+            JOIN silver.staff s ON r.id_personal = s.id_personal
+                AND r.id_sucursal = s.id_sucursal
+            WHERE r.id_fuerza_ventas = 1
+              AND cf.fecha_fin = '9999-12-31'
+              {condicion_forces}
+            ORDER BY cf.id_cliente, cf.fecha_inicio DESC
+        ),
+        rutas_fv4 AS (
+            -- Ruta y preventista para Fuerza de Ventas 4
+            SELECT DISTINCT ON (cf.id_cliente)
+                cf.id_cliente,
+                cf.id_ruta,
+                s.des_personal
+            FROM silver.client_forces cf
+            JOIN silver.routes r ON cf.id_ruta = r.id_ruta
+            JOIN silver.staff s ON r.id_personal = s.id_personal
+                AND r.id_sucursal = s.id_sucursal
+            WHERE r.id_fuerza_ventas = 4
+              AND cf.fecha_fin = '9999-12-31'
+              {condicion_forces}
+            ORDER BY cf.id_cliente, cf.fecha_inicio DESC
+        )
+        INSERT INTO gold.dim_cliente (
+            id_cliente, razon_social, fantasia,
+            id_sucursal, des_sucursal,
+            id_canal_mkt, des_canal_mkt,
+            id_segmento_mkt, des_segmento_mkt,
+            id_subcanal_mkt, des_subcanal_mkt,
+            id_ruta_fv1, des_personal_fv1,
+            id_ruta_fv4, des_personal_fv4,
+            id_ramo, des_ramo,
+            id_localidad, des_localidad,
+            id_provincia, des_provincia,
+            latitud, longitud,
+            id_lista_precio, des_lista_precio,
+            telefono_fijo, telefono_movil,
+            anulado
+        )
+        SELECT
+            c.id_cliente,
+            c.razon_social,
+            c.fantasia,
+
+            -- Sucursal
+            c.id_sucursal,
+            b.descripcion AS des_sucursal,
+
+            -- Marketing
+            c.id_canal_mkt,
+            mc.des_canal_mkt,
+            c.id_segmento_mkt,
+            ms.des_segmento_mkt,
+            c.id_subcanal_mkt,
+            msc.des_subcanal_mkt,
+
+            -- Ruta/Preventista FV1
+            fv1.id_ruta,
+            fv1.des_personal,
+
+            -- Ruta/Preventista FV4
+            fv4.id_ruta,
+            fv4.des_personal,
+
+            -- Clasificación
+            c.id_ramo,
+            c.desc_ramo,
+            c.id_localidad,
+            c.desc_localidad,
+            c.id_provincia,
+            c.desc_provincia,
+
+            -- Geolocalización
+            c.latitud,
+            c.longitud,
+
+            -- Lista de precio
+            c.id_lista_precio,
+            c.desc_lista_precio,
+
+            -- Teléfonos
+            c.telefono_fijo,
+            c.telefono_movil,
+
+            -- Estado
+            c.anulado
+
+        FROM silver.clients c
+        LEFT JOIN silver.branches b ON c.id_sucursal = b.id_sucursal
+        LEFT JOIN silver.marketing_channels mc ON c.id_canal_mkt = mc.id_canal_mkt
+        LEFT JOIN silver.marketing_segments ms ON c.id_segmento_mkt = ms.id_segmento_mkt
+        LEFT JOIN silver.marketing_subchannels msc ON c.id_subcanal_mkt = msc.id_subcanal_mkt
+        LEFT JOIN rutas_fv1 fv1 ON c.id_cliente = fv1.id_cliente
+        LEFT JOIN rutas_fv4 fv4 ON c.id_cliente = fv4.id_cliente
+        WHERE c.id_cliente IS NOT NULL
+          {condicion_clientes}
+        ON CONFLICT (id_cliente) DO UPDATE SET
+            razon_social = EXCLUDED.razon_social,
+            fantasia = EXCLUDED.fantasia,
+            id_sucursal = EXCLUDED.id_sucursal,
+            des_sucursal = EXCLUDED.des_sucursal,
+            id_canal_mkt = EXCLUDED.id_canal_mkt,
+            des_canal_mkt = EXCLUDED.des_canal_mkt,
+            id_segmento_mkt = EXCLUDED.id_segmento_mkt,
+            des_segmento_mkt = EXCLUDED.des_segmento_mkt,
+            id_subcanal_mkt = EXCLUDED.id_subcanal_mkt,
+            des_subcanal_mkt = EXCLUDED.des_subcanal_mkt,
+            id_ruta_fv1 = EXCLUDED.id_ruta_fv1,
+            des_personal_fv1 = EXCLUDED.des_personal_fv1,
+            id_ruta_fv4 = EXCLUDED.id_ruta_fv4,
+            des_personal_fv4 = EXCLUDED.des_personal_fv4,
+            id_ramo = EXCLUDED.id_ramo,
+            des_ramo = EXCLUDED.des_ramo,
+            id_localidad = EXCLUDED.id_localidad,
+            des_localidad = EXCLUDED.des_localidad,
+            id_provincia = EXCLUDED.id_provincia,
+            des_provincia = EXCLUDED.des_provincia,
+            latitud = EXCLUDED.latitud,
+            longitud = EXCLUDED.longitud,
+            id_lista_precio = EXCLUDED.id_lista_precio,
+            des_lista_precio = EXCLUDED.des_lista_precio,
+            telefono_fijo = EXCLUDED.telefono_fijo,
+            telefono_movil = EXCLUDED.telefono_movil,
+            anulado = EXCLUDED.anulado
+    """
+
+
 def load_dim_cliente():
     """
     Carga dim_cliente desde silver.clients con todas las dimensiones desnormalizadas.
@@ -24,140 +220,14 @@ def load_dim_cliente():
         cursor.execute("DELETE FROM gold.dim_cliente")
 
         # Query compleja con todas las desnormalizaciones
-        insert_query = """
-            WITH rutas_fv1 AS (
-                -- Ruta y preventista para Fuerza de Ventas 1
-                SELECT DISTINCT ON (cf.id_cliente)
-                    cf.id_cliente,
-                    cf.id_ruta,
-                    s.des_personal
-                FROM silver.client_forces cf
-                JOIN silver.routes r ON cf.id_ruta = r.id_ruta
-                JOIN silver.staff s ON r.id_personal = s.id_personal
-                    AND r.id_sucursal = s.id_sucursal
-                WHERE r.id_fuerza_ventas = 1
-                  AND cf.fecha_fin = '9999-12-31'
-                ORDER BY cf.id_cliente, cf.fecha_inicio DESC
-            ),
-            rutas_fv4 AS (
-                -- Ruta y preventista para Fuerza de Ventas 4
-                SELECT DISTINCT ON (cf.id_cliente)
-                    cf.id_cliente,
-                    cf.id_ruta,
-                    s.des_personal
-                FROM silver.client_forces cf
-                JOIN silver.routes r ON cf.id_ruta = r.id_ruta
-                JOIN silver.staff s ON r.id_personal = s.id_personal
-                    AND r.id_sucursal = s.id_sucursal
-                WHERE r.id_fuerza_ventas = 4
-                  AND cf.fecha_fin = '9999-12-31'
-                ORDER BY cf.id_cliente, cf.fecha_inicio DESC
-            )
-            INSERT INTO gold.dim_cliente (
-                id_cliente, razon_social, fantasia,
-                id_sucursal, des_sucursal,
-                id_canal_mkt, des_canal_mkt,
-                id_segmento_mkt, des_segmento_mkt,
-                id_subcanal_mkt, des_subcanal_mkt,
-                id_ruta_fv1, des_personal_fv1,
-                id_ruta_fv4, des_personal_fv4,
-                id_ramo, des_ramo,
-                id_localidad, des_localidad,
-                id_provincia, des_provincia,
-                latitud, longitud,
-                id_lista_precio, des_lista_precio,
-                telefono_fijo, telefono_movil,
-                anulado
-            )
-            SELECT
-                c.id_cliente,
-                c.razon_social,
-                c.fantasia,
-
-                -- Sucursal
-                c.id_sucursal,
-                b.descripcion AS des_sucursal,
-
-                -- Marketing
-                c.id_canal_mkt,
-                mc.des_canal_mkt,
-                c.id_segmento_mkt,
-                ms.des_segmento_mkt,
-                c.id_subcanal_mkt,
-                msc.des_subcanal_mkt,
-
-                -- Ruta/Preventista FV1
-                fv1.id_ruta,
-                fv1.des_personal,
-
-                -- Ruta/Preventista FV4
-                fv4.id_ruta,
-                fv4.des_personal,
-
-                -- Clasificación
-                c.id_ramo,
-                c.desc_ramo,
-                c.id_localidad,
-                c.desc_localidad,
-                c.id_provincia,
-                c.desc_provincia,
-
-                -- Geolocalización
-                c.latitud,
-                c.longitud,
-
-                -- Lista de precio
-                c.id_lista_precio,
-                c.desc_lista_precio,
-
-                -- Teléfonos
-                c.telefono_fijo,
-                c.telefono_movil,
-
-                -- Estado
-                c.anulado
-
-            FROM silver.clients c
-            LEFT JOIN silver.branches b ON c.id_sucursal = b.id_sucursal
-            LEFT JOIN silver.marketing_channels mc ON c.id_canal_mkt = mc.id_canal_mkt
-            LEFT JOIN silver.marketing_segments ms ON c.id_segmento_mkt = ms.id_segmento_mkt
-            LEFT JOIN silver.marketing_subchannels msc ON c.id_subcanal_mkt = msc.id_subcanal_mkt
-            LEFT JOIN rutas_fv1 fv1 ON c.id_cliente = fv1.id_cliente
-            LEFT JOIN rutas_fv4 fv4 ON c.id_cliente = fv4.id_cliente
-            WHERE c.id_cliente IS NOT NULL
-            ON CONFLICT (id_cliente) DO UPDATE SET
-                razon_social = EXCLUDED.razon_social,
-                fantasia = EXCLUDED.fantasia,
-                id_sucursal = EXCLUDED.id_sucursal,
-                des_sucursal = EXCLUDED.des_sucursal,
-                id_canal_mkt = EXCLUDED.id_canal_mkt,
-                des_canal_mkt = EXCLUDED.des_canal_mkt,
-                id_segmento_mkt = EXCLUDED.id_segmento_mkt,
-                des_segmento_mkt = EXCLUDED.des_segmento_mkt,
-                id_subcanal_mkt = EXCLUDED.id_subcanal_mkt,
-                des_subcanal_mkt = EXCLUDED.des_subcanal_mkt,
-                id_ruta_fv1 = EXCLUDED.id_ruta_fv1,
-                des_personal_fv1 = EXCLUDED.des_personal_fv1,
-                id_ruta_fv4 = EXCLUDED.id_ruta_fv4,
-                des_personal_fv4 = EXCLUDED.des_personal_fv4,
-                id_ramo = EXCLUDED.id_ramo,
-                des_ramo = EXCLUDED.des_ramo,
-                id_localidad = EXCLUDED.id_localidad,
-                des_localidad = EXCLUDED.des_localidad,
-                id_provincia = EXCLUDED.id_provincia,
-                des_provincia = EXCLUDED.des_provincia,
-                latitud = EXCLUDED.latitud,
-                longitud = EXCLUDED.longitud,
-                id_lista_precio = EXCLUDED.id_lista_precio,
-                des_lista_precio = EXCLUDED.des_lista_precio,
-                telefono_fijo = EXCLUDED.telefono_fijo,
-                telefono_movil = EXCLUDED.telefono_movil,
-                anulado = EXCLUDED.anulado
-        """
+        posicion = min(consumer_position(cursor, previo) for previo in UPSTREAM)
+        insert_query = _build_insert_query()
 
         cursor.execute(insert_query)
         inserted = cursor.rowcount
 
+        advance_consumer(cursor, 'gold.dim_cliente', posicion)
+
         raw_conn.commit()
         cursor.close()
 
@@ -165,5 +235,35 @@ def load_dim_cliente():
         logger.info(f"dim_cliente completado: {inserted:,} registros en {total_time:.2f}s")
 
 
+
+def load_dim_cliente_changes():
+    """
+    Recarga en dim_cliente solo los clientes afectados por cambios de maestros.
+
+    Aplica los cambios de bronze.raw_masters_changes (clientes, rutas y staff) que ya
+    aplicaron las tablas de silver: borra y vuelve a insertar los clientes afectados y
+    actualiza las descripciones de sucursal/marketing que hayan cambiado.
+    """
+    start_time = datetime.now()
+    logger.info("Cargando dim_cliente (clientes modificados)...")
+
+    filas = apply_changes('gold.dim_cliente', [
+        _CLIENTES_AFECTADOS_SQL,
+        "DELETE FROM gold.dim_cliente WHERE id_cliente IN (SELECT id_cliente FROM tmp_dim_clientes)",
+        _build_insert_query("SELECT id_cliente FROM tmp_dim_clientes"),
+        *_DESCRIPCIONES_SQL,
+    ], after=UPSTREAM)
+
+    if filas is None:
+        logger.info("dim_cliente: sin cambios de maestros pendientes")
+        return
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(
+        f"dim_cliente completado: {filas[0]:,} clientes afectados, {filas[2]:,} recargados, "
+        f"{sum(filas[3:]):,} descripciones actualizadas en {total_time:.2f}s"
+    )
+
+
 if __name__ == '__main__':
     load_dim_cliente()
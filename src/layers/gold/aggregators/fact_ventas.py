@@ -9,7 +9,43 @@ from config import get_logger
 logger = get_logger(__name__)
 
 
-def load_fact_ventas(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False):
+def _build_insert_query(where_clause: str) -> str:
+    """INSERT INTO gold.fact_ventas SELECT ... FROM silver.fact_ventas con el filtro indicado."""
+    return f"""
+        INSERT INTO gold.fact_ventas (
+            id_cliente, id_articulo, id_vendedor, id_sucursal, fecha_comprobante,
+            id_empresa, id_documento, letra, serie, nro_doc, anulado,
+            cantidades_con_cargo, cantidades_sin_cargo, cantidades_total,
+            subtotal_neto, subtotal_final, bonificacion,
+            cantidad_total_htls
+        )
+        SELECT
+            fv.id_cliente,
+            fv.id_articulo,
+            fv.id_vendedor,
+            fv.id_sucursal,
+            fv.fecha_comprobante,
+            fv.id_empresa,
+            fv.id_documento,
+            fv.letra,
+            fv.serie,
+            fv.nro_doc,
+            fv.anulado,
+            fv.cantidades_con_cargo,
+            fv.cantidades_sin_cargo,
+            fv.cantidades_total,
+            fv.subtotal_neto,
+            fv.subtotal_final,
+            fv.bonificacion,
+            fv.cantidades_total * h.factor_hectolitros AS cantidad_total_htls
+        FROM silver.fact_ventas fv
+        LEFT JOIN silver.hectolitros h ON fv.id_articulo = h.id_articulo
+        {where_clause}
+    """
+
+
+def load_fact_ventas(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False,
+                     id_empresa: int = None):
     """
     Carga fact_ventas en Gold desde Silver.
 
@@ -17,6 +53,7 @@ def load_fact_ventas(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
         fecha_desde: Fecha inicio (YYYY-MM-DD)
         fecha_hasta: Fecha fin (YYYY-MM-DD)
         full_refresh: Si True, elimina todo y recarga
+        id_empresa: Recargar solo las ventas de esa empresa (opcional)
     """
     start_time = datetime.now()
     logger.info("Cargando gold.fact_ventas...")
@@ -30,53 +67,30 @@ def load_fact_ventas(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
         # Determinar modo de carga (fechas tienen prioridad sobre full_refresh)
         if fecha_desde and fecha_hasta:
             logger.debug(f"Carga incremental: {fecha_desde} a {fecha_hasta}")
-            cursor.execute(
-                "DELETE FROM gold.fact_ventas WHERE fecha_comprobante BETWEEN %s AND %s",
-                (fecha_desde, fecha_hasta)
-            )
-            where_clause = "WHERE fecha_comprobante BETWEEN %s AND %s"
+            condicion = "fecha_comprobante BETWEEN %s AND %s"
             params = (fecha_desde, fecha_hasta)
         elif full_refresh:
             logger.debug("Full refresh: eliminando todos los datos...")
-            cursor.execute("DELETE FROM gold.fact_ventas")
-            where_clause = ""
-            params = None
+            condicion = "TRUE"
+            params = ()
         else:
             logger.debug("Carga completa (sin filtro de fecha)...")
+            condicion = "TRUE"
+            params = ()
+
+        if id_empresa is not None:
+            logger.debug(f"Solo empresa {id_empresa}")
+            condicion += " AND id_empresa = %s"
+            params += (id_empresa,)
+
+        if params:
+            cursor.execute(f"DELETE FROM gold.fact_ventas WHERE {condicion}", params)
+            where_clause = f"WHERE {condicion}"
+        else:
             cursor.execute("DELETE FROM gold.fact_ventas")
             where_clause = ""
-            params = None
-
-        insert_query = f"""
-            INSERT INTO gold.fact_ventas (
-                id_cliente, id_articulo, id_vendedor, id_sucursal, fecha_comprobante,
-                id_documento, letra, serie, nro_doc, anulado,
-                cantidades_con_cargo, cantidades_sin_cargo, cantidades_total,
-                subtotal_neto, subtotal_final, bonificacion,
-                cantidad_total_htls
-            )
-            SELECT
-                fv.id_cliente,
-                fv.id_articulo,
-                fv.id_vendedor,
-                fv.id_sucursal,
-                fv.fecha_comprobante,
-                fv.id_documento,
-                fv.letra,
-                fv.serie,
-                fv.nro_doc,
-                fv.anulado,
-                fv.cantidades_con_cargo,
-                fv.cantidades_sin_cargo,
-                fv.cantidades_total,
-                fv.subtotal_neto,
-                fv.subtotal_final,
-                fv.bonificacion,
-                fv.cantidades_total * h.factor_hectolitros AS cantidad_total_htls
-            FROM silver.fact_ventas fv
-            LEFT JOIN silver.hectolitros h ON fv.id_articulo = h.id_articulo
-            {where_clause}
-        """
+
+        insert_query = _build_insert_query(where_clause)
 
         cursor.execute(insert_query, params if params else None)
         inserted = cursor.rowcount
@@ -89,5 +103,72 @@ def load_fact_ventas(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
         logger.info(f"gold.fact_ventas completado: {inserted:,} registros en {total_time:.2f}s ({throughput:,.0f} reg/s)")
 
 
+def load_fact_ventas_changes():
+    """
+    Aplica en gold.fact_ventas solo los documentos modificados ya aplicados en silver.
+
+    Toma de bronze.raw_sales_changes los documentos con silver_applied_at, recarga sus
+    líneas desde silver.fact_ventas y elimina los cambios procesados (gold es el último
+    consumidor).
+    """
+    start_time = datetime.now()
+    logger.info("Cargando gold.fact_ventas (documentos modificados)...")
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+
+        cursor.execute("SELECT MAX(id) FROM bronze.raw_sales_changes WHERE silver_applied_at IS NOT NULL")
+        hasta_id = cursor.fetchone()[0]
+
+        if hasta_id is None:
+            logger.info("Sin documentos modificados pendientes")
+            cursor.close()
+            return
+
+        cursor.execute("""
+            CREATE TEMP TABLE tmp_documentos ON COMMIT DROP AS
+            SELECT DISTINCT date_comprobante, id_empresa, id_documento, letra, serie, nro_doc
+            FROM bronze.raw_sales_changes
+            WHERE silver_applied_at IS NOT NULL AND id <= %s
+        """, (hasta_id,))
+        documentos = cursor.rowcount
+
+        cursor.execute("""
+            DELETE FROM gold.fact_ventas f
+            USING tmp_documentos d
+            WHERE f.fecha_comprobante = d.date_comprobante
+              AND f.id_empresa IS NOT DISTINCT FROM d.id_empresa
+              AND f.id_documento IS NOT DISTINCT FROM d.id_documento
+              AND f.letra IS NOT DISTINCT FROM d.letra
+              AND f.serie IS NOT DISTINCT FROM d.serie
+              AND f.nro_doc IS NOT DISTINCT FROM d.nro_doc
+        """)
+
+        cursor.execute(_build_insert_query("""
+            WHERE EXISTS (
+                SELECT 1 FROM tmp_documentos d
+                WHERE d.date_comprobante = fv.fecha_comprobante
+                  AND d.id_empresa IS NOT DISTINCT FROM fv.id_empresa
+                  AND d.id_documento IS NOT DISTINCT FROM fv.id_documento
+                  AND d.letra IS NOT DISTINCT FROM fv.letra
+                  AND d.serie IS NOT DISTINCT FROM fv.serie
+                  AND d.nro_doc IS NOT DISTINCT FROM fv.nro_doc
+            )
+        """))
+        inserted = cursor.rowcount
+
+        cursor.execute(
+            "DELETE FROM bronze.raw_sales_changes WHERE silver_applied_at IS NOT NULL AND id <= %s",
+            (hasta_id,)
+        )
+
+        raw_conn.commit()
+        cursor.close()
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(f"gold.fact_ventas completado: {documentos:,} documentos, {inserted:,} registros en {total_time:.2f}s")
+
+
 if __name__ == '__main__':
     load_fact_ventas(full_refresh=True)
@@ -0,0 +1,122 @@
+"""
+Contexto de una corrida del pipeline: sesión del ERP y pool de conexiones compartidos.
+
+Sin contexto, cada loader crea su propio ChessClient (una sesión HTTP y un login por
+paso). El orchestrator y daily_load abren un RunContext al inicio de la corrida y
+todos los pasos lo usan:
+
+  - client: un ChessClient (envuelto con wrap_client) creado la primera vez que se
+    pide, autenticado una sola vez y con un pool HTTP keep-alive de
+    ERP_HTTP_POOL_SIZE conexiones (se reutiliza TCP/TLS entre pasos y entre hilos).
+    Con varias empresas (ERP_COMPANIES) hay uno por prefijo de credenciales: client_for()
+  - engine: el engine de database, con el pool dimensionado por DB_POOL_SIZE /
+    DB_MAX_OVERFLOW; al cerrar el contexto se liberan sus conexiones
+
+Los loaders piden el cliente con current_client() y solo crean uno propio si no hay
+una corrida activa (ej: ejecutados sueltos con `python -m`).
+
+El contexto es del proceso y no un parámetro de cada paso, a propósito: silver y gold
+ya comparten el engine de database (un solo pool por proceso, que es el que dimensiona
+el contexto), los loaders de maestros ya aceptan un `client` explícito, y pasar el
+contexto por cada función de bronze/silver/gold cambiaría la firma de todos los pasos,
+del orchestrator y de daily_load sin reutilizar ninguna conexión más. Quien necesite
+otro cliente o engine (tests, scripts) crea su RunContext y lo activa.
+
+Uso:
+    with RunContext() as run:
+        bronze_masters()
+        bronze_sales('2025-01-01', '2025-01-31')
+"""
+import threading
+
+from chesserp.client import ChessClient
+from requests.adapters import HTTPAdapter
+
+from database import engine as default_engine
+from config import get_logger, settings
+from layers.bronze.api_cache import get_cache_mode
+from layers.bronze.api_client import wrap_client
+from layers.bronze.raw_passthrough import client_session
+
+logger = get_logger(__name__)
+
+_current = None
+_current_lock = threading.Lock()
+
+
+class RunContext:
+    """Recursos compartidos por los pasos de una corrida."""
+
+    def __init__(self, engine=None, prefix: str = "EMPRESA1_", http_pool_size: int = None):
+        self.engine = default_engine if engine is None else engine
+        self.prefix = prefix
+        self.http_pool_size = settings.ERP_HTTP_POOL_SIZE if http_pool_size is None else http_pool_size
+        self._chess = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Cliente del ERP de la corrida (se crea y autentica la primera vez)."""
+        return self.client_for(self.prefix)
+
+    def client_for(self, prefix: str):
+        """Cliente del ERP de la corrida para un prefijo de credenciales (ej: EMPRESA2_)."""
+        with self._lock:
+            if prefix not in self._clients:
+                chess = ChessClient.from_env(prefix=prefix)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.http_pool_size)
+                session = client_session(chess)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+
+                client = wrap_client(chess)
+                # En modo replay el cliente real no se usa: no hay login
+                if get_cache_mode() != 'replay':
+                    client.login()
+                self._chess[prefix], self._clients[prefix] = chess, client
+            return self._clients[prefix]
+
+    def activate(self) -> 'RunContext':
+        """Registra el contexto como la corrida activa del proceso."""
+        global _current
+        with _current_lock:
+            _current = self
+        logger.debug(f"Corrida activa: sesión del ERP compartida (pool HTTP de {self.http_pool_size})")
+        return self
+
+    def close(self) -> None:
+        """Cierra la sesión del ERP, libera las conexiones del pool y desactiva el contexto."""
+        global _current
+        with _current_lock:
+            if _current is self:
+                _current = None
+        with self._lock:
+            for chess in self._chess.values():
+                client_session(chess).close()
+            self._chess.clear()
+            self._clients.clear()
+        self.engine.dispose()
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def current_context():
+    """Corrida activa (None si no hay)."""
+    return _current
+
+
+def current_client(prefix: str = None):
+    """
+    Cliente del ERP de la corrida activa (del prefijo indicado o el default), o None si
+    no hay corrida (el loader crea el suyo).
+    """
+    ctx = _current
+    if ctx is None:
+        return None
+    return ctx.client_for(prefix or ctx.prefix)
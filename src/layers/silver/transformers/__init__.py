@@ -1,11 +1,16 @@
-from layers.silver.transformers.sales_transformer import transform_sales
-from layers.silver.transformers.clients_transformer import transform_clients
-from layers.silver.transformers.articles_transformer import transform_articles
-from layers.silver.transformers.client_forces_transformer import transform_client_forces
+from layers.silver.transformers.sales_transformer import (
+    transform_sales,
+    transform_sales_changes,
+    transform_sales_incremental,
+    transform_sales_parallel,
+)
+from layers.silver.transformers.clients_transformer import transform_clients, transform_clients_changes
+from layers.silver.transformers.articles_transformer import transform_articles, transform_articles_changes
+from layers.silver.transformers.client_forces_transformer import transform_client_forces, transform_client_forces_changes
 from layers.silver.transformers.branches_transformer import transform_branches
 from layers.silver.transformers.sales_forces_transformer import transform_sales_forces
-from layers.silver.transformers.staff_transformer import transform_staff
-from layers.silver.transformers.routes_transformer import transform_routes
+from layers.silver.transformers.staff_transformer import transform_staff, transform_staff_changes
+from layers.silver.transformers.routes_transformer import transform_routes, transform_routes_changes
 from layers.silver.transformers.article_groupings_transformer import transform_article_groupings
 from layers.silver.transformers.marketing_transformer import transform_marketing, transform_marketing_segments, transform_marketing_channels, transform_marketing_subchannels
 from layers.silver.transformers.stock_transformer import transform_stock
@@ -14,13 +19,21 @@ from layers.silver.transformers.hectolitros_transformer import transform_hectoli
 
 __all__ = [
     'transform_sales',
+    'transform_sales_changes',
+    'transform_sales_incremental',
+    'transform_sales_parallel',
     'transform_clients',
+    'transform_clients_changes',
     'transform_articles',
+    'transform_articles_changes',
     'transform_client_forces',
+    'transform_client_forces_changes',
     'transform_branches',
     'transform_sales_forces',
     'transform_staff',
+    'transform_staff_changes',
     'transform_routes',
+    'transform_routes_changes',
     'transform_article_groupings',
     'transform_marketing',
     'transform_marketing_segments',
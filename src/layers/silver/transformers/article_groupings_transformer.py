@@ -49,10 +49,10 @@ def transform_article_groupings(full_refresh: bool = True):
                 des_agrupacion
             )
             SELECT DISTINCT ON (
-                NULLIF(a.data_raw->>'idArticulo', '')::integer,
+                a.id_articulo,
                 agrup->>'idFormaAgrupar'
             )
-                NULLIF(a.data_raw->>'idArticulo', '')::integer AS id_articulo,
+                a.id_articulo,
                 agrup->>'idFormaAgrupar',
                 agrup->>'idAgrupacion',
                 agrup->>'desAgrupacion'
@@ -62,7 +62,7 @@ def transform_article_groupings(full_refresh: bool = True):
                 'MARCA', 'GENERICO', 'CALIBRE', 'ESQUEMA', 'PROVEED', 'UNIDAD DE NEGOCIO'
             )
             ORDER BY
-                NULLIF(a.data_raw->>'idArticulo', '')::integer,
+                a.id_articulo,
                 agrup->>'idFormaAgrupar'
         """
 
@@ -8,10 +8,81 @@ Este transformer solo inserta los datos core del artículo.
 from database import engine
 from datetime import datetime
 from config import get_logger
+from layers.bronze.master_changes import MASTER_ENTITIES, apply_changes, last_change_id, advance_consumer
+from layers.silver.transformers.extraction import apply_strategy, record_join
 
 logger = get_logger(__name__)
 
 
+def _build_insert_query(where_clause: str = '', strategy: str = None) -> str:
+    """
+    INSERT ... SELECT desde bronze.raw_articles (where_clause filtra las filas de bronze).
+    strategy: extracción de data_raw, operator o record (ver extraction.py)
+    """
+    return apply_strategy(f"""
+        INSERT INTO silver.articles (
+            -- Datos principales
+            id_articulo, des_articulo, des_corta_articulo, anulado, fecha_alta,
+            -- Características
+            es_combo, es_alcoholico, es_activo_fijo, pesable, visible_mobile, tiene_retornables,
+            -- Unidades y presentación
+            id_unidad_medida, des_unidad_medida, valor_unidad_medida, unidades_bulto,
+            id_presentacion_bulto, des_presentacion_bulto, id_presentacion_unidad, des_presentacion_unidad,
+            -- Códigos de barra
+            cod_barra_bulto, cod_barra_unidad,
+            -- Impuestos
+            tasa_iva, tasa_iibb, tasa_internos, internos_bulto, exento_iva, iva_diferencial,
+            -- Logística
+            peso_bulto, bultos_pallet, pisos_pallet
+        )
+        SELECT
+            -- === DATOS PRINCIPALES ===
+            a.id_articulo,
+            a.data_raw->>'desArticulo',
+            a.data_raw->>'desCortaArticulo',
+            COALESCE((a.data_raw->>'anulado')::boolean, false),
+            NULLIF(a.data_raw->>'fechaAlta', '')::date,
+
+            -- === CARACTERÍSTICAS ===
+            COALESCE((a.data_raw->>'esCombo')::boolean, false),
+            COALESCE((a.data_raw->>'esAlcoholico')::boolean, false),
+            COALESCE((a.data_raw->>'esActivoFijo')::boolean, false),
+            COALESCE((a.data_raw->>'pesable')::boolean, false),
+            COALESCE((a.data_raw->>'visibleMobile')::boolean, true),
+            COALESCE((a.data_raw->>'tieneRetornables')::boolean, false),
+
+            -- === UNIDADES Y PRESENTACIÓN ===
+            NULLIF(a.data_raw->>'idUnidadMedida', '')::integer,
+            a.data_raw->>'desUnidadMedida',
+            NULLIF(a.data_raw->>'valorUnidadMedida', '')::numeric(10,4),
+            NULLIF(a.data_raw->>'unidadesBulto', '')::integer,
+            a.data_raw->>'idPresentacionBulto',
+            a.data_raw->>'desPresentacionBulto',
+            a.data_raw->>'idPresentacionUnidad',
+            a.data_raw->>'desPresentacionUnidad',
+
+            -- === CÓDIGOS DE BARRA ===
+            a.data_raw->>'codBarraBulto',
+            a.data_raw->>'codBarraUnidad',
+
+            -- === IMPUESTOS ===
+            NULLIF(a.data_raw->>'tasaIva', '')::numeric(8,4),
+            NULLIF(a.data_raw->>'tasaIibb', '')::numeric(8,4),
+            NULLIF(a.data_raw->>'tasaInternos', '')::numeric(8,4),
+            NULLIF(a.data_raw->>'internosBulto', '')::numeric(15,4),
+            COALESCE((a.data_raw->>'exentoIva')::boolean, false),
+            COALESCE((a.data_raw->>'ivaDiferencial')::boolean, false),
+
+            -- === LOGÍSTICA ===
+            NULLIF(a.data_raw->>'pesoBulto', '')::numeric(10,4),
+            NULLIF(a.data_raw->>'bultosPallet', '')::integer,
+            NULLIF(a.data_raw->>'pisosPallet', '')::integer
+
+        FROM bronze.raw_articles a {record_join()}
+        {where_clause}
+    """, {'a.data_raw': 'r'}, strategy)
+
+
 def transform_articles(full_refresh: bool = True):
     """
     Transforma datos de bronze.raw_articles a silver.articles.
@@ -53,67 +124,8 @@ def transform_articles(full_refresh: bool = True):
         logger.debug("Ejecutando INSERT INTO SELECT...")
 
         # INSERT INTO SELECT - Solo datos core (sin agrupaciones)
-        insert_query = """
-            INSERT INTO silver.articles (
-                -- Datos principales
-                id_articulo, des_articulo, des_corta_articulo, anulado, fecha_alta,
-                -- Características
-                es_combo, es_alcoholico, es_activo_fijo, pesable, visible_mobile, tiene_retornables,
-                -- Unidades y presentación
-                id_unidad_medida, des_unidad_medida, valor_unidad_medida, unidades_bulto,
-                id_presentacion_bulto, des_presentacion_bulto, id_presentacion_unidad, des_presentacion_unidad,
-                -- Códigos de barra
-                cod_barra_bulto, cod_barra_unidad,
-                -- Impuestos
-                tasa_iva, tasa_iibb, tasa_internos, internos_bulto, exento_iva, iva_diferencial,
-                -- Logística
-                peso_bulto, bultos_pallet, pisos_pallet
-            )
-            SELECT
-                -- === DATOS PRINCIPALES ===
-                NULLIF(a.data_raw->>'idArticulo', '')::integer,
-                a.data_raw->>'desArticulo',
-                a.data_raw->>'desCortaArticulo',
-                COALESCE((a.data_raw->>'anulado')::boolean, false),
-                NULLIF(a.data_raw->>'fechaAlta', '')::date,
-
-                -- === CARACTERÍSTICAS ===
-                COALESCE((a.data_raw->>'esCombo')::boolean, false),
-                COALESCE((a.data_raw->>'esAlcoholico')::boolean, false),
-                COALESCE((a.data_raw->>'esActivoFijo')::boolean, false),
-                COALESCE((a.data_raw->>'pesable')::boolean, false),
-                COALESCE((a.data_raw->>'visibleMobile')::boolean, true),
-                COALESCE((a.data_raw->>'tieneRetornables')::boolean, false),
-
-                -- === UNIDADES Y PRESENTACIÓN ===
-                NULLIF(a.data_raw->>'idUnidadMedida', '')::integer,
-                a.data_raw->>'desUnidadMedida',
-                NULLIF(a.data_raw->>'valorUnidadMedida', '')::numeric(10,4),
-                NULLIF(a.data_raw->>'unidadesBulto', '')::integer,
-                a.data_raw->>'idPresentacionBulto',
-                a.data_raw->>'desPresentacionBulto',
-                a.data_raw->>'idPresentacionUnidad',
-                a.data_raw->>'desPresentacionUnidad',
-
-                -- === CÓDIGOS DE BARRA ===
-                a.data_raw->>'codBarraBulto',
-                a.data_raw->>'codBarraUnidad',
-
-                -- === IMPUESTOS ===
-                NULLIF(a.data_raw->>'tasaIva', '')::numeric(8,4),
-                NULLIF(a.data_raw->>'tasaIibb', '')::numeric(8,4),
-                NULLIF(a.data_raw->>'tasaInternos', '')::numeric(8,4),
-                NULLIF(a.data_raw->>'internosBulto', '')::numeric(15,4),
-                COALESCE((a.data_raw->>'exentoIva')::boolean, false),
-                COALESCE((a.data_raw->>'ivaDiferencial')::boolean, false),
-
-                -- === LOGÍSTICA ===
-                NULLIF(a.data_raw->>'pesoBulto', '')::numeric(10,4),
-                NULLIF(a.data_raw->>'bultosPallet', '')::integer,
-                NULLIF(a.data_raw->>'pisosPallet', '')::integer
-
-            FROM bronze.raw_articles a
-        """
+        posicion = last_change_id(cursor)
+        insert_query = _build_insert_query()
 
         insert_start = datetime.now()
         cursor.execute(insert_query)
@@ -123,6 +135,8 @@ def transform_articles(full_refresh: bool = True):
         logger.debug(f"INSERT completado en {insert_time:.2f}s ({inserted:,} registros)")
 
         commit_start = datetime.now()
+        advance_consumer(cursor, 'silver.articles', posicion)
+
         raw_conn.commit()
         commit_time = (datetime.now() - commit_start).total_seconds()
         logger.debug(f"COMMIT completado en {commit_time:.2f}s")
@@ -134,5 +148,24 @@ def transform_articles(full_refresh: bool = True):
         logger.info(f"Transformación completada: {inserted:,} artículos en {total_time:.2f}s ({throughput:,.0f} reg/s)")
 
 
+def transform_articles_changes():
+    """Recalcula en silver.articles solo los artículos modificados en bronze (ver layers/bronze/master_changes.py)."""
+    start_time = datetime.now()
+    logger.info("Iniciando transformación de artículos modificados...")
+
+    _, clave_bronze = MASTER_ENTITIES['articles']
+    filas = apply_changes('silver.articles', [
+        "DELETE FROM silver.articles WHERE id_articulo IN (SELECT NULLIF(entity_key, '')::integer FROM tmp_master_keys)",
+        _build_insert_query(f"WHERE {clave_bronze} IN (SELECT entity_key FROM tmp_master_keys)"),
+    ])
+
+    if filas is None:
+        logger.info("Sin artículos modificados en bronze")
+        return
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Transformación completada: {filas[0]:,} artículos eliminados, {filas[1]:,} insertados en {total_time:.2f}s")
+
+
 if __name__ == '__main__':
     transform_articles()
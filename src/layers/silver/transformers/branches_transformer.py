@@ -40,10 +40,10 @@ def transform_branches(full_refresh: bool = True):
         insert_query = """
             INSERT INTO silver.branches (id_sucursal, descripcion)
             SELECT DISTINCT
-                NULLIF(data_raw->>'idSucursal', '')::integer,
+                id_sucursal,
                 data_raw->>'desSucursal'
             FROM bronze.raw_staff
-            WHERE NULLIF(data_raw->>'idSucursal', '') IS NOT NULL
+            WHERE id_sucursal IS NOT NULL
             ON CONFLICT (id_sucursal) DO NOTHING
         """
 
@@ -8,10 +8,49 @@ Solo se insertan asignaciones vigentes (fechaFinFuerza = '9999-12-31').
 from database import engine
 from datetime import datetime
 from config import get_logger
+from layers.bronze.master_changes import MASTER_ENTITIES, apply_changes, last_change_id, advance_consumer
 
 logger = get_logger(__name__)
 
 
+def _build_insert_query(condicion: str = '') -> str:
+    """INSERT ... SELECT desde bronze.raw_clients (condicion: filtro AND adicional sobre bronze)."""
+    return f"""
+        INSERT INTO silver.client_forces (
+            id_cliente,
+            id_ruta,
+            dias_visita,
+            semana_visita,
+            periodicidad_visita,
+            id_modo_atencion,
+            fecha_inicio,
+            fecha_fin
+        )
+        SELECT DISTINCT ON (
+            b.id_cliente,
+            (fuerza->>'idRuta')::integer,
+            NULLIF(fuerza->>'fechaInicioFuerza', '')::date
+        )
+            b.id_cliente,
+            (fuerza->>'idRuta')::integer,
+            fuerza->>'diasVisita',
+            (fuerza->>'semanaVisita')::integer,
+            (fuerza->>'periodicidadVisita')::integer,
+            fuerza->>'idModoAtencion',
+            NULLIF(fuerza->>'fechaInicioFuerza', '')::date,
+            NULLIF(fuerza->>'fechaFinFuerza', '')::date
+        FROM bronze.raw_clients b,
+             LATERAL jsonb_array_elements(b.data_raw->'eClifuerza') AS fuerza
+        WHERE fuerza->>'fechaFinFuerza' = '9999-12-31'
+          AND (fuerza->>'idFuerzaVentas')::integer IN (1, 4)
+          {condicion}
+        ORDER BY
+            b.id_cliente,
+            (fuerza->>'idRuta')::integer,
+            NULLIF(fuerza->>'fechaInicioFuerza', '')::date
+    """
+
+
 def transform_client_forces(full_refresh: bool = True):
     """
     Transforma eClifuerza de bronze.raw_clients a silver.client_forces.
@@ -43,39 +82,8 @@ def transform_client_forces(full_refresh: bool = True):
         # INSERT con LATERAL expansion
         # Una fila por cada ruta vigente por cliente
         # La fuerza de venta se obtiene via JOIN a routes
-        insert_query = """
-            INSERT INTO silver.client_forces (
-                id_cliente,
-                id_ruta,
-                dias_visita,
-                semana_visita,
-                periodicidad_visita,
-                id_modo_atencion,
-                fecha_inicio,
-                fecha_fin
-            )
-            SELECT DISTINCT ON (
-                NULLIF(b.data_raw->>'idCliente', '')::integer,
-                (fuerza->>'idRuta')::integer,
-                NULLIF(fuerza->>'fechaInicioFuerza', '')::date
-            )
-                NULLIF(b.data_raw->>'idCliente', '')::integer AS id_cliente,
-                (fuerza->>'idRuta')::integer,
-                fuerza->>'diasVisita',
-                (fuerza->>'semanaVisita')::integer,
-                (fuerza->>'periodicidadVisita')::integer,
-                fuerza->>'idModoAtencion',
-                NULLIF(fuerza->>'fechaInicioFuerza', '')::date,
-                NULLIF(fuerza->>'fechaFinFuerza', '')::date
-            FROM bronze.raw_clients b,
-                 LATERAL jsonb_array_elements(b.data_raw->'eClifuerza') AS fuerza
-            WHERE fuerza->>'fechaFinFuerza' = '9999-12-31'
-              AND (fuerza->>'idFuerzaVentas')::integer IN (1, 4)
-            ORDER BY
-                NULLIF(b.data_raw->>'idCliente', '')::integer,
-                (fuerza->>'idRuta')::integer,
-                NULLIF(fuerza->>'fechaInicioFuerza', '')::date
-        """
+        posicion = last_change_id(cursor)
+        insert_query = _build_insert_query()
 
         insert_start = datetime.now()
         cursor.execute(insert_query)
@@ -84,6 +92,8 @@ def transform_client_forces(full_refresh: bool = True):
 
         logger.debug(f"INSERT completado en {insert_time:.2f}s ({inserted:,} registros)")
 
+        advance_consumer(cursor, 'silver.client_forces', posicion)
+
         commit_start = datetime.now()
         raw_conn.commit()
         commit_time = (datetime.now() - commit_start).total_seconds()
@@ -96,5 +106,24 @@ def transform_client_forces(full_refresh: bool = True):
         logger.info(f"Transformación completada: {inserted:,} client_forces en {total_time:.2f}s ({throughput:,.0f} reg/s)")
 
 
+def transform_client_forces_changes():
+    """Recalcula en silver.client_forces solo las asignaciones de los clientes modificados en bronze."""
+    start_time = datetime.now()
+    logger.info("Iniciando transformación de client_forces de clientes modificados...")
+
+    _, clave_bronze = MASTER_ENTITIES['clients']
+    filas = apply_changes('silver.client_forces', [
+        "DELETE FROM silver.client_forces WHERE id_cliente IN (SELECT NULLIF(entity_key, '')::integer FROM tmp_master_keys)",
+        _build_insert_query(f"AND {clave_bronze} IN (SELECT entity_key FROM tmp_master_keys)"),
+    ])
+
+    if filas is None:
+        logger.info("Sin clientes modificados en bronze")
+        return
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Transformación completada: {filas[0]:,} client_forces eliminados, {filas[1]:,} insertados en {total_time:.2f}s")
+
+
 if __name__ == '__main__':
     transform_client_forces()
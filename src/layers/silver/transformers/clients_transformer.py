@@ -8,10 +8,98 @@ Este transformer solo inserta los datos core del cliente.
 from database import engine
 from datetime import datetime
 from config import get_logger
+from layers.bronze.master_changes import MASTER_ENTITIES, apply_changes, last_change_id, advance_consumer
+from layers.silver.transformers.extraction import apply_strategy, record_join
 
 logger = get_logger(__name__)
 
 
+def _build_insert_query(where_clause: str = '', strategy: str = None) -> str:
+    """
+    INSERT ... SELECT desde bronze.raw_clients (where_clause filtra las filas de bronze).
+    strategy: extracción de data_raw y del alias vigente, operator o record (ver extraction.py)
+    """
+    return apply_strategy(f"""
+        WITH alias_vigente AS (
+            -- Extraer datos fiscales del alias vigente (primer elemento de eClialias)
+            SELECT
+                id_cliente,
+                data_raw,
+                (data_raw->'eClialias'->0) AS alias
+            FROM bronze.raw_clients
+            {where_clause}
+        )
+        INSERT INTO silver.clients (
+            -- Datos principales
+            id_cliente, razon_social, fantasia, id_ramo, desc_ramo, anulado,
+            calle, id_localidad, desc_localidad, id_provincia, desc_provincia,
+            -- Fechas
+            fecha_alta, fecha_baja,
+            -- Organización (FK a branches)
+            id_sucursal,
+            -- Datos fiscales
+            identificador, id_tipo_identificador, desc_tipo_identificador,
+            id_tipo_contribuyente, desc_tipo_contribuyente, es_inscripto_iibb,
+            -- Comercial
+            id_lista_precio, desc_lista_precio, id_canal_mkt, desc_canal_mkt,
+            id_segmento_mkt, desc_segmento_mkt, id_subcanal_mkt, desc_subcanal_mkt,
+            -- Geolocalización
+            latitud, longitud,
+            -- Contacto
+            telefono_fijo, telefono_movil, email
+        )
+        SELECT
+            -- === DATOS PRINCIPALES ===
+            a.id_cliente,
+            a.alias->>'razonSocial',
+            a.alias->>'fantasiaSocial',
+            NULLIF(a.data_raw->>'idRamo', '')::integer,
+            a.data_raw->>'desRamo',
+            COALESCE((a.data_raw->>'anulado')::boolean, false),
+            a.data_raw->>'calle',
+            NULLIF(a.data_raw->>'idLocalidad', '')::integer,
+            a.data_raw->>'desLocalidad',
+            a.data_raw->>'idProvincia',
+            a.data_raw->>'desProvincia',
+
+            -- === FECHAS ===
+            NULLIF(NULLIF(a.data_raw->>'fechaAlta', ''), '0001-01-01')::date,
+            NULLIF(NULLIF(a.data_raw->>'fechaBaja', ''), '9999-12-31')::date,
+
+            -- === ORGANIZACIÓN (FK a branches) ===
+            NULLIF(a.data_raw->>'idSucursal', '')::integer,
+
+            -- === DATOS FISCALES (desde eClialias) ===
+            a.alias->>'identificador',
+            NULLIF(a.alias->>'idTipoIdentificador', '')::integer,
+            a.alias->>'desTipoIdentificador',
+            a.alias->>'idTipoContribuyente',
+            a.alias->>'desTipoContribuyente',
+            COALESCE((a.alias->>'esInscriptoIibb')::boolean, false),
+
+            -- === COMERCIAL ===
+            NULLIF(a.data_raw->>'idListaPrecio', '')::integer,
+            a.data_raw->>'desListaPrecio',
+            NULLIF(a.data_raw->>'idCanalMkt', '')::integer,
+            a.data_raw->>'desCanalMkt',
+            NULLIF(a.data_raw->>'idSegmentoMkt', '')::integer,
+            a.data_raw->>'desSegmentoMkt',
+            NULLIF(a.data_raw->>'idSubcanalMkt', '')::integer,
+            a.data_raw->>'desSubcanalMkt',
+
+            -- === GEOLOCALIZACIÓN ===
+            NULLIF(a.data_raw->>'latitudGeo', '')::numeric(15,6),
+            NULLIF(a.data_raw->>'longitudGeo', '')::numeric(15,6),
+
+            -- === CONTACTO ===
+            a.data_raw->>'telefonoFijo',
+            a.data_raw->>'telefonoMovil',
+            a.data_raw->>'email'
+
+        FROM alias_vigente a {record_join()} {record_join('ra')}
+    """, {'a.data_raw': 'r', 'a.alias': 'ra'}, strategy)
+
+
 def transform_clients(full_refresh: bool = True):
     """
     Transforma datos de bronze.raw_clients a silver.clients.
@@ -52,84 +140,11 @@ def transform_clients(full_refresh: bool = True):
         logger.info(f"Encontrados {total:,} registros (COUNT en {count_time:.2f}s)")
         logger.debug("Ejecutando INSERT INTO SELECT...")
 
+        # Posición del log de cambios que queda cubierta por este full refresh
+        posicion = last_change_id(cursor)
+
         # INSERT INTO SELECT - Solo datos core (sin fuerzas de venta)
-        insert_query = """
-            WITH alias_vigente AS (
-                -- Extraer datos fiscales del alias vigente (primer elemento de eClialias)
-                SELECT
-                    data_raw,
-                    (data_raw->'eClialias'->0) AS alias
-                FROM bronze.raw_clients
-            )
-            INSERT INTO silver.clients (
-                -- Datos principales
-                id_cliente, razon_social, fantasia, id_ramo, desc_ramo, anulado,
-                calle, id_localidad, desc_localidad, id_provincia, desc_provincia,
-                -- Fechas
-                fecha_alta, fecha_baja,
-                -- Organización (FK a branches)
-                id_sucursal,
-                -- Datos fiscales
-                identificador, id_tipo_identificador, desc_tipo_identificador,
-                id_tipo_contribuyente, desc_tipo_contribuyente, es_inscripto_iibb,
-                -- Comercial
-                id_lista_precio, desc_lista_precio, id_canal_mkt, desc_canal_mkt,
-                id_segmento_mkt, desc_segmento_mkt, id_subcanal_mkt, desc_subcanal_mkt,
-                -- Geolocalización
-                latitud, longitud,
-                -- Contacto
-                telefono_fijo, telefono_movil, email
-            )
-            SELECT
-                -- === DATOS PRINCIPALES ===
-                NULLIF(a.data_raw->>'idCliente', '')::integer,
-                a.alias->>'razonSocial',
-                a.alias->>'fantasiaSocial',
-                NULLIF(a.data_raw->>'idRamo', '')::integer,
-                a.data_raw->>'desRamo',
-                COALESCE((a.data_raw->>'anulado')::boolean, false),
-                a.data_raw->>'calle',
-                NULLIF(a.data_raw->>'idLocalidad', '')::integer,
-                a.data_raw->>'desLocalidad',
-                a.data_raw->>'idProvincia',
-                a.data_raw->>'desProvincia',
-
-                -- === FECHAS ===
-                NULLIF(NULLIF(a.data_raw->>'fechaAlta', ''), '0001-01-01')::date,
-                NULLIF(NULLIF(a.data_raw->>'fechaBaja', ''), '9999-12-31')::date,
-
-                -- === ORGANIZACIÓN (FK a branches) ===
-                NULLIF(a.data_raw->>'idSucursal', '')::integer,
-
-                -- === DATOS FISCALES (desde eClialias) ===
-                a.alias->>'identificador',
-                NULLIF(a.alias->>'idTipoIdentificador', '')::integer,
-                a.alias->>'desTipoIdentificador',
-                a.alias->>'idTipoContribuyente',
-                a.alias->>'desTipoContribuyente',
-                COALESCE((a.alias->>'esInscriptoIibb')::boolean, false),
-
-                -- === COMERCIAL ===
-                NULLIF(a.data_raw->>'idListaPrecio', '')::integer,
-                a.data_raw->>'desListaPrecio',
-                NULLIF(a.data_raw->>'idCanalMkt', '')::integer,
-                a.data_raw->>'desCanalMkt',
-                NULLIF(a.data_raw->>'idSegmentoMkt', '')::integer,
-                a.data_raw->>'desSegmentoMkt',
-                NULLIF(a.data_raw->>'idSubcanalMkt', '')::integer,
-                a.data_raw->>'desSubcanalMkt',
-
-                -- === GEOLOCALIZACIÓN ===
-                NULLIF(a.data_raw->>'latitudGeo', '')::numeric(15,6),
-                NULLIF(a.data_raw->>'longitudGeo', '')::numeric(15,6),
-
-                -- === CONTACTO ===
-                a.data_raw->>'telefonoFijo',
-                a.data_raw->>'telefonoMovil',
-                a.data_raw->>'email'
-
-            FROM alias_vigente a
-        """
+        insert_query = _build_insert_query()
 
         insert_start = datetime.now()
         cursor.execute(insert_query)
@@ -138,6 +153,8 @@ def transform_clients(full_refresh: bool = True):
 
         logger.debug(f"INSERT completado en {insert_time:.2f}s ({inserted:,} registros)")
 
+        advance_consumer(cursor, 'silver.clients', posicion)
+
         commit_start = datetime.now()
         raw_conn.commit()
         commit_time = (datetime.now() - commit_start).total_seconds()
@@ -150,5 +167,29 @@ def transform_clients(full_refresh: bool = True):
         logger.info(f"Transformación completada: {inserted:,} clientes en {total_time:.2f}s ({throughput:,.0f} reg/s)")
 
 
+def transform_clients_changes():
+    """
+    Recalcula en silver.clients solo los clientes modificados por la carga de bronze.
+
+    Lee las claves pendientes de bronze.raw_masters_changes: borra esos clientes de
+    silver y los vuelve a insertar desde bronze (los dados de baja ya no están).
+    """
+    start_time = datetime.now()
+    logger.info("Iniciando transformación de clientes modificados...")
+
+    _, clave_bronze = MASTER_ENTITIES['clients']
+    filas = apply_changes('silver.clients', [
+        "DELETE FROM silver.clients WHERE id_cliente IN (SELECT NULLIF(entity_key, '')::integer FROM tmp_master_keys)",
+        _build_insert_query(f"WHERE {clave_bronze} IN (SELECT entity_key FROM tmp_master_keys)"),
+    ])
+
+    if filas is None:
+        logger.info("Sin clientes modificados en bronze")
+        return
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Transformación completada: {filas[0]:,} clientes eliminados, {filas[1]:,} insertados en {total_time:.2f}s")
+
+
 if __name__ == '__main__':
     transform_clients()
@@ -0,0 +1,70 @@
+"""
+Estrategias de extracción de los campos de data_raw en los INSERT ... SELECT de silver.
+
+  - operator (default): cada columna lee su clave con data_raw->>'clave'. PostgreSQL
+    lee (y descomprime, si está en TOAST) el jsonb y lo recorre una vez por columna.
+  - record: un solo jsonb_to_record(data_raw) por fila, contra un registro declarado con
+    las claves que usa la consulta, y cada columna lee r."clave".
+
+Los builders escriben la consulta con el operador y marcan con record_join() el lugar del
+FROM donde va el registro; apply_strategy() deja la consulta como está o la reescribe.
+
+Las claves se declaran text: jsonb_to_record devuelve para un campo text lo mismo que ->>
+(strings sin comillas, números y booleanos como su texto, null como NULL), así que las
+conversiones no cambian (NULLIF(x, '')::integer, NULLIF(NULLIF(x, ''), '0001-01-01')::date)
+y '' o '0001-01-01' dan NULL igual en ambas estrategias.
+
+Comparación por transformer: python scripts/bench_json_extraction.py
+"""
+import re
+
+from config import settings
+
+STRATEGIES = ('operator', 'record')
+
+
+def record_join(alias: str = 'r') -> str:
+    """Marca del FROM donde la estrategia record agrega el jsonb_to_record de `alias`."""
+    return f"/* registro {alias} */"
+
+
+def record_keys(sql: str, expresion: str = 'data_raw') -> list:
+    """Claves leídas con `expresion`->>'clave' en la consulta, en orden de aparición."""
+    return list(dict.fromkeys(_patron(expresion).findall(sql)))
+
+
+def _patron(expresion: str):
+    # Sin letras ni punto antes: 'data_raw' no toma 'a.data_raw' ni 'bronze.raw_sales.data_raw'
+    return re.compile(rf"(?<![\w.]){re.escape(expresion)}->>'([^']+)'")
+
+
+def apply_strategy(sql: str, registros: dict = None, strategy: str = None) -> str:
+    """
+    Aplica la estrategia de extracción a una consulta escrita con el operador ->>.
+
+    Args:
+        sql: Consulta con record_join(alias) en el FROM de cada registro
+        registros: {expresión jsonb: alias del registro}. Default: {'data_raw': 'r'}
+        strategy: 'operator' o 'record'. Default: settings.SILVER_JSON_EXTRACTION
+
+    Returns:
+        La consulta con data_raw->>'clave' (operator) o r."clave" y un
+        CROSS JOIN LATERAL jsonb_to_record(data_raw) AS r("clave" text, ...) (record)
+    """
+    strategy = strategy or settings.SILVER_JSON_EXTRACTION
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estrategia de extracción desconocida: {strategy} (operator o record)")
+    registros = registros or {'data_raw': 'r'}
+
+    for expresion, alias in registros.items():
+        marca = record_join(alias)
+        claves = record_keys(sql, expresion) if strategy == 'record' else []
+        if not claves:
+            sql = sql.replace(marca, '')
+            continue
+        if marca not in sql:
+            raise ValueError(f"La consulta no tiene la marca {marca} para {expresion}")
+        sql = _patron(expresion).sub(lambda m: f'{alias}."{m.group(1)}"', sql)
+        columnas = ', '.join(f'"{clave}" text' for clave in claves)
+        sql = sql.replace(marca, f"CROSS JOIN LATERAL jsonb_to_record({expresion}) AS {alias}({columnas})")
+    return sql
@@ -6,10 +6,75 @@ Ignora el array eClientesRutas (esa relación está en client_forces).
 from database import engine
 from datetime import datetime
 from config import get_logger
+from layers.bronze.master_changes import MASTER_ENTITIES, apply_changes, last_change_id, advance_consumer
+from layers.silver.transformers.extraction import apply_strategy, record_join
 
 logger = get_logger(__name__)
 
 
+def _build_insert_query(condicion: str = '', strategy: str = None) -> str:
+    """
+    INSERT ... SELECT desde bronze.raw_routes (condicion: filtro AND adicional sobre bronze).
+    strategy: extracción de data_raw, operator o record (ver extraction.py)
+    """
+    return apply_strategy(f"""
+        INSERT INTO silver.routes (
+            id_ruta,
+            des_ruta,
+            dias_visita,
+            semana_visita,
+            periodicidad_visita,
+            dias_entrega,
+            semana_entrega,
+            periodicidad_entrega,
+            id_modo_atencion,
+            des_modo_atencion,
+            fecha_desde,
+            fecha_hasta,
+            anulado,
+            id_sucursal,
+            id_fuerza_ventas,
+            id_personal
+        )
+        SELECT
+            NULLIF(data_raw->>'idRuta', '')::integer,
+            data_raw->>'desRuta',
+            data_raw->>'diasVisita',
+            NULLIF(data_raw->>'semanaVisita', '')::integer,
+            NULLIF(data_raw->>'periodicidadVisita', '')::integer,
+            data_raw->>'diasEntrega',
+            NULLIF(data_raw->>'semanaEntrega', '')::integer,
+            NULLIF(data_raw->>'periodicidadEntrega', '')::integer,
+            data_raw->>'idModoAtencion',
+            data_raw->>'desModoAtencion',
+            NULLIF(data_raw->>'fechaDesde', '')::date,
+            NULLIF(data_raw->>'fechaHasta', '')::date,
+            COALESCE((data_raw->>'anulado')::boolean, false),
+            NULLIF(data_raw->>'idSucursal', '')::integer,
+            NULLIF(data_raw->>'idFuerzaVentas', '')::integer,
+            NULLIF(data_raw->>'idPersonal', '')::integer
+        FROM bronze.raw_routes {record_join()}
+        WHERE data_raw->>'fechaHasta' = '9999-12-31'
+          {condicion}
+        -- if exists, update
+        ON CONFLICT (id_ruta, id_sucursal, id_fuerza_ventas) DO UPDATE SET
+            des_ruta = EXCLUDED.des_ruta,
+            dias_visita = EXCLUDED.dias_visita,
+            semana_visita = EXCLUDED.semana_visita,
+            periodicidad_visita = EXCLUDED.periodicidad_visita,
+            dias_entrega = EXCLUDED.dias_entrega,
+            semana_entrega = EXCLUDED.semana_entrega,
+            periodicidad_entrega = EXCLUDED.periodicidad_entrega,
+            id_modo_atencion = EXCLUDED.id_modo_atencion,
+            des_modo_atencion = EXCLUDED.des_modo_atencion,
+            fecha_hasta = EXCLUDED.fecha_hasta,
+            anulado = EXCLUDED.anulado,
+            id_sucursal = EXCLUDED.id_sucursal,
+            id_personal = EXCLUDED.id_personal,
+            processed_at = CURRENT_TIMESTAMP
+    """, strategy=strategy)
+
+
 def transform_routes(full_refresh: bool = True):
     """
     Transforma bronze.raw_routes a silver.routes.
@@ -45,61 +110,8 @@ def transform_routes(full_refresh: bool = True):
         logger.info(f"Encontrados {total:,} registros")
         logger.debug("Ejecutando INSERT INTO SELECT...")
 
-        insert_query = """
-            INSERT INTO silver.routes (
-                id_ruta,
-                des_ruta,
-                dias_visita,
-                semana_visita,
-                periodicidad_visita,
-                dias_entrega,
-                semana_entrega,
-                periodicidad_entrega,
-                id_modo_atencion,
-                des_modo_atencion,
-                fecha_desde,
-                fecha_hasta,
-                anulado,
-                id_sucursal,
-                id_fuerza_ventas,
-                id_personal
-            )
-            SELECT
-                NULLIF(data_raw->>'idRuta', '')::integer,
-                data_raw->>'desRuta',
-                data_raw->>'diasVisita',
-                NULLIF(data_raw->>'semanaVisita', '')::integer,
-                NULLIF(data_raw->>'periodicidadVisita', '')::integer,
-                data_raw->>'diasEntrega',
-                NULLIF(data_raw->>'semanaEntrega', '')::integer,
-                NULLIF(data_raw->>'periodicidadEntrega', '')::integer,
-                data_raw->>'idModoAtencion',
-                data_raw->>'desModoAtencion',
-                NULLIF(data_raw->>'fechaDesde', '')::date,
-                NULLIF(data_raw->>'fechaHasta', '')::date,
-                COALESCE((data_raw->>'anulado')::boolean, false),
-                NULLIF(data_raw->>'idSucursal', '')::integer,
-                NULLIF(data_raw->>'idFuerzaVentas', '')::integer,
-                NULLIF(data_raw->>'idPersonal', '')::integer
-            FROM bronze.raw_routes
-            WHERE data_raw->>'fechaHasta' = '9999-12-31'
-            -- if exists, update
-            ON CONFLICT (id_ruta, id_sucursal, id_fuerza_ventas) DO UPDATE SET
-                des_ruta = EXCLUDED.des_ruta,
-                dias_visita = EXCLUDED.dias_visita,
-                semana_visita = EXCLUDED.semana_visita,
-                periodicidad_visita = EXCLUDED.periodicidad_visita,
-                dias_entrega = EXCLUDED.dias_entrega,
-                semana_entrega = EXCLUDED.semana_entrega,
-                periodicidad_entrega = EXCLUDED.periodicidad_entrega,
-                id_modo_atencion = EXCLUDED.id_modo_atencion,
-                des_modo_atencion = EXCLUDED.des_modo_atencion,
-                fecha_hasta = EXCLUDED.fecha_hasta,
-                anulado = EXCLUDED.anulado,
-                id_sucursal = EXCLUDED.id_sucursal,
-                id_personal = EXCLUDED.id_personal,
-                processed_at = CURRENT_TIMESTAMP
-        """
+        posicion = last_change_id(cursor)
+        insert_query = _build_insert_query()
 
         insert_start = datetime.now()
         cursor.execute(insert_query)
@@ -108,6 +120,8 @@ def transform_routes(full_refresh: bool = True):
 
         logger.debug(f"INSERT completado en {insert_time:.2f}s ({inserted:,} registros)")
 
+        advance_consumer(cursor, 'silver.routes', posicion)
+
         raw_conn.commit()
         cursor.close()
 
@@ -116,5 +130,26 @@ def transform_routes(full_refresh: bool = True):
         logger.info(f"Transformación completada: {inserted:,} routes en {total_time:.2f}s ({throughput:,.0f} reg/s)")
 
 
+def transform_routes_changes():
+    """Recalcula en silver.routes solo las rutas modificadas en bronze (ver layers/bronze/master_changes.py)."""
+    start_time = datetime.now()
+    logger.info("Iniciando transformación de routes modificados...")
+
+    _, clave_bronze = MASTER_ENTITIES['routes']
+    filas = apply_changes('silver.routes', [
+        "DELETE FROM silver.routes WHERE (id_ruta, id_sucursal, id_fuerza_ventas) IN ("
+        "SELECT NULLIF(split_part(entity_key, '|', 1), '')::integer, NULLIF(split_part(entity_key, '|', 2), '')::integer, "
+        "NULLIF(split_part(entity_key, '|', 3), '')::integer FROM tmp_master_keys)",
+        _build_insert_query(f"AND {clave_bronze} IN (SELECT entity_key FROM tmp_master_keys)"),
+    ])
+
+    if filas is None:
+        logger.info("Sin routes modificados en bronze")
+        return
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Transformación completada: {filas[0]:,} routes eliminados, {filas[1]:,} insertados en {total_time:.2f}s")
+
+
 if __name__ == '__main__':
     transform_routes()
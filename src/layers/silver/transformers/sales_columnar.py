@@ -0,0 +1,358 @@
+"""
+Motor columnar de la transformación de ventas (alternativa al INSERT ... SELECT de
+sales_transformer._build_insert_query).
+
+El motor SQL convierte en PostgreSQL ~80 expresiones NULLIF(data_raw->>'x', '')::tipo
+por línea, y durante la ventana diaria el servidor de base queda ocupado en eso. Este
+motor lleva la decodificación y los casts al proceso de Python:
+
+  1. Lee data_raw::text de bronze por bloques (cursor con nombre, SILVER_COLUMNAR_BATCH_SIZE),
+     junto con id_empresa y las columnas generadas de las claves del documento, cliente y
+     artículo (las mismas que lee el motor sql)
+  2. Decodifica el bloque con pyarrow.json (C++, multihilo). Si una clave trae tipos que
+     no se convierten sin pérdida (ej: números con decimales, booleanos), ese bloque se
+     decodifica con json.loads conservando el texto de los números, igual que ->>
+  3. Convierte cada columna con pyarrow.compute con la misma semántica que el SQL:
+     '' -> NULL, '0001-01-01' -> NULL en fechas, UPPER(x) = 'SI', SPLIT_PART y el
+     redondeo de numeric(p,s)
+  4. Escribe el bloque tipado con COPY (CSV), con el id_empresa de bronze, en una tabla
+     temporal; al final un INSERT ... SELECT la pasa a silver.fact_ventas numerando las
+     líneas (sales_transformer.LINE_NUMBER_SQL, sobre las columnas ya tipadas)
+
+Requiere pyarrow (opcional). Se elige con SILVER_SALES_ENGINE=columnar o --engine=columnar.
+Comparación de ambos motores: python scripts/bench_sales_engines.py
+"""
+import io
+import json
+from datetime import date
+
+from config import get_logger, settings
+from layers.silver.transformers.sales_transformer import LINE_NUMBER_SQL
+
+logger = get_logger(__name__)
+
+# Líneas tipadas del llamado en curso, antes de numerarlas
+STAGING = 'tmp_ventas_columnar'
+
+# (columna de silver.fact_ventas, clave de data_raw, conversión, argumento)
+# Mismo orden y semántica que el SELECT de sales_transformer._build_insert_query, entre
+# id_empresa (columna de bronze) y nro_linea:
+#   int      NULLIF(x, '')::integer
+#   text     x
+#   nullif   NULLIF(x, '')
+#   si       UPPER(x) = 'SI'
+#   date     NULLIF(NULLIF(x, ''), '0001-01-01')::date
+#   numeric  NULLIF(x, '')::numeric(p,s)
+#   split    SPLIT_PART(x, ' - ', 1)
+#   neto     NULLIF(x, '')::numeric(15,4) * ABS(NULLIF(<argumento>, '')::numeric(15,4))
+#   bronze   columna generada de bronze con el mismo nombre (argumento: tipo de pyarrow);
+#            la clave de data_raw es la que usa la columna generada
+SALES_COLUMNS = (
+    # Identificación documento (id_empresa: columna de bronze)
+    ('id_documento', 'idDocumento', 'bronze', 'string'),
+    ('letra', 'letra', 'bronze', 'string'),
+    ('serie', 'serie', 'bronze', 'int32'),
+    ('nro_doc', 'nrodoc', 'bronze', 'int32'),
+    ('anulado', 'anulado', 'si', None),
+    # Fechas
+    ('fecha_comprobante', 'fechaComprobate', 'date', None),
+    ('fecha_alta', 'fechaAlta', 'date', None),
+    ('fecha_pedido', 'fechaPedido', 'date', None),
+    ('fecha_entrega', 'fechaEntrega', 'date', None),
+    ('fecha_vencimiento', 'fechaVencimiento', 'date', None),
+    ('fecha_caja', 'fechaCaja', 'date', None),
+    ('fecha_anulacion', 'fechaAnulacion', 'date', None),
+    ('fecha_pago', 'fechaPago', 'date', None),
+    ('fecha_liquidacion', 'fechaLiquidacion', 'date', None),
+    ('fecha_asiento_contable', 'fechaAsientoContable', 'date', None),
+    # Organización
+    ('id_sucursal', 'idSucursal', 'int', None),
+    ('id_deposito', 'idDeposito', 'int', None),
+    ('id_caja', 'idCaja', 'int', None),
+    ('cajero', 'cajero', 'text', None),
+    ('id_centro_costo', 'idCentroCosto', 'int', None),
+    # Personal
+    ('id_vendedor', 'idVendedor', 'int', None),
+    ('id_supervisor', 'idSupervisor', 'int', None),
+    ('id_gerente', 'idGerente', 'int', None),
+    ('id_fuerza_ventas', 'idFuerzaVentas', 'int', None),
+    ('usuario_alta', 'usuarioAlta', 'text', None),
+    # Cliente
+    ('id_cliente', 'idCliente', 'bronze', 'int32'),
+    ('linea_credito', 'lineaCredito', 'text', None),
+    # Segmentación comercial
+    ('id_canal_mkt', 'idCanalMkt', 'int', None),
+    ('id_segmento_mkt', 'idSegmentoMkt', 'int', None),
+    ('id_subcanal_mkt', 'idSubcanalMkt', 'int', None),
+    # Logística
+    ('id_fletero_carga', 'idFleteroCarga', 'int', None),
+    ('planilla_carga', 'planillaCarga', 'text', None),
+    # Línea de venta
+    ('id_articulo', 'idArticulo', 'bronze', 'int32'),
+    ('es_combo', 'esCombo', 'si', None),
+    ('id_combo', 'idCombo', 'int', None),
+    ('id_pedido', 'idPedido', 'int', None),
+    ('id_origen', 'idorigen', 'nullif', None),
+    ('origen', 'origen', 'text', None),
+    ('acciones', 'acciones', 'text', None),
+    # Cantidades
+    ('cantidades_con_cargo', 'cantidadesCorCargo', 'numeric', (15, 4)),
+    ('cantidades_sin_cargo', 'cantidadesSinCargo', 'numeric', (15, 4)),
+    ('cantidades_total', 'cantidadesTotal', 'numeric', (15, 4)),
+    ('cantidades_rechazo', 'cantidadesRechazo', 'numeric', (15, 4)),
+    # Precios
+    ('precio_unitario_bruto', 'precioUnitarioBruto', 'numeric', (15, 4)),
+    ('precio_unitario_neto', 'precioUnitarioNeto', 'numeric', (15, 4)),
+    ('bonificacion', 'bonificacion', 'numeric', (8, 4)),
+    ('precio_compra_bruto', 'preciocomprabr', 'numeric', (15, 4)),
+    ('precio_compra_neto', 'preciocomprant', 'numeric', (15, 4)),
+    # Subtotales
+    ('subtotal_bruto', 'subtotalBruto', 'numeric', (15, 4)),
+    ('subtotal_bonificado', 'subtotalBonificado', 'numeric', (15, 4)),
+    ('subtotal_neto', 'subtotalNeto', 'numeric', (15, 4)),
+    ('subtotal_final', 'subtotalFinal', 'numeric', (15, 4)),
+    ('facturacion_neta', 'cantidadesTotal', 'neto', 'precioventabr'),
+    # Impuestos
+    ('iva21', 'iva21', 'numeric', (15, 4)),
+    ('iva27', 'iva27', 'numeric', (15, 4)),
+    ('iva105', 'iva105', 'numeric', (15, 4)),
+    ('iva2', 'iva2', 'numeric', (15, 4)),
+    ('internos', 'internos', 'numeric', (15, 4)),
+    ('per3337', 'per3337', 'numeric', (15, 4)),
+    ('percepcion212', 'percepcion212', 'numeric', (15, 4)),
+    ('percepcion_iibb', 'percepcioniibb', 'numeric', (15, 4)),
+    ('pers_iibb_d', 'persiibbd', 'numeric', (15, 4)),
+    ('pers_iibb_r', 'persiibbr', 'numeric', (15, 4)),
+    ('cod_prov_iibb', 'codproviibb', 'text', None),
+    # Contabilidad
+    ('cod_cuenta_contable', 'codCuentaContable', 'text', None),
+    ('nro_asiento_contable', 'nroAsientoContable', 'int', None),
+    ('nro_plan_contable', 'nroPlanContable', 'int', None),
+    ('id_liquidacion', 'idLiquidacion', 'int', None),
+    # Proveedor
+    ('proveedor', 'proveedor', 'split', None),
+    ('fvig_pcompra', 'fvigpcompra', 'date', None),
+    # Metadata / Rechazo
+    ('id_rechazo', 'idRechazo', 'int', None),
+    ('informado', 'informado', 'si', None),
+    ('regimen_fiscal', 'regimenFiscal', 'text', None),
+)
+
+# Columnas que se leen de bronze en lugar de data_raw (además de id_empresa)
+BRONZE_COLUMNS = tuple(c for c, _, conversion, _ in SALES_COLUMNS if conversion == 'bronze')
+
+# Tipos que pyarrow.json puede inferir para cada conversión sin perder el texto original
+# (cualquier otro tipo, o un cambio de tipo dentro del bloque, decodifica con json.loads)
+_TIPOS_ADMITIDOS = {
+    'int': ('string', 'int64'),
+    'numeric': ('string', 'int64'),
+    'neto': ('string', 'int64'),
+    'date': ('string', 'timestamp'),
+    'text': ('string',),
+    'nullif': ('string',),
+    'si': ('string',),
+    'split': ('string',),
+}
+
+
+def _pyarrow():
+    """Importa pyarrow (dependencia opcional)."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.csv
+        import pyarrow.json
+    except ImportError as e:
+        raise ImportError("El motor columnar de ventas requiere pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.compute, pyarrow.csv, pyarrow.json
+
+
+def _claves() -> dict:
+    """{clave de data_raw: conversiones que la leen}."""
+    claves = {}
+    for _, clave, conversion, argumento in SALES_COLUMNS:
+        if conversion == 'bronze':
+            continue
+        claves.setdefault(clave, set()).add(conversion)
+        if conversion == 'neto':
+            claves.setdefault(argumento, set()).add('neto')
+    return claves
+
+
+def _tipo(pa, tipo) -> str:
+    if pa.types.is_null(tipo):
+        return 'null'
+    if pa.types.is_string(tipo):
+        return 'string'
+    if pa.types.is_int64(tipo):
+        return 'int64'
+    if pa.types.is_timestamp(tipo):
+        return 'timestamp'
+    return str(tipo)
+
+
+def _decode_arrow(lineas: list) -> dict:
+    """
+    Decodifica el bloque con pyarrow.json.
+
+    Returns:
+        {clave: array} o None si alguna clave no tiene un tipo admitido
+    """
+    pa, _, _, pj = _pyarrow()
+    datos = '\n'.join(lineas).encode('utf-8')
+    # Bloques de 4 MB se decodifican en paralelo; cada línea tiene que entrar entera en un bloque
+    bloque = max(4 << 20, 4 * max(len(linea) for linea in lineas) + 1)
+    try:
+        tabla = pj.read_json(io.BytesIO(datos), read_options=pj.ReadOptions(block_size=bloque))
+    except pa.ArrowInvalid:
+        return None
+    if tabla.num_rows != len(lineas):
+        return None
+
+    columnas = {}
+    for clave, conversiones in _claves().items():
+        if clave not in tabla.column_names:
+            columnas[clave] = pa.nulls(len(lineas), pa.string())
+            continue
+        columna = tabla.column(clave).combine_chunks()
+        tipo = _tipo(pa, columna.type)
+        if tipo == 'null':
+            columna = columna.cast(pa.string())
+        elif any(tipo not in _TIPOS_ADMITIDOS[c] for c in conversiones):
+            return None
+        columnas[clave] = columna
+    return columnas
+
+
+def _texto(valor):
+    """Texto de un valor de json.loads (parse_float/parse_int=str): lo que devuelve ->>."""
+    if valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, bool):
+        return 'true' if valor else 'false'
+    return json.dumps(valor, ensure_ascii=False)
+
+
+def _decode_python(lineas: list) -> dict:
+    """Decodifica el bloque con json.loads, con el texto original de los números."""
+    pa, _, _, _ = _pyarrow()
+    filas = [json.loads(linea, parse_float=str, parse_int=str) for linea in lineas]
+    return {
+        clave: pa.array([_texto(fila.get(clave)) for fila in filas], pa.string())
+        for clave in _claves()
+    }
+
+
+def _as_string(pa, pc, columna):
+    """La columna como texto, con '' como NULL (NULLIF(x, ''))."""
+    if not pa.types.is_string(columna.type):
+        return columna.cast(pa.string())
+    return pc.if_else(pc.equal(columna, ''), None, columna)
+
+
+def _numeric(pa, pc, columna, precision: int, escala: int):
+    """NULLIF(x, '')::numeric(p,s): redondeo a la escala alejándose del cero, como PostgreSQL."""
+    texto = pc.utf8_trim_whitespace(_as_string(pa, pc, columna))
+    valor = pc.cast(texto, pa.decimal128(38, 18))
+    valor = pc.round(valor, ndigits=escala, round_mode='half_towards_infinity')
+    return pc.cast(valor, pa.decimal128(precision, escala))
+
+
+def _convert(pa, pc, columnas: dict, conversion: str, clave: str, argumento):
+    columna = columnas[clave]
+    if conversion == 'text':
+        return columna
+    if conversion == 'nullif':
+        return _as_string(pa, pc, columna)
+    if conversion == 'int':
+        return pc.cast(pc.utf8_trim_whitespace(_as_string(pa, pc, columna)), pa.int32())
+    if conversion == 'si':
+        return pc.equal(pc.utf8_upper(columna), 'SI')
+    if conversion == 'split':
+        return pc.list_element(pc.split_pattern(columna, ' - ', max_splits=1), 0)
+    if conversion == 'numeric':
+        return _numeric(pa, pc, columna, *argumento)
+    if conversion == 'neto':
+        cantidad = _numeric(pa, pc, columna, 15, 4)
+        precio = _numeric(pa, pc, columnas[argumento], 15, 4)
+        return pc.multiply(cantidad, pc.abs(precio))
+    if conversion == 'date':
+        if pa.types.is_timestamp(columna.type):
+            # pyarrow.json ya interpretó el texto: '0001-01-01' llega como timestamp del año 1
+            fecha = pc.cast(columna, pa.date32(), safe=False)
+            return pc.if_else(pc.equal(fecha, pa.scalar(date(1, 1, 1), pa.date32())), None, fecha)
+        texto = _as_string(pa, pc, columna)
+        texto = pc.if_else(pc.equal(texto, '0001-01-01'), None, texto)
+        return pc.cast(pc.utf8_slice_codeunits(texto, 0, 10), pa.date32())
+    raise ValueError(f"Conversión desconocida: {conversion}")
+
+
+def transform_batch(lineas: list, bronze: dict = None):
+    """
+    Convierte un bloque de data_raw (texto JSON, una línea de venta por elemento) en una
+    tabla de pyarrow con las columnas de silver.fact_ventas (SALES_COLUMNS).
+
+    Args:
+        bronze: {columna: valores del bloque} leídos de bronze: id_empresa (si está, va
+            primera) y BRONZE_COLUMNS (las que falten quedan NULL)
+    """
+    pa, pc, _, _ = _pyarrow()
+    columnas = _decode_arrow(lineas)
+    if columnas is None:
+        logger.debug(f"Bloque de {len(lineas):,} líneas decodificado con json.loads (tipos mixtos)")
+        columnas = _decode_python(lineas)
+    bronze = bronze or {}
+    tabla = {}
+    if 'id_empresa' in bronze:
+        tabla['id_empresa'] = pa.array(bronze['id_empresa'], pa.int32())
+    for columna, clave, conversion, argumento in SALES_COLUMNS:
+        if conversion == 'bronze':
+            tipo = getattr(pa, argumento)()
+            valores = bronze.get(columna)
+            tabla[columna] = pa.nulls(len(lineas), tipo) if valores is None else pa.array(valores, tipo)
+        else:
+            tabla[columna] = _convert(pa, pc, columnas, conversion, clave, argumento)
+    return pa.table(tabla)
+
+
+def copy_sales(cursor, where_clause: str, params=None, source: str = 'bronze.raw_sales_all',
+               target: str = 'silver.fact_ventas', batch_size: int = None) -> int:
+    """
+    Transforma las líneas de `source` que cumplen where_clause y las escribe en `target`
+    (mismo resultado que el INSERT de _build_insert_query): COPY bloque a bloque a una
+    tabla temporal y un INSERT ... SELECT con nro_linea. Se confirma con el commit del llamador.
+
+    Returns:
+        Líneas escritas
+    """
+    _, _, pcsv, _ = _pyarrow()
+    batch_size = batch_size or settings.SILVER_COLUMNAR_BATCH_SIZE
+    columnas = ', '.join(['id_empresa'] + [c for c, _, _, _ in SALES_COLUMNS])
+    cursor.execute(f"CREATE TEMP TABLE {STAGING} AS SELECT {columnas} FROM silver.fact_ventas WITH NO DATA")
+    copy_sql = f"COPY {STAGING} ({columnas}) FROM STDIN WITH (FORMAT csv)"
+
+    total = 0
+    lector = cursor.connection.cursor(name='ventas_columnar')
+    lector.itersize = batch_size
+    try:
+        leidas = ('id_empresa',) + BRONZE_COLUMNS
+        lector.execute(f"SELECT data_raw::text, {', '.join(leidas)} FROM {source} {where_clause}", params)
+        while True:
+            bloque = lector.fetchmany(batch_size)
+            if not bloque:
+                break
+            datos, *valores = zip(*bloque)
+            tabla = transform_batch(list(datos), dict(zip(leidas, valores)))
+            buffer = io.BytesIO()
+            pcsv.write_csv(tabla, buffer, pcsv.WriteOptions(include_header=False))
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+            total += len(bloque)
+    finally:
+        lector.close()
+
+    cursor.execute(
+        f"INSERT INTO {target} ({columnas}, nro_linea) SELECT l.*, {LINE_NUMBER_SQL} FROM {STAGING} l"
+    )
+    cursor.execute(f"DROP TABLE {STAGING}")
+    return total
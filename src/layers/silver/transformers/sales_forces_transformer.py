@@ -38,10 +38,10 @@ def transform_sales_forces(full_refresh: bool = True):
         insert_query = """
             INSERT INTO silver.sales_forces (id_fuerza_ventas, des_fuerza_ventas)
             SELECT DISTINCT
-                NULLIF(data_raw->>'idFuerzaVentas', '')::integer,
+                id_fuerza_ventas,
                 data_raw->>'desFuerzaVentas'
             FROM bronze.raw_staff
-            WHERE NULLIF(data_raw->>'idFuerzaVentas', '') IS NOT NULL
+            WHERE id_fuerza_ventas IS NOT NULL
             ON CONFLICT (id_fuerza_ventas) DO NOTHING
         """
 
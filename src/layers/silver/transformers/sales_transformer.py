@@ -4,125 +4,138 @@ Utiliza INSERT INTO SELECT para máxima eficiencia (todo ejecutado en PostgreSQL
 
 NORMALIZADO: Solo IDs de dimensiones, sin descripciones redundantes.
 Las descripciones se obtienen via JOIN a las tablas de dimensiones.
-"""
-from database import engine
-from datetime import datetime
-from config import get_logger
 
-logger = get_logger(__name__)
+Lee bronze.raw_sales_all: las líneas planas y las compactadas con diccionario de
+claves (layers/bronze/compaction.py), ambas con el mismo data_raw. Las claves del
+documento, el cliente y el artículo se leen de las columnas generadas de bronze
+(migración 20261017190000), no de data_raw.
+Los meses archivados en Parquet (layers/bronze/archive.py) se leen de vuelta con
+--full-refresh o un rango de fechas: mismo INSERT sobre una tabla temporal.
 
+Modo incremental (transform_sales_incremental): solo los documentos con líneas nuevas
+o borradas en bronze desde la marca de agua (silver.transform_watermarks).
 
-def transform_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False):
-    """
-    Transforma datos de bronze.raw_sales a silver.fact_ventas.
+Reconstrucción por meses (transform_sales_parallel): un mes por transacción en varias
+conexiones, con reintento y checkpoint por mes (--resume retoma solo los que faltan).
 
-    Args:
-        fecha_desde: Fecha inicial para filtrar (opcional)
-        fecha_hasta: Fecha final para filtrar (opcional)
-        full_refresh: Si True, elimina todos los datos de silver antes de insertar
-    """
-    start_time = datetime.now()
-    logger.info("Iniciando transformación de ventas...")
+Modo merge (merge=True, --merge): en lugar de DELETE + INSERT de todo el alcance, las
+líneas se escriben en una tabla temporal y se aplican con MERGE por la clave de línea
+(documento + artículo + nro_linea, ver LINE_NUMBER_SQL): solo se escriben las líneas
+nuevas o que cambiaron y se borran las que ya no están en bronze.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
-    with engine.connect() as conn:
-        raw_conn = conn.connection.dbapi_connection
-        cursor = raw_conn.cursor()
+from database import engine
+from config import get_logger, settings
+from layers.bronze.archive import archived_months, restore_month
+from layers.bronze.checkpoints import completed_units, mark_completed
+from layers.bronze.compaction import COMPACT_TABLE
+from layers.bronze.partitions import list_partitions, month_bounds, months_in_range
+from layers.bronze.sales_changes import read_sales_position
+from layers.silver.transformers.extraction import apply_strategy, record_join
 
-        # Optimizaciones de PostgreSQL
-        cursor.execute("SET work_mem = '1GB'")
-        cursor.execute("SET maintenance_work_mem = '2GB'")
+logger = get_logger(__name__)
 
-        # Construir cláusula WHERE
-        where_conditions = []
-        params = []
+WATERMARK = 'silver.fact_ventas'
 
-        if fecha_desde:
-            where_conditions.append("date_comprobante >= %s")
-            params.append(fecha_desde)
-        if fecha_hasta:
-            where_conditions.append("date_comprobante <= %s")
-            params.append(fecha_hasta)
+# Unidades de la reconstrucción por meses en bronze.load_checkpoints
+# (id_empresa = 0: todas las empresas)
+CHUNK_ENTITY = 'silver_sales'
+TODAS_LAS_EMPRESAS = 0
 
-        where_clause = f"WHERE {' AND '.join(where_conditions)}" if where_conditions else ""
+# nro_linea: ordinal de la línea entre las del mismo documento y artículo. El payload no
+# trae un número de línea; se ordena por la fila de silver completa (l: el SELECT de las
+# columnas de silver.fact_ventas sin nro_linea, en el orden del INSERT), así que una línea
+# conserva su número mientras no cambien las repetidas del mismo artículo, y la numeración
+# se puede reproducir sobre silver.fact_ventas (migración 20261017210000).
+LINE_PARTITION = ('id_empresa', 'id_documento', 'letra', 'serie', 'nro_doc',
+                  'fecha_comprobante', 'id_articulo')
+LINE_NUMBER_SQL = f"""ROW_NUMBER() OVER (
+            PARTITION BY {', '.join(f'l.{c}' for c in LINE_PARTITION)}
+            ORDER BY l
+        )"""
 
-        # DELETE según el modo (fechas tienen prioridad sobre full_refresh)
-        delete_start = datetime.now()
-        if fecha_desde and fecha_hasta:
-            logger.debug(f"Eliminando datos existentes en silver para el rango {fecha_desde} - {fecha_hasta}...")
-            cursor.execute(
-                "DELETE FROM silver.fact_ventas WHERE fecha_comprobante >= %s AND fecha_comprobante <= %s",
-                (fecha_desde, fecha_hasta)
-            )
-        elif full_refresh:
-            logger.debug("Full refresh: eliminando todos los datos de silver.fact_ventas...")
-            cursor.execute("DELETE FROM silver.fact_ventas")
+# Clave de línea (índice único idx_silver_ventas_linea, NULLS NOT DISTINCT): todas las
+# columnas se comparan con IS NOT DISTINCT FROM, con la misma semántica de NULL que el
+# índice (ej: fecha_comprobante es NULL cuando el ERP manda '0001-01-01')
+LINE_KEY = LINE_PARTITION + ('nro_linea',)
 
-        if full_refresh or (fecha_desde and fecha_hasta):
-            delete_time = (datetime.now() - delete_start).total_seconds()
-            logger.debug(f"DELETE completado en {delete_time:.2f}s")
+MERGE_STAGING = 'tmp_ventas_merge'
 
-        # Contar registros a procesar
-        count_start = datetime.now()
-        count_query = f"SELECT COUNT(*) FROM bronze.raw_sales {where_clause}"
-        cursor.execute(count_query, params if params else None)
-        total = cursor.fetchone()[0]
-        count_time = (datetime.now() - count_start).total_seconds()
 
-        if total == 0:
-            logger.warning("Sin datos para procesar en bronze.raw_sales")
-            cursor.close()
-            return
+class SalesRefreshError(Exception):
+    """Uno o más meses de la reconstrucción de silver.fact_ventas fallaron."""
 
-        logger.info(f"Encontrados {total:,} registros (COUNT en {count_time:.2f}s)")
-        logger.debug("Ejecutando INSERT INTO SELECT...")
-
-        # INSERT INTO SELECT - NORMALIZADO (solo IDs, sin descripciones)
-        insert_query = f"""
-            INSERT INTO silver.fact_ventas (
-                -- Identificación documento
-                id_empresa, id_documento, letra, serie, nro_doc, anulado,
-                -- Fechas
-                fecha_comprobante, fecha_alta, fecha_pedido, fecha_entrega, fecha_vencimiento, fecha_caja,
-                fecha_anulacion, fecha_pago, fecha_liquidacion, fecha_asiento_contable,
-                -- Organización (solo IDs)
-                id_sucursal, id_deposito, id_caja, cajero, id_centro_costo,
-                -- Personal (solo IDs)
-                id_vendedor, id_supervisor, id_gerente, id_fuerza_ventas, usuario_alta,
-                -- Cliente (solo ID)
-                id_cliente, linea_credito,
-                -- Segmentación comercial (solo IDs)
-                id_canal_mkt, id_segmento_mkt, id_subcanal_mkt,
-                -- Logística
-                id_fletero_carga, planilla_carga,
-                -- Línea de venta (solo ID artículo)
-                id_articulo, es_combo, id_combo, id_pedido, id_origen, origen, acciones,
-                -- Cantidades
-                cantidades_con_cargo, cantidades_sin_cargo, cantidades_total, cantidades_rechazo,
-                -- Precios
-                precio_unitario_bruto, precio_unitario_neto, bonificacion, precio_compra_bruto, precio_compra_neto,
-                -- Subtotales
-                subtotal_bruto, subtotal_bonificado, subtotal_neto, subtotal_final, facturacion_neta,
-                -- Impuestos
-                iva21, iva27, iva105, iva2, internos, per3337, percepcion212, percepcion_iibb,
-                pers_iibb_d, pers_iibb_r, cod_prov_iibb,
-                -- Contabilidad
-                cod_cuenta_contable, nro_asiento_contable, nro_plan_contable, id_liquidacion,
-                -- Proveedor
-                proveedor, fvig_pcompra,
-                -- Metadata / Rechazo
-                id_rechazo, informado, regimen_fiscal
-            )
+    def __init__(self, errores: dict):
+        self.errores = errores
+        detalle = ', '.join(f"{mes} ({error})" for mes, error in errores.items())
+        super().__init__(
+            f"Fallaron {len(errores)} mes(es): {detalle}. Reintentar solo esos con --resume"
+        )
+
+
+def _build_insert_query(where_clause: str, source: str = 'bronze.raw_sales', strategy: str = None,
+                        target: str = 'silver.fact_ventas') -> str:
+    """
+    INSERT INTO `target` SELECT ... FROM `source` (bronze.raw_sales, bronze.raw_sales_all o un mes archivado).
+    strategy: extracción de data_raw, operator o record (ver extraction.py)
+    target: silver.fact_ventas o la tabla temporal del modo merge
+    """
+    return apply_strategy(f"""
+        INSERT INTO {target} (
+            -- Identificación documento
+            id_empresa, id_documento, letra, serie, nro_doc, anulado,
+            -- Fechas
+            fecha_comprobante, fecha_alta, fecha_pedido, fecha_entrega, fecha_vencimiento, fecha_caja,
+            fecha_anulacion, fecha_pago, fecha_liquidacion, fecha_asiento_contable,
+            -- Organización (solo IDs)
+            id_sucursal, id_deposito, id_caja, cajero, id_centro_costo,
+            -- Personal (solo IDs)
+            id_vendedor, id_supervisor, id_gerente, id_fuerza_ventas, usuario_alta,
+            -- Cliente (solo ID)
+            id_cliente, linea_credito,
+            -- Segmentación comercial (solo IDs)
+            id_canal_mkt, id_segmento_mkt, id_subcanal_mkt,
+            -- Logística
+            id_fletero_carga, planilla_carga,
+            -- Línea de venta (solo ID artículo)
+            id_articulo, es_combo, id_combo, id_pedido, id_origen, origen, acciones,
+            -- Cantidades
+            cantidades_con_cargo, cantidades_sin_cargo, cantidades_total, cantidades_rechazo,
+            -- Precios
+            precio_unitario_bruto, precio_unitario_neto, bonificacion, precio_compra_bruto, precio_compra_neto,
+            -- Subtotales
+            subtotal_bruto, subtotal_bonificado, subtotal_neto, subtotal_final, facturacion_neta,
+            -- Impuestos
+            iva21, iva27, iva105, iva2, internos, per3337, percepcion212, percepcion_iibb,
+            pers_iibb_d, pers_iibb_r, cod_prov_iibb,
+            -- Contabilidad
+            cod_cuenta_contable, nro_asiento_contable, nro_plan_contable, id_liquidacion,
+            -- Proveedor
+            proveedor, fvig_pcompra,
+            -- Metadata / Rechazo
+            id_rechazo, informado, regimen_fiscal,
+            -- Clave de línea
+            nro_linea
+        )
+        SELECT l.*, {LINE_NUMBER_SQL}
+        FROM (
             SELECT
                 -- === IDENTIFICACIÓN DOCUMENTO ===
-                NULLIF(data_raw->>'idEmpresa', '')::integer,
-                data_raw->>'idDocumento',
-                data_raw->>'letra',
-                NULLIF(data_raw->>'serie', '')::integer,
-                NULLIF(data_raw->>'nrodoc', '')::integer,
+                -- Empresa: la etiqueta de bronze (ERP_COMPANIES), la misma que filtra --empresa
+                id_empresa,
+                -- Claves del documento: columnas generadas de bronze (sin decodificar data_raw)
+                id_documento,
+                letra,
+                serie,
+                nro_doc,
                 UPPER(data_raw->>'anulado') = 'SI',
 
                 -- === FECHAS ===
-                NULLIF(NULLIF(data_raw->>'fechaComprobate', ''), '0001-01-01')::date,
+                NULLIF(NULLIF(data_raw->>'fechaComprobate', ''), '0001-01-01')::date AS fecha_comprobante,
                 NULLIF(NULLIF(data_raw->>'fechaAlta', ''), '0001-01-01')::date,
                 NULLIF(NULLIF(data_raw->>'fechaPedido', ''), '0001-01-01')::date,
                 NULLIF(NULLIF(data_raw->>'fechaEntrega', ''), '0001-01-01')::date,
@@ -148,7 +161,7 @@ def transform_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
                 data_raw->>'usuarioAlta',
 
                 -- === CLIENTE (solo ID) ===
-                NULLIF(data_raw->>'idCliente', '')::integer,
+                id_cliente,
                 data_raw->>'lineaCredito',
 
                 -- === SEGMENTACIÓN COMERCIAL (solo IDs) ===
@@ -161,7 +174,7 @@ def transform_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
                 data_raw->>'planillaCarga',
 
                 -- === LÍNEA DE VENTA (solo ID artículo) ===
-                NULLIF(data_raw->>'idArticulo', '')::integer,
+                id_articulo,
                 UPPER(data_raw->>'esCombo') = 'SI',
                 NULLIF(data_raw->>'idCombo', '')::integer,
                 NULLIF(data_raw->>'idPedido', '')::integer,
@@ -188,8 +201,8 @@ def transform_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
                 NULLIF(data_raw->>'subtotalNeto', '')::numeric(15,4),
                 NULLIF(data_raw->>'subtotalFinal', '')::numeric(15,4),
                 -- facturacion_neta = cantidades_total * abs(precio_unitario_bruto)
-                NULLIF(data_raw->>'cantidadesTotal', '')::numeric(15,4) *
-                    ABS(NULLIF(data_raw->>'precioventabr', '')::numeric(15,4)),
+                (NULLIF(data_raw->>'cantidadesTotal', '')::numeric(15,4) *
+                    ABS(NULLIF(data_raw->>'precioventabr', '')::numeric(15,4)))::numeric(15,4),
 
                 -- === IMPUESTOS ===
                 NULLIF(data_raw->>'iva21', '')::numeric(15,4),
@@ -219,17 +232,237 @@ def transform_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
                 UPPER(data_raw->>'informado') = 'SI',
                 data_raw->>'regimenFiscal'
 
-            FROM bronze.raw_sales
+            FROM {source} {record_join()}
             {where_clause}
-        """
+        ) AS l
+    """, strategy=strategy)
+
+
+def _insert_sales(cursor, where_clause: str, params=None, source: str = 'bronze.raw_sales',
+                  motor: str = None, target: str = 'silver.fact_ventas') -> int:
+    """
+    Inserta en `target` las líneas de `source` que cumplen where_clause.
+
+    Args:
+        motor: 'sql' (INSERT ... SELECT en PostgreSQL) o 'columnar' (pyarrow + COPY, ver
+            sales_columnar). Default: settings.SILVER_SALES_ENGINE
+        target: silver.fact_ventas o la tabla temporal del modo merge
+
+    Returns:
+        Líneas insertadas
+    """
+    motor = motor or settings.SILVER_SALES_ENGINE
+    if motor == 'columnar':
+        from .sales_columnar import copy_sales
+        return copy_sales(cursor, where_clause, params, source, target)
+    if motor != 'sql':
+        raise ValueError(f"Motor de ventas desconocido: {motor} (sql o columnar)")
+    cursor.execute(_build_insert_query(where_clause, source, target=target), params)
+    return cursor.rowcount
+
+
+def _create_merge_staging(cursor) -> None:
+    """Tabla temporal con las columnas de silver.fact_ventas que escribe el INSERT (sin id ni processed_at)."""
+    cursor.execute(
+        f"CREATE TEMP TABLE {MERGE_STAGING} ON COMMIT DROP AS "
+        "SELECT * FROM silver.fact_ventas WITH NO DATA"
+    )
+    cursor.execute(f"ALTER TABLE {MERGE_STAGING} DROP COLUMN id, DROP COLUMN processed_at")
+
+
+def _merge_staged(cursor, scope: str, params=None) -> tuple[int, int]:
+    """
+    Aplica en silver.fact_ventas las líneas de la tabla temporal del modo merge
+    (se confirma con el commit del llamador).
+
+    Primero borra las líneas de silver dentro de `scope` (condición sobre f) que ya no
+    están en la tabla temporal; después un MERGE por la clave de línea actualiza solo las
+    que cambiaron e inserta las nuevas. PostgreSQL < 17 no tiene WHEN NOT MATCHED BY
+    SOURCE: el borrado va en un DELETE aparte.
+
+    Args:
+        scope: Condición sobre f (silver.fact_ventas) con lo que se recargó; ej:
+            "f.fecha_comprobante >= %s AND f.fecha_comprobante <= %s"
+        params: Parámetros de scope
+
+    Returns:
+        (líneas eliminadas, líneas insertadas o actualizadas)
+    """
+    cursor.execute(f"ANALYZE {MERGE_STAGING}")
+    cursor.execute(f"SELECT * FROM {MERGE_STAGING} LIMIT 0")
+    columnas = [c[0] for c in cursor.description]
+    valores = [c for c in columnas if c not in LINE_KEY]
+
+    clave = ' AND '.join(f"f.{c} IS NOT DISTINCT FROM t.{c}" for c in LINE_KEY)
+
+    cursor.execute(f"""
+        DELETE FROM silver.fact_ventas f
+        WHERE {scope}
+          AND NOT EXISTS (SELECT 1 FROM {MERGE_STAGING} t WHERE {clave})
+    """, params)
+    deleted = cursor.rowcount
+
+    cursor.execute(f"""
+        MERGE INTO silver.fact_ventas f
+        USING {MERGE_STAGING} t
+        ON {clave}
+        WHEN MATCHED AND ({', '.join(f'f.{c}' for c in valores)})
+                IS DISTINCT FROM ({', '.join(f't.{c}' for c in valores)}) THEN
+            UPDATE SET {', '.join(f'{c} = t.{c}' for c in valores)}, processed_at = CURRENT_TIMESTAMP
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(columnas)})
+            VALUES ({', '.join(f't.{c}' for c in columnas)})
+    """)
+    return deleted, cursor.rowcount
+
+
+def transform_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False,
+                    id_empresa: int = None, motor: str = None, merge: bool = None):
+    """
+    Transforma datos de bronze.raw_sales a silver.fact_ventas.
+
+    Args:
+        fecha_desde: Fecha inicial para filtrar (opcional)
+        fecha_hasta: Fecha final para filtrar (opcional)
+        full_refresh: Si True, elimina todos los datos de silver antes de insertar
+            (con full_refresh o un rango también se leen los meses archivados)
+        id_empresa: Transformar (y eliminar antes) solo las ventas de esa empresa (opcional)
+        motor: 'sql' o 'columnar' (opcional). Default: settings.SILVER_SALES_ENGINE
+        merge: Aplicar con MERGE por clave de línea en lugar de DELETE + INSERT (opcional).
+            Default: settings.SILVER_SALES_MERGE. Sin rango ni full_refresh siempre es merge
+            (no hay DELETE previo)
+    """
+    start_time = datetime.now()
+    logger.info("Iniciando transformación de ventas...")
+
+    if merge is None:
+        merge = settings.SILVER_SALES_MERGE
+    if not (full_refresh or (fecha_desde and fecha_hasta)):
+        # Sin DELETE previo un INSERT duplicaría las líneas ya transformadas
+        merge = True
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+
+        # Optimizaciones de PostgreSQL
+        cursor.execute("SET work_mem = '1GB'")
+        cursor.execute("SET maintenance_work_mem = '2GB'")
+
+        # Construir cláusula WHERE (las líneas marcadas como borradas en bronze no se transforman)
+        where_conditions = ["deleted_at IS NULL"]
+        params = []
+        # Mismo alcance sobre silver, para el borrado del modo merge
+        scope_conditions = ["TRUE"]
+
+        if fecha_desde:
+            where_conditions.append("date_comprobante >= %s")
+            scope_conditions.append("f.fecha_comprobante >= %s")
+            params.append(fecha_desde)
+        if fecha_hasta:
+            where_conditions.append("date_comprobante <= %s")
+            scope_conditions.append("f.fecha_comprobante <= %s")
+            params.append(fecha_hasta)
+        if id_empresa is not None:
+            where_conditions.append("id_empresa = %s")
+            scope_conditions.append("f.id_empresa = %s")
+            params.append(id_empresa)
+
+        where_clause = f"WHERE {' AND '.join(where_conditions)}"
+
+        es_total = full_refresh and id_empresa is None and not (fecha_desde and fecha_hasta)
+        if es_total:
+            # Posición de bronze antes de transformar: el modo incremental sigue desde acá
+            marca = _bronze_position(cursor)
+
+        # Filtro de empresa para el DELETE
+        empresa_sql = "" if id_empresa is None else " AND id_empresa = %s"
+        empresa_params = () if id_empresa is None else (id_empresa,)
+
+        # DELETE según el modo (fechas tienen prioridad sobre full_refresh)
+        delete_start = datetime.now()
+        if merge:
+            logger.debug("Merge: las líneas que ya no están en bronze se eliminan al aplicar")
+        elif fecha_desde and fecha_hasta:
+            logger.debug(f"Eliminando datos existentes en silver para el rango {fecha_desde} - {fecha_hasta}...")
+            cursor.execute(
+                "DELETE FROM silver.fact_ventas WHERE fecha_comprobante >= %s AND fecha_comprobante <= %s"
+                + empresa_sql,
+                (fecha_desde, fecha_hasta) + empresa_params
+            )
+        elif full_refresh and id_empresa is not None:
+            logger.debug(f"Full refresh: eliminando las ventas de la empresa {id_empresa} de silver.fact_ventas...")
+            cursor.execute("DELETE FROM silver.fact_ventas WHERE TRUE" + empresa_sql, empresa_params)
+        elif full_refresh:
+            logger.debug("Full refresh: eliminando todos los datos de silver.fact_ventas...")
+            cursor.execute("DELETE FROM silver.fact_ventas")
 
+        if not merge:
+            delete_time = (datetime.now() - delete_start).total_seconds()
+            logger.debug(f"DELETE completado en {delete_time:.2f}s")
+
+        # Contar registros a procesar
+        count_start = datetime.now()
+        count_query = f"SELECT COUNT(*) FROM bronze.raw_sales_all {where_clause}"
+        cursor.execute(count_query, params if params else None)
+        total = cursor.fetchone()[0]
+        count_time = (datetime.now() - count_start).total_seconds()
+
+        # Meses archivados en Parquet: cuando se recarga todo el alcance (silver se
+        # eliminó antes, o el merge borra lo que no se vuelva a leer)
+        archivados = []
+        if full_refresh or (fecha_desde and fecha_hasta) or merge:
+            archivados = archived_months(cursor, 'bronze.raw_sales', fecha_desde, fecha_hasta)
+
+        if total == 0 and not archivados:
+            logger.warning("Sin datos para procesar en bronze.raw_sales")
+            if es_total:
+                _save_watermark(cursor, *marca)
+                raw_conn.commit()
+            cursor.close()
+            return
+
+        logger.info(f"Encontrados {total:,} registros (COUNT en {count_time:.2f}s)")
+        logger.debug(
+            f"Ejecutando INSERT (motor {motor or settings.SILVER_SALES_ENGINE}"
+            f"{', merge' if merge else ''})..."
+        )
+
+        destino = MERGE_STAGING if merge else 'silver.fact_ventas'
+        if merge:
+            _create_merge_staging(cursor)
+
+        # INSERT - NORMALIZADO (solo IDs, sin descripciones)
         insert_start = datetime.now()
-        cursor.execute(insert_query, params if params else None)
-        inserted = cursor.rowcount
+        inserted = _insert_sales(cursor, where_clause, params if params else None, 'bronze.raw_sales_all',
+                                 motor, destino)
         insert_time = (datetime.now() - insert_start).total_seconds()
 
         logger.debug(f"INSERT completado en {insert_time:.2f}s ({inserted:,} registros)")
 
+        for periodo, path in archivados:
+            restore_start = datetime.now()
+            restore_month(cursor, 'bronze.raw_sales', path, 'tmp_ventas_archivo', fecha_desde, fecha_hasta)
+            filas = _insert_sales(cursor, where_clause, params if params else None, 'tmp_ventas_archivo',
+                                  motor, destino)
+            inserted += filas
+            cursor.execute("DROP TABLE tmp_ventas_archivo")
+            logger.debug(
+                f"Mes archivado {periodo:%Y-%m}: {filas:,} registros en "
+                f"{(datetime.now() - restore_start).total_seconds():.2f}s"
+            )
+
+        if merge:
+            merge_start = datetime.now()
+            deleted, inserted = _merge_staged(cursor, ' AND '.join(scope_conditions), params if params else None)
+            logger.debug(
+                f"MERGE completado en {(datetime.now() - merge_start).total_seconds():.2f}s "
+                f"({deleted:,} eliminadas, {inserted:,} insertadas o actualizadas)"
+            )
+
+        if es_total:
+            _save_watermark(cursor, *marca)
+
         commit_start = datetime.now()
         raw_conn.commit()
         commit_time = (datetime.now() - commit_start).total_seconds()
@@ -242,5 +475,433 @@ def transform_sales(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
         logger.info(f"Transformación completada: {inserted:,} ventas en {total_time:.2f}s ({throughput:,.0f} reg/s)")
 
 
+def _bronze_position(cursor) -> tuple:
+    """
+    (último id, último deleted_at) de bronze.raw_sales: la marca de agua hasta la que se
+    transforma. Se lee sin cargas de bronze en curso y confirma la transacción del cursor
+    (ver layers/bronze/sales_changes.py).
+    """
+    return read_sales_position(cursor)[:2]
+
+
+def _save_watermark(cursor, last_id: int, last_deleted_at) -> None:
+    """Guarda la marca de agua de silver.fact_ventas (se confirma con el commit del llamador)."""
+    cursor.execute(
+        """
+        INSERT INTO silver.transform_watermarks (target, last_id, last_deleted_at)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (target) DO UPDATE SET
+            last_id = EXCLUDED.last_id,
+            last_deleted_at = EXCLUDED.last_deleted_at,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (WATERMARK, last_id, last_deleted_at)
+    )
+
+
+# Líneas de silver (f) de los documentos de tmp_documentos
+DOCUMENTOS_SCOPE = """
+    EXISTS (
+        SELECT 1 FROM tmp_documentos d
+        WHERE f.fecha_comprobante = d.date_comprobante
+          AND f.id_empresa IS NOT DISTINCT FROM d.id_empresa
+          AND f.id_documento IS NOT DISTINCT FROM d.id_documento
+          AND f.letra IS NOT DISTINCT FROM d.letra
+          AND f.serie IS NOT DISTINCT FROM d.serie
+          AND f.nro_doc IS NOT DISTINCT FROM d.nro_doc
+    )
+"""
+
+
+def _replace_documents(cursor, motor: str = None, merge: bool = None) -> tuple[int, int]:
+    """
+    Borra de silver.fact_ventas las líneas de los documentos de tmp_documentos y las
+    vuelve a generar desde las líneas vigentes de bronze. Con merge solo se escriben las
+    líneas que cambiaron (default: settings.SILVER_SALES_MERGE).
+
+    Returns:
+        (líneas eliminadas, líneas insertadas; con merge, insertadas o actualizadas)
+    """
+    if merge is None:
+        merge = settings.SILVER_SALES_MERGE
+
+    deleted = 0
+    if merge:
+        _create_merge_staging(cursor)
+    else:
+        cursor.execute(f"""
+            DELETE FROM silver.fact_ventas f
+            WHERE {DOCUMENTOS_SCOPE}
+        """)
+        deleted = cursor.rowcount
+
+    inserted = _insert_sales(cursor, """
+        WHERE deleted_at IS NULL
+          AND EXISTS (
+              SELECT 1 FROM tmp_documentos d
+              WHERE d.date_comprobante = bronze.raw_sales.date_comprobante
+                AND d.id_empresa IS NOT DISTINCT FROM bronze.raw_sales.id_empresa
+                AND d.id_documento IS NOT DISTINCT FROM bronze.raw_sales.id_documento
+                AND d.letra IS NOT DISTINCT FROM bronze.raw_sales.letra
+                AND d.serie IS NOT DISTINCT FROM bronze.raw_sales.serie
+                AND d.nro_doc IS NOT DISTINCT FROM bronze.raw_sales.nro_doc
+          )
+    """, motor=motor, target=MERGE_STAGING if merge else 'silver.fact_ventas')
+
+    if merge:
+        return _merge_staged(cursor, DOCUMENTOS_SCOPE)
+    return deleted, inserted
+
+
+def transform_sales_changes(motor: str = None, merge: bool = None):
+    """
+    Aplica en silver.fact_ventas solo los documentos modificados en bronze.
+
+    Lee los documentos pendientes de bronze.raw_sales_changes (registrados por la carga
+    de bronze), borra sus líneas de silver y las vuelve a generar desde las líneas
+    vigentes de bronze. Marca los cambios como aplicados (silver_applied_at) para que
+    gold los tome después.
+    """
+    start_time = datetime.now()
+    logger.info("Iniciando transformación de ventas (documentos modificados)...")
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+
+        cursor.execute("SELECT MAX(id) FROM bronze.raw_sales_changes WHERE silver_applied_at IS NULL")
+        hasta_id = cursor.fetchone()[0]
+
+        if hasta_id is None:
+            logger.info("Sin documentos modificados pendientes")
+            cursor.close()
+            return
+
+        cursor.execute("""
+            CREATE TEMP TABLE tmp_documentos ON COMMIT DROP AS
+            SELECT DISTINCT date_comprobante, id_empresa, id_documento, letra, serie, nro_doc
+            FROM bronze.raw_sales_changes
+            WHERE silver_applied_at IS NULL AND id <= %s
+        """, (hasta_id,))
+        documentos = cursor.rowcount
+
+        deleted, inserted = _replace_documents(cursor, motor, merge)
+
+        cursor.execute(
+            "UPDATE bronze.raw_sales_changes SET silver_applied_at = CURRENT_TIMESTAMP "
+            "WHERE silver_applied_at IS NULL AND id <= %s",
+            (hasta_id,)
+        )
+
+        raw_conn.commit()
+        cursor.close()
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(
+        f"Transformación completada: {documentos:,} documentos, "
+        f"{deleted:,} líneas eliminadas, {inserted:,} insertadas en {total_time:.2f}s"
+    )
+
+
+
+def transform_sales_incremental(motor: str = None, merge: bool = None):
+    """
+    Aplica en silver.fact_ventas solo lo que llegó a bronze desde la última transformación.
+
+    La marca de agua (silver.transform_watermarks) guarda el último id de bronze.raw_sales
+    y el último deleted_at ya transformados. Se toman los documentos con líneas nuevas
+    (id posterior) o marcadas como borradas (deleted_at posterior), se borran sus líneas
+    de silver y se regeneran desde las líneas vigentes de bronze: el costo depende de lo
+    cargado desde la corrida anterior, no del tamaño del mes.
+
+    La marca de agua se inicializa con `silver sales --full-refresh`. Los documentos
+    pendientes de bronze.raw_sales_changes (ej: los que desaparecieron en un reemplazo
+    de partición) también se recargan y se marcan como aplicados (gold --changes los
+    toma igual). La posición se lee con el lock de escrituras de
+    ventas: una carga en curso no puede confirmar después ids menores a la marca.
+    """
+    start_time = datetime.now()
+    logger.info("Iniciando transformación de ventas (incremental por marca de agua)...")
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+
+        cursor.execute(
+            "SELECT last_id, last_deleted_at FROM silver.transform_watermarks WHERE target = %s",
+            (WATERMARK,)
+        )
+        marca = cursor.fetchone()
+        if marca is None:
+            logger.warning(f"Sin marca de agua para {WATERMARK}: ejecutar primero silver sales --full-refresh")
+            cursor.close()
+            return
+        desde_id, desde_borrado = marca
+
+        # Posición de bronze y cambios pendientes, leídos sin cargas en curso (quedan cubiertos)
+        hasta_id, hasta_borrado, cambios_id = read_sales_position(cursor)
+        hay_borradas = hasta_borrado is not None and (desde_borrado is None or hasta_borrado > desde_borrado)
+        if hasta_id <= desde_id and not hay_borradas and cambios_id is None:
+            logger.info("Sin líneas nuevas en bronze desde la última transformación")
+            cursor.close()
+            return
+
+        cursor.execute("""
+            CREATE TEMP TABLE tmp_documentos ON COMMIT DROP AS
+            SELECT date_comprobante, id_empresa, id_documento, letra, serie, nro_doc
+            FROM bronze.raw_sales
+            WHERE id > %(desde_id)s AND id <= %(hasta_id)s
+            UNION
+            SELECT date_comprobante, id_empresa, id_documento, letra, serie, nro_doc
+            FROM bronze.raw_sales
+            WHERE deleted_at > COALESCE(%(desde_borrado)s, '-infinity'::timestamp)
+              AND deleted_at <= %(hasta_borrado)s
+            UNION
+            SELECT date_comprobante, id_empresa, id_documento, letra, serie, nro_doc
+            FROM bronze.raw_sales_changes
+            WHERE silver_applied_at IS NULL AND id <= %(cambios_id)s
+        """, {'desde_id': desde_id, 'hasta_id': hasta_id,
+              'desde_borrado': desde_borrado, 'hasta_borrado': hasta_borrado,
+              'cambios_id': cambios_id})
+        documentos = cursor.rowcount
+
+        deleted, inserted = _replace_documents(cursor, motor, merge)
+
+        if cambios_id is not None:
+            cursor.execute(
+                "UPDATE bronze.raw_sales_changes SET silver_applied_at = CURRENT_TIMESTAMP "
+                "WHERE silver_applied_at IS NULL AND id <= %s",
+                (cambios_id,)
+            )
+        _save_watermark(cursor, max(hasta_id, desde_id), hasta_borrado if hay_borradas else desde_borrado)
+
+        raw_conn.commit()
+        cursor.close()
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(
+        f"Transformación completada: {documentos:,} documentos hasta el id {hasta_id:,}, "
+        f"{deleted:,} líneas eliminadas, {inserted:,} insertadas en {total_time:.2f}s"
+    )
+
+
+
+def _refresh_months(cursor, fecha_desde: str, fecha_hasta: str, id_empresa: int = None) -> list:
+    """
+    Primer día de cada mes a reconstruir: los del rango o, sin rango, todos los que tienen
+    datos en bronze (particiones planas y compactadas, meses archivados) o en silver.
+    """
+    if fecha_desde and fecha_hasta:
+        return months_in_range(fecha_desde, fecha_hasta)
+
+    meses = {mes for _, mes in list_partitions(cursor, 'bronze.raw_sales')}
+    meses.update(mes for _, mes in list_partitions(cursor, COMPACT_TABLE))
+    meses.update(mes for mes, _ in archived_months(cursor, 'bronze.raw_sales'))
+
+    # Meses que solo quedan en silver también se recorren (se vacían)
+    empresa_sql = "" if id_empresa is None else " WHERE id_empresa = %s"
+    cursor.execute(
+        "SELECT MIN(fecha_comprobante), MAX(fecha_comprobante) FROM silver.fact_ventas" + empresa_sql,
+        None if id_empresa is None else (id_empresa,)
+    )
+    minimo, maximo = cursor.fetchone()
+    if minimo is not None:
+        meses.update(months_in_range(minimo, maximo))
+    return sorted(meses)
+
+
+def _month_range(mes, fecha_desde: str = '', fecha_hasta: str = '') -> tuple[str, str]:
+    """(desde, hasta) del mes, recortado al rango si lo hay."""
+    inicio, siguiente = month_bounds(mes)
+    desde, hasta = inicio.isoformat(), (siguiente - timedelta(days=1)).isoformat()
+    if fecha_desde:
+        desde = max(desde, fecha_desde)
+    if fecha_hasta:
+        hasta = min(hasta, fecha_hasta)
+    return desde, hasta
+
+
+def _transform_month(cursor, fecha_desde: str, fecha_hasta: str, id_empresa: int = None,
+                     motor: str = None, merge: bool = None) -> int:
+    """
+    Reemplaza en silver.fact_ventas las ventas de un mes (se confirma con el commit del llamador).
+    Con merge (default: settings.SILVER_SALES_MERGE) solo escribe las líneas que cambiaron.
+
+    Returns:
+        Líneas insertadas (con merge, insertadas o actualizadas)
+    """
+    if merge is None:
+        merge = settings.SILVER_SALES_MERGE
+
+    # Varias conexiones en paralelo: menos memoria por conexión que el full refresh completo
+    cursor.execute("SET work_mem = '256MB'")
+
+    condiciones = "fecha_comprobante >= %s AND fecha_comprobante <= %s"
+    alcance = "f.fecha_comprobante >= %s AND f.fecha_comprobante <= %s"
+    where_clause = "WHERE deleted_at IS NULL AND date_comprobante >= %s AND date_comprobante <= %s"
+    params = (fecha_desde, fecha_hasta)
+    if id_empresa is not None:
+        condiciones += " AND id_empresa = %s"
+        alcance += " AND f.id_empresa = %s"
+        where_clause += " AND id_empresa = %s"
+        params += (id_empresa,)
+
+    if merge:
+        destino = MERGE_STAGING
+        _create_merge_staging(cursor)
+    else:
+        destino = 'silver.fact_ventas'
+        cursor.execute(f"DELETE FROM silver.fact_ventas WHERE {condiciones}", params)
+    filas = _insert_sales(cursor, where_clause, params, 'bronze.raw_sales_all', motor, destino)
+
+    for _, path in archived_months(cursor, 'bronze.raw_sales', fecha_desde, fecha_hasta):
+        restore_month(cursor, 'bronze.raw_sales', path, 'tmp_ventas_archivo', fecha_desde, fecha_hasta)
+        filas += _insert_sales(cursor, where_clause, params, 'tmp_ventas_archivo', motor, destino)
+        cursor.execute("DROP TABLE tmp_ventas_archivo")
+
+    if merge:
+        _, filas = _merge_staged(cursor, alcance, params)
+    return filas
+
+
+def _run_month(fecha_desde: str, fecha_hasta: str, id_empresa: int, reintentos: int,
+               motor: str = None, merge: bool = None) -> tuple[int, float]:
+    """
+    Transforma un mes en su propia conexión y transacción, junto con su checkpoint.
+    Reintenta el mes completo ante un error (cada intento empieza de cero).
+
+    Returns:
+        (líneas insertadas, segundos del último intento)
+    """
+    empresa_checkpoint = TODAS_LAS_EMPRESAS if id_empresa is None else id_empresa
+    intento = 0
+    while True:
+        intento += 1
+        inicio = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                raw_conn = conn.connection.dbapi_connection
+                cursor = raw_conn.cursor()
+                try:
+                    filas = _transform_month(cursor, fecha_desde, fecha_hasta, id_empresa, motor, merge)
+                    mark_completed(cursor, CHUNK_ENTITY, fecha_desde, fecha_hasta, rows=filas,
+                                   id_empresa=empresa_checkpoint)
+                    raw_conn.commit()
+                except Exception:
+                    raw_conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            return filas, time.perf_counter() - inicio
+        except Exception as e:
+            if intento > reintentos:
+                raise
+            logger.warning(f"Mes {fecha_desde[:7]}: intento {intento} falló ({e}), reintentando...")
+
+
+def transform_sales_parallel(fecha_desde: str = '', fecha_hasta: str = '', id_empresa: int = None,
+                             max_workers: int = None, resume: bool = False, motor: str = None,
+                             merge: bool = None) -> int:
+    """
+    Reconstruye silver.fact_ventas por meses, en paralelo.
+
+    Cada mes es una transacción propia (DELETE del mes + INSERT ... SELECT desde bronze y
+    sus meses archivados) en su propia conexión: los bloqueos y el WAL quedan acotados a
+    un mes, PostgreSQL usa varios núcleos y un mes que falla no descarta los demás. Cada
+    mes confirmado queda registrado en bronze.load_checkpoints; con resume=True se
+    saltean los ya reconstruidos (ej: después de corregir el mes que falló).
+
+    Sin rango recorre todos los meses con datos en bronze o en silver (equivale a
+    --full-refresh) y, si todos los meses de todas las empresas terminan bien, inicializa
+    la marca de agua del modo incremental (salvo con resume: los meses de la corrida
+    anterior no incluyen lo cargado en bronze desde entonces).
+
+    Args:
+        fecha_desde: Fecha inicial (opcional, con fecha_hasta)
+        fecha_hasta: Fecha final (opcional)
+        id_empresa: Reconstruir solo las ventas de esa empresa (opcional)
+        max_workers: Meses simultáneos. Default: settings.SILVER_SALES_WORKERS (1 = secuencial)
+        resume: Saltear los meses completados por una ejecución anterior del mismo rango
+        motor: 'sql' o 'columnar' (opcional). Default: settings.SILVER_SALES_ENGINE
+        merge: Aplicar cada mes con MERGE por clave de línea (opcional). Default: settings.SILVER_SALES_MERGE
+
+    Returns:
+        Líneas insertadas (con merge, insertadas o actualizadas)
+
+    Raises:
+        SalesRefreshError: si algún mes falló después de sus reintentos (los demás quedan confirmados)
+    """
+    if max_workers is None:
+        max_workers = settings.SILVER_SALES_WORKERS
+    reintentos = settings.SILVER_SALES_RETRIES
+    start_time = datetime.now()
+
+    with engine.connect() as conn:
+        raw_conn = conn.connection.dbapi_connection
+        cursor = raw_conn.cursor()
+        es_total = id_empresa is None and not (fecha_desde and fecha_hasta) and not resume
+        # Posición de bronze antes de transformar: el modo incremental sigue desde acá
+        marca = _bronze_position(cursor) if es_total else None
+
+        unidades = [_month_range(mes, fecha_desde, fecha_hasta)
+                    for mes in _refresh_months(cursor, fecha_desde, fecha_hasta, id_empresa)]
+        if resume and unidades:
+            completados = completed_units(
+                cursor, CHUNK_ENTITY, unidades[0][0], unidades[-1][1],
+                TODAS_LAS_EMPRESAS if id_empresa is None else id_empresa
+            )
+            pendientes = [u for u in unidades if (u[0], u[1], 0) not in completados]
+            logger.info(f"Resume: {len(unidades) - len(pendientes)} mes(es) ya reconstruidos")
+            unidades = pendientes
+        raw_conn.commit()
+        cursor.close()
+
+    if not unidades:
+        logger.warning("Sin meses para reconstruir en silver.fact_ventas")
+        return 0
+
+    max_workers = max(1, min(max_workers, len(unidades)))
+    logger.info(f"Reconstruyendo {len(unidades)} mes(es) de silver.fact_ventas con {max_workers} conexión(es)")
+
+    lock = threading.Lock()
+    hechos = [0]
+
+    def procesar(unidad):
+        desde, hasta = unidad
+        try:
+            filas, segundos = _run_month(desde, hasta, id_empresa, reintentos, motor, merge)
+        except Exception as e:
+            logger.error(f"Mes {desde[:7]}: {e}")
+            return None, e
+        with lock:
+            hechos[0] += 1
+            logger.info(f"  [{hechos[0]}/{len(unidades)}] {desde[:7]}: {filas:,} líneas en {segundos:.1f}s")
+        return filas, None
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='silver_sales') as executor:
+        resultados = dict(zip((d[:7] for d, _ in unidades), executor.map(procesar, unidades)))
+
+    errores = {mes: error for mes, (_, error) in resultados.items() if error is not None}
+    inserted = sum(filas for filas, error in resultados.values() if error is None)
+
+    if es_total and not errores:
+        with engine.connect() as conn:
+            raw_conn = conn.connection.dbapi_connection
+            cursor = raw_conn.cursor()
+            _save_watermark(cursor, *marca)
+            raw_conn.commit()
+            cursor.close()
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    throughput = inserted / total_time if total_time > 0 else 0
+    logger.info(
+        f"Reconstrucción completada: {len(unidades) - len(errores)}/{len(unidades)} mes(es), "
+        f"{inserted:,} ventas en {total_time:.2f}s ({throughput:,.0f} reg/s)"
+    )
+    if errores:
+        raise SalesRefreshError(errores)
+    return inserted
+
+
 if __name__ == '__main__':
     transform_sales()
@@ -5,10 +5,62 @@ Convierte bronze.raw_staff a silver.staff.
 from database import engine
 from datetime import datetime
 from config import get_logger
+from layers.bronze.master_changes import MASTER_ENTITIES, apply_changes, last_change_id, advance_consumer
+from layers.silver.transformers.extraction import apply_strategy, record_join
 
 logger = get_logger(__name__)
 
 
+def _build_insert_query(condicion: str = '', strategy: str = None) -> str:
+    """
+    INSERT ... SELECT desde bronze.raw_staff (condicion: filtro AND adicional sobre bronze).
+    strategy: extracción de data_raw, operator o record (ver extraction.py)
+    """
+    return apply_strategy(f"""
+        INSERT INTO silver.staff (
+            id_personal,
+            des_personal,
+            cargo,
+            tipo_venta,
+            usuario_sistema,
+            telefono,
+            domicilio,
+            fecha_nacimiento,
+            id_sucursal,
+            id_fuerza_ventas,
+            id_personal_superior
+        )
+        SELECT DISTINCT ON (id_personal, id_sucursal)
+            id_personal,
+            data_raw->>'desPersonal',
+            data_raw->>'cargo',
+            data_raw->>'tipoVenta',
+            data_raw->>'usuarioSistema',
+            data_raw->>'telefono',
+            data_raw->>'domicilio',
+            NULLIF(data_raw->>'fechaNacimiento', '')::date,
+            id_sucursal,
+            id_fuerza_ventas,
+            NULLIF(data_raw->>'idPersonalSuperior', '')::integer
+        FROM bronze.raw_staff {record_join()}
+        WHERE id_personal IS NOT NULL
+          {condicion}
+        ORDER BY id_personal, id_sucursal, id DESC
+        ON CONFLICT (id_personal, id_sucursal) DO UPDATE SET
+            des_personal = EXCLUDED.des_personal,
+            cargo = EXCLUDED.cargo,
+            tipo_venta = EXCLUDED.tipo_venta,
+            usuario_sistema = EXCLUDED.usuario_sistema,
+            telefono = EXCLUDED.telefono,
+            domicilio = EXCLUDED.domicilio,
+            fecha_nacimiento = EXCLUDED.fecha_nacimiento,
+            id_sucursal = EXCLUDED.id_sucursal,
+            id_fuerza_ventas = EXCLUDED.id_fuerza_ventas,
+            id_personal_superior = EXCLUDED.id_personal_superior,
+            processed_at = CURRENT_TIMESTAMP
+    """, strategy=strategy)
+
+
 def transform_staff(full_refresh: bool = True):
     """
     Transforma bronze.raw_staff a silver.staff.
@@ -44,54 +96,8 @@ def transform_staff(full_refresh: bool = True):
         logger.info(f"Encontrados {total:,} registros")
         logger.debug("Ejecutando INSERT INTO SELECT...")
 
-        insert_query = """
-            INSERT INTO silver.staff (
-                id_personal,
-                des_personal,
-                cargo,
-                tipo_venta,
-                usuario_sistema,
-                telefono,
-                domicilio,
-                fecha_nacimiento,
-                id_sucursal,
-                id_fuerza_ventas,
-                id_personal_superior
-            )
-            SELECT DISTINCT ON (
-                    NULLIF(data_raw->>'idPersonal', '')::integer,
-                    NULLIF(data_raw->>'idSucursal', '')::integer
-                )
-                NULLIF(data_raw->>'idPersonal', '')::integer,
-                data_raw->>'desPersonal',
-                data_raw->>'cargo',
-                data_raw->>'tipoVenta',
-                data_raw->>'usuarioSistema',
-                data_raw->>'telefono',
-                data_raw->>'domicilio',
-                NULLIF(data_raw->>'fechaNacimiento', '')::date,
-                NULLIF(data_raw->>'idSucursal', '')::integer,
-                NULLIF(data_raw->>'idFuerzaVentas', '')::integer,
-                NULLIF(data_raw->>'idPersonalSuperior', '')::integer
-            FROM bronze.raw_staff
-            WHERE NULLIF(data_raw->>'idPersonal', '') IS NOT NULL
-            ORDER BY
-                NULLIF(data_raw->>'idPersonal', '')::integer,
-                NULLIF(data_raw->>'idSucursal', '')::integer,
-                id DESC
-            ON CONFLICT (id_personal, id_sucursal) DO UPDATE SET
-                des_personal = EXCLUDED.des_personal,
-                cargo = EXCLUDED.cargo,
-                tipo_venta = EXCLUDED.tipo_venta,
-                usuario_sistema = EXCLUDED.usuario_sistema,
-                telefono = EXCLUDED.telefono,
-                domicilio = EXCLUDED.domicilio,
-                fecha_nacimiento = EXCLUDED.fecha_nacimiento,
-                id_sucursal = EXCLUDED.id_sucursal,
-                id_fuerza_ventas = EXCLUDED.id_fuerza_ventas,
-                id_personal_superior = EXCLUDED.id_personal_superior,
-                processed_at = CURRENT_TIMESTAMP
-        """
+        posicion = last_change_id(cursor)
+        insert_query = _build_insert_query()
 
         insert_start = datetime.now()
         cursor.execute(insert_query)
@@ -100,6 +106,8 @@ def transform_staff(full_refresh: bool = True):
 
         logger.debug(f"INSERT completado en {insert_time:.2f}s ({inserted:,} registros)")
 
+        advance_consumer(cursor, 'silver.staff', posicion)
+
         raw_conn.commit()
         cursor.close()
 
@@ -108,5 +116,26 @@ def transform_staff(full_refresh: bool = True):
         logger.info(f"Transformación completada: {inserted:,} staff en {total_time:.2f}s ({throughput:,.0f} reg/s)")
 
 
+def transform_staff_changes():
+    """Recalcula en silver.staff solo el personal modificado en bronze (ver layers/bronze/master_changes.py)."""
+    start_time = datetime.now()
+    logger.info("Iniciando transformación de staff modificados...")
+
+    _, clave_bronze = MASTER_ENTITIES['staff']
+    filas = apply_changes('silver.staff', [
+        "DELETE FROM silver.staff WHERE (id_personal, id_sucursal) IN ("
+        "SELECT NULLIF(split_part(entity_key, '|', 1), '')::integer, NULLIF(split_part(entity_key, '|', 2), '')::integer "
+        "FROM tmp_master_keys)",
+        _build_insert_query(f"AND {clave_bronze} IN (SELECT entity_key FROM tmp_master_keys)"),
+    ])
+
+    if filas is None:
+        logger.info("Sin staff modificados en bronze")
+        return
+
+    total_time = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Transformación completada: {filas[0]:,} staff eliminados, {filas[1]:,} insertados en {total_time:.2f}s")
+
+
 if __name__ == '__main__':
     transform_staff()
@@ -1,14 +1,59 @@
 """
 Transformer para convertir datos crudos de stock (bronze) a formato estructurado (silver).
 Utiliza INSERT INTO SELECT para máxima eficiencia (todo ejecutado en PostgreSQL).
+
+Lee el inventario completo de cada día con bronze.raw_stock_snapshot(), que reconstruye
+los días guardados como baseline + deltas (ver layers/bronze/stock_snapshots.py).
+Los meses archivados en Parquet (layers/bronze/archive.py) se leen de vuelta con
+--full-refresh o un rango de fechas: mismo INSERT sobre una tabla temporal.
 """
 from database import engine
 from datetime import datetime
 from config import get_logger
+from layers.bronze.archive import archived_months, restore_month
+from layers.silver.transformers.extraction import apply_strategy, record_join
 
 logger = get_logger(__name__)
 
 
+def _build_insert_query(source: str = 'bronze.raw_stock_snapshot(%s::date, %s::date)',
+                        strategy: str = None) -> str:
+    """
+    INSERT INTO silver.fact_stock SELECT ... FROM `source` (inventario reconstruido o un mes archivado).
+    strategy: extracción de data_raw, operator o record (ver extraction.py)
+    """
+    return apply_strategy(f"""
+        INSERT INTO silver.fact_stock (
+            date_stock,
+            id_deposito,
+            id_almacen,
+            id_articulo,
+            ds_articulo,
+            cant_bultos,
+            cant_unidades,
+            fec_vto_lote
+        )
+        SELECT
+            date_stock,
+            id_deposito,
+            NULLIF(data_raw->>'idAlmacen', '')::integer,
+            NULLIF(data_raw->>'idArticulo', '')::integer,
+            data_raw->>'dsArticulo',
+            NULLIF(data_raw->>'cantBultos', '')::numeric(15,4),
+            NULLIF(data_raw->>'cantUnidades', '')::numeric(15,4),
+            NULLIF(NULLIF(data_raw->>'fecVtoLote', ''), '0001-01-01')::date
+        FROM {source} {record_join()}
+        ON CONFLICT (date_stock, id_deposito, id_articulo)
+        DO UPDATE SET
+            id_almacen = EXCLUDED.id_almacen,
+            ds_articulo = EXCLUDED.ds_articulo,
+            cant_bultos = EXCLUDED.cant_bultos,
+            cant_unidades = EXCLUDED.cant_unidades,
+            fec_vto_lote = EXCLUDED.fec_vto_lote,
+            processed_at = CURRENT_TIMESTAMP
+    """, strategy=strategy)
+
+
 def transform_stock(fecha_desde: str = '', fecha_hasta: str = '', full_refresh: bool = False):
     """
     Transforma datos de bronze.raw_stock a silver.fact_stock.
@@ -17,6 +62,7 @@ def transform_stock(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
         fecha_desde: Fecha inicial para filtrar (opcional)
         fecha_hasta: Fecha final para filtrar (opcional)
         full_refresh: Si True, elimina todos los datos de silver antes de insertar
+            (con full_refresh o un rango también se leen los meses archivados)
     """
     start_time = datetime.now()
     logger.info("Iniciando transformación de stock...")
@@ -28,18 +74,8 @@ def transform_stock(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
         # Optimizaciones de PostgreSQL
         cursor.execute("SET work_mem = '512MB'")
 
-        # Construir cláusula WHERE
-        where_conditions = []
-        params = []
-
-        if fecha_desde:
-            where_conditions.append("date_stock >= %s")
-            params.append(fecha_desde)
-        if fecha_hasta:
-            where_conditions.append("date_stock <= %s")
-            params.append(fecha_hasta)
-
-        where_clause = f"WHERE {' AND '.join(where_conditions)}" if where_conditions else ""
+        # Rango de días a reconstruir (NULL = sin límite)
+        params = (fecha_desde or None, fecha_hasta or None)
 
         # DELETE según el modo (fechas tienen prioridad sobre full_refresh)
         delete_start = datetime.now()
@@ -58,14 +94,25 @@ def transform_stock(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
             delete_time = (datetime.now() - delete_start).total_seconds()
             logger.debug(f"DELETE completado en {delete_time:.2f}s ({deleted:,} registros)")
 
-        # Contar registros a procesar
+        # Contar registros a procesar (filas del inventario completo, registradas por día)
         count_start = datetime.now()
-        count_query = f"SELECT COUNT(*) FROM bronze.raw_stock {where_clause}"
-        cursor.execute(count_query, params if params else None)
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(rows_total), 0) FROM bronze.raw_stock_days
+            WHERE (%s::date IS NULL OR date_stock >= %s::date)
+              AND (%s::date IS NULL OR date_stock <= %s::date)
+            """,
+            (params[0], params[0], params[1], params[1])
+        )
         total = cursor.fetchone()[0]
         count_time = (datetime.now() - count_start).total_seconds()
 
-        if total == 0:
+        # Meses archivados en Parquet: solo cuando silver se eliminó antes
+        archivados = []
+        if full_refresh or (fecha_desde and fecha_hasta):
+            archivados = archived_months(cursor, 'bronze.raw_stock', fecha_desde, fecha_hasta)
+
+        if total == 0 and not archivados:
             logger.warning("Sin datos para procesar en bronze.raw_stock")
             cursor.close()
             return
@@ -74,45 +121,27 @@ def transform_stock(fecha_desde: str = '', fecha_hasta: str = '', full_refresh:
         logger.debug("Ejecutando INSERT INTO SELECT...")
 
         # INSERT INTO SELECT
-        insert_query = f"""
-            INSERT INTO silver.fact_stock (
-                date_stock,
-                id_deposito,
-                id_almacen,
-                id_articulo,
-                ds_articulo,
-                cant_bultos,
-                cant_unidades,
-                fec_vto_lote
-            )
-            SELECT
-                date_stock,
-                id_deposito,
-                NULLIF(data_raw->>'idAlmacen', '')::integer,
-                NULLIF(data_raw->>'idArticulo', '')::integer,
-                data_raw->>'dsArticulo',
-                NULLIF(data_raw->>'cantBultos', '')::numeric(15,4),
-                NULLIF(data_raw->>'cantUnidades', '')::numeric(15,4),
-                NULLIF(NULLIF(data_raw->>'fecVtoLote', ''), '0001-01-01')::date
-            FROM bronze.raw_stock
-            {where_clause}
-            ON CONFLICT (date_stock, id_deposito, id_articulo)
-            DO UPDATE SET
-                id_almacen = EXCLUDED.id_almacen,
-                ds_articulo = EXCLUDED.ds_articulo,
-                cant_bultos = EXCLUDED.cant_bultos,
-                cant_unidades = EXCLUDED.cant_unidades,
-                fec_vto_lote = EXCLUDED.fec_vto_lote,
-                processed_at = CURRENT_TIMESTAMP
-        """
+        insert_query = _build_insert_query()
 
         insert_start = datetime.now()
-        cursor.execute(insert_query, params if params else None)
+        cursor.execute(insert_query, params)
         inserted = cursor.rowcount
         insert_time = (datetime.now() - insert_start).total_seconds()
 
         logger.debug(f"INSERT completado en {insert_time:.2f}s ({inserted:,} registros)")
 
+        for periodo, path in archivados:
+            restore_start = datetime.now()
+            restore_month(cursor, 'bronze.raw_stock', path, 'tmp_stock_archivo', fecha_desde, fecha_hasta)
+            cursor.execute(_build_insert_query('tmp_stock_archivo'))
+            filas = cursor.rowcount
+            inserted += filas
+            cursor.execute("DROP TABLE tmp_stock_archivo")
+            logger.debug(
+                f"Mes archivado {periodo:%Y-%m}: {filas:,} registros en "
+                f"{(datetime.now() - restore_start).total_seconds():.2f}s"
+            )
+
         commit_start = datetime.now()
         raw_conn.commit()
         commit_time = (datetime.now() - commit_start).total_seconds()
@@ -11,6 +11,13 @@ sys.path.insert(0, str(PROJECT_ROOT / 'src'))
 sys.path.insert(0, str(PROJECT_ROOT))
 
 
+@pytest.fixture(autouse=True)
+def scheduler_sin_esperas(monkeypatch):
+    """Scheduler compartido de la API sin esperas reales entre reintentos."""
+    from layers.bronze import scheduler
+    monkeypatch.setattr(scheduler, '_scheduler', scheduler.RequestScheduler(sleep=lambda segundos: None))
+
+
 @pytest.fixture
 def sample_sales_data():
     """Datos de ejemplo para tests de ventas."""
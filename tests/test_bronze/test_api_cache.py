@@ -0,0 +1,137 @@
+"""
+Tests para la cache en disco de respuestas de la API.
+"""
+import os
+import time
+import pytest
+
+
+class FakeClient:
+    """Cliente falso que cuenta las llamadas a la API."""
+
+    name = 'EMPRESA1'
+
+    def __init__(self):
+        self.llamadas = 0
+
+    def get_sales(self, fecha_desde, fecha_hasta, raw=True):
+        self.llamadas += 1
+        return [{'fechaComprobate': fecha_desde, 'n': self.llamadas}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    from layers.bronze.api_cache import ApiCache
+    return ApiCache(directory=str(tmp_path), ttl_hours=1, max_mb=10)
+
+
+class TestApiCache:
+    """Tests para ApiCache."""
+
+    def test_clave_estable_e_independiente_del_orden(self):
+        from layers.bronze.api_cache import ApiCache
+
+        k1 = ApiCache.make_key('E1', 'get_sales', {'kwargs': {'a': 1, 'b': 2}})
+        k2 = ApiCache.make_key('E1', 'get_sales', {'kwargs': {'b': 2, 'a': 1}})
+        k3 = ApiCache.make_key('E2', 'get_sales', {'kwargs': {'a': 1, 'b': 2}})
+
+        assert k1 == k2
+        assert k1 != k3
+
+    def test_put_y_get(self, cache):
+        cache.put('get_sales', 'k', {}, [{'x': 1}])
+
+        assert cache.get('get_sales', 'k') == (True, [{'x': 1}])
+        assert cache.path_for('get_sales', 'k').name.endswith('.json.gz')
+
+    def test_cuerpo_crudo(self, cache):
+        """Los cuerpos crudos (bytes) de get_*_body vuelven como bytes."""
+        body = '{"dsStock": [{"desc": "ñandú"}]}'.encode()
+        cache.put('get_stock_body', 'k', {}, body)
+
+        assert cache.get('get_stock_body', 'k') == (True, body)
+
+    def test_entrada_vencida(self, cache):
+        cache.put('get_sales', 'k', {}, [1])
+        viejo = time.time() - 2 * 3600
+        os.utime(cache.path_for('get_sales', 'k'), (viejo, viejo))
+
+        assert cache.get('get_sales', 'k') == (False, None)
+        assert cache.get('get_sales', 'k', ignore_ttl=True) == (True, [1])
+
+    def test_evict_elimina_las_mas_antiguas(self, cache):
+        for i in range(3):
+            cache.put('get_stock', f'k{i}', {}, [os.urandom(64).hex() for _ in range(50)])
+            t = time.time() - (10 - i)
+            os.utime(cache.path_for('get_stock', f'k{i}'), (t, t))
+
+        tamanio = cache.path_for('get_stock', 'k0').stat().st_size
+        cache.max_bytes = 2 * tamanio + tamanio // 2
+        cache.evict()
+
+        assert not cache.path_for('get_stock', 'k0').exists()
+        assert cache.path_for('get_stock', 'k2').exists()
+
+    def test_put_no_recorre_el_directorio_cada_vez(self, cache):
+        """El tamaño se lleva en memoria: un solo recorrido mientras no se pase del límite."""
+        from unittest.mock import patch
+
+        with patch.object(cache, '_scan', wraps=cache._scan) as mock_scan:
+            for i in range(20):
+                cache.put('get_stock', f'k{i}', {}, [i])
+
+        assert mock_scan.call_count == 1
+
+    def test_put_elimina_al_pasar_el_limite(self, cache):
+        cache.put('get_stock', 'k0', {}, [os.urandom(64).hex() for _ in range(50)])
+        viejo = time.time() - 60
+        os.utime(cache.path_for('get_stock', 'k0'), (viejo, viejo))
+        tamanio = cache.path_for('get_stock', 'k0').stat().st_size
+        cache.max_bytes = tamanio + tamanio // 2
+
+        cache.put('get_stock', 'k1', {}, [os.urandom(64).hex() for _ in range(50)])
+
+        assert not cache.path_for('get_stock', 'k0').exists()
+        assert cache.path_for('get_stock', 'k1').exists()
+
+
+class TestCachedClient:
+    """Tests para cached_client() y los modos de cache."""
+
+    def test_modo_off_retorna_el_cliente(self):
+        from layers.bronze.api_cache import cached_client
+
+        client = FakeClient()
+        assert cached_client(client, mode='off') is client
+
+    def test_modo_on_consulta_una_sola_vez(self, cache):
+        from layers.bronze.api_cache import CachedClient
+
+        client = FakeClient()
+        cacheado = CachedClient(client, 'on', cache)
+
+        r1 = cacheado.get_sales(fecha_desde='2025-01-01', fecha_hasta='2025-01-31')
+        r2 = cacheado.get_sales(fecha_desde='2025-01-01', fecha_hasta='2025-01-31')
+        cacheado.get_sales(fecha_desde='2025-02-01', fecha_hasta='2025-02-28')
+
+        assert r1 == r2
+        assert client.llamadas == 2
+
+    def test_replay_no_usa_la_red(self, cache):
+        from layers.bronze.api_cache import CachedClient, CacheMissError
+
+        CachedClient(FakeClient(), 'on', cache).get_sales(fecha_desde='2025-01-01', fecha_hasta='2025-01-31')
+
+        client = FakeClient()
+        replay = CachedClient(client, 'replay', cache)
+        assert replay.get_sales(fecha_desde='2025-01-01', fecha_hasta='2025-01-31')[0]['n'] == 1
+
+        with pytest.raises(CacheMissError):
+            replay.get_sales(fecha_desde='2025-03-01', fecha_hasta='2025-03-31')
+        assert client.llamadas == 0
+
+    def test_set_cache_mode_invalido(self):
+        from layers.bronze.api_cache import set_cache_mode
+
+        with pytest.raises(ValueError):
+            set_cache_mode('siempre')
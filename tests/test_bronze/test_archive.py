@@ -0,0 +1,242 @@
+"""
+Tests para el archivo de meses fríos de bronze en Parquet.
+"""
+from datetime import date
+from pathlib import Path
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from config import settings
+from layers.bronze.archive import (
+    ArchivedMonthError,
+    archive_month,
+    archive_months,
+    archive_path,
+    archived_months,
+    check_not_archived,
+)
+
+
+@pytest.fixture(autouse=True)
+def archive_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'ARCHIVE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def _export_falso(raw_conn, table, mes, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'PAR1')
+    return 10
+
+
+class TestArchivePath:
+
+    def test_un_archivo_por_mes(self, archive_tmp):
+        assert archive_path('bronze.raw_sales', '2024-01-15') == archive_tmp / 'raw_sales' / '2024-01.parquet'
+
+
+class TestArchiveMonth:
+    """Tests para archive_month() (registro + eliminación de la partición)."""
+
+    def _run(self, table, particion):
+        mock_cursor = MagicMock()
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = mock_cursor
+        with patch('layers.bronze.archive.export_month', side_effect=_export_falso):
+            filas = archive_month(mock_raw_conn, table, particion, date(2024, 1, 1))
+        return filas, [c.args[0] for c in mock_cursor.execute.call_args_list], mock_raw_conn
+
+    def test_registra_y_elimina_la_particion(self):
+        filas, sqls, mock_raw_conn = self._run('bronze.raw_sales', 'bronze.raw_sales_p2024_01')
+
+        assert filas == 10
+        assert 'INSERT INTO bronze.archived_months' in sqls[0]
+        assert sqls[1] == 'ALTER TABLE bronze.raw_sales DETACH PARTITION bronze.raw_sales_p2024_01'
+        assert sqls[2] == 'DROP TABLE bronze.raw_sales_p2024_01'
+        assert len(sqls) == 3
+        mock_raw_conn.commit.assert_called_once()
+
+    def test_mes_compactado_elimina_la_particion_compacta(self):
+        mock_cursor = MagicMock()
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = mock_cursor
+        with patch('layers.bronze.archive.export_month', side_effect=_export_falso) as mock_export:
+            archive_month(mock_raw_conn, 'bronze.raw_sales', 'bronze.raw_sales_compact_p2024_01',
+                          date(2024, 1, 1), 'bronze.raw_sales_compact')
+
+        # El archivo es el mismo de la tabla de ventas
+        assert mock_export.call_args.args[1] == 'bronze.raw_sales'
+        sqls = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert sqls[1] == 'ALTER TABLE bronze.raw_sales_compact DETACH PARTITION bronze.raw_sales_compact_p2024_01'
+
+    def test_ventas_se_leen_de_planas_y_compactadas(self):
+        from layers.bronze.archive import _source_sql
+        sql, params = _source_sql('bronze.raw_sales', date(2024, 1, 1))
+        assert 'FROM bronze.raw_sales_all ' in sql and 'deleted_at IS NULL' in sql
+        assert params == (date(2024, 1, 1), date(2024, 2, 1))
+
+    def test_stock_elimina_el_registro_de_dias(self):
+        _, sqls, _ = self._run('bronze.raw_stock', 'bronze.raw_stock_p2024_01')
+        assert 'DELETE FROM bronze.raw_stock_days' in sqls[-1]
+
+    def test_error_hace_rollback(self):
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value.execute.side_effect = [None, Exception('sin permiso')]
+        with patch('layers.bronze.archive.export_month', side_effect=_export_falso):
+            with pytest.raises(Exception, match='sin permiso'):
+                archive_month(mock_raw_conn, 'bronze.raw_sales', 'bronze.raw_sales_p2024_01', date(2024, 1, 1))
+        mock_raw_conn.rollback.assert_called_once()
+        mock_raw_conn.commit.assert_not_called()
+
+
+class TestArchiveMonths:
+    """Tests para archive_months()."""
+
+    def test_archiva_solo_meses_anteriores_al_limite(self):
+        particiones = {
+            'bronze.raw_sales': [
+                ('bronze.raw_sales_p2024_02', date(2024, 2, 1)),
+                ('bronze.raw_sales_p2024_03', date(2024, 3, 1)),
+            ],
+            # Meses compactados (ver layers/bronze/compaction.py)
+            'bronze.raw_sales_compact': [('bronze.raw_sales_compact_p2024_01', date(2024, 1, 1))],
+        }
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+
+        with patch('layers.bronze.archive.engine') as mock_engine, \
+             patch('layers.bronze.archive._pyarrow'), \
+             patch('layers.bronze.archive.date') as mock_date, \
+             patch('layers.bronze.archive.list_partitions', side_effect=lambda c, t: particiones[t]), \
+             patch('layers.bronze.archive.archive_month', return_value=5) as mock_archive, \
+             patch('layers.bronze.archive.Path.stat', return_value=MagicMock(st_size=1024)):
+            mock_engine.connect.return_value = mock_conn
+            mock_date.today.return_value = date(2024, 4, 10)
+            archivos = archive_months('bronze.raw_sales', 2)
+
+        assert [c.args[2:] for c in mock_archive.call_args_list] == [
+            ('bronze.raw_sales_compact_p2024_01', date(2024, 1, 1), 'bronze.raw_sales_compact'),
+            ('bronze.raw_sales_p2024_02', date(2024, 2, 1), 'bronze.raw_sales'),
+        ]
+        assert [Path(a).name for a in archivos] == ['2024-01.parquet', '2024-02.parquet']
+
+    def test_tabla_no_particionada(self):
+        with pytest.raises(ValueError):
+            archive_months('bronze.raw_clientes', 3)
+
+    def test_sin_pyarrow(self):
+        with patch.dict('sys.modules', {'pyarrow': None}):
+            with pytest.raises(ImportError, match='pyarrow'):
+                archive_months('bronze.raw_sales', 3)
+
+
+class TestArchivedMonths:
+
+    def test_filtra_por_rango(self):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(date(2024, 1, 1), '/a/2024-01.parquet')]
+
+        assert archived_months(mock_cursor, 'bronze.raw_sales', '2024-01-15', '') == [
+            (date(2024, 1, 1), '/a/2024-01.parquet')
+        ]
+        assert mock_cursor.execute.call_args.args[1] == (
+            'bronze.raw_sales', '2024-01-15', '2024-01-15', None, None
+        )
+
+    def test_no_se_vuelve_a_cargar(self):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(date(2024, 3, 1), '/a/2024-03.parquet')]
+        with pytest.raises(ArchivedMonthError, match='2024-03'):
+            check_not_archived(mock_cursor, 'bronze.raw_sales', '2024-02-15', '2024-03-10')
+
+        mock_cursor.fetchall.return_value = []
+        check_not_archived(mock_cursor, 'bronze.raw_sales', '2024-02-01', '2024-02-29')
+
+    @pytest.mark.parametrize('modulo, funcion, tabla', [
+        ('layers.bronze.loaders.sales_loader', 'load_bronze', 'bronze.raw_sales'),
+        ('layers.bronze.landing', 'reload_sales', 'bronze.raw_sales'),
+        ('layers.bronze.loaders.stock_loader', 'load_stock', 'bronze.raw_stock'),
+        ('layers.bronze.landing', 'reload_stock', 'bronze.raw_stock'),
+    ])
+    def test_loaders_rechazan_meses_archivados(self, modulo, funcion, tabla):
+        """Los loaders fallan antes de crear la partición del mes archivado."""
+        import importlib
+        loader = importlib.import_module(modulo)
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(date(2024, 3, 1), '/a/2024-03.parquet')]
+        mock_conn = MagicMock()
+        mock_conn.__enter__.return_value.connection.dbapi_connection.cursor.return_value = mock_cursor
+
+        with patch(f'{modulo}.engine') as mock_engine, \
+             patch(f'{modulo}.ensure_partitions') as mock_ensure, \
+             patch(f'{modulo}.check_not_compacted', create=True), \
+             patch(f'{modulo}.current_client', create=True), \
+             patch(f'{modulo}.cargar_depositos', create=True, return_value=[{'id': 1}]), \
+             patch(f'{modulo}._sales_files', create=True, return_value=[]), \
+             patch(f'{modulo}.read_manifest', create=True, return_value={'stock_1.ndjson.gz': {}}):
+            mock_engine.connect.return_value = mock_conn
+            with pytest.raises(ArchivedMonthError):
+                getattr(loader, funcion)('2024-03-01', '2024-03-31')
+
+        mock_ensure.assert_not_called()
+        assert mock_cursor.execute.call_args.args[1][0] == tabla
+
+
+class TestParquet:
+    """Ida y vuelta real por Parquet (requiere pyarrow)."""
+
+    def test_exporta_y_restaura_filtrando_fechas(self, archive_tmp):
+        pytest.importorskip('pyarrow')
+        from layers.bronze.archive import export_month, restore_month
+
+        filas = [
+            (date(2024, 1, d), 3, '{"idArticulo": %d}' % d) for d in (1, 2, 3)
+        ]
+        # Fuente de stock: date_stock, id_deposito, 4 claves aplanadas, data_raw
+        servidor = MagicMock()
+        servidor.fetchmany.side_effect = [
+            [(f, dep, 1, 10, 1.0, 2.5, raw) for f, dep, raw in filas], []
+        ]
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = servidor
+        path = archive_path('bronze.raw_stock', '2024-01-01')
+
+        assert export_month(mock_raw_conn, 'bronze.raw_stock', date(2024, 1, 1), path) == 3
+        assert path.exists()
+        assert not path.with_name(path.name + '.tmp').exists()
+
+        mock_cursor = MagicMock()
+        with patch('layers.bronze.archive.copy_rows', side_effect=lambda c, t, cols, rows: len(list(rows))) as mock_copy:
+            assert restore_month(mock_cursor, 'bronze.raw_stock', str(path), 'tmp_stock_archivo',
+                                 '2024-01-02', '2024-01-31') == 2
+
+        assert 'CREATE TEMP TABLE tmp_stock_archivo' in mock_cursor.execute.call_args.args[0]
+        assert mock_copy.call_args.args[2] == ['data_raw', 'date_stock', 'id_deposito']
+
+    def test_restaura_por_bloques(self, archive_tmp, monkeypatch):
+        """El archivo se lee y copia por bloques de ARCHIVE_BATCH_SIZE filas, sin cargar el mes entero."""
+        pytest.importorskip('pyarrow')
+        from layers.bronze.archive import export_month, restore_month
+
+        servidor = MagicMock()
+        servidor.fetchmany.side_effect = [
+            [(date(2024, 1, d), 3, 1, 10, 1.0, 2.5, '{}') for d in range(1, 11)], []
+        ]
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = servidor
+        path = archive_path('bronze.raw_stock', '2024-01-01')
+        export_month(mock_raw_conn, 'bronze.raw_stock', date(2024, 1, 1), path)
+
+        monkeypatch.setattr(settings, 'ARCHIVE_BATCH_SIZE', 4)
+        bloques = []
+        with patch('layers.bronze.archive.copy_rows', side_effect=lambda c, t, cols, rows: bloques.append(
+                [r[1] for r in rows]) or len(bloques[-1])), \
+             patch('pyarrow.parquet.read_table') as mock_read_table:
+            assert restore_month(MagicMock(), 'bronze.raw_stock', str(path), 'tmp_stock_archivo',
+                                 '2024-01-03', '') == 8
+
+        mock_read_table.assert_not_called()
+        assert [len(b) for b in bloques] == [2, 4, 2]
+        assert bloques[0][0] == date(2024, 1, 3)
@@ -0,0 +1,107 @@
+"""
+Tests para la compactación de ventas con diccionario de claves.
+"""
+from datetime import date
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from layers.bronze.compaction import (
+    CompactedMonthError,
+    check_not_compacted,
+    compact_month,
+    compact_months,
+    expand_month,
+)
+
+
+def _sqls(mock_cursor):
+    return [' '.join(str(c.args[0]).split()) for c in mock_cursor.execute.call_args_list]
+
+
+class TestCheckNotCompacted:
+
+    def test_mes_compactado_en_el_rango(self):
+        particiones = [('bronze.raw_sales_compact_p2024_01', date(2024, 1, 1)),
+                       ('bronze.raw_sales_compact_p2024_03', date(2024, 3, 1))]
+        with patch('layers.bronze.compaction.list_partitions', return_value=particiones):
+            with pytest.raises(CompactedMonthError, match='2024-03'):
+                check_not_compacted(MagicMock(), '2024-02-15', '2024-03-10')
+            check_not_compacted(MagicMock(), '2024-02-01', '2024-02-29')
+
+
+class TestCompactMonth:
+    """Tests para compact_month()."""
+
+    def _run(self, vigentes):
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 120
+        mock_cursor.fetchone.return_value = (vigentes,)
+        with patch('layers.bronze.compaction.create_staging_partition',
+                   return_value='bronze.raw_sales_compact_p2024_01_swap'), \
+             patch('layers.bronze.compaction.swap_partition') as mock_swap:
+            filas = compact_month(mock_cursor, 'bronze.raw_sales_p2024_01', date(2024, 1, 1))
+        return filas, _sqls(mock_cursor), mock_swap
+
+    def test_registra_claves_compacta_y_elimina_la_particion_plana(self):
+        filas, sqls, mock_swap = self._run(120)
+
+        assert filas == 120
+        assert 'INSERT INTO bronze.sales_key_schemas (keys)' in sqls[0]
+        assert 'ON CONFLICT (keys) DO NOTHING' in sqls[0]
+        assert 'INSERT INTO bronze.raw_sales_compact_p2024_01_swap' in sqls[1]
+        assert 'FROM bronze.raw_sales_p2024_01 r' in sqls[1]
+        assert 'r.deleted_at IS NULL' in sqls[1]
+        assert mock_swap.call_args.args[1:] == (
+            'bronze.raw_sales_compact', date(2024, 1, 1), 'bronze.raw_sales_compact_p2024_01_swap'
+        )
+        assert sqls[-2:] == ['ALTER TABLE bronze.raw_sales DETACH PARTITION bronze.raw_sales_p2024_01',
+                             'DROP TABLE bronze.raw_sales_p2024_01']
+
+    def test_conteo_distinto_no_elimina_nada(self):
+        with pytest.raises(RuntimeError, match='vigentes'):
+            self._run(121)
+
+
+class TestExpandMonth:
+
+    def test_rearma_el_jsonb_en_la_particion_plana(self):
+        mock_cursor = MagicMock()
+        with patch('layers.bronze.compaction.create_staging_partition',
+                   return_value='bronze.raw_sales_p2024_01_swap'), \
+             patch('layers.bronze.compaction.swap_partition') as mock_swap:
+            expand_month(mock_cursor, 'bronze.raw_sales_compact_p2024_01', date(2024, 1, 1))
+
+        sqls = _sqls(mock_cursor)
+        assert 'INSERT INTO bronze.raw_sales_p2024_01_swap' in sqls[0]
+        assert 'bronze.expand_keys(k.keys, c.data_values)' in sqls[0]
+        assert mock_swap.call_args.args[1] == 'bronze.raw_sales'
+        assert sqls[-1] == 'DROP TABLE bronze.raw_sales_compact_p2024_01'
+
+
+class TestCompactMonths:
+
+    def test_un_mes_por_transaccion(self):
+        particiones = [('bronze.raw_sales_p2024_01', date(2024, 1, 1)),
+                       ('bronze.raw_sales_p2024_02', date(2024, 2, 1)),
+                       ('bronze.raw_sales_p2024_05', date(2024, 5, 1))]
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (1024,)
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = mock_cursor
+        mock_conn = MagicMock()
+        mock_conn.connection.dbapi_connection = mock_raw_conn
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+
+        with patch('layers.bronze.compaction.engine') as mock_engine, \
+             patch('layers.bronze.compaction.list_partitions', return_value=particiones), \
+             patch('layers.bronze.compaction.compact_month', return_value=10) as mock_compact:
+            mock_engine.connect.return_value = mock_conn
+            assert compact_months('2024-01-01', '2024-03-31') == 20
+
+        assert [c.args[1] for c in mock_compact.call_args_list] == [
+            'bronze.raw_sales_p2024_01', 'bronze.raw_sales_p2024_02'
+        ]
+        assert mock_raw_conn.commit.call_count == 3
+
@@ -0,0 +1,106 @@
+"""
+Tests para la carga de ventas de varias empresas en paralelo (Bronze).
+"""
+import time
+import threading
+import pytest
+from unittest.mock import patch
+
+from layers.bronze.companies import CompaniesLoadError, configured_companies, run_companies
+
+
+@pytest.fixture
+def mock_ensure():
+    """Parchea el engine y retorna el mock de ensure_partitions."""
+    with patch('layers.bronze.companies.engine'), \
+         patch('layers.bronze.companies.ensure_partitions') as ensure:
+        yield ensure
+
+
+class TestConfiguredCompanies:
+    """Tests para configured_companies()."""
+
+    @patch('layers.bronze.companies.settings')
+    def test_todas_o_las_pedidas(self, mock_settings):
+        mock_settings.ERP_COMPANIES = {'EMPRESA1_': 1, 'EMPRESA2_': 2}
+
+        assert configured_companies() == {'EMPRESA1_': 1, 'EMPRESA2_': 2}
+        assert configured_companies(['EMPRESA2_']) == {'EMPRESA2_': 2}
+
+    @patch('layers.bronze.companies.settings')
+    def test_prefijo_no_configurado(self, mock_settings):
+        mock_settings.ERP_COMPANIES = {'EMPRESA1_': 1}
+
+        with pytest.raises(ValueError, match='EMPRESA3_'):
+            configured_companies(['EMPRESA3_'])
+
+
+class TestRunCompanies:
+    """Tests para run_companies()."""
+
+    def test_empresas_en_paralelo(self, mock_ensure):
+        """Cada empresa carga con sus credenciales y su id; tarda lo que la más lenta."""
+        llamadas = []
+
+        def load(desde, hasta, prefix, id_empresa, **kwargs):
+            llamadas.append((prefix, id_empresa, kwargs))
+            time.sleep(0.2)
+
+        inicio = time.perf_counter()
+        with patch('layers.bronze.companies.load_bronze', side_effect=load):
+            tiempos = run_companies('2025-01-01', '2025-01-31', {'EMPRESA1_': 1, 'EMPRESA2_': 2, 'EMPRESA3_': 3},
+                                    max_workers=3, resume=True)
+        total = time.perf_counter() - inicio
+
+        assert set(tiempos) == {1, 2, 3}
+        assert total < 0.5
+        assert sorted(llamadas) == [(f'EMPRESA{i}_', i, {'resume': True}) for i in (1, 2, 3)]
+        # Particiones creadas una sola vez antes de los hilos
+        mock_ensure.assert_called_once()
+
+    def test_replace_de_a_una(self, mock_ensure):
+        activos = []
+        maximo = []
+        lock = threading.Lock()
+
+        def load(*args, **kwargs):
+            with lock:
+                activos.append(1)
+                maximo.append(len(activos))
+            time.sleep(0.01)
+            with lock:
+                activos.pop()
+
+        with patch('layers.bronze.companies.load_bronze', side_effect=load):
+            run_companies('2025-01-01', '2025-01-31', {'EMPRESA1_': 1, 'EMPRESA2_': 2}, max_workers=4,
+                          replace=True)
+
+        assert max(maximo) == 1
+        mock_ensure.assert_not_called()
+
+    def test_falla_no_corta_a_las_demas(self, mock_ensure):
+        cargadas = []
+
+        def load(desde, hasta, prefix, id_empresa, **kwargs):
+            if id_empresa == 2:
+                raise RuntimeError("login inválido")
+            cargadas.append(id_empresa)
+
+        with patch('layers.bronze.companies.load_bronze', side_effect=load):
+            with pytest.raises(CompaniesLoadError) as exc:
+                run_companies('2025-01-01', '2025-01-31', {'EMPRESA1_': 1, 'EMPRESA2_': 2, 'EMPRESA3_': 3},
+                              max_workers=2)
+
+        assert sorted(cargadas) == [1, 3]
+        assert list(exc.value.errores) == [2]
+        assert 'empresa 2 (login inválido)' in str(exc.value)
+
+    @patch('layers.bronze.companies.settings')
+    def test_default_de_settings(self, mock_settings, mock_ensure):
+        mock_settings.ERP_COMPANIES = {'EMPRESA1_': 1}
+        mock_settings.COMPANIES_MAX_WORKERS = 4
+
+        with patch('layers.bronze.companies.load_bronze') as mock_load:
+            run_companies('2025-01-01', '2025-01-31')
+
+        mock_load.assert_called_once_with('2025-01-01', '2025-01-31', prefix='EMPRESA1_', id_empresa=1)
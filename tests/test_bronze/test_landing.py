@@ -0,0 +1,202 @@
+"""
+Tests para la landing zone de bronze (NDJSON comprimido + manifiesto + recarga con COPY).
+"""
+import gzip
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from config import settings
+from layers.bronze.landing import (
+    LandingError,
+    LandingFile,
+    land_sales,
+    land_stock,
+    landing_dir,
+    read_manifest,
+    reload_sales,
+    reload_stock,
+)
+
+
+@pytest.fixture(autouse=True)
+def landing_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'LANDING_DIR', str(tmp_path))
+    return tmp_path
+
+
+def _lineas(entity, fecha, nombre):
+    with gzip.open(landing_dir(entity, fecha) / nombre, 'rb') as f:
+        return [json.loads(linea) for linea in f]
+
+
+def _mock_engine():
+    """Engine mockeado cuyo copy_expert consume el stream (como PostgreSQL)."""
+    mock_cursor = MagicMock()
+    copiados = []
+
+    def copy_expert(sql, stream, size=8192):
+        datos = b''
+        while True:
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            datos += chunk
+        copiados.append((sql, datos))
+
+    mock_cursor.copy_expert.side_effect = copy_expert
+    mock_raw_conn = MagicMock()
+    mock_raw_conn.cursor.return_value = mock_cursor
+    mock_conn = MagicMock()
+    mock_conn.connection.dbapi_connection = mock_raw_conn
+    mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+    mock_conn.__exit__ = MagicMock(return_value=False)
+    mock_engine = MagicMock()
+    mock_engine.connect.return_value = mock_conn
+    return mock_engine, mock_cursor, mock_raw_conn, copiados
+
+
+class TestLandSales:
+    """Tests para land_sales()."""
+
+    def test_un_archivo_por_dia_con_manifiesto(self):
+        ventas = [
+            {'fechaComprobate': '2025-01-01', 'nrodoc': 1},
+            {'fechaComprobate': '2025-01-03', 'nrodoc': 2},
+            {'fechaComprobate': '2025-01-03', 'nrodoc': 3},
+        ]
+
+        assert land_sales('2025-01-01', '2025-01-03', 2, ventas) == 3
+
+        assert _lineas('sales', '2025-01-03', 'empresa_2.ndjson.gz') == ventas[1:]
+        # Día consultado sin ventas: archivo vacío registrado
+        assert _lineas('sales', '2025-01-02', 'empresa_2.ndjson.gz') == []
+        entrada = read_manifest('sales', '2025-01-03')['empresa_2.ndjson.gz']
+        assert entrada['rows'] == 2
+        assert len(entrada['sha256']) == 64
+        assert read_manifest('sales', '2025-01-02')['empresa_2.ndjson.gz']['rows'] == 0
+
+    def test_cuerpos_crudos(self):
+        body = json.dumps({'dsReporteComprobantesApi': {'VentasResumen': [
+            {'fechaComprobate': '2025-01-01', 'nrodoc': 1},
+        ]}}).encode()
+
+        land_sales('2025-01-01', '2025-01-01', 1, [body])
+
+        assert _lineas('sales', '2025-01-01', 'empresa_1.ndjson.gz') == [{'fechaComprobate': '2025-01-01', 'nrodoc': 1}]
+
+    def test_reescribe_el_dia(self):
+        land_sales('2025-01-01', '2025-01-01', 1, [{'fechaComprobate': '2025-01-01', 'n': 1}] * 3)
+        land_sales('2025-01-01', '2025-01-01', 1, [{'fechaComprobate': '2025-01-01', 'n': 2}])
+
+        assert _lineas('sales', '2025-01-01', 'empresa_1.ndjson.gz') == [{'fechaComprobate': '2025-01-01', 'n': 2}]
+        assert read_manifest('sales', '2025-01-01')['empresa_1.ndjson.gz']['rows'] == 1
+
+    def test_stock(self):
+        assert land_stock('2025-01-15', 3, [{'idArticulo': 1}, {'idArticulo': 2}]) == 2
+        assert land_stock('2025-01-15', 4, None) == 0
+
+        assert set(read_manifest('stock', '2025-01-15')) == {'deposito_3.ndjson.gz', 'deposito_4.ndjson.gz'}
+
+
+class TestLandingFile:
+    """Tests para LandingFile (lectura verificada contra el manifiesto)."""
+
+    def test_archivo_alterado(self):
+        land_stock('2025-01-15', 3, [{'idArticulo': 1}, {'idArticulo': 2}])
+        path = landing_dir('stock', '2025-01-15') / 'deposito_3.ndjson.gz'
+        with gzip.open(path, 'wb') as f:
+            f.write(b'{"idArticulo": 1}\n')
+
+        archivo = LandingFile('stock', '2025-01-15', 'deposito_3.ndjson.gz',
+                              read_manifest('stock', '2025-01-15')['deposito_3.ndjson.gz'])
+        assert list(archivo) == [b'{"idArticulo": 1}']
+        with pytest.raises(LandingError):
+            archivo.verify()
+
+
+class TestReloadSales:
+    """Tests para reload_sales()."""
+
+    def test_dias_faltantes_no_tocan_la_base(self):
+        land_sales('2025-01-01', '2025-01-30', 1, [])
+
+        with patch('layers.bronze.landing.engine') as mock_engine:
+            with pytest.raises(LandingError, match='2025-01-31'):
+                reload_sales('2025-01-01', '2025-01-31')
+
+        mock_engine.connect.assert_not_called()
+
+    def test_copy_directo_y_swap_por_mes(self):
+        land_sales('2025-01-30', '2025-02-01', 2, [
+            {'fechaComprobate': '2025-01-30', 'nrodoc': 1},
+            {'fechaComprobate': '2025-02-01', 'nrodoc': 2},
+        ])
+        mock_engine, mock_cursor, mock_raw_conn, copiados = _mock_engine()
+
+        with patch('layers.bronze.landing.engine', mock_engine), \
+             patch('layers.bronze.landing.swap_partition') as mock_swap, \
+             patch('layers.bronze.landing.carry_over_rows') as mock_carry, \
+             patch('layers.bronze.landing.record_replaced_documents') as mock_record, \
+             patch('layers.bronze.landing.mark_completed') as mock_mark:
+            assert reload_sales('2025-01-30', '2025-02-01', 2) == 2
+
+        assert [c.args[2] for c in mock_swap.call_args_list] == ['2025-01-30', '2025-02-01']
+        assert mock_carry.call_args_list[0].args[3:] == ('2025-01-30', '2025-01-31', 2)
+        # Los documentos que desaparecen del mes quedan en el log de cambios
+        assert mock_record.call_args_list[0].args[1:] == (
+            'bronze.raw_sales_p2025_01_swap', '2025-01-30', '2025-01-31', 2
+        )
+        sql, datos = copiados[0]
+        assert sql == ('COPY bronze.raw_sales_p2025_01_swap (data_raw, source_system, date_comprobante, id_empresa) '
+                       'FROM STDIN')
+        assert datos == b'{"fechaComprobate": "2025-01-30", "nrodoc": 1}\tAPI_CHESS_ERP\t2025-01-30\t2\n'
+        assert len(copiados) == 3
+        assert mock_mark.call_args_list[0].kwargs == {'rows': 1, 'id_empresa': 2}
+        assert mock_raw_conn.commit.call_count == 3
+
+
+class TestReloadStock:
+    """Tests para reload_stock()."""
+
+    def test_reemplaza_cada_deposito_como_completo(self):
+        land_stock('2025-01-15', 3, [{'idArticulo': 1}, {'idArticulo': 2}])
+        land_stock('2025-01-15', 4, [])
+        mock_engine, mock_cursor, mock_raw_conn, copiados = _mock_engine()
+
+        with patch('layers.bronze.landing.engine', mock_engine), \
+             patch('layers.bronze.landing.ensure_partitions'), \
+             patch('layers.bronze.landing.delete_day') as mock_delete, \
+             patch('layers.bronze.landing.register_day') as mock_register, \
+             patch('layers.bronze.landing.mark_completed'):
+            assert reload_stock('2025-01-15', '2025-01-15') == 2
+
+        assert [c.args[1:] for c in mock_delete.call_args_list] == [('2025-01-15', 3), ('2025-01-15', 4)]
+        assert mock_register.call_args_list[0].args[1:] == ('2025-01-15', 3, 'F', 2, 2)
+        assert copiados[0][0] == 'COPY bronze.raw_stock (data_raw, source_system, date_stock, id_deposito) FROM STDIN'
+
+    def test_filtra_depositos(self):
+        land_stock('2025-01-15', 3, [{'idArticulo': 1}])
+
+        with patch('layers.bronze.landing.engine'):
+            with pytest.raises(LandingError):
+                reload_stock('2025-01-15', '2025-01-15', depositos=[9])
+
+
+class TestLoadersEscribenLanding:
+    """Los loaders escriben la landing solo si está activada."""
+
+    def test_fetch_de_ventas(self):
+        from layers.bronze.loaders.sales_loader import _fetch_month
+
+        client = MagicMock()
+        client.get_sales.return_value = [{'fechaComprobate': '2025-01-01'}]
+
+        with patch('layers.bronze.loaders.sales_loader.land_sales') as mock_land:
+            with patch('layers.bronze.loaders.sales_loader.landing_enabled', return_value=False):
+                _fetch_month(client, '2025-01-01', '2025-01-07', empresa=2)
+            mock_land.assert_not_called()
+
+            with patch('layers.bronze.loaders.sales_loader.landing_enabled', return_value=True):
+                _fetch_month(client, '2025-01-01', '2025-01-07', empresa=2)
+            mock_land.assert_called_once_with('2025-01-01', '2025-01-07', 2, [{'fechaComprobate': '2025-01-01'}])
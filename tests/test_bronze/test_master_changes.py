@@ -0,0 +1,170 @@
+"""
+Tests para el log de cambios por fila de los maestros (Bronze).
+"""
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+def _make_mock_conn(cursor):
+    mock_raw_conn = MagicMock()
+    mock_raw_conn.cursor.return_value = cursor
+    mock_conn = MagicMock()
+    mock_conn.connection.dbapi_connection = mock_raw_conn
+    mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+    mock_conn.__exit__ = MagicMock(return_value=False)
+    return mock_conn, mock_raw_conn
+
+
+class TestMergeMaster:
+    """Tests para merge_master()."""
+
+    def _merge(self, entity, records, operaciones=()):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(op,) for op in operaciones]
+        copiadas = []
+
+        def capture(cur, table, columns, rows):
+            copiadas.extend(rows)
+            return len(copiadas)
+
+        with patch('layers.bronze.master_changes.copy_rows', side_effect=capture):
+            from layers.bronze.master_changes import merge_master
+            resumen = merge_master(cursor, entity, records)
+
+        return resumen, [c.args[0] for c in cursor.execute.call_args_list], copiadas
+
+    def test_copia_a_tabla_temporal(self):
+        """La respuesta de la API se copia a una tabla temporal, no a la tabla de bronze."""
+        _, sqls, copiadas = self._merge('clients', [{'idCliente': 1}, {'idCliente': 2}])
+
+        assert 'CREATE TEMP TABLE tmp_master' in sqls[0]
+        assert [json.loads(data) for (data,) in copiadas] == [{'idCliente': 1}, {'idCliente': 2}]
+
+    def test_no_borra_toda_la_tabla(self):
+        """Solo borra las filas cuyo hash ya no está en la respuesta (nunca un DELETE sin filtro)."""
+        _, sqls, _ = self._merge('clients', [{'idCliente': 1}])
+        merge = sqls[1]
+
+        assert 'DELETE FROM bronze.raw_clients r' in merge
+        assert 'md5(data_raw::text)' in merge
+        assert not any(s.strip() == 'DELETE FROM bronze.raw_clients' for s in sqls)
+
+    def test_registra_claves_en_log(self):
+        """Las claves afectadas se registran en bronze.raw_masters_changes con la clave de negocio."""
+        _, sqls, _ = self._merge('staff', [{'idPersonal': 5, 'idSucursal': 1}])
+        merge = sqls[1]
+
+        assert 'INSERT INTO bronze.raw_masters_changes' in merge
+        assert "data_raw->>'idPersonal'" in merge and "data_raw->>'idSucursal'" in merge
+
+    def test_resumen_por_operacion(self):
+        """Debe contar las claves nuevas, modificadas y eliminadas."""
+        resumen, _, _ = self._merge('articles', [{'idArticulo': 1}], operaciones=['I', 'U', 'U', 'D'])
+        assert resumen == {'I': 1, 'U': 2, 'D': 1}
+
+    def test_entidad_desconocida(self):
+        """Una entidad sin clave definida debe fallar."""
+        with pytest.raises(KeyError):
+            self._merge('marketing', [])
+
+
+class TestChangedKeys:
+    """Tests para changed_keys()."""
+
+    def test_sin_cambios_nuevos(self):
+        """Si el consumidor ya está al día, no crea la tabla de claves."""
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [(40,), (40,)]   # posición, último cambio
+
+        from layers.bronze.master_changes import changed_keys
+        assert changed_keys(cursor, 'silver.clients', ('clients',)) is None
+        assert not any('tmp_master_keys' in c.args[0] for c in cursor.execute.call_args_list)
+
+    def test_carga_claves_pendientes(self):
+        """Carga las claves entre la posición del consumidor y el último cambio."""
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [(10,), (25,)]
+        cursor.rowcount = 3
+
+        from layers.bronze.master_changes import changed_keys
+        assert changed_keys(cursor, 'silver.clients', ('clients',)) == 25
+
+        sql, params = next(
+            c.args for c in cursor.execute.call_args_list if 'tmp_master_keys' in c.args[0]
+        )
+        assert params == (10, 25, ['clients'])
+
+    def test_cambios_de_otras_entidades_avanzan_posicion(self):
+        """Si los cambios son de otras entidades, avanza la posición sin aplicar nada."""
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [(10,), (25,)]
+        cursor.rowcount = 0
+
+        from layers.bronze.master_changes import changed_keys
+        assert changed_keys(cursor, 'silver.articles', ('articles',)) is None
+
+        avance = next(
+            c.args for c in cursor.execute.call_args_list
+            if 'bronze.master_change_consumers' in c.args[0] and 'INSERT' in c.args[0]
+        )
+        assert avance[1] == ('silver.articles', 25)
+
+
+class TestApplyChanges:
+    """Tests para apply_changes()."""
+
+    def _apply(self, posiciones, statements, after=()):
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [(p,) for p in posiciones]
+        cursor.rowcount = 7
+        mock_conn, mock_raw_conn = _make_mock_conn(cursor)
+
+        with patch('layers.bronze.master_changes.engine') as mock_engine:
+            mock_engine.connect.return_value = mock_conn
+            from layers.bronze.master_changes import apply_changes
+            filas = apply_changes('gold.dim_cliente' if after else 'silver.clients', statements, after=after)
+
+        return filas, [c.args[0] for c in cursor.execute.call_args_list], mock_raw_conn
+
+    def test_ejecuta_sentencias_y_avanza(self):
+        """Con cambios pendientes ejecuta las sentencias, avanza el consumidor y confirma."""
+        filas, sqls, mock_raw_conn = self._apply([3, 9], ['DELETE A', 'INSERT B'])
+
+        assert filas == [7, 7]
+        assert sqls.index('DELETE A') < sqls.index('INSERT B')
+        assert any('bronze.master_change_consumers' in s and 'INSERT' in s for s in sqls)
+        mock_raw_conn.commit.assert_called_once()
+
+    def test_sin_cambios_no_ejecuta(self):
+        """Sin cambios pendientes no ejecuta las sentencias."""
+        filas, sqls, _ = self._apply([9, 9], ['DELETE A'])
+
+        assert filas is None
+        assert 'DELETE A' not in sqls
+
+    def test_gold_espera_a_silver(self):
+        """Con `after`, solo aplica hasta la menor posición de los consumidores previos."""
+        # posiciones: 4 upstream, luego la propia (2)
+        filas, sqls, _ = self._apply([12, 8, 15, 9, 2], ['DELETE A'], after=(
+            'silver.clients', 'silver.client_forces', 'silver.routes', 'silver.staff'
+        ))
+
+        assert filas == [7]
+
+    def test_rollback_ante_error(self):
+        """Si una sentencia falla, revierte la transacción."""
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [(0,), (5,)]
+        cursor.rowcount = 2
+        cursor.execute.side_effect = lambda sql, *a: (_ for _ in ()).throw(RuntimeError()) if sql == 'MAL' else None
+        mock_conn, mock_raw_conn = _make_mock_conn(cursor)
+
+        with patch('layers.bronze.master_changes.engine') as mock_engine:
+            mock_engine.connect.return_value = mock_conn
+            from layers.bronze.master_changes import apply_changes
+            with pytest.raises(RuntimeError):
+                apply_changes('silver.clients', ['MAL'])
+
+        mock_raw_conn.rollback.assert_called_once()
+        mock_raw_conn.commit.assert_not_called()
@@ -0,0 +1,88 @@
+"""
+Tests para la carga concurrente de maestros (Bronze).
+"""
+import time
+import threading
+import pytest
+from unittest.mock import patch
+
+from layers.bronze.masters import MastersLoadError, master_client, run_masters
+
+
+class TestRunMasters:
+    """Tests para run_masters()."""
+
+    def test_ejecuta_en_paralelo(self):
+        """Con un hilo por loader la carga tarda lo que el más lento, no la suma."""
+        def lento():
+            time.sleep(0.2)
+
+        inicio = time.perf_counter()
+        tiempos = run_masters({f'm{i}': lento for i in range(4)}, max_workers=4)
+        total = time.perf_counter() - inicio
+
+        assert set(tiempos) == {'m0', 'm1', 'm2', 'm3'}
+        assert all(s >= 0.2 for s in tiempos.values())
+        assert total < 0.6
+
+    def test_secuencial_con_un_hilo(self):
+        activos = []
+        maximo = []
+        lock = threading.Lock()
+
+        def loader():
+            with lock:
+                activos.append(1)
+                maximo.append(len(activos))
+            time.sleep(0.01)
+            with lock:
+                activos.pop()
+
+        run_masters({'a': loader, 'b': loader, 'c': loader}, max_workers=1)
+
+        assert max(maximo) == 1
+
+    def test_falla_no_corta_a_los_demas(self):
+        ejecutados = []
+
+        def ok(nombre):
+            return lambda: ejecutados.append(nombre)
+
+        def falla():
+            raise RuntimeError("timeout")
+
+        with pytest.raises(MastersLoadError) as exc:
+            run_masters({'clientes': falla, 'staff': ok('staff'), 'rutas': ok('rutas')}, max_workers=2)
+
+        assert sorted(ejecutados) == ['rutas', 'staff']
+        assert list(exc.value.errores) == ['clientes']
+        assert 'clientes (timeout)' in str(exc.value)
+
+    @patch('layers.bronze.masters.settings')
+    def test_workers_default_de_settings(self, mock_settings):
+        mock_settings.BRONZE_MASTERS_WORKERS = 1
+        hilos = set()
+
+        run_masters({n: lambda: hilos.add(threading.current_thread().name) for n in 'abc'})
+
+        assert len(hilos) == 1
+
+
+class TestMasterClient:
+    """Tests para master_client()."""
+
+    @patch('layers.bronze.masters.get_cache_mode', return_value='off')
+    @patch('layers.bronze.masters.ChessClient')
+    def test_login_antes_de_los_hilos(self, mock_chess, mock_mode):
+        client = master_client()
+
+        mock_chess.from_env.return_value.login.assert_called_once()
+        assert client is not None
+
+    @patch('layers.bronze.masters.wrap_client')
+    @patch('layers.bronze.masters.get_cache_mode', return_value='replay')
+    @patch('layers.bronze.masters.ChessClient')
+    def test_sin_login_en_replay(self, mock_chess, mock_mode, mock_wrap):
+        master_client()
+
+        mock_wrap.return_value.login.assert_not_called()
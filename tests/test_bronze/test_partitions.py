@@ -0,0 +1,167 @@
+"""
+Tests para la gestión de particiones mensuales de Bronze.
+"""
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+
+def _sqls(cursor):
+    return [c.args[0] for c in cursor.execute.call_args_list]
+
+
+class TestHelpersDeMeses:
+    """Tests para month_bounds(), months_in_range(), is_full_month() y partition_name()."""
+
+    def test_month_bounds(self):
+        from layers.bronze.partitions import month_bounds
+
+        assert month_bounds('2025-02-15') == (date(2025, 2, 1), date(2025, 3, 1))
+        assert month_bounds('2025-12-31') == (date(2025, 12, 1), date(2026, 1, 1))
+
+    def test_months_in_range(self):
+        from layers.bronze.partitions import months_in_range
+
+        meses = months_in_range('2024-12-15', '2025-02-03')
+
+        assert meses == [date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1)]
+
+    def test_is_full_month(self):
+        from layers.bronze.partitions import is_full_month
+
+        assert is_full_month('2024-02-01', '2024-02-29')
+        assert not is_full_month('2024-02-01', '2024-02-28')
+        assert not is_full_month('2025-01-15', '2025-01-31')
+
+    def test_partition_name(self):
+        from layers.bronze.partitions import partition_name
+
+        assert partition_name('bronze.raw_sales', '2025-01-20') == 'bronze.raw_sales_p2025_01'
+
+
+class TestOperacionesDeParticion:
+    """Tests del SQL emitido por las operaciones de partición."""
+
+    def test_ensure_partitions_una_por_mes(self):
+        from layers.bronze.partitions import ensure_partitions
+
+        cursor = MagicMock()
+        ensure_partitions(cursor, 'bronze.raw_stock', '2025-01-20', '2025-02-10')
+
+        sqls = _sqls(cursor)
+        assert len(sqls) == 2
+        assert "bronze.raw_stock_p2025_01 PARTITION OF bronze.raw_stock" in sqls[0]
+        assert "FROM ('2025-02-01') TO ('2025-03-01')" in sqls[1]
+
+    def test_staging_con_check_del_mes(self):
+        from layers.bronze.partitions import create_staging_partition
+
+        cursor = MagicMock()
+        staging = create_staging_partition(cursor, 'bronze.raw_sales', '2025-03-01')
+
+        assert staging == 'bronze.raw_sales_p2025_03_swap'
+        check = _sqls(cursor)[-1]
+        assert "date_comprobante >= '2025-03-01'" in check
+        assert "date_comprobante < '2025-04-01'" in check
+
+    def test_swap_reemplaza_particion_existente(self):
+        from layers.bronze.partitions import swap_partition
+
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ('bronze.raw_sales_p2025_03',)
+        swap_partition(cursor, 'bronze.raw_sales', '2025-03-01', 'bronze.raw_sales_p2025_03_swap')
+
+        sqls = _sqls(cursor)
+        detach = sqls.index("ALTER TABLE bronze.raw_sales DETACH PARTITION bronze.raw_sales_p2025_03")
+        attach = next(i for i, s in enumerate(sqls) if 'ATTACH PARTITION' in s)
+        assert detach < attach
+        assert "DROP TABLE bronze.raw_sales_p2025_03" in sqls
+
+    def test_swap_sin_particion_previa_no_hace_detach(self):
+        from layers.bronze.partitions import swap_partition
+
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (None,)
+        swap_partition(cursor, 'bronze.raw_sales', '2025-03-01', 'bronze.raw_sales_p2025_03_swap')
+
+        assert not any('DETACH' in s for s in _sqls(cursor))
+
+    def test_drop_partitions_before(self):
+        from layers.bronze.partitions import drop_partitions_before
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            ('raw_stock_p2025_01',), ('raw_stock_p2025_02',), ('raw_stock_p2025_03',), ('raw_stock_otra',)
+        ]
+        eliminadas = drop_partitions_before(cursor, 'bronze.raw_stock', '2025-03-01')
+
+        assert eliminadas == ['bronze.raw_stock_p2025_01', 'bronze.raw_stock_p2025_02']
+
+
+class TestLoadBronzeParticiones:
+    """load_bronze(replace=True) reemplaza cada mes via partición staging, sin DELETE sobre la tabla viva."""
+
+    def _run(self, fecha_desde, fecha_hasta, con_datos=True):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (None,)
+        raw_conn = MagicMock()
+        raw_conn.cursor.return_value = cursor
+        conn = MagicMock()
+        conn.connection.dbapi_connection = raw_conn
+        conn.__enter__ = MagicMock(return_value=conn)
+        conn.__exit__ = MagicMock(return_value=False)
+
+        client = MagicMock()
+        client.get_sales.side_effect = lambda fecha_desde, fecha_hasta, **kw: (
+            [{'fechaComprobate': fecha_desde}] if con_datos else []
+        )
+
+        with patch('layers.bronze.loaders.sales_loader.engine') as mock_engine, \
+             patch('layers.bronze.loaders.sales_loader.ChessClient') as mock_client_cls, \
+             patch('layers.bronze.loaders.sales_loader.copy_rows', return_value=1) as mock_copy:
+            mock_engine.connect.return_value = conn
+            mock_client_cls.from_env.return_value = client
+            from layers.bronze.loaders.sales_loader import load_bronze
+            load_bronze(fecha_desde, fecha_hasta, prefetch=0, replace=True, fetch_days=0)
+
+        return _sqls(cursor), mock_copy, raw_conn
+
+    def test_mes_completo_carga_en_staging(self):
+        sqls, mock_copy, raw_conn = self._run('2025-01-01', '2025-02-28')
+
+        assert not any(s.strip().startswith('DELETE') for s in sqls)
+        tablas = [c.args[1] for c in mock_copy.call_args_list]
+        assert tablas == ['bronze.raw_sales_p2025_01_swap', 'bronze.raw_sales_p2025_02_swap']
+        assert raw_conn.commit.call_count == 2
+
+    def test_mes_sin_datos_reemplaza_vacio(self):
+        """Sin datos en la API el rango de la empresa se reemplaza igual (queda vacío)."""
+        sqls, mock_copy, raw_conn = self._run('2025-01-01', '2025-01-31', con_datos=False)
+
+        mock_copy.assert_not_called()
+        assert any('INSERT INTO bronze.raw_sales_changes' in s for s in sqls)
+        assert any('RENAME TO raw_sales_p2025_01' in s for s in sqls)
+        raw_conn.commit.assert_called_once()
+
+    def test_registra_documentos_antes_del_swap(self):
+        sqls, _, _ = self._run('2025-01-01', '2025-01-31')
+
+        cambios = next(i for i, s in enumerate(sqls) if 'INSERT INTO bronze.raw_sales_changes' in s)
+        assert 'bronze.raw_sales_p2025_01_swap s' in sqls[cambios]
+        assert cambios < next(i for i, s in enumerate(sqls) if 'ATTACH PARTITION' in s)
+
+    def test_mes_parcial_conserva_resto_del_mes(self):
+        sqls, _, _ = self._run('2025-01-01', '2025-01-15')
+
+        assert not any('INSERT INTO bronze.raw_sales_p2025_01_swap' in s for s in sqls)
+
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ('bronze.raw_sales_p2025_01',)
+        cursor.fetchall.return_value = [('id',), ('data_raw',), ('date_comprobante',)]
+        from layers.bronze.partitions import carry_over_rows
+        carry_over_rows(cursor, 'bronze.raw_sales', 'bronze.raw_sales_p2025_01_swap', '2025-01-01', '2025-01-15')
+        insert = cursor.execute.call_args_list[-1]
+        assert (
+            'INSERT INTO bronze.raw_sales_p2025_01_swap (id, data_raw, date_comprobante) '
+            'SELECT id, data_raw, date_comprobante FROM bronze.raw_sales_p2025_01'
+        ) in insert.args[0]
+        assert insert.args[1] == ('2025-01-01', '2025-01-15')
@@ -0,0 +1,257 @@
+"""
+Tests para la división adaptativa de rangos de consulta de ventas (Bronze).
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+
+from layers.bronze.range_planner import (
+    DAY,
+    MONTH,
+    WEEK,
+    RangePlanner,
+    coarser,
+    count_rows,
+    finer,
+    load_plan,
+    save_plan,
+)
+
+
+class FakeFetch:
+    """fetch(desde, hasta) falso: `por_dia` líneas por día, opcionalmente fallando en rangos dados."""
+
+    def __init__(self, por_dia=1, fallas=()):
+        self.por_dia = por_dia
+        self.fallas = set(fallas)
+        self.llamadas = []
+
+    def __call__(self, desde, hasta):
+        self.llamadas.append((desde, hasta))
+        if (desde, hasta) in self.fallas:
+            raise RuntimeError(f"timeout en {desde} - {hasta}")
+        dias = int(hasta[8:]) - int(desde[8:]) + 1
+        return [{'fechaComprobate': desde}] * (dias * self.por_dia)
+
+
+def _planner(**kwargs):
+    kwargs.setdefault('initial_days', MONTH)
+    kwargs.setdefault('max_rows', 100)
+    kwargs.setdefault('max_seconds', 60)
+    kwargs.setdefault('adaptive', True)
+    return RangePlanner(**kwargs)
+
+
+class TestGranularidades:
+    """Tests para finer() y coarser()."""
+
+    def test_finer(self):
+        assert finer(MONTH) == WEEK
+        assert finer(WEEK) == DAY
+        assert finer(14) == WEEK
+        assert finer(3) == DAY
+        assert finer(DAY) is None
+
+    def test_coarser(self):
+        assert coarser(DAY) == WEEK
+        assert coarser(WEEK) == MONTH
+        assert coarser(MONTH) is None
+
+    def test_count_rows_cuerpos_crudos(self):
+        cuerpos = [b'[{"fechaComprobate": "x"}, {"fechaComprobate": "y"}]', b'[{"fechaComprobate": "z"}]']
+        assert count_rows(cuerpos) == 3
+        assert count_rows([{'a': 1}, {'a': 2}]) == 2
+        assert count_rows([]) == 0
+
+
+class TestIterMonth:
+    """Tests para RangePlanner.iter_month()."""
+
+    def test_mes_tranquilo_una_consulta(self):
+        fetch = FakeFetch(por_dia=1)
+        planner = _planner()
+
+        respuestas = list(planner.iter_month(fetch, '2025-01-01', '2025-01-31'))
+
+        assert fetch.llamadas == [('2025-01-01', '2025-01-31')]
+        assert sum(map(len, respuestas)) == 31
+        assert planner.stats('2025-01-01').splits == 0
+
+    def test_usa_granularidad_del_plan(self):
+        fetch = FakeFetch(por_dia=1)
+        planner = _planner(plan={'2025-01-01': WEEK})
+
+        list(planner.iter_month(fetch, '2025-01-01', '2025-01-31'))
+
+        assert len(fetch.llamadas) == 5
+        assert planner.days_for('2025-02-01') == MONTH
+
+    def test_respuesta_grande_parte_el_resto_del_mes(self):
+        # 10 líneas/día: la primera semana (70) supera 50, el resto va por día
+        fetch = FakeFetch(por_dia=10)
+        planner = _planner(initial_days=WEEK, max_rows=50)
+
+        respuestas = list(planner.iter_month(fetch, '2025-01-01', '2025-01-31'))
+
+        assert fetch.llamadas[0] == ('2025-01-01', '2025-01-07')
+        assert fetch.llamadas[1:] == [(f'2025-01-{d:02d}', f'2025-01-{d:02d}') for d in range(8, 32)]
+        assert sum(map(len, respuestas)) == 310
+        stats = planner.stats('2025-01-01')
+        assert stats.dias == DAY
+        assert stats.splits == 1
+        assert not stats.exceeded
+
+    def test_respuesta_lenta_parte_el_resto_del_mes(self):
+        fetch = FakeFetch(por_dia=1)
+        planner = _planner(initial_days=WEEK, max_seconds=5)
+
+        with patch('layers.bronze.range_planner.time.perf_counter', side_effect=[0, 10] + [0, 1] * 40):
+            list(planner.iter_month(fetch, '2025-01-01', '2025-01-31'))
+
+        assert fetch.llamadas[1] == ('2025-01-08', '2025-01-08')
+        assert len(fetch.llamadas) == 25
+
+    def test_falla_reintenta_el_rango_mas_fino(self):
+        fetch = FakeFetch(por_dia=1, fallas=[('2025-01-01', '2025-01-31')])
+        planner = _planner()
+
+        respuestas = list(planner.iter_month(fetch, '2025-01-01', '2025-01-31'))
+
+        assert fetch.llamadas[0] == ('2025-01-01', '2025-01-31')
+        assert fetch.llamadas[1:] == [
+            ('2025-01-01', '2025-01-07'), ('2025-01-08', '2025-01-14'), ('2025-01-15', '2025-01-21'),
+            ('2025-01-22', '2025-01-28'), ('2025-01-29', '2025-01-31'),
+        ]
+        assert sum(map(len, respuestas)) == 31
+        assert planner.stats('2025-01-01').dias == WEEK
+
+    def test_falla_por_dia_se_propaga(self):
+        fetch = FakeFetch(fallas=[('2025-01-01', '2025-01-07'), ('2025-01-01', '2025-01-01')])
+        planner = _planner(initial_days=WEEK)
+
+        with pytest.raises(RuntimeError, match="2025-01-01 - 2025-01-01"):
+            list(planner.iter_month(fetch, '2025-01-01', '2025-01-31'))
+
+    def test_error_no_reintentable_no_parte(self):
+        def fetch(desde, hasta):
+            raise ValueError("parámetros inválidos")
+
+        with pytest.raises(ValueError):
+            list(_planner().iter_month(fetch, '2025-01-01', '2025-01-31'))
+
+    def test_sin_adaptativo_no_parte(self):
+        fetch = FakeFetch(por_dia=10, fallas=[('2025-01-01', '2025-01-31')])
+
+        with pytest.raises(RuntimeError):
+            list(_planner(adaptive=False).iter_month(fetch, '2025-01-01', '2025-01-31'))
+
+        fetch = FakeFetch(por_dia=10)
+        list(_planner(adaptive=False, max_rows=5).iter_month(fetch, '2025-01-01', '2025-01-31'))
+        assert len(fetch.llamadas) == 1
+
+
+class TestRecommendedDays:
+    """Tests para RangePlanner.recommended_days()."""
+
+    def test_mes_tranquilo_vuelve_a_mas_grueso(self):
+        # 1 línea/día: una consulta mensual proyecta 31 < 100 / 2
+        planner = _planner(initial_days=DAY)
+        list(planner.iter_month(FakeFetch(por_dia=1), '2025-01-01', '2025-01-31'))
+
+        assert planner.recommended_days('2025-01-01') == WEEK
+
+        planner = _planner(initial_days=WEEK)
+        list(planner.iter_month(FakeFetch(por_dia=1), '2025-01-01', '2025-01-31'))
+
+        assert planner.recommended_days('2025-01-01') == MONTH
+
+    def test_mes_pico_mantiene_la_granularidad_fina(self):
+        # 10 líneas/día: una semana proyecta 70 >= 50
+        planner = _planner(initial_days=DAY)
+        list(planner.iter_month(FakeFetch(por_dia=10), '2025-01-01', '2025-01-31'))
+
+        assert planner.recommended_days('2025-01-01') == DAY
+
+    def test_excedido_en_la_ultima_consulta_refina(self):
+        # La única consulta del mes supera el umbral y no queda resto para partir
+        planner = _planner(max_rows=20)
+        list(planner.iter_month(FakeFetch(por_dia=1), '2025-01-01', '2025-01-31'))
+
+        assert planner.stats('2025-01-01').exceeded
+        assert planner.recommended_days('2025-01-01') == WEEK
+
+    def test_mes_sin_consultar_conserva_el_plan(self):
+        planner = _planner(plan={'2025-03-01': DAY})
+
+        assert planner.recommended_days('2025-03-01') == DAY
+
+
+class TestPlanPersistencia:
+    """Tests para load_plan() y save_plan()."""
+
+    def test_load_plan(self):
+        from datetime import date
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(date(2025, 1, 1), 7), (date(2025, 2, 1), 1)]
+
+        plan = load_plan(cursor, '2025-01-15', '2025-02-28', id_empresa=2)
+
+        assert plan == {'2025-01-01': WEEK, '2025-02-01': DAY}
+        sql, params = cursor.execute.call_args[0]
+        assert 'bronze.sales_fetch_plan' in sql
+        assert params == (2, '2025-01-15', '2025-02-28')
+
+    def test_save_plan(self):
+        planner = _planner(initial_days=WEEK, max_rows=50)
+        list(planner.iter_month(FakeFetch(por_dia=10), '2025-01-01', '2025-01-31'))
+        cursor = MagicMock()
+
+        save_plan(cursor, '2025-01-01', DAY, planner.stats('2025-01-01'))
+
+        sql, params = cursor.execute.call_args[0]
+        assert 'ON CONFLICT (period, id_empresa)' in sql
+        assert params[:6] == ('2025-01-01', 1, DAY, 310, 25, 70)
+        assert params[7] == 1
+
+
+class TestLoadBronzePlan:
+    """Tests de integración del plan con load_bronze()."""
+
+    def test_usa_y_guarda_el_plan(self):
+        mock_cursor = MagicMock()
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = mock_cursor
+        mock_conn = MagicMock()
+        mock_conn.connection.dbapi_connection = mock_raw_conn
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+
+        client = MagicMock()
+        client.get_sales.side_effect = lambda fecha_desde, fecha_hasta, **kw: [
+            {'fechaComprobate': fecha_desde}
+        ]
+
+        def consumir(cursor, desde, hasta, partes, batch_size, id_empresa):
+            filas = sum(len(p) for p in partes)
+            return filas, filas, 0, filas
+
+        with patch('layers.bronze.loaders.sales_loader.engine') as mock_engine, \
+             patch('layers.bronze.loaders.sales_loader.wrap_client', return_value=client), \
+             patch('layers.bronze.loaders.sales_loader.ChessClient'), \
+             patch('layers.bronze.loaders.sales_loader._merge_month', side_effect=consumir), \
+             patch('layers.bronze.loaders.sales_loader.load_plan',
+                   return_value={'2025-01-01': DAY}) as mock_load, \
+             patch('layers.bronze.loaders.sales_loader.save_plan') as mock_save:
+            mock_engine.connect.return_value = mock_conn
+            from layers.bronze.loaders.sales_loader import load_bronze
+            load_bronze('2025-01-01', '2025-02-28', prefetch=0, passthrough=False)
+
+        mock_load.assert_called_once_with(mock_cursor, '2025-01-01', '2025-02-28', id_empresa=1)
+        consultas = [c.kwargs['fecha_desde'] for c in client.get_sales.call_args_list]
+        # Enero por día (plan), febrero con la granularidad configurada
+        assert consultas[:31] == [f'2025-01-{d:02d}' for d in range(1, 32)]
+        assert consultas[31] == '2025-02-01'
+        guardados = {c.args[1]: c.args[2] for c in mock_save.call_args_list}
+        assert set(guardados) == {'2025-01-01', '2025-02-01'}
+        # Enero tranquilo (1 línea/día): la próxima vez por semana
+        assert guardados['2025-01-01'] == WEEK
@@ -0,0 +1,158 @@
+"""
+Tests para el passthrough de respuestas crudas de la API (Bronze).
+"""
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+def _body_ventas(items, lote='1/1'):
+    return json.dumps({
+        'dsReporteComprobantesApi': {'VentasResumen': items},
+        'cantComprobantesVentas': lote,
+    }).encode()
+
+
+class TestPeek:
+    """Tests para has_items() y sales_lotes()."""
+
+    def test_has_items(self):
+        from layers.bronze.raw_passthrough import has_items, SALES_ITEMS_PATH, STOCK_ITEMS_PATH
+
+        assert has_items(_body_ventas([{'a': 1}]), SALES_ITEMS_PATH)
+        assert not has_items(_body_ventas([]), SALES_ITEMS_PATH)
+        assert not has_items(b'{"dsReporteComprobantesApi": {}}', SALES_ITEMS_PATH)
+        assert has_items(b'{"dsStockFisicoApi": {"dsStock": [ {"x": 1}]}}', STOCK_ITEMS_PATH)
+        assert not has_items(b'{"dsStockFisicoApi": {"dsStock": [\n ]}}', STOCK_ITEMS_PATH)
+
+    def test_sales_lotes(self):
+        from layers.bronze.raw_passthrough import sales_lotes
+
+        assert sales_lotes(_body_ventas([], '1/5')) == 5
+        assert sales_lotes(_body_ventas([], '1/1.200')) == 1200
+        assert sales_lotes(b'{}') == 1
+
+
+class FakeRawClient:
+    """Cliente falso: 3 lotes de ventas, el segundo vacío."""
+
+    def __init__(self):
+        self.llamadas = []
+
+    def get_sales_body(self, fecha_desde, fecha_hasta, nro_lote=1):
+        self.llamadas.append(nro_lote)
+        items = [] if nro_lote == 2 else [{'fechaComprobate': fecha_desde, 'lote': nro_lote}]
+        return _body_ventas(items, f'{nro_lote}/3')
+
+
+class TestFetchSalesPages:
+    """Tests para fetch_sales_pages()."""
+
+    def test_pide_todos_los_lotes_y_descarta_vacios(self):
+        from layers.bronze.raw_passthrough import fetch_sales_pages, RawPages
+
+        client = FakeRawClient()
+        paginas = fetch_sales_pages(client, '2025-01-01', '2025-01-07')
+
+        assert client.llamadas == [1, 2, 3]
+        assert isinstance(paginas, RawPages)
+        assert [json.loads(p)['dsReporteComprobantesApi']['VentasResumen'][0]['lote'] for p in paginas] == [1, 3]
+
+    def test_sin_ventas_lista_vacia(self):
+        from layers.bronze.raw_passthrough import fetch_sales_pages
+
+        client = MagicMock()
+        client.get_sales_body.return_value = _body_ventas([], '1/1')
+
+        assert not fetch_sales_pages(client, '2025-01-01', '2025-01-07')
+
+
+class TestRawClient:
+    """Tests para RawClient (cuerpo HTTP sin decodificar)."""
+
+    def _client(self, *respuestas):
+        inner = MagicMock()
+        inner._authenticated = False
+        inner.base_url = 'http://api/web/api/chess/v1/'
+        inner.timeout = 30
+        inner._session.get.side_effect = list(respuestas)
+        return inner
+
+    def _resp(self, status, content=b'{}'):
+        resp = MagicMock()
+        resp.status_code = status
+        resp.content = content
+        return resp
+
+    def test_retorna_bytes_sin_decodificar(self):
+        from layers.bronze.raw_passthrough import RawClient
+
+        inner = self._client(self._resp(200, b'{"dsStockFisicoApi": {}}'))
+        body = RawClient(inner).get_stock_body(id_deposito=5, fecha='2025-01-31')
+
+        assert body == b'{"dsStockFisicoApi": {}}'
+        inner.login.assert_called_once()
+        url = inner._session.get.call_args.args[0]
+        params = inner._session.get.call_args.kwargs['params']
+        assert url.endswith('stock/')
+        assert params == {'idDeposito': 5, 'fechastock': '31-01-2025'}
+
+    def test_reintenta_login_ante_401(self):
+        from layers.bronze.raw_passthrough import RawClient
+
+        inner = self._client(self._resp(401), self._resp(200, b'[]'))
+        assert RawClient(inner).get_sales_body('2025-01-01', '2025-01-31', nro_lote=2) == b'[]'
+        assert inner.login.call_count == 2
+        assert inner._session.get.call_args.kwargs['params']['nroLote'] == 2
+
+    def test_error_http(self):
+        from chesserp.exceptions import ApiError
+        from layers.bronze.raw_passthrough import RawClient
+
+        inner = self._client(self._resp(500))
+        with pytest.raises(ApiError):
+            RawClient(inner).get_sales_body('2025-01-01', '2025-01-31')
+
+    def test_cliente_sin_internos(self):
+        """Otra versión de chesserp-api: error claro en lugar de un AttributeError."""
+        from layers.bronze.raw_passthrough import RawClient, UnsupportedClientError
+
+        class OtroClient:
+            def login(self):
+                pass
+
+        with pytest.raises(UnsupportedClientError, match='_session'):
+            RawClient(OtroClient()).get_stock_body(id_deposito=5, fecha='2025-01-31')
+
+    def test_delega_el_resto(self):
+        from layers.bronze.raw_passthrough import RawClient
+
+        inner = MagicMock()
+        inner.name = 'EMPRESA1'
+        inner.get_sales.return_value = [1]
+
+        cliente = RawClient(inner)
+        assert cliente.name == 'EMPRESA1'
+        assert cliente.get_sales(fecha_desde='x') == [1]
+
+
+class TestInsertRawItems:
+    """Tests para insert_raw_items()."""
+
+    def test_expande_en_postgres(self):
+        from layers.bronze.raw_passthrough import insert_raw_items, STOCK_ITEMS_PATH, STOCK_COLUMNS, STOCK_SELECT
+
+        cursor = MagicMock()
+        cursor.rowcount = 42
+        with patch('layers.bronze.raw_passthrough.copy_documents') as mock_copy:
+            n = insert_raw_items(cursor, [b'{}'], STOCK_ITEMS_PATH, 'bronze.raw_stock', STOCK_COLUMNS,
+                                 STOCK_SELECT, ('2025-01-31', 5))
+
+        assert n == 42
+        assert mock_copy.call_args.args[1:] == ('tmp_raw_bodies', 'body', [b'{}'])
+
+        sql, params = cursor.execute.call_args_list[1].args
+        assert 'INSERT INTO bronze.raw_stock (data_raw, source_system, date_stock, id_deposito)' in sql
+        assert 'jsonb_array_elements' in sql and 'WITH ORDINALITY' in sql
+        assert params == ('2025-01-31', 5, ['dsStockFisicoApi', 'dsStock'], ['dsStockFisicoApi', 'dsStock'])
+        assert cursor.execute.call_args_list[2].args[0] == 'DROP TABLE tmp_raw_bodies'
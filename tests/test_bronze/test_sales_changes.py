@@ -0,0 +1,48 @@
+"""
+Tests para el lock de escrituras de ventas y los documentos de un reemplazo de partición (Bronze).
+"""
+from datetime import datetime
+from unittest.mock import MagicMock
+
+
+class TestSalesWritesLock:
+    """Tests para begin_sales_write() y read_sales_position()."""
+
+    def test_escritura_toma_el_lock_compartido_antes_de_la_marca(self):
+        from layers.bronze.sales_changes import SALES_WRITES_LOCK, begin_sales_write
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (datetime(2025, 1, 2, 3, 4, 5),)
+
+        assert begin_sales_write(cursor) == datetime(2025, 1, 2, 3, 4, 5)
+        sqls = [c.args for c in cursor.execute.call_args_list]
+        assert sqls[0] == ("SELECT pg_advisory_xact_lock_shared(%s)", (SALES_WRITES_LOCK,))
+        assert sqls[1] == ("SELECT clock_timestamp()::timestamp",)
+
+    def test_posicion_con_el_lock_exclusivo_y_commit(self):
+        from layers.bronze.sales_changes import SALES_WRITES_LOCK, read_sales_position
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (250, None, 7)
+
+        assert read_sales_position(cursor) == (250, None, 7)
+        assert cursor.execute.call_args_list[0].args == ("SELECT pg_advisory_xact_lock(%s)", (SALES_WRITES_LOCK,))
+        cursor.connection.commit.assert_called_once()
+
+
+class TestRecordReplacedDocuments:
+    """Tests para record_replaced_documents()."""
+
+    def test_documentos_sin_lineas_en_la_staging(self):
+        from layers.bronze.sales_changes import record_replaced_documents
+        cursor = MagicMock()
+        cursor.rowcount = 3
+
+        assert record_replaced_documents(
+            cursor, 'bronze.raw_sales_p2025_01_swap', '2025-01-01', '2025-01-15', 2
+        ) == 3
+        sql, params = cursor.execute.call_args.args
+        assert 'INSERT INTO bronze.raw_sales_changes (date_comprobante, id_empresa, id_documento' in sql
+        assert 'FROM bronze.raw_sales r' in sql
+        assert 'SELECT 1 FROM bronze.raw_sales_p2025_01_swap s' in sql
+        assert 's.deleted_at IS NULL' in sql
+        assert 's.nro_doc IS NOT DISTINCT FROM r.nro_doc' in sql
+        assert params == {'desde': '2025-01-01', 'hasta': '2025-01-15', 'empresa': 2}
@@ -1,7 +1,67 @@
 """
 Tests para el loader de ventas (Bronze).
 """
+import json
+import time
+import threading
 import pytest
+from unittest.mock import patch, MagicMock
+
+
+class FakeSalesClient:
+    """Cliente falso: una venta por día del rango consultado, registrando eventos de consulta."""
+
+    def __init__(self, eventos, latencia=0.0, falla_en=None):
+        self.eventos = eventos
+        self.latencia = latencia
+        self.falla_en = falla_en
+
+    def get_sales(self, fecha_desde, fecha_hasta, detallado=True, empresas='1', raw=True):
+        if fecha_desde == self.falla_en:
+            raise RuntimeError(f"API caída en {fecha_desde}")
+        self.eventos.append(('fetch_inicio', fecha_desde, time.perf_counter()))
+        time.sleep(self.latencia)
+        self.eventos.append(('fetch_fin', fecha_desde, time.perf_counter()))
+        return [{'fechaComprobate': fecha_desde, 'nrodoc': n} for n in range(3)]
+
+
+def _run_load_bronze(prefetch, latencia=0.0, latencia_escritura=0.0, falla_en=None, completados=(), resume=False,
+                     fetch_days=0, batch_size=10000):
+    """Helper: ejecuta load_bronze con cliente falso y retorna (eventos, filas insertadas)."""
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 0
+    mock_cursor.fetchall.return_value = list(completados)
+    mock_raw_conn = MagicMock()
+    mock_raw_conn.cursor.return_value = mock_cursor
+    mock_conn = MagicMock()
+    mock_conn.connection.dbapi_connection = mock_raw_conn
+    mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+    mock_conn.__exit__ = MagicMock(return_value=False)
+
+    eventos = []
+    insertadas = []
+
+    def capture(cursor, table, columns, rows):
+        filas = list(rows)
+        mes = filas[0][2]
+        eventos.append(('write_inicio', mes, time.perf_counter()))
+        time.sleep(latencia_escritura)
+        insertadas.extend(filas)
+        eventos.append(('write_fin', mes, time.perf_counter()))
+        return len(filas)
+
+    with patch('layers.bronze.loaders.sales_loader.engine') as mock_engine, \
+         patch('layers.bronze.loaders.sales_loader.ChessClient') as mock_client_cls, \
+         patch('layers.bronze.loaders.sales_loader.copy_rows', side_effect=capture), \
+         patch('layers.bronze.loaders.sales_loader.check_not_compacted'), \
+         patch('layers.bronze.loaders.sales_loader.check_not_archived'):
+        mock_engine.connect.return_value = mock_conn
+        mock_client_cls.from_env.return_value = FakeSalesClient(eventos, latencia, falla_en)
+        from layers.bronze.loaders.sales_loader import load_bronze
+        load_bronze('2025-01-01', '2025-04-30', prefetch=prefetch, resume=resume,
+                    fetch_days=fetch_days, batch_size=batch_size)
+
+    return eventos, insertadas
 
 
 class TestGenerarRangosMensuales:
@@ -86,3 +146,284 @@ class TestGenerarRangosMensuales:
             fecha_inicio_siguiente = rangos[i + 1][0]
             # El día siguiente al fin debe ser el inicio del siguiente rango
             assert fecha_fin_actual < fecha_inicio_siguiente
+
+
+class TestLoadBronzePipeline:
+    """Tests para el modo productor/consumidor (prefetch) de load_bronze()."""
+
+    def test_mismas_filas_que_secuencial(self):
+        """Con prefetch debe insertar las mismas filas y en el mismo orden de meses."""
+        _, secuencial = _run_load_bronze(prefetch=0)
+        _, pipeline = _run_load_bronze(prefetch=2)
+
+        assert len(secuencial) == 4 * 3
+        assert pipeline == secuencial
+
+    def test_secuencial_no_solapa(self):
+        """Sin prefetch, la consulta del mes N+1 empieza después de escribir el mes N."""
+        eventos, _ = _run_load_bronze(prefetch=0, latencia=0.01, latencia_escritura=0.01)
+
+        fin_write_enero = next(t for e, m, t in eventos if e == 'write_fin' and m == '2025-01-01')
+        inicio_fetch_febrero = next(t for e, m, t in eventos if e == 'fetch_inicio' and m == '2025-02-01')
+        assert inicio_fetch_febrero >= fin_write_enero
+
+    def test_pipeline_solapa_consulta_y_escritura(self):
+        """Con prefetch, la consulta del mes N+1 arranca antes de terminar de escribir el mes N."""
+        eventos, _ = _run_load_bronze(prefetch=1, latencia=0.02, latencia_escritura=0.05)
+
+        fin_write_enero = next(t for e, m, t in eventos if e == 'write_fin' and m == '2025-01-01')
+        inicio_fetch_febrero = next(t for e, m, t in eventos if e == 'fetch_inicio' and m == '2025-02-01')
+        assert inicio_fetch_febrero < fin_write_enero
+
+    def test_error_del_productor_se_propaga(self):
+        """Un error de la API en el hilo productor debe lanzarse en load_bronze."""
+        with pytest.raises(RuntimeError, match='API caída'):
+            _run_load_bronze(prefetch=2, falla_en='2025-03-01')
+
+    def test_no_quedan_hilos_productores(self):
+        """Al terminar (incluso con error) no debe quedar vivo el hilo productor."""
+        with pytest.raises(RuntimeError):
+            _run_load_bronze(prefetch=1, falla_en='2025-02-01')
+        _run_load_bronze(prefetch=1)
+
+        assert not any(t.name == 'sales-prefetch' for t in threading.enumerate())
+
+
+class TestGenerarSubrangos:
+    """Tests para generar_subrangos()."""
+
+    def test_semanas(self):
+        from layers.bronze.range_planner import generar_subrangos
+
+        assert generar_subrangos('2025-01-01', '2025-01-31', 7) == [
+            ('2025-01-01', '2025-01-07'), ('2025-01-08', '2025-01-14'), ('2025-01-15', '2025-01-21'),
+            ('2025-01-22', '2025-01-28'), ('2025-01-29', '2025-01-31'),
+        ]
+
+    def test_cero_es_mes_completo(self):
+        from layers.bronze.range_planner import generar_subrangos
+
+        assert generar_subrangos('2025-02-01', '2025-02-28', 0) == [('2025-02-01', '2025-02-28')]
+
+    def test_rango_parcial(self):
+        from layers.bronze.range_planner import generar_subrangos
+
+        assert generar_subrangos('2025-03-10', '2025-03-12', 7) == [('2025-03-10', '2025-03-12')]
+
+
+class TestLoadBronzeStreaming:
+    """Tests para la ingesta por sub-rangos y bloques de load_bronze()."""
+
+    def test_consulta_por_subrangos(self):
+        """Con fetch_days cada mes se consulta en varias requests."""
+        eventos, insertadas = _run_load_bronze(prefetch=0, fetch_days=7)
+
+        consultados = [m for e, m, _ in eventos if e == 'fetch_inicio']
+        assert consultados[:5] == ['2025-01-01', '2025-01-08', '2025-01-15', '2025-01-22', '2025-01-29']
+        assert len(insertadas) == len(consultados) * 3
+
+    def test_bloques_de_copy(self):
+        """Cada respuesta se escribe en bloques de batch_size líneas, en orden."""
+        eventos, insertadas = _run_load_bronze(prefetch=0, batch_size=2)
+
+        escrituras = [e for e in eventos if e[0] == 'write_inicio']
+        assert len(escrituras) == 4 * 2   # 3 líneas por mes -> bloques de 2 y 1
+        assert [json.loads(f[0])['nrodoc'] for f in insertadas[:3]] == [0, 1, 2]
+
+    def test_pipeline_por_subrangos_mismas_filas(self):
+        """Con prefetch y sub-rangos se insertan las mismas filas que en secuencial."""
+        _, secuencial = _run_load_bronze(prefetch=0, fetch_days=10)
+        _, pipeline = _run_load_bronze(prefetch=3, fetch_days=10)
+
+        assert pipeline == secuencial
+
+    def test_libera_las_respuestas(self):
+        """Las listas devueltas por la API quedan vacías después de escribirse."""
+        from layers.bronze.loaders.sales_loader import _insert_partes
+
+        partes = [[{'fechaComprobate': '2025-01-01', 'n': n} for n in range(5)] for _ in range(2)]
+        with patch('layers.bronze.loaders.sales_loader.copy_rows', side_effect=lambda c, t, cols, rows: len(list(rows))):
+            assert _insert_partes(MagicMock(), iter(partes), 'tmp_raw_sales', 2) == 10
+
+        assert partes == [[], []]
+
+    def test_batch_size_invalido(self):
+        with pytest.raises(ValueError):
+            _run_load_bronze(prefetch=0, batch_size=0)
+
+
+class TestLoadBronzeDiferencias:
+    """Tests para la carga por diferencias (hash de contenido) de load_bronze()."""
+
+    def _run(self, rowcounts, **kwargs):
+        mock_cursor = MagicMock()
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = mock_cursor
+        mock_conn = MagicMock()
+        mock_conn.connection.dbapi_connection = mock_raw_conn
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+
+        # rowcount de cada execute, en orden: UPDATE tombstone, INSERT nuevas, INSERT cambios
+        sqls = []
+        self.params = []
+        pendientes = list(rowcounts)
+
+        def execute(sql, params=None):
+            sqls.append(sql)
+            self.params.append(params)
+            if 'UPDATE bronze.raw_sales' in sql or 'INSERT INTO bronze.raw_sales' in sql:
+                mock_cursor.rowcount = pendientes.pop(0)
+
+        mock_cursor.execute.side_effect = execute
+
+        with patch('layers.bronze.loaders.sales_loader.engine') as mock_engine, \
+             patch('layers.bronze.loaders.sales_loader.ChessClient') as mock_client_cls, \
+             patch('layers.bronze.loaders.sales_loader.copy_rows', return_value=3) as mock_copy:
+            mock_engine.connect.return_value = mock_conn
+            mock_client_cls.from_env.return_value = FakeSalesClient([])
+            from layers.bronze.loaders.sales_loader import load_bronze
+            load_bronze('2025-01-01', '2025-01-31', prefetch=0, fetch_days=0, **kwargs)
+            self.from_env = mock_client_cls.from_env
+
+        return sqls, mock_copy, mock_raw_conn
+
+    def test_carga_en_tabla_temporal(self):
+        """Las líneas recibidas se copian a una tabla temporal, no directo a bronze.raw_sales."""
+        _, mock_copy, _ = self._run([0, 0])
+        assert mock_copy.call_args.args[1] == 'tmp_raw_sales'
+
+    def test_tombstone_e_insert_por_hash(self):
+        """Debe marcar deleted_at en las líneas que faltan e insertar solo hashes nuevos."""
+        sqls, _, _ = self._run([0, 0])
+
+        tombstone = next(s for s in sqls if 'UPDATE bronze.raw_sales' in s)
+        assert 'deleted_at = %(marca)s' in tombstone
+        assert 'content_hash' in tombstone and 'ocurrencia' in tombstone
+
+        insert = next(s for s in sqls if 'INSERT INTO bronze.raw_sales (' in s)
+        assert 'NOT EXISTS' in insert
+        assert not any(s.strip().startswith('DELETE') for s in sqls)
+
+    def test_sin_diferencias_no_registra_documentos(self):
+        """Si nada cambió no debe escribir en bronze.raw_sales_changes."""
+        sqls, _, mock_raw_conn = self._run([0, 0])
+
+        assert not any('bronze.raw_sales_changes' in s for s in sqls)
+        mock_raw_conn.commit.assert_called_once()
+
+    def test_con_diferencias_registra_documentos(self):
+        """Si hubo líneas nuevas o borradas debe registrar los documentos afectados."""
+        sqls, _, _ = self._run([1, 2, 1])
+
+        cambios = next(s for s in sqls if 'INSERT INTO bronze.raw_sales_changes' in s)
+        assert 'SELECT DISTINCT date_comprobante, id_empresa, id_documento, letra, serie, nro_doc' in cambios
+        assert 'deleted_at = %(marca)s' in cambios
+
+    def test_toma_el_lock_de_escrituras_antes_de_escribir(self):
+        """
+        El lock compartido de escrituras de ventas es lo primero del mes y su marca de
+        tiempo es la que se usa para ingestion_at y deleted_at.
+        """
+        from layers.bronze.sales_changes import SALES_WRITES_LOCK
+        sqls, _, _ = self._run([1, 2, 1])
+
+        lock = sqls.index("SELECT pg_advisory_xact_lock_shared(%s)")
+        assert self.params[lock] == (SALES_WRITES_LOCK,)
+        tombstone = sqls.index(next(s for s in sqls if 'UPDATE bronze.raw_sales' in s))
+        assert lock < tombstone and 'marca' in self.params[tombstone]
+
+    def test_empresa_compara_y_etiqueta_solo_sus_lineas(self):
+        """Con otra empresa se usan sus credenciales y el diff no toca las líneas de las demás."""
+        sqls, _, _ = self._run([1, 2, 1], prefix='EMPRESA2_', id_empresa=2)
+
+        self.from_env.assert_called_once_with(prefix='EMPRESA2_')
+        tombstone = next(s for s in sqls if 'UPDATE bronze.raw_sales' in s)
+        assert 'id_empresa = %(empresa)s' in tombstone
+        insert = next(s for s in sqls if 'INSERT INTO bronze.raw_sales (' in s)
+        assert 'id_empresa' in insert and '%(empresa)s' in insert
+        cambios = next(s for s in sqls if 'INSERT INTO bronze.raw_sales_changes' in s)
+        assert 'id_empresa = %(empresa)s' in cambios
+        assert all(p['empresa'] == 2 for p in self.params if isinstance(p, dict))
+        checkpoint = next(p for s, p in zip(sqls, self.params) if 'bronze.load_checkpoints' in s)
+        assert checkpoint[:2] == ('sales', 2)
+
+
+class TestLoadBronzeResume:
+    """Tests para --resume de load_bronze()."""
+
+    def test_resume_saltea_meses_completados(self):
+        """Con resume no se consultan los meses con checkpoint."""
+        from datetime import date
+
+        completados = [
+            (date(2025, 1, 1), date(2025, 1, 31), 0),
+            (date(2025, 2, 1), date(2025, 2, 28), 0),
+        ]
+        eventos, insertadas = _run_load_bronze(prefetch=0, completados=completados, resume=True)
+
+        consultados = [m for e, m, _ in eventos if e == 'fetch_inicio']
+        assert consultados == ['2025-03-01', '2025-04-01']
+        assert len(insertadas) == 2 * 3
+
+    def test_sin_resume_consulta_todo(self):
+        """Sin resume se ignoran los checkpoints existentes."""
+        from datetime import date
+
+        completados = [(date(2025, 1, 1), date(2025, 1, 31), 0)]
+        eventos, _ = _run_load_bronze(prefetch=0, completados=completados)
+
+        assert len([e for e in eventos if e[0] == 'fetch_inicio']) == 4
+
+
+class TestLoadBronzePassthrough:
+    """Tests para load_bronze(passthrough=True): cuerpos crudos, sin json en Python."""
+
+    def _run(self, items_por_consulta=1):
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 0
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = mock_cursor
+        mock_conn = MagicMock()
+        mock_conn.connection.dbapi_connection = mock_raw_conn
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+
+        client = MagicMock()
+        client.get_sales_body.side_effect = lambda fecha_desde, fecha_hasta, nro_lote=1: json.dumps({
+            'dsReporteComprobantesApi': {'VentasResumen': [{'fechaComprobate': fecha_desde}] * items_por_consulta},
+            'cantComprobantesVentas': '1/1',
+        }).encode()
+        insertados = []
+
+        def capture(cursor, bodies, path, table, columns, select_sql, params=()):
+            insertados.append((table, list(bodies)))
+            return len(bodies)
+
+        with patch('layers.bronze.loaders.sales_loader.engine') as mock_engine, \
+             patch('layers.bronze.loaders.sales_loader.ChessClient'), \
+             patch('layers.bronze.loaders.sales_loader.wrap_client', return_value=client), \
+             patch('layers.bronze.loaders.sales_loader.insert_raw_items', side_effect=capture), \
+             patch('layers.bronze.loaders.sales_loader.copy_rows') as mock_copy:
+            mock_engine.connect.return_value = mock_conn
+            from layers.bronze.loaders.sales_loader import load_bronze
+            load_bronze('2025-01-01', '2025-01-31', prefetch=0, fetch_days=7, passthrough=True)
+
+        return insertados, mock_copy, client, mock_raw_conn
+
+    def test_copia_cuerpos_sin_serializar(self):
+        insertados, mock_copy, client, _ = self._run()
+
+        assert client.get_sales_body.call_count == 5
+        assert [t for t, _ in insertados] == ['tmp_raw_sales'] * 5
+        assert all(isinstance(b, bytes) for _, bodies in insertados for b in bodies)
+        mock_copy.assert_not_called()   # las filas serializadas con json.dumps van por copy_rows
+
+    def test_mes_sin_datos_marca_las_lineas_como_borradas(self):
+        """Un mes vacío en la API se aplica igual: las líneas cargadas del rango quedan con tombstone."""
+        insertados, _, _, mock_raw_conn = self._run(items_por_consulta=0)
+
+        assert insertados == []
+        sqls = [c.args[0] for c in mock_raw_conn.cursor.return_value.execute.call_args_list]
+        assert any('SET deleted_at = %(marca)s' in s for s in sqls)
+        mock_raw_conn.commit.assert_called_once()
@@ -0,0 +1,189 @@
+"""
+Tests para el scheduler de requests a la API (concurrencia adaptativa y reintentos).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+class FakeApiClient:
+    """Cliente falso: latencia configurable, fallas inyectadas y registro de concurrencia."""
+
+    name = 'EMPRESA1'
+
+    def __init__(self, latencia=0.0, fallas=0):
+        self.latencia = latencia
+        self.fallas = fallas
+        self.llamadas = 0
+        self.activas = 0
+        self.max_activas = 0
+        self._lock = threading.Lock()
+
+    def get_stock(self, fecha, id_deposito, raw=True):
+        with self._lock:
+            self.llamadas += 1
+            self.activas += 1
+            self.max_activas = max(self.max_activas, self.activas)
+            fallar = self.fallas > 0
+            if fallar:
+                self.fallas -= 1
+        try:
+            time.sleep(self.latencia)
+            if fallar:
+                raise ConnectionError("ERP no responde")
+            return [{'fecha': fecha, 'idDeposito': id_deposito}]
+        finally:
+            with self._lock:
+                self.activas -= 1
+
+
+def _scheduler(**kwargs):
+    from layers.bronze.scheduler import RequestScheduler
+
+    esperas = []
+    opciones = dict(max_retries=3, retry_base=1.0, retry_max=8.0, initial=1, maximum=4,
+                    limits={}, slow_factor=3.0, sleep=esperas.append)
+    opciones.update(kwargs)
+    return RequestScheduler(**opciones), esperas
+
+
+class TestAdaptiveLimiter:
+    """Tests para AdaptiveLimiter (AIMD)."""
+
+    def test_crece_con_latencia_estable(self):
+        from layers.bronze.scheduler import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter('get_stock', initial=1, maximum=4)
+        for _ in range(20):
+            limiter.acquire()
+            limiter.release(latency=0.1)
+
+        assert limiter.limit == 4
+
+    def test_error_reduce_a_la_mitad(self):
+        from layers.bronze.scheduler import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter('get_stock', initial=8, maximum=8)
+        limiter.acquire()
+        limiter.release(ok=False)
+
+        assert limiter.limit == 4
+
+    def test_respuesta_lenta_reduce(self):
+        from layers.bronze.scheduler import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter('get_stock', initial=8, maximum=8, slow_factor=3.0)
+        limiter.acquire()
+        limiter.release(latency=0.1)
+        limiter.acquire()
+        limiter.release(latency=1.0)
+
+        assert limiter.limit < 8
+
+    def test_nunca_baja_del_minimo(self):
+        from layers.bronze.scheduler import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter('get_stock', initial=2, maximum=8)
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(ok=False)
+
+        assert limiter.limit == 1
+
+
+class TestRequestScheduler:
+    """Tests para RequestScheduler y scheduled_client() contra un cliente falso."""
+
+    def test_reintenta_con_jitter_y_recupera(self):
+        from layers.bronze.scheduler import scheduled_client
+
+        scheduler, esperas = _scheduler()
+        client = FakeApiClient(fallas=2)
+
+        resultado = scheduled_client(client, scheduler).get_stock(fecha='2025-01-01', id_deposito=1)
+
+        assert resultado == [{'fecha': '2025-01-01', 'idDeposito': 1}]
+        assert client.llamadas == 3
+        assert len(esperas) == 2
+        assert 0 <= esperas[0] <= 1.0 and 0 <= esperas[1] <= 2.0
+
+    def test_agota_reintentos(self):
+        from layers.bronze.scheduler import scheduled_client
+
+        scheduler, esperas = _scheduler(max_retries=2)
+        client = FakeApiClient(fallas=10)
+
+        with pytest.raises(ConnectionError):
+            scheduled_client(client, scheduler).get_stock(fecha='2025-01-01', id_deposito=1)
+        assert client.llamadas == 3
+        assert scheduler.limiter('EMPRESA1', 'get_stock').in_flight == 0
+
+    def test_error_no_reintentable(self):
+        from layers.bronze.scheduler import scheduled_client
+
+        scheduler, esperas = _scheduler()
+
+        class ClienteInvalido:
+            def get_sales(self, **kwargs):
+                raise ValueError("fecha inválida")
+
+        with pytest.raises(ValueError):
+            scheduled_client(ClienteInvalido(), scheduler).get_sales(fecha_desde='x')
+        assert esperas == []
+
+    @pytest.mark.parametrize("status,reintenta", [(400, False), (401, False), (404, False),
+                                                  (429, True), (500, True), (503, True)])
+    def test_api_error_segun_status(self, status, reintenta):
+        from chesserp.exceptions import ApiError
+        from layers.bronze.scheduler import scheduled_client
+
+        scheduler, esperas = _scheduler(initial=8, maximum=8, max_retries=2)
+
+        class ClienteConError:
+            llamadas = 0
+
+            def get_sales(self, **kwargs):
+                self.llamadas += 1
+                raise ApiError(status, "Request to /ventas/ failed")
+
+        client = ClienteConError()
+        with pytest.raises(ApiError):
+            scheduled_client(client, scheduler).get_sales(fecha_desde='2025-01-01')
+
+        limite = scheduler.limiter('', 'get_sales').limit
+        if reintenta:
+            assert client.llamadas == 3 and len(esperas) == 2
+            assert limite < 8
+        else:
+            assert client.llamadas == 1 and esperas == []
+            assert limite >= 8
+
+    def test_respeta_limite_por_endpoint(self):
+        from layers.bronze.scheduler import scheduled_client
+
+        scheduler, _ = _scheduler(initial=4, maximum=8, limits={'get_stock': 3})
+        client = FakeApiClient(latencia=0.02)
+        api = scheduled_client(client, scheduler)
+
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            list(pool.map(lambda d: api.get_stock(fecha='2025-01-01', id_deposito=d), range(36)))
+
+        assert client.llamadas == 36
+        assert client.max_activas <= 3
+
+    def test_fallas_bajan_la_concurrencia(self):
+        from layers.bronze.scheduler import scheduled_client
+
+        scheduler, _ = _scheduler(initial=8, maximum=8)
+        client = FakeApiClient(fallas=3)
+        scheduled_client(client, scheduler).get_stock(fecha='2025-01-01', id_deposito=1)
+
+        assert scheduler.limiter('EMPRESA1', 'get_stock').limit < 8
+
+    def test_delega_atributos_que_no_son_get(self):
+        from layers.bronze.scheduler import scheduled_client
+
+        scheduler, _ = _scheduler()
+        assert scheduled_client(FakeApiClient(), scheduler).name == 'EMPRESA1'
@@ -1,7 +1,74 @@
 """
 Tests para el loader de stock (Bronze).
 """
+import json
+import time
+import threading
 import pytest
+from unittest.mock import patch, MagicMock
+
+
+DEPOSITOS = [{'id': 1, 'nombre': 'CENTRAL'}, {'id': 2, 'nombre': 'NORTE'}, {'id': 7, 'nombre': 'SUR'}]
+
+
+class FakeStockClient:
+    """Cliente falso: devuelve filas deterministas por (fecha, depósito) con latencia variable."""
+
+    def get_stock(self, fecha, id_deposito, raw=True):
+        time.sleep(0.001 * (id_deposito % 3))
+        if id_deposito == 2 and fecha.endswith('02'):
+            return []
+        return [
+            {'idArticulo': n, 'idDeposito': id_deposito, 'fecha': fecha}
+            for n in range(id_deposito + 1)
+        ]
+
+
+class FakeDeltaStockClient:
+    """Cliente falso con inventario estable: por día solo cambia el artículo 1 y el 3 se da de baja el día 3."""
+
+    def get_stock(self, fecha, id_deposito, raw=True):
+        time.sleep(0.001 * ((id_deposito + int(fecha[-2:])) % 3))
+        dia = int(fecha[-2:])
+        return [
+            {'idAlmacen': 1, 'idArticulo': n, 'cantUnidades': dia if n == 1 else 10}
+            for n in range(1, 5)
+            if not (n == 3 and dia >= 3)
+        ]
+
+
+def _run_load_stock(max_workers, completados=(), resume=False, storage='full', client=None):
+    """Helper: ejecuta load_stock con cliente falso y retorna las filas insertadas."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = list(completados)
+    mock_raw_conn = MagicMock()
+    mock_raw_conn.cursor.return_value = mock_cursor
+    mock_conn = MagicMock()
+    mock_conn.connection.dbapi_connection = mock_raw_conn
+    mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+    mock_conn.__exit__ = MagicMock(return_value=False)
+
+    insertadas = []
+
+    def capture(cursor, table, columns, rows):
+        filas = list(rows)
+        insertadas.extend(filas)
+        return len(filas)
+
+    with patch('layers.bronze.loaders.stock_loader.engine') as mock_engine, \
+         patch('layers.bronze.loaders.stock_loader.ChessClient') as mock_client_cls, \
+         patch('layers.bronze.loaders.stock_loader.cargar_depositos', return_value=DEPOSITOS), \
+         patch('layers.bronze.loaders.stock_loader.copy_rows', side_effect=capture), \
+         patch('layers.bronze.loaders.stock_loader.check_not_archived'), \
+         patch('layers.bronze.loaders.stock_loader._thread_local', new=threading.local()), \
+         patch('layers.bronze.stock_snapshots.delete_day', return_value=False), \
+         patch('layers.bronze.stock_snapshots.previous_state', return_value=None):
+        mock_engine.connect.return_value = mock_conn
+        mock_client_cls.from_env.return_value = client or FakeStockClient()
+        from layers.bronze.loaders.stock_loader import load_stock
+        load_stock('2025-01-01', '2025-01-03', max_workers=max_workers, resume=resume, storage=storage)
+
+    return insertadas, mock_raw_conn
 
 
 class TestGenerarRangosDiarios:
@@ -90,3 +157,202 @@ class TestGenerarRangosDiarios:
 
         for i in range(len(fechas) - 1):
             assert fechas[i] < fechas[i + 1]
+
+
+class TestLoadStockConcurrente:
+    """Tests para el modo concurrente de load_stock()."""
+
+    def test_mismas_filas_que_secuencial(self):
+        """El modo concurrente debe insertar exactamente las mismas filas por depósito."""
+        secuencial, _ = _run_load_stock(max_workers=1)
+        concurrente, _ = _run_load_stock(max_workers=4)
+
+        assert len(secuencial) > 0
+        assert sorted(secuencial) == sorted(concurrente)
+
+    def test_filas_por_deposito(self):
+        """Cada (fecha, depósito) con datos debe aportar sus filas con date_stock e id_deposito correctos."""
+        filas, _ = _run_load_stock(max_workers=3)
+
+        por_unidad = {}
+        for data_raw, source, fecha, id_deposito in filas:
+            item = json.loads(data_raw)
+            assert item['idDeposito'] == id_deposito
+            assert item['fecha'] == fecha
+            assert source == 'API_CHESS_ERP'
+            por_unidad[(fecha, id_deposito)] = por_unidad.get((fecha, id_deposito), 0) + 1
+
+        assert por_unidad[('2025-01-01', 7)] == 8
+        assert ('2025-01-02', 2) not in por_unidad
+        assert len(por_unidad) == 3 * 3 - 1
+
+    def test_commit_por_unidad(self):
+        """Debe commitear una vez por cada (fecha, depósito), con o sin datos, por su checkpoint (más las particiones)."""
+        _, mock_raw_conn = _run_load_stock(max_workers=4)
+        assert mock_raw_conn.commit.call_count == 1 + 3 * 3
+
+    def test_default_desde_settings(self):
+        """Sin max_workers debe usar settings.STOCK_MAX_WORKERS."""
+        with patch('layers.bronze.loaders.stock_loader.settings') as mock_settings, \
+             patch('layers.bronze.loaders.stock_loader._load_stock_concurrent', return_value=0) as mock_conc, \
+             patch('layers.bronze.loaders.stock_loader._load_stock_sequential', return_value=0) as mock_seq, \
+             patch('layers.bronze.loaders.stock_loader.engine'), \
+             patch('layers.bronze.loaders.stock_loader.cargar_depositos', return_value=DEPOSITOS):
+            mock_settings.STOCK_MAX_WORKERS = 6
+            mock_settings.STOCK_STORAGE_MODE = 'full'
+            from layers.bronze.loaders.stock_loader import load_stock
+            load_stock('2025-01-01', '2025-01-01')
+
+        mock_seq.assert_not_called()
+        assert mock_conc.call_args.args[3] == 6
+
+
+class TestLoadStockResume:
+    """Tests para los checkpoints y --resume de load_stock()."""
+
+    def test_registra_checkpoint_por_unidad(self):
+        """Cada (fecha, depósito) debe registrar su checkpoint, incluso sin datos."""
+        _, mock_raw_conn = _run_load_stock(max_workers=1)
+        cursor = mock_raw_conn.cursor.return_value
+
+        checkpoints = [
+            c.args[1] for c in cursor.execute.call_args_list
+            if 'bronze.load_checkpoints' in c.args[0] and 'INSERT' in c.args[0]
+        ]
+        assert len(checkpoints) == 9
+        assert ('stock', 1, '2025-01-02', '2025-01-02', 2, 0) in checkpoints
+
+    def test_resume_saltea_completadas(self):
+        """Con resume, las unidades con checkpoint no se vuelven a consultar."""
+        from datetime import date
+
+        completados = [(date(2025, 1, 1), date(2025, 1, 1), d['id']) for d in DEPOSITOS]
+        completados.append((date(2025, 1, 2), date(2025, 1, 2), 7))
+
+        for workers in (1, 4):
+            insertadas, _ = _run_load_stock(max_workers=workers, completados=completados, resume=True)
+            unidades = {(fila[2], fila[3]) for fila in insertadas}
+
+            assert not any(fecha == '2025-01-01' for fecha, _ in unidades)
+            assert ('2025-01-02', 7) not in unidades
+            assert ('2025-01-03', 7) in unidades
+
+
+class TestLoadStockDelta:
+    """Tests para el almacenamiento delta de load_stock()."""
+
+    def _filas(self, max_workers):
+        filas, mock_raw_conn = _run_load_stock(max_workers, storage='delta', client=FakeDeltaStockClient())
+        return [
+            (fecha, id_deposito, tipo, json.loads(data_raw))
+            for data_raw, _, fecha, id_deposito, tipo in filas
+        ], mock_raw_conn
+
+    def test_baseline_y_cambios(self):
+        """El primer día del mes guarda el inventario completo; los siguientes, solo los cambios."""
+        filas, _ = self._filas(max_workers=1)
+        deposito_1 = [(f, t, item['idArticulo']) for f, d, t, item in filas if d == 1]
+
+        assert deposito_1 == [
+            ('2025-01-01', 'B', 1), ('2025-01-01', 'B', 2), ('2025-01-01', 'B', 3), ('2025-01-01', 'B', 4),
+            ('2025-01-02', 'D', 1),
+            ('2025-01-03', 'D', 1), ('2025-01-03', 'X', 3),
+        ]
+
+    def test_concurrente_escribe_en_orden(self):
+        """Con varios workers las unidades se escriben en orden y el resultado es idéntico al secuencial."""
+        secuencial, _ = self._filas(max_workers=1)
+        concurrente, _ = self._filas(max_workers=4)
+
+        assert secuencial == concurrente
+
+    def test_registra_dias(self):
+        """Cada (fecha, depósito) queda en bronze.raw_stock_days con filas guardadas y totales."""
+        _, mock_raw_conn = self._filas(max_workers=1)
+        cursor = mock_raw_conn.cursor.return_value
+
+        dias = [
+            c.args[1] for c in cursor.execute.call_args_list
+            if 'INSERT INTO bronze.raw_stock_days' in c.args[0]
+        ]
+        assert len(dias) == 9
+        assert ('2025-01-01', 1, 'B', 4, 4) in dias
+        assert ('2025-01-03', 1, 'D', 2, 3) in dias
+
+    def test_modo_invalido(self):
+        """Un modo de almacenamiento desconocido debe fallar antes de consultar la API."""
+        from layers.bronze.loaders.stock_loader import load_stock
+
+        with patch('layers.bronze.loaders.stock_loader.engine') as mock_engine, \
+             patch('layers.bronze.loaders.stock_loader.cargar_depositos', return_value=DEPOSITOS):
+            with pytest.raises(ValueError):
+                load_stock('2025-01-01', '2025-01-01', storage='comprimido')
+            mock_engine.connect.assert_not_called()
+
+
+class FakeRawStockClient:
+    """Cliente falso en modo passthrough: cuerpo crudo por (fecha, depósito), vacío para el depósito 2."""
+
+    def get_stock_body(self, id_deposito, fecha):
+        items = [] if id_deposito == 2 else [{'idArticulo': n} for n in range(id_deposito)]
+        return json.dumps({'dsStockFisicoApi': {'dsStock': items}}).encode()
+
+
+class TestLoadStockPassthrough:
+    """Tests para load_stock(passthrough=True)."""
+
+    def _run(self, max_workers, storage='full'):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = []
+        mock_raw_conn = MagicMock()
+        mock_raw_conn.cursor.return_value = mock_cursor
+        mock_conn = MagicMock()
+        mock_conn.connection.dbapi_connection = mock_raw_conn
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+
+        crudos = []
+
+        def capture(cursor, bodies, path, table, columns, select_sql, params=()):
+            crudos.append((table, params, json.loads(bodies[0])))
+            return len(json.loads(bodies[0])['dsStockFisicoApi']['dsStock'])
+
+        with patch('layers.bronze.loaders.stock_loader.engine') as mock_engine, \
+             patch('layers.bronze.loaders.stock_loader.ChessClient'), \
+             patch('layers.bronze.loaders.stock_loader.wrap_client', return_value=FakeRawStockClient()), \
+             patch('layers.bronze.loaders.stock_loader.cargar_depositos', return_value=DEPOSITOS), \
+             patch('layers.bronze.loaders.stock_loader.insert_raw_items', side_effect=capture), \
+             patch('layers.bronze.loaders.stock_loader.copy_rows') as mock_copy, \
+             patch('layers.bronze.loaders.stock_loader._thread_local', new=threading.local()):
+            mock_engine.connect.return_value = mock_conn
+            from layers.bronze.loaders.stock_loader import load_stock
+            load_stock('2025-01-01', '2025-01-02', max_workers=max_workers, storage=storage, passthrough=True)
+
+        return crudos, mock_copy, mock_cursor
+
+    @pytest.mark.parametrize('max_workers', [1, 3])
+    def test_copia_cuerpos_crudos(self, max_workers):
+        crudos, mock_copy, _ = self._run(max_workers)
+
+        mock_copy.assert_not_called()
+        assert [(t, p) for t, p, _ in crudos] == [
+            ('bronze.raw_stock', (f, d)) for f in ('2025-01-01', '2025-01-02') for d in (1, 7)
+        ]
+
+    def test_registra_dias_con_filas_insertadas(self):
+        _, _, cursor = self._run(1)
+
+        dias = [c.args[1] for c in cursor.execute.call_args_list if 'INSERT INTO bronze.raw_stock_days' in c.args[0]]
+        assert ('2025-01-01', 7, 'F', 7, 7) in dias
+        assert ('2025-01-01', 2, 'F', 0, 0) in dias   # respuesta sin ítems
+
+    def test_delta_no_usa_passthrough(self):
+        """El modo delta necesita las filas decodificadas: passthrough se ignora."""
+        from layers.bronze.loaders.stock_loader import load_stock
+
+        with patch('layers.bronze.loaders.stock_loader._load_stock_sequential', return_value=0) as mock_seq, \
+             patch('layers.bronze.loaders.stock_loader.engine'), \
+             patch('layers.bronze.loaders.stock_loader.cargar_depositos', return_value=DEPOSITOS):
+            load_stock('2025-01-01', '2025-01-01', max_workers=1, storage='delta', passthrough=True)
+
+        assert mock_seq.call_args.args[-1] is False
@@ -0,0 +1,135 @@
+"""
+Tests para la codificación baseline/delta de snapshots de stock (Bronze).
+"""
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+
+def _item(articulo, unidades, almacen=1, lote=None):
+    return {'idAlmacen': almacen, 'idArticulo': articulo, 'cantUnidades': unidades, 'fecVtoLote': lote}
+
+
+class TestStockKey:
+    """Tests para stock_key()."""
+
+    def test_formato_igual_a_sql(self):
+        """Debe replicar bronze.stock_key(): valores ->> unidos por '|', NULL como vacío."""
+        from layers.bronze.stock_snapshots import stock_key
+
+        assert stock_key(_item(10, 5, lote='2025-03-01')) == '1|10|2025-03-01'
+        assert stock_key({'idArticulo': 10}) == '|10|'
+
+    def test_ignora_cantidades(self):
+        """Las cantidades no forman parte de la identidad de la fila."""
+        from layers.bronze.stock_snapshots import stock_key
+
+        assert stock_key(_item(10, 5)) == stock_key(_item(10, 7))
+
+
+class TestDiffSnapshot:
+    """Tests para diff_snapshot()."""
+
+    def test_sin_cambios(self):
+        """Un inventario idéntico al anterior no genera filas."""
+        from layers.bronze.stock_snapshots import diff_snapshot, stock_key
+
+        actual = [_item(1, 5), _item(2, 3)]
+        anterior = {stock_key(i): dict(i) for i in actual}
+
+        assert diff_snapshot(anterior, actual) == []
+
+    def test_altas_modificaciones_y_bajas(self):
+        """Debe marcar D las filas nuevas o modificadas y X las que desaparecieron."""
+        from layers.bronze.stock_snapshots import diff_snapshot, stock_key
+
+        anterior = {stock_key(i): i for i in [_item(1, 5), _item(2, 3), _item(3, 1)]}
+        actual = [_item(1, 5), _item(2, 4), _item(4, 8)]
+
+        cambios = diff_snapshot(anterior, actual)
+
+        assert cambios == [('D', _item(2, 4)), ('D', _item(4, 8)), ('X', _item(3, 1))]
+
+    def test_lote_distinto_es_otra_fila(self):
+        """El mismo artículo con otro vencimiento de lote es una fila distinta."""
+        from layers.bronze.stock_snapshots import diff_snapshot, stock_key
+
+        anterior = {stock_key(i): i for i in [_item(1, 5, lote='2025-01-01')]}
+        cambios = diff_snapshot(anterior, [_item(1, 5, lote='2025-02-01')])
+
+        assert [tipo for tipo, _ in cambios] == ['D', 'X']
+
+
+class TestDeltaEncoder:
+    """Tests para DeltaEncoder."""
+
+    def _encode(self, dias, previo=None, existente=False):
+        """Helper: codifica [(fecha, stock)] de un depósito y retorna resultados y llamadas a previous_state."""
+        from layers.bronze.stock_snapshots import DeltaEncoder
+
+        encoder = DeltaEncoder()
+        cursor = MagicMock()
+        with patch('layers.bronze.stock_snapshots.previous_state', return_value=previo) as mock_prev, \
+             patch('layers.bronze.stock_snapshots.delete_day', return_value=existente):
+            resultados = [encoder.encode(cursor, fecha, 1, stock) for fecha, stock in dias]
+        return resultados, mock_prev
+
+    def test_primer_dia_del_mes_es_baseline(self):
+        """Sin día anterior en el mes, guarda el inventario completo como B."""
+        resultados, _ = self._encode([('2025-01-01', [_item(1, 5), _item(2, 3)])])
+
+        assert resultados == [('B', [('B', _item(1, 5)), ('B', _item(2, 3))])]
+
+    def test_dias_consecutivos_usan_memoria(self):
+        """Los días consecutivos se comparan contra el inventario en memoria, sin consultar la BD."""
+        resultados, mock_prev = self._encode([
+            ('2025-01-01', [_item(1, 5), _item(2, 3)]),
+            ('2025-01-02', [_item(1, 5), _item(2, 2)]),
+        ])
+
+        assert resultados[1] == ('D', [('D', _item(2, 2))])
+        assert mock_prev.call_count == 1
+
+    def test_cambio_de_mes_nuevo_baseline(self):
+        """El primer día de un mes nuevo no se codifica contra el último día del mes anterior."""
+        resultados, mock_prev = self._encode([
+            ('2025-01-31', [_item(1, 5)]),
+            ('2025-02-01', [_item(1, 5)]),
+        ])
+
+        assert resultados[1][0] == 'B'
+        assert mock_prev.call_count == 2
+
+    def test_dia_salteado_consulta_bd(self):
+        """Si falta el día anterior en memoria (ej: --resume), reconstruye el estado desde la BD."""
+        from layers.bronze.stock_snapshots import stock_key
+
+        previo = (date(2025, 1, 4), {stock_key(_item(1, 5)): _item(1, 5)})
+        resultados, mock_prev = self._encode([('2025-01-05', [_item(1, 6)])], previo=previo)
+
+        assert resultados == [('D', [('D', _item(1, 6))])]
+        mock_prev.assert_called_once()
+
+
+class TestDeleteDay:
+    """Tests para delete_day()."""
+
+    def test_dia_existente_borra_filas(self):
+        """Si el día estaba registrado, elimina también sus filas de bronze.raw_stock."""
+        from layers.bronze.stock_snapshots import delete_day
+
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ('D',)
+
+        assert delete_day(cursor, '2025-01-02', 1) is True
+        sqls = [c.args[0] for c in cursor.execute.call_args_list]
+        assert any('DELETE FROM bronze.raw_stock WHERE' in s for s in sqls)
+
+    def test_dia_nuevo_no_borra(self):
+        """Si el día no estaba registrado, no toca bronze.raw_stock."""
+        from layers.bronze.stock_snapshots import delete_day
+
+        cursor = MagicMock()
+        cursor.fetchone.return_value = None
+
+        assert delete_day(cursor, '2025-01-02', 1) is False
+        assert cursor.execute.call_count == 1
@@ -0,0 +1,157 @@
+"""
+Tests para el writer masivo COPY (database.bulk).
+"""
+import json
+import re
+from datetime import date
+from unittest.mock import MagicMock
+
+
+class TestFormatCopyValue:
+    """Tests para format_copy_value()."""
+
+    def test_null(self):
+        """None debe serializarse como \\N."""
+        from database.bulk import format_copy_value
+        assert format_copy_value(None) == '\\N'
+
+    def test_escapa_caracteres_de_control(self):
+        """Backslash, TAB y saltos de línea deben escaparse."""
+        from database.bulk import format_copy_value
+        assert format_copy_value('a\\b\tc\nd\re') == 'a\\\\b\\tc\\nd\\re'
+
+    def test_tipos_no_texto(self):
+        """Enteros y fechas deben serializarse con str()."""
+        from database.bulk import format_copy_value
+        assert format_copy_value(15) == '15'
+        assert format_copy_value(date(2025, 1, 31)) == '2025-01-31'
+
+    def test_json_con_escapes_preserva_contenido(self):
+        """Un JSON con comillas y escapes debe reconstruirse idéntico al desescapar."""
+        from database.bulk import format_copy_value
+        payload = json.dumps({'obs': 'línea 1\nlínea 2', 'ruta': 'C:\\tmp', 'q': '"x"'})
+        escapado = format_copy_value(payload)
+        assert '\n' not in escapado
+        assert escapado.replace('\\\\', '\\') == payload
+
+
+class TestCopyStream:
+    """Tests para CopyStream (lectura incremental)."""
+
+    def test_lee_todas_las_filas(self):
+        """Leyendo por bloques debe producir todas las filas en formato COPY."""
+        from database.bulk import CopyStream
+        rows = [('{"a": 1}', 'API', '2025-01-01'), ('{"a": 2}', 'API', None)]
+        stream = CopyStream(iter(rows))
+
+        contenido = ''
+        while True:
+            chunk = stream.read(7)
+            if not chunk:
+                break
+            contenido += chunk
+
+        assert contenido == '{"a": 1}\tAPI\t2025-01-01\n{"a": 2}\tAPI\t\\N\n'
+        assert stream.rowcount == 2
+
+    def test_consume_generador_a_demanda(self):
+        """No debe consumir más filas que las necesarias para el bloque pedido."""
+        from database.bulk import CopyStream
+        consumidas = []
+
+        def gen():
+            for i in range(1000):
+                consumidas.append(i)
+                yield (str(i),)
+
+        stream = CopyStream(gen())
+        stream.read(10)
+
+        assert len(consumidas) < 10
+
+
+class TestCopyRows:
+    """Tests para copy_rows()."""
+
+    def test_ejecuta_copy_from_stdin(self):
+        """Debe ejecutar COPY tabla (columnas) FROM STDIN."""
+        from database.bulk import copy_rows
+        cursor = MagicMock()
+        recibido = {}
+
+        def fake_copy(sql, file, size=8192):
+            recibido['sql'] = sql
+            recibido['data'] = file.read(-1) + file.read(-1)
+
+        cursor.copy_expert.side_effect = fake_copy
+
+        n = copy_rows(cursor, 'bronze.raw_stock', ('data_raw', 'source_system', 'date_stock', 'id_deposito'),
+                      [('{}', 'API_CHESS_ERP', '2025-01-01', 5)])
+
+        assert recibido['sql'] == 'COPY bronze.raw_stock (data_raw, source_system, date_stock, id_deposito) FROM STDIN'
+        assert recibido['data'] == '{}\tAPI_CHESS_ERP\t2025-01-01\t5\n'
+        assert n == 1
+
+
+class TestCopyDocuments:
+    """Tests para copy_documents() y DocumentStream (documentos ya serializados)."""
+
+    def test_escapa_sin_decodificar(self):
+        """Los bytes se escapan para COPY y se reconstruyen idénticos al desescapar."""
+        from database.bulk import format_copy_bytes
+        body = json.dumps({'obs': 'línea 1\nlínea 2', 'ruta': 'C:\\tmp'}, ensure_ascii=False).encode()
+        body += b'\n\t'
+
+        escapado = format_copy_bytes(body)
+        assert b'\n' not in escapado and b'\t' not in escapado
+        desescapes = {b'n': b'\n', b't': b'\t', b'r': b'\r', b'\\': b'\\'}
+        assert re.sub(rb'\\(.)', lambda m: desescapes[m.group(1)], escapado) == body
+
+    def test_documento_grande_por_bloques(self):
+        """Un documento más grande que el bloque se entrega completo en varias lecturas."""
+        from database.bulk import DocumentStream
+        docs = [b'{"a": "' + b'x' * 1000 + b'"}', b'[]']
+        stream = DocumentStream(iter(docs))
+
+        contenido = b''
+        while True:
+            chunk = stream.read(64)
+            assert len(chunk) <= 64
+            if not chunk:
+                break
+            contenido += chunk
+
+        assert contenido == docs[0] + b'\n' + docs[1] + b'\n'
+        assert stream.rowcount == 2
+
+    def test_ejecuta_copy_de_una_columna(self):
+        from database.bulk import copy_documents
+        cursor = MagicMock()
+        recibido = {}
+
+        def fake_copy(sql, file, size=8192):
+            recibido['sql'] = sql
+            recibido['data'] = file.read(size) + file.read(size)
+
+        cursor.copy_expert.side_effect = fake_copy
+
+        assert copy_documents(cursor, 'tmp_raw_bodies', 'body', [b'{"x": 1}']) == 1
+        assert recibido['sql'] == 'COPY tmp_raw_bodies (body) FROM STDIN'
+        assert recibido['data'] == b'{"x": 1}\n'
+
+    def test_columnas_constantes(self):
+        from database.bulk import copy_documents
+        cursor = MagicMock()
+        recibido = {}
+
+        def fake_copy(sql, file, size=8192):
+            recibido['sql'] = sql
+            recibido['data'] = file.read(size) + file.read(size) + file.read(size)
+
+        cursor.copy_expert.side_effect = fake_copy
+
+        n = copy_documents(cursor, 'bronze.raw_stock', 'data_raw', [b'{"x": 1}', b'{"x": 2}'],
+                           {'date_stock': '2025-01-15', 'id_deposito': 3, 'source_system': None})
+        assert n == 2
+        assert recibido['sql'] == 'COPY bronze.raw_stock (data_raw, date_stock, id_deposito, source_system) FROM STDIN'
+        assert recibido['data'] == b'{"x": 1}\t2025-01-15\t3\t\\N\n{"x": 2}\t2025-01-15\t3\t\\N\n'
@@ -2,7 +2,6 @@
 Tests para el aggregator dim_cliente (Gold).
 Verifica CTEs de rutas, JOINs y campo anulado.
 """
-import pytest
 from unittest.mock import patch, MagicMock
 
 
@@ -10,6 +9,7 @@ def _capture_sql():
     """Helper: ejecuta load_dim_cliente y captura SQL."""
     mock_cursor = MagicMock()
     mock_cursor.rowcount = 50
+    mock_cursor.fetchone.return_value = (0,)
     mock_raw_conn = MagicMock()
     mock_raw_conn.cursor.return_value = mock_cursor
     mock_conn = MagicMock()
@@ -85,3 +85,39 @@ class TestDimClienteSQL:
         """CTEs deben usar DISTINCT ON para seleccionar una ruta por cliente."""
         calls = _capture_sql()
         assert any('DISTINCT ON' in c for c in calls)
+
+
+class TestDimClienteChanges:
+    """Tests para load_dim_cliente_changes() (solo clientes afectados por cambios de maestros)."""
+
+    def _capture_changes(self, filas=(3, 0, 3, 3, 1, 0, 0, 0)):
+        with patch('layers.gold.aggregators.dim_cliente.apply_changes', return_value=list(filas)) as mock_apply:
+            from layers.gold.aggregators.dim_cliente import load_dim_cliente_changes
+            load_dim_cliente_changes()
+        return mock_apply.call_args
+
+    def test_espera_a_silver(self):
+        """Solo aplica los cambios que ya aplicaron las tablas de silver."""
+        from layers.gold.aggregators.dim_cliente import UPSTREAM
+        llamada = self._capture_changes()
+        assert llamada.args[0] == 'gold.dim_cliente'
+        assert llamada.kwargs['after'] == UPSTREAM
+
+    def test_recarga_clientes_afectados(self):
+        """Borra y reinserta solo los clientes de tmp_dim_clientes."""
+        sentencias = self._capture_changes().args[1]
+        assert 'tmp_dim_clientes' in sentencias[0]
+        assert 'DELETE FROM gold.dim_cliente' in sentencias[1]
+        assert 'INSERT INTO gold.dim_cliente' in sentencias[2]
+        assert 'tmp_dim_clientes' in sentencias[2]
+
+    def test_actualiza_descripciones(self):
+        """Las descripciones de sucursal y marketing se actualizan solo si cambiaron."""
+        sentencias = self._capture_changes().args[1]
+        assert all('IS DISTINCT FROM' in s for s in sentencias[3:])
+
+    def test_sin_cambios(self):
+        """Sin cambios pendientes no falla."""
+        with patch('layers.gold.aggregators.dim_cliente.apply_changes', return_value=None):
+            from layers.gold.aggregators.dim_cliente import load_dim_cliente_changes
+            load_dim_cliente_changes()
@@ -2,7 +2,6 @@
 Tests para el aggregator fact_ventas (Gold).
 Verifica modos de carga, JOIN hectolitros y campo cantidad_total_htls.
 """
-import pytest
 from unittest.mock import patch, MagicMock
 
 
@@ -69,6 +68,23 @@ class TestFactVentasModes:
         calls_sql = [str(c) for c in mock_cursor.execute.call_args_list]
         assert any('BETWEEN' in c for c in calls_sql)
 
+    def test_una_empresa(self):
+        """Con id_empresa se elimina y se recarga solo esa empresa."""
+        mock_conn, mock_cursor = _make_mock_conn()
+
+        with patch('layers.gold.aggregators.fact_ventas.engine') as mock_engine:
+            mock_engine.connect.return_value = mock_conn
+            from layers.gold.aggregators.fact_ventas import load_fact_ventas
+            load_fact_ventas(full_refresh=True, id_empresa=2)
+
+        llamadas = [c.args for c in mock_cursor.execute.call_args_list]
+        delete = next(a for a in llamadas if 'DELETE FROM gold.fact_ventas' in a[0])
+        assert delete == ("DELETE FROM gold.fact_ventas WHERE TRUE AND id_empresa = %s", (2,))
+        insert = next(a for a in llamadas if 'INSERT INTO gold.fact_ventas' in a[0])
+        assert 'WHERE TRUE AND id_empresa = %s' in insert[0]
+        assert 'id_empresa' in insert[0].split('SELECT')[0]
+        assert insert[1] == (2,)
+
 
 class TestFactVentasHTLS:
     """Tests para la integración de hectolitros."""
@@ -103,3 +119,28 @@ class TestFactVentasHTLS:
         """Debe configurar work_mem."""
         calls = self._capture_sql()
         assert any('work_mem' in c for c in calls)
+
+
+class TestFactVentasChanges:
+    """Tests para load_fact_ventas_changes()."""
+
+    def _run(self, hasta_id):
+        mock_conn, mock_cursor = _make_mock_conn()
+        mock_cursor.fetchone.return_value = (hasta_id,)
+        with patch('layers.gold.aggregators.fact_ventas.engine') as mock_engine:
+            mock_engine.connect.return_value = mock_conn
+            from layers.gold.aggregators.fact_ventas import load_fact_ventas_changes
+            load_fact_ventas_changes()
+        return [str(c) for c in mock_cursor.execute.call_args_list]
+
+    def test_sin_pendientes_no_hace_nada(self):
+        calls = self._run(None)
+        assert not any('DELETE FROM gold.fact_ventas' in c for c in calls)
+
+    def test_recarga_documentos_y_consume_cambios(self):
+        calls = self._run(7)
+
+        assert any('DELETE FROM gold.fact_ventas' in c and 'tmp_documentos' in c for c in calls)
+        insert = next(c for c in calls if 'INSERT INTO gold.fact_ventas' in c)
+        assert 'tmp_documentos' in insert
+        assert any('DELETE FROM bronze.raw_sales_changes' in c for c in calls)
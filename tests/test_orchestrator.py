@@ -3,7 +3,7 @@ Tests para funciones del orchestrator.
 Extiende test_utils.py con tests de funciones de orquestación.
 """
 import pytest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch
 
 
 class TestGoldDimensions:
@@ -57,6 +57,7 @@ class TestGoldDimensions:
 class TestBronzeMasters:
     """Tests para bronze_masters() - orden de ejecución."""
 
+    @patch('layers.bronze.masters.master_client')
     @patch('orchestrator.bronze_marketing')
     @patch('orchestrator.bronze_depositos')
     @patch('orchestrator.bronze_articles')
@@ -65,16 +66,37 @@ class TestBronzeMasters:
     @patch('orchestrator.bronze_clientes')
     def test_bronze_masters_llama_todas(self, mock_clientes, mock_staff,
                                          mock_routes, mock_articles,
-                                         mock_depositos, mock_marketing):
-        """bronze_masters debe llamar a todos los loaders maestros."""
+                                         mock_depositos, mock_marketing, mock_client):
+        """bronze_masters debe llamar a todos los loaders maestros con el cliente compartido."""
         from orchestrator import bronze_masters
         bronze_masters()
 
-        mock_clientes.assert_called_once()
+        client = mock_client.return_value
+        mock_clientes.assert_called_once_with(client)
+        mock_staff.assert_called_once_with(client)
+        mock_routes.assert_called_once_with(client)
+        mock_articles.assert_called_once_with(client)
+        mock_depositos.assert_called_once_with()
+        mock_marketing.assert_called_once_with(client)
+
+    @patch('layers.bronze.masters.master_client')
+    @patch('orchestrator.bronze_marketing')
+    @patch('orchestrator.bronze_depositos')
+    @patch('orchestrator.bronze_articles')
+    @patch('orchestrator.bronze_routes')
+    @patch('orchestrator.bronze_staff')
+    @patch('orchestrator.bronze_clientes', side_effect=RuntimeError("API caída"))
+    def test_bronze_masters_falla_al_final(self, mock_clientes, mock_staff,
+                                            mock_routes, mock_articles,
+                                            mock_depositos, mock_marketing, mock_client):
+        """Un maestro que falla no corta a los demás, pero la fase termina con error."""
+        from orchestrator import bronze_masters
+        from layers.bronze.masters import MastersLoadError
+
+        with pytest.raises(MastersLoadError, match="clientes"):
+            bronze_masters()
+
         mock_staff.assert_called_once()
-        mock_routes.assert_called_once()
-        mock_articles.assert_called_once()
-        mock_depositos.assert_called_once()
         mock_marketing.assert_called_once()
 
 
@@ -0,0 +1,102 @@
+"""
+Tests para el contexto de corrida (sesión del ERP y pool de conexiones compartidos).
+"""
+import threading
+from unittest.mock import patch, MagicMock
+
+from layers.run_context import RunContext, current_client, current_context
+
+
+def _contexto(**kwargs):
+    return RunContext(engine=MagicMock(), **kwargs)
+
+
+class TestRunContext:
+    """Tests para RunContext."""
+
+    @patch('layers.run_context.get_cache_mode', return_value='off')
+    @patch('layers.run_context.ChessClient')
+    def test_un_cliente_y_un_login_por_corrida(self, mock_chess, mock_mode):
+        ctx = _contexto(http_pool_size=4)
+        clientes = []
+
+        hilos = [threading.Thread(target=lambda: clientes.append(ctx.client)) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert len({id(c) for c in clientes}) == 1
+        mock_chess.from_env.assert_called_once_with(prefix="EMPRESA1_")
+        chess = mock_chess.from_env.return_value
+        chess.login.assert_called_once()
+        # Pool keep-alive montado para http y https
+        montados = {c.args[0]: c.args[1] for c in chess._session.mount.call_args_list}
+        assert set(montados) == {'http://', 'https://'}
+        assert montados['https://']._pool_maxsize == 4
+
+    @patch('layers.run_context.get_cache_mode', return_value='replay')
+    @patch('layers.run_context.ChessClient')
+    def test_sin_login_en_replay(self, mock_chess, mock_mode):
+        _contexto().client
+
+        mock_chess.from_env.return_value.login.assert_not_called()
+
+    @patch('layers.run_context.get_cache_mode', return_value='off')
+    @patch('layers.run_context.ChessClient')
+    def test_activo_dentro_del_with(self, mock_chess, mock_mode):
+        assert current_context() is None
+        assert current_client() is None
+
+        with _contexto() as ctx:
+            assert current_context() is ctx
+            assert current_client() is ctx.client
+
+        assert current_context() is None
+        mock_chess.from_env.return_value._session.close.assert_called_once()
+        ctx.engine.dispose.assert_called_once()
+
+    def test_cerrar_sin_usar_el_cliente(self):
+        with _contexto() as ctx:
+            pass
+
+        ctx.engine.dispose.assert_called_once()
+        assert current_context() is None
+
+
+class TestLoadersUsanLaCorrida:
+    """Los loaders usan el cliente de la corrida activa en lugar de crear uno."""
+
+    @patch('layers.bronze.loaders.clientes_loader.merge_master', return_value={'I': 0, 'U': 0, 'D': 0})
+    @patch('layers.bronze.loaders.clientes_loader.engine')
+    @patch('layers.bronze.loaders.clientes_loader.ChessClient')
+    def test_load_clientes(self, mock_chess_loader, mock_engine, mock_merge):
+        from layers.bronze.loaders.clientes_loader import load_clientes
+
+        client = MagicMock()
+        client.get_customers.return_value = [{'idCliente': 1}]
+        ctx = _contexto()
+        ctx._clients[ctx.prefix] = client
+
+        with ctx:
+            load_clientes()
+
+        mock_chess_loader.from_env.assert_not_called()
+        client.get_customers.assert_called_once()
+
+    @patch('layers.bronze.loaders.stock_loader.ChessClient')
+    def test_stock_hilos_comparten_el_cliente(self, mock_chess_loader):
+        from layers.bronze.loaders.stock_loader import _get_thread_client
+
+        client = MagicMock()
+        ctx = _contexto()
+        ctx._clients[ctx.prefix] = client
+
+        with ctx:
+            resultados = []
+            hilo = threading.Thread(target=lambda: resultados.append(_get_thread_client()))
+            hilo.start()
+            hilo.join()
+
+        assert resultados == [client]
+        mock_chess_loader.from_env.assert_not_called()
@@ -0,0 +1,79 @@
+"""
+Tests para las estrategias de extracción de data_raw (Silver).
+Verifica la reescritura de las consultas a jsonb_to_record.
+"""
+import re
+
+import pytest
+from unittest.mock import patch
+
+
+class TestApplyStrategy:
+    """Tests para apply_strategy()."""
+
+    SQL = "SELECT NULLIF(data_raw->>'idCliente', '')::integer, data_raw->>'nombre' FROM t /* registro r */"
+
+    def test_operator_deja_la_consulta(self):
+        from layers.silver.transformers.extraction import apply_strategy
+        sql = apply_strategy(self.SQL, strategy='operator')
+        assert sql == "SELECT NULLIF(data_raw->>'idCliente', '')::integer, data_raw->>'nombre' FROM t "
+
+    def test_record_un_registro_por_fila(self):
+        from layers.silver.transformers.extraction import apply_strategy
+        sql = apply_strategy(self.SQL, strategy='record')
+        assert "->>" not in sql
+        assert """NULLIF(r."idCliente", '')::integer, r."nombre\"""" in sql
+        assert sql.endswith(
+            """FROM t CROSS JOIN LATERAL jsonb_to_record(data_raw) AS r("idCliente" text, "nombre" text)"""
+        )
+
+    def test_default_desde_settings(self):
+        from layers.silver.transformers.extraction import apply_strategy
+        with patch('layers.silver.transformers.extraction.settings') as mock_settings:
+            mock_settings.SILVER_JSON_EXTRACTION = 'record'
+            assert 'jsonb_to_record' in apply_strategy(self.SQL)
+
+    def test_estrategia_desconocida(self):
+        from layers.silver.transformers.extraction import apply_strategy
+        with pytest.raises(ValueError):
+            apply_strategy(self.SQL, strategy='jsonpath')
+
+    def test_record_sin_marca(self):
+        from layers.silver.transformers.extraction import apply_strategy
+        with pytest.raises(ValueError):
+            apply_strategy("SELECT data_raw->>'x' FROM t", strategy='record')
+
+
+class TestTransformerQueries:
+    """La estrategia record debe mantener las conversiones de cada transformer."""
+
+    def test_ventas_mismas_expresiones(self):
+        from layers.silver.transformers.sales_transformer import _build_insert_query
+        operador = _build_insert_query("WHERE deleted_at IS NULL", strategy='operator')
+        registro = _build_insert_query("WHERE deleted_at IS NULL", strategy='record')
+        assert "data_raw->>" not in registro
+        assert registro.count("jsonb_to_record(data_raw)") == 1
+        # Misma consulta reemplazando cada data_raw->>'clave' por r."clave"
+        assert re.sub(r"data_raw->>'(\w+)'", r'r."\1"', operador) == re.sub(r"CROSS JOIN LATERAL .*", "", registro)
+        assert """NULLIF(NULLIF(r."fechaComprobate", ''), '0001-01-01')::date""" in registro
+
+    def test_clientes_dos_registros(self):
+        from layers.silver.transformers.clients_transformer import _build_insert_query
+        sql = _build_insert_query("WHERE COALESCE(data_raw->>'idCliente', '') IN ('1')", strategy='record')
+        assert "jsonb_to_record(a.data_raw) AS r(" in sql
+        assert "jsonb_to_record(a.alias) AS ra(" in sql
+        assert 'ra."razonSocial"' in sql
+        # El filtro del CTE lee bronze directamente
+        assert "COALESCE(data_raw->>'idCliente', '')" in sql
+
+    @pytest.mark.parametrize('modulo', [
+        'articles_transformer', 'routes_transformer', 'staff_transformer', 'stock_transformer',
+    ])
+    def test_maestros_y_stock(self, modulo):
+        import importlib
+        transformer = importlib.import_module(f'layers.silver.transformers.{modulo}')
+        operador = transformer._build_insert_query(strategy='operator')
+        registro = transformer._build_insert_query(strategy='record')
+        assert "registro r" not in operador and "jsonb_to_record" not in operador
+        assert "->>" not in registro
+        assert registro.count("jsonb_to_record(") == 1
@@ -110,6 +110,14 @@ class TestStaffTransformer:
         calls = _capture_sql('layers.silver.transformers.staff_transformer', 'transform_staff')
         assert any('DISTINCT ON' in c for c in calls)
 
+    def test_deduplica_por_columnas_generadas(self):
+        """DISTINCT ON y ORDER BY usan las columnas tipadas de bronze, no data_raw."""
+        calls = _capture_sql('layers.silver.transformers.staff_transformer', 'transform_staff')
+        insert = ' '.join(next(c for c in calls if 'INSERT INTO silver.staff' in c).split())
+        assert 'DISTINCT ON (id_personal, id_sucursal)' in insert
+        assert 'ORDER BY id_personal, id_sucursal, id DESC' in insert
+        assert "data_raw->>'idPersonal'" not in insert
+
 
 class TestDepositsTransformer:
     """Tests para transform_deposits()."""
@@ -154,3 +162,49 @@ class TestBranchesTransformer:
     def test_escribe_en_silver_branches(self):
         calls = _capture_sql('layers.silver.transformers.branches_transformer', 'transform_branches')
         assert any('INSERT INTO silver.branches' in c for c in calls)
+
+    def test_filtra_por_columna_generada(self):
+        calls = _capture_sql('layers.silver.transformers.branches_transformer', 'transform_branches')
+        assert any('WHERE id_sucursal IS NOT NULL' in c for c in calls)
+
+
+def _capture_changes(module_path, func_name, consumer):
+    """Helper: ejecuta un transform_*_changes y captura las sentencias pasadas a apply_changes."""
+    with patch(f'{module_path}.apply_changes', return_value=[2, 3]) as mock_apply:
+        import importlib
+        mod = importlib.import_module(module_path)
+        getattr(mod, func_name)()
+
+    args = mock_apply.call_args.args
+    assert args[0] == consumer
+    return args[1]
+
+
+class TestMasterChangesTransformers:
+    """Tests para los transform_*_changes() (solo claves modificadas en bronze)."""
+
+    @pytest.mark.parametrize('modulo,funcion,consumidor,tabla', [
+        ('clients_transformer', 'transform_clients_changes', 'silver.clients', 'silver.clients'),
+        ('client_forces_transformer', 'transform_client_forces_changes', 'silver.client_forces', 'silver.client_forces'),
+        ('staff_transformer', 'transform_staff_changes', 'silver.staff', 'silver.staff'),
+        ('routes_transformer', 'transform_routes_changes', 'silver.routes', 'silver.routes'),
+        ('articles_transformer', 'transform_articles_changes', 'silver.articles', 'silver.articles'),
+    ])
+    def test_delete_e_insert_filtrados(self, modulo, funcion, consumidor, tabla):
+        sentencias = _capture_changes(f'layers.silver.transformers.{modulo}', funcion, consumidor)
+
+        assert len(sentencias) == 2
+        assert f'DELETE FROM {tabla}' in sentencias[0]
+        assert f'INSERT INTO {tabla}' in sentencias[1]
+        assert all('tmp_master_keys' in s for s in sentencias)
+
+    def test_sin_cambios(self):
+        """Si no hay cambios pendientes no falla."""
+        with patch('layers.silver.transformers.clients_transformer.apply_changes', return_value=None):
+            from layers.silver.transformers.clients_transformer import transform_clients_changes
+            transform_clients_changes()
+
+    def test_full_refresh_avanza_consumidor(self):
+        """El full refresh marca como aplicados los cambios previos a la lectura de bronze."""
+        calls = _capture_sql('layers.silver.transformers.clients_transformer', 'transform_clients')
+        assert any('bronze.master_change_consumers' in c and 'silver.clients' in c for c in calls)
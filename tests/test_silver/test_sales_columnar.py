@@ -0,0 +1,154 @@
+"""
+Tests para el motor columnar de ventas (Silver).
+Verifica que reproduzca el SELECT de _build_insert_query y la elección del motor.
+"""
+import json
+import re
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+def _insert_columns():
+    from layers.silver.transformers.sales_transformer import _build_insert_query
+    sql = re.sub(r'--[^\n]*', '', _build_insert_query("WHERE TRUE"))
+    columnas = sql[sql.index('(') + 1:sql.index(')')]
+    return [c.strip() for c in columnas.split(',') if c.strip()]
+
+
+class TestSalesColumns:
+    """La especificación de columnas debe coincidir con el INSERT del motor sql."""
+
+    def test_mismas_columnas_y_orden(self):
+        from layers.silver.transformers.sales_columnar import SALES_COLUMNS
+        assert ['id_empresa'] + [c for c, _, _, _ in SALES_COLUMNS] + ['nro_linea'] == _insert_columns()
+
+    def test_mismas_claves_de_data_raw(self):
+        from layers.silver.transformers.sales_columnar import _claves
+        from layers.silver.transformers.sales_transformer import _build_insert_query
+        claves_sql = set(re.findall(r"data_raw->>'(\w+)'", _build_insert_query("WHERE TRUE")))
+        assert set(_claves()) == claves_sql
+
+
+class TestTransformBatch:
+    """Tests para transform_batch() (requiere pyarrow)."""
+
+    @pytest.fixture(autouse=True)
+    def _pyarrow(self):
+        pytest.importorskip('pyarrow')
+
+    def _transformar(self, *filas):
+        from layers.silver.transformers.sales_columnar import transform_batch
+        return transform_batch([json.dumps(f) for f in filas]).to_pylist()
+
+    def test_semantica_del_select(self):
+        filas = self._transformar(
+            {'idEmpresa': '1', 'idSucursal': ' 3', 'idCaja': '', 'anulado': 'si', 'esCombo': 'NO',
+             'fechaComprobate': '2024-01-15', 'fechaAlta': '0001-01-01', 'fechaPedido': '',
+             'cantidadesTotal': '2.00005', 'precioventabr': '-10.5', 'bonificacion': '1.23456',
+             'proveedor': '12 - ACME - SA', 'idorigen': '', 'cajero': ''},
+            {'idEmpresa': '1', 'fechaComprobate': '2024-01-16', 'idorigen': 'X'},
+        )
+        primera, segunda = filas
+        assert primera['id_sucursal'] == 3 and primera['id_caja'] is None
+        assert primera['anulado'] is True and primera['es_combo'] is False
+        assert segunda['anulado'] is None
+        assert primera['fecha_comprobante'] == date(2024, 1, 15)
+        assert primera['fecha_alta'] is None and primera['fecha_pedido'] is None
+        assert primera['cantidades_total'] == Decimal('2.0001')
+        assert primera['bonificacion'] == Decimal('1.2346')
+        assert primera['facturacion_neta'] == Decimal('2.0001') * Decimal('10.5000')
+        assert primera['proveedor'] == '12'
+        assert primera['id_origen'] is None and segunda['id_origen'] == 'X'
+        assert primera['cajero'] == '' and segunda['cajero'] is None
+
+    def test_numeros_y_booleanos_json_usan_su_texto(self):
+        """Valores no string (fallback a json.loads) se convierten como su texto en ->>."""
+        primera, segunda = self._transformar(
+            {'cantidadesTotal': 2.5, 'precioventabr': '4', 'idSucursal': 7, 'esCombo': True},
+            {'cantidadesTotal': '1', 'precioventabr': 0.123456789012345678901, 'idSucursal': '8'},
+        )
+        assert primera['cantidades_total'] == Decimal('2.5000')
+        assert primera['facturacion_neta'] == Decimal('10.0000')
+        assert primera['id_sucursal'] == 7 and segunda['id_sucursal'] == 8
+        assert primera['es_combo'] is False
+        assert segunda['facturacion_neta'] == Decimal('0.1235')
+
+    def test_columnas_de_bronze(self):
+        """
+        id_empresa es la etiqueta de bronze, aunque el payload traiga otro idEmpresa, y las
+        claves del documento, cliente y artículo son las columnas generadas de bronze.
+        """
+        from layers.silver.transformers.sales_columnar import transform_batch
+        tabla = transform_batch(
+            [json.dumps({'idEmpresa': '1', 'idDocumento': 'NC', 'serie': '9', 'idArticulo': '5'})],
+            {'id_empresa': [2], 'id_documento': ['FC'], 'serie': [3], 'id_articulo': [None]},
+        )
+        assert tabla.column_names[0] == 'id_empresa' and tabla.column_names[-1] == 'regimen_fiscal'
+        fila = tabla.to_pylist()[0]
+        assert fila['id_empresa'] == 2 and fila['id_documento'] == 'FC'
+        assert fila['serie'] == 3 and fila['id_articulo'] is None
+        # Columnas de bronze que no se pasan: NULL
+        assert fila['nro_doc'] is None and fila['letra'] is None
+
+    def test_tipos_mixtos_usan_json_loads(self):
+        from layers.silver.transformers import sales_columnar
+        with patch.object(sales_columnar, '_decode_python', wraps=sales_columnar._decode_python) as mock_py:
+            self._transformar({'cantidadesTotal': 1.5}, {'cantidadesTotal': '2'})
+        mock_py.assert_called_once()
+
+
+class TestInsertSales:
+    """Tests para la elección del motor en _insert_sales()."""
+
+    def test_motor_sql_por_defecto(self):
+        from layers.silver.transformers.sales_transformer import _insert_sales
+        cursor = MagicMock()
+        cursor.rowcount = 7
+        assert _insert_sales(cursor, "WHERE deleted_at IS NULL", None, 'bronze.raw_sales_all') == 7
+        assert 'INSERT INTO silver.fact_ventas' in cursor.execute.call_args.args[0]
+
+    def test_motor_columnar_usa_copy(self):
+        from layers.silver.transformers.sales_transformer import _insert_sales
+        cursor = MagicMock()
+        with patch('layers.silver.transformers.sales_columnar.copy_sales', return_value=5) as mock_copy:
+            assert _insert_sales(cursor, "WHERE x", ('a',), 'tmp_ventas_archivo', motor='columnar') == 5
+        mock_copy.assert_called_once_with(cursor, "WHERE x", ('a',), 'tmp_ventas_archivo', 'silver.fact_ventas')
+        cursor.execute.assert_not_called()
+
+    def test_motor_desconocido(self):
+        from layers.silver.transformers.sales_transformer import _insert_sales
+        with pytest.raises(ValueError):
+            _insert_sales(MagicMock(), "WHERE TRUE", motor='numpy')
+
+    def test_copy_sales_por_bloques(self):
+        pytest.importorskip('pyarrow')
+        from layers.silver.transformers.sales_columnar import copy_sales
+        cursor = MagicMock()
+        lector = cursor.connection.cursor.return_value
+        lector.fetchmany.side_effect = [
+            [(json.dumps({'idDocumento': 'FC'}), 1, 'FC', 'A', 1, 10, 7, 100),
+             (json.dumps({'idDocumento': 'NC'}), 2, 'NC', 'B', 1, 11, 7, 100)],
+            [(json.dumps({'idDocumento': 'FC'}), 3, 'FC', 'A', 2, 12, 8, 101)],
+            [],
+        ]
+        assert copy_sales(cursor, "WHERE deleted_at IS NULL", batch_size=2) == 3
+        assert cursor.copy_expert.call_count == 2
+        assert cursor.copy_expert.call_args.args[0].startswith('COPY tmp_ventas_columnar (id_empresa, ')
+        assert cursor.copy_expert.call_args.args[0].endswith('regimen_fiscal) FROM STDIN WITH (FORMAT csv)')
+        assert lector.execute.call_args.args[0] == (
+            'SELECT data_raw::text, id_empresa, id_documento, letra, serie, nro_doc, id_cliente, id_articulo '
+            'FROM bronze.raw_sales_all WHERE deleted_at IS NULL'
+        )
+        lector.close.assert_called_once()
+
+        # nro_linea se numera en PostgreSQL sobre las líneas ya tipadas, como en el motor sql
+        sentencias = [c.args[0] for c in cursor.execute.call_args_list]
+        assert sentencias[0].startswith('CREATE TEMP TABLE tmp_ventas_columnar AS SELECT id_empresa, ')
+        insert = sentencias[-2]
+        assert insert.startswith('INSERT INTO silver.fact_ventas (id_empresa, ')
+        assert 'regimen_fiscal, nro_linea) SELECT l.*, ROW_NUMBER() OVER' in insert
+        assert insert.endswith('FROM tmp_ventas_columnar l')
+        assert sentencias[-1] == 'DROP TABLE tmp_ventas_columnar'
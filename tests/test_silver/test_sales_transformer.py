@@ -2,17 +2,21 @@
 Tests para el transformer de ventas (Silver).
 Verifica modos de carga y estructura SQL.
 """
+from datetime import datetime
+
 import pytest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, MagicMock
 
 
 def _make_mock_conn():
     """Helper: crea conexión mockeada con COUNT > 0 para evitar early return."""
     mock_cursor = MagicMock()
     mock_cursor.rowcount = 100
-    mock_cursor.fetchone.return_value = (50,)
+    # (COUNT, ...) y (MAX(id), MAX(deleted_at), cambios pendientes) de la posición de bronze
+    mock_cursor.fetchone.return_value = (50, None, None)
     mock_raw_conn = MagicMock()
     mock_raw_conn.cursor.return_value = mock_cursor
+    mock_cursor.connection = mock_raw_conn
     mock_conn = MagicMock()
     mock_conn.connection.dbapi_connection = mock_raw_conn
     mock_conn.__enter__ = MagicMock(return_value=mock_conn)
@@ -74,6 +78,28 @@ class TestSalesTransformerModes:
 
         mock_raw_conn.commit.assert_called()
 
+    def test_una_empresa_filtra_delete_e_insert(self):
+        """Con id_empresa se elimina y se transforma solo esa empresa."""
+        mock_conn, mock_cursor, _ = _make_mock_conn()
+        with patch('layers.silver.transformers.sales_transformer.engine') as mock_engine:
+            mock_engine.connect.return_value = mock_conn
+            from layers.silver.transformers.sales_transformer import transform_sales
+            transform_sales('2025-03-01', '2025-03-31', id_empresa=2)
+
+        llamadas = [c.args for c in mock_cursor.execute.call_args_list]
+        delete = next(a for a in llamadas if 'DELETE FROM silver.fact_ventas' in a[0])
+        assert 'id_empresa = %s' in delete[0]
+        assert delete[1] == ('2025-03-01', '2025-03-31', 2)
+        insert = next(a for a in llamadas if 'INSERT INTO silver.fact_ventas' in a[0])
+        assert 'id_empresa = %s' in insert[0]
+        assert insert[1] == ['2025-03-01', '2025-03-31', 2]
+
+    def test_full_refresh_de_una_empresa_no_borra_las_demas(self):
+        calls = _capture_sql(full_refresh=True, id_empresa=2)
+        deletes = [c for c in calls if 'DELETE FROM silver.fact_ventas' in c]
+        assert len(deletes) == 1
+        assert 'id_empresa = %s' in deletes[0]
+
 
 class TestSalesTransformerSQL:
     """Tests para la estructura SQL del transformer de ventas."""
@@ -97,3 +123,390 @@ class TestSalesTransformerSQL:
         """El INSERT debe incluir campo anulado."""
         calls = _capture_sql(full_refresh=True)
         assert any('anulado' in c for c in calls)
+
+
+class TestSalesTransformerChanges:
+    """Tests para transform_sales_changes() y el filtro de líneas borradas en bronze."""
+
+    def _run_changes(self, hasta_id):
+        mock_conn, mock_cursor, mock_raw_conn = _make_mock_conn()
+        mock_cursor.fetchone.return_value = (hasta_id,)
+        with patch('layers.silver.transformers.sales_transformer.engine') as mock_engine:
+            mock_engine.connect.return_value = mock_conn
+            from layers.silver.transformers.sales_transformer import transform_sales_changes
+            transform_sales_changes()
+        return [str(c) for c in mock_cursor.execute.call_args_list], mock_raw_conn
+
+    def test_lee_ventas_planas_y_compactadas(self):
+        """Cuenta e inserta desde bronze.raw_sales_all (incluye los meses compactados)."""
+        calls = _capture_sql(fecha_desde='2025-01-01', fecha_hasta='2025-01-31')
+        assert any('SELECT COUNT(*) FROM bronze.raw_sales_all' in c for c in calls)
+        insert = next(c for c in calls if 'INSERT INTO silver.fact_ventas' in c)
+        assert 'FROM bronze.raw_sales_all' in insert
+
+    def test_ignora_lineas_borradas(self):
+        """Ningún modo debe transformar líneas con deleted_at."""
+        calls = _capture_sql(fecha_desde='2025-01-01', fecha_hasta='2025-01-31')
+        insert = next(c for c in calls if 'INSERT INTO silver.fact_ventas' in c)
+        assert 'deleted_at IS NULL' in insert
+
+    def test_sin_pendientes_no_hace_nada(self):
+        """Sin cambios pendientes no debe borrar ni insertar."""
+        calls, mock_raw_conn = self._run_changes(None)
+        assert not any('DELETE FROM silver.fact_ventas' in c for c in calls)
+        mock_raw_conn.commit.assert_not_called()
+
+    def test_recarga_solo_documentos_modificados(self):
+        """Debe borrar y reinsertar solo los documentos pendientes y marcarlos aplicados."""
+        calls, mock_raw_conn = self._run_changes(42)
+
+        delete = next(c for c in calls if 'DELETE FROM silver.fact_ventas' in c)
+        assert 'tmp_documentos' in delete
+        insert = next(c for c in calls if 'INSERT INTO silver.fact_ventas' in c)
+        assert 'tmp_documentos' in insert
+        assert any('silver_applied_at = CURRENT_TIMESTAMP' in c for c in calls)
+        mock_raw_conn.commit.assert_called_once()
+
+
+class TestSalesTransformerIncremental:
+    """Tests para transform_sales_incremental() y la marca de agua."""
+
+    def _run(self, *fetchones):
+        mock_conn, mock_cursor, mock_raw_conn = _make_mock_conn()
+        mock_cursor.fetchone.side_effect = list(fetchones)
+        with patch('layers.silver.transformers.sales_transformer.engine') as mock_engine:
+            mock_engine.connect.return_value = mock_conn
+            from layers.silver.transformers.sales_transformer import transform_sales_incremental
+            transform_sales_incremental()
+        return mock_cursor, mock_raw_conn
+
+    def test_sin_marca_de_agua_no_hace_nada(self):
+        mock_cursor, mock_raw_conn = self._run(None)
+        assert mock_cursor.execute.call_count == 1
+        mock_raw_conn.commit.assert_not_called()
+
+    def test_sin_lineas_nuevas_no_hace_nada(self):
+        mock_cursor, mock_raw_conn = self._run((100, datetime(2025, 1, 2)), (100, datetime(2025, 1, 2), None))
+        calls = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert not any('silver.fact_ventas' in c or 'transform_watermarks (' in c for c in calls)
+        # Solo la transacción de la lectura de la posición
+        mock_raw_conn.commit.assert_called_once()
+
+    def test_solo_cambios_pendientes_recarga_sus_documentos(self):
+        """Documentos registrados por un reemplazo de partición, sin líneas nuevas ni tombstones."""
+        mock_cursor, mock_raw_conn = self._run((100, None), (100, None, 9))
+        calls = mock_cursor.execute.call_args_list
+
+        documentos = next(c for c in calls if 'CREATE TEMP TABLE tmp_documentos' in c.args[0])
+        assert 'silver_applied_at IS NULL AND id <= %(cambios_id)s' in documentos.args[0]
+        assert any('DELETE FROM silver.fact_ventas' in c.args[0] for c in calls)
+        assert calls[-1].args[1] == ('silver.fact_ventas', 100, None)
+
+    def test_posicion_leida_sin_cargas_de_bronze_en_curso(self):
+        """La posición se lee con el lock exclusivo de escrituras y se confirma antes de transformar."""
+        from layers.bronze.sales_changes import SALES_WRITES_LOCK
+        mock_cursor, mock_raw_conn = self._run((100, None), (250, None, None))
+        calls = mock_cursor.execute.call_args_list
+
+        sentencias = [c.args[0] for c in calls]
+        lock = sentencias.index("SELECT pg_advisory_xact_lock(%s)")
+        assert calls[lock].args[1] == (SALES_WRITES_LOCK,)
+        assert 'COALESCE(MAX(id), 0) FROM bronze.raw_sales)' in sentencias[lock + 1]
+        assert 'bronze.raw_sales_changes WHERE silver_applied_at IS NULL' in sentencias[lock + 1]
+        assert mock_raw_conn.commit.call_count == 2
+
+    def test_recarga_documentos_de_lineas_nuevas_y_borradas(self):
+        marca, borrado = datetime(2025, 1, 2), datetime(2025, 1, 3)
+        mock_cursor, mock_raw_conn = self._run((100, marca), (250, borrado, 7))
+        calls = mock_cursor.execute.call_args_list
+
+        documentos = next(c for c in calls if 'CREATE TEMP TABLE tmp_documentos' in c.args[0])
+        assert 'id > %(desde_id)s AND id <= %(hasta_id)s' in documentos.args[0]
+        assert 'deleted_at > COALESCE(%(desde_borrado)s' in documentos.args[0]
+        assert 'FROM bronze.raw_sales_changes' in documentos.args[0]
+        assert documentos.args[1] == {'desde_id': 100, 'hasta_id': 250,
+                                      'desde_borrado': marca, 'hasta_borrado': borrado,
+                                      'cambios_id': 7}
+        assert any('DELETE FROM silver.fact_ventas' in c.args[0] for c in calls)
+        assert any('INSERT INTO silver.fact_ventas' in c.args[0] for c in calls)
+        cambios = next(c for c in calls if 'UPDATE bronze.raw_sales_changes' in c.args[0])
+        assert cambios.args[1] == (7,)
+        assert calls[-1].args[1] == ('silver.fact_ventas', 250, borrado)
+        # Posición de bronze y transformación
+        assert mock_raw_conn.commit.call_count == 2
+
+    def test_full_refresh_inicializa_la_marca_de_agua(self):
+        calls = _capture_sql(full_refresh=True)
+        assert any('INSERT INTO silver.transform_watermarks' in c for c in calls)
+
+    @pytest.mark.parametrize('kwargs', [
+        {'full_refresh': True, 'id_empresa': 2},
+        {'fecha_desde': '2025-01-01', 'fecha_hasta': '2025-01-31'},
+    ])
+    def test_transformaciones_parciales_no_mueven_la_marca(self, kwargs):
+        calls = _capture_sql(**kwargs)
+        assert not any('silver.transform_watermarks' in c for c in calls)
+
+
+class TestSalesTransformerArchivo:
+    """Lectura de los meses archivados en Parquet."""
+
+    def _run(self, archivados, count=50, **kwargs):
+        mock_conn, mock_cursor, _ = _make_mock_conn()
+        mock_cursor.fetchone.return_value = (count,)
+        with patch('layers.silver.transformers.sales_transformer.engine') as mock_engine, \
+             patch('layers.silver.transformers.sales_transformer.archived_months',
+                   return_value=archivados) as mock_archived, \
+             patch('layers.silver.transformers.sales_transformer.restore_month') as mock_restore:
+            mock_engine.connect.return_value = mock_conn
+            from layers.silver.transformers.sales_transformer import transform_sales
+            transform_sales(**kwargs)
+        return [str(c) for c in mock_cursor.execute.call_args_list], mock_archived, mock_restore
+
+    def test_full_refresh_lee_meses_archivados(self):
+        """Mismo INSERT sobre la tabla temporal de cada mes archivado, aunque bronze esté vacío."""
+        from datetime import date
+        calls, _, mock_restore = self._run(
+            [(date(2024, 1, 1), '/a/2024-01.parquet')], count=0, full_refresh=True, id_empresa=2
+        )
+
+        mock_restore.assert_called_once()
+        assert mock_restore.call_args.args[1:4] == ('bronze.raw_sales', '/a/2024-01.parquet', 'tmp_ventas_archivo')
+        inserts = [c for c in calls if 'INSERT INTO silver.fact_ventas' in c]
+        assert 'FROM bronze.raw_sales' in inserts[0]
+        assert 'FROM tmp_ventas_archivo' in inserts[1]
+        assert 'id_empresa = %s' in inserts[1]
+
+    def test_sin_rango_aplica_con_merge(self):
+        """Sin full_refresh ni rango no hay DELETE previo: se aplica con MERGE, archivo incluido."""
+        from datetime import date
+        calls, mock_archived, mock_restore = self._run([(date(2024, 1, 1), '/a/2024-01.parquet')])
+        mock_archived.assert_called_once()
+        mock_restore.assert_called_once()
+        assert not any('INSERT INTO silver.fact_ventas' in c for c in calls)
+        assert sum('INSERT INTO tmp_ventas_merge' in c for c in calls) == 2
+        assert any('MERGE INTO silver.fact_ventas' in c for c in calls)
+
+
+class TestSalesTransformerParallel:
+    """Tests para la reconstrucción por meses (transform_sales_parallel)."""
+
+    MODULO = 'layers.silver.transformers.sales_transformer'
+
+    def test_meses_de_bronze_archivo_y_silver(self):
+        from datetime import date
+        from layers.silver.transformers.sales_transformer import _refresh_months
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (date(2023, 11, 20), date(2023, 12, 5))
+        particiones = {
+            'bronze.raw_sales': [('bronze.raw_sales_p2024_02', date(2024, 2, 1))],
+            'bronze.raw_sales_compact': [('bronze.raw_sales_compact_p2024_01', date(2024, 1, 1))],
+        }
+        with patch(f'{self.MODULO}.list_partitions', side_effect=lambda c, t: particiones[t]), \
+             patch(f'{self.MODULO}.archived_months', return_value=[(date(2023, 6, 1), '/a.parquet')]):
+            meses = _refresh_months(mock_cursor, '', '')
+
+        assert meses == [date(2023, 6, 1), date(2023, 11, 1), date(2023, 12, 1),
+                         date(2024, 1, 1), date(2024, 2, 1)]
+
+    def test_un_mes_por_transaccion_recortado_al_rango(self):
+        from layers.silver.transformers.sales_transformer import _transform_month
+
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 30
+        with patch(f'{self.MODULO}.archived_months', return_value=[]):
+            assert _transform_month(mock_cursor, '2024-01-15', '2024-01-31', 2) == 30
+
+        calls = mock_cursor.execute.call_args_list
+        assert 'DELETE FROM silver.fact_ventas WHERE fecha_comprobante >= %s' in calls[1].args[0]
+        assert calls[1].args[1] == ('2024-01-15', '2024-01-31', 2)
+        assert 'FROM bronze.raw_sales_all' in calls[2].args[0]
+        assert calls[2].args[1] == ('2024-01-15', '2024-01-31', 2)
+
+    def test_reintenta_el_mes_en_una_transaccion_nueva(self):
+        from layers.silver.transformers.sales_transformer import _run_month
+
+        mock_conn, mock_cursor, mock_raw_conn = _make_mock_conn()
+        with patch(f'{self.MODULO}.engine') as mock_engine, \
+             patch(f'{self.MODULO}._transform_month', side_effect=[Exception('deadlock'), 10]), \
+             patch(f'{self.MODULO}.mark_completed') as mock_mark:
+            mock_engine.connect.return_value = mock_conn
+            filas, _ = _run_month('2024-01-01', '2024-01-31', None, 1)
+
+        assert filas == 10
+        mock_raw_conn.rollback.assert_called_once()
+        mock_raw_conn.commit.assert_called_once()
+        assert mock_mark.call_args.args[1:4] == ('silver_sales', '2024-01-01', '2024-01-31')
+        assert mock_mark.call_args.kwargs['id_empresa'] == 0
+
+    def _run(self, run_month, meses, **kwargs):
+        mock_conn, mock_cursor, _ = _make_mock_conn()
+        with patch(f'{self.MODULO}.engine') as mock_engine, \
+             patch(f'{self.MODULO}._refresh_months', return_value=meses), \
+             patch(f'{self.MODULO}._bronze_position', return_value=(500, None)), \
+             patch(f'{self.MODULO}._save_watermark') as mock_save, \
+             patch(f'{self.MODULO}._run_month', side_effect=run_month) as mock_run:
+            mock_engine.connect.return_value = mock_conn
+            from layers.silver.transformers.sales_transformer import transform_sales_parallel
+            try:
+                resultado = transform_sales_parallel(max_workers=2, **kwargs)
+            except Exception as e:
+                resultado = e
+        return resultado, mock_run, mock_save, mock_cursor
+
+    def test_todos_los_meses_inicializa_la_marca_de_agua(self):
+        from datetime import date
+        resultado, mock_run, mock_save, _ = self._run(
+            lambda d, h, e, r, m, g: (10, 0.1), [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+        )
+        assert resultado == 30
+        assert sorted(c.args[:2] for c in mock_run.call_args_list) == [
+            ('2024-01-01', '2024-01-31'), ('2024-02-01', '2024-02-29'), ('2024-03-01', '2024-03-31')
+        ]
+        assert mock_save.call_args.args[1:] == (500, None)
+
+    def test_un_mes_fallido_no_descarta_los_demas(self):
+        from datetime import date
+        from layers.silver.transformers.sales_transformer import SalesRefreshError
+
+        def run_month(desde, hasta, id_empresa, reintentos, motor, merge):
+            if desde.startswith('2024-02'):
+                raise Exception('sin espacio')
+            return 10, 0.1
+
+        resultado, mock_run, mock_save, _ = self._run(
+            run_month, [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+        )
+        assert isinstance(resultado, SalesRefreshError)
+        assert list(resultado.errores) == ['2024-02']
+        assert mock_run.call_count == 3
+        mock_save.assert_not_called()
+
+    def test_resume_saltea_meses_completados(self):
+        from datetime import date
+        mock_completed = MagicMock(return_value={('2024-01-01', '2024-01-31', 0)})
+        with patch(f'{self.MODULO}.completed_units', mock_completed):
+            resultado, mock_run, mock_save, _ = self._run(
+                lambda d, h, e, r, m, g: (10, 0.1), [date(2024, 1, 1), date(2024, 2, 1)], resume=True
+            )
+
+        assert resultado == 10
+        assert [c.args[0] for c in mock_run.call_args_list] == ['2024-02-01']
+        assert mock_completed.call_args.args[1:] == ('silver_sales', '2024-01-01', '2024-02-29', 0)
+        mock_save.assert_not_called()
+
+
+class TestSalesTransformerMerge:
+    """Tests para el modo merge (MERGE por clave de línea)."""
+
+    MODULO = 'layers.silver.transformers.sales_transformer'
+
+    def test_insert_numera_las_lineas(self):
+        from layers.silver.transformers.sales_transformer import _build_insert_query
+        sql = _build_insert_query("WHERE TRUE")
+        assert 'regimen_fiscal,\n            -- Clave de línea\n            nro_linea' in sql
+        assert 'SELECT l.*, ROW_NUMBER() OVER' in sql
+        assert 'PARTITION BY l.id_empresa, l.id_documento, l.letra, l.serie, l.nro_doc, ' \
+               'l.fecha_comprobante, l.id_articulo' in sql
+        assert 'ORDER BY l\n' in sql
+        assert sql.rstrip().endswith(') AS l')
+        assert 'INSERT INTO tmp_ventas_merge' in _build_insert_query("WHERE TRUE", target='tmp_ventas_merge')
+
+    def test_empresa_de_la_etiqueta_de_bronze(self):
+        """id_empresa (y la clave de línea) salen de la columna de bronze, no de data_raw."""
+        from layers.silver.transformers.sales_transformer import _build_insert_query
+        sql = _build_insert_query("WHERE TRUE")
+        assert "idEmpresa" not in sql
+        assert "PARTITION BY l.id_empresa," in sql
+
+    def test_merge_staged(self):
+        from layers.silver.transformers.sales_transformer import _merge_staged
+        cursor = MagicMock()
+        cursor.rowcount = 3
+        cursor.description = [('id_empresa',), ('id_documento',), ('letra',), ('serie',), ('nro_doc',),
+                              ('fecha_comprobante',), ('id_articulo',), ('nro_linea',),
+                              ('id_cliente',), ('subtotal_final',)]
+
+        assert _merge_staged(cursor, "f.fecha_comprobante >= %s", ('2025-01-01',)) == (3, 3)
+        calls = [c.args for c in cursor.execute.call_args_list]
+        assert calls[0] == ('ANALYZE tmp_ventas_merge',)
+
+        borrado = next(c for c in calls if 'DELETE FROM silver.fact_ventas f' in c[0])
+        assert 'f.fecha_comprobante >= %s' in borrado[0]
+        assert 'NOT EXISTS (SELECT 1 FROM tmp_ventas_merge t' in borrado[0]
+        assert borrado[1] == ('2025-01-01',)
+
+        merge = next(c[0] for c in calls if 'MERGE INTO silver.fact_ventas f' in c[0])
+        assert 'f.nro_linea IS NOT DISTINCT FROM t.nro_linea' in merge
+        assert 'f.letra IS NOT DISTINCT FROM t.letra' in merge
+        # Solo se actualizan las líneas que cambiaron; la clave no se actualiza
+        assert '(f.id_cliente, f.subtotal_final)\n                IS DISTINCT FROM (t.id_cliente, t.subtotal_final)' in merge
+        assert 'UPDATE SET id_cliente = t.id_cliente, subtotal_final = t.subtotal_final, processed_at' in merge
+        assert 'INSERT (id_empresa, id_documento, letra, serie, nro_doc, fecha_comprobante' in merge
+
+    def test_linea_con_fecha_null(self):
+        """
+        Una línea con fechaComprobate '0001-01-01' (fecha_comprobante NULL) tiene que
+        matchear consigo misma: con '=' el DELETE la borraría y el MERGE la reinsertaría
+        en cada corrida, chocando con el índice único NULLS NOT DISTINCT.
+        """
+        import re
+        from layers.silver.transformers.sales_transformer import _merge_staged
+        cursor = MagicMock()
+        cursor.rowcount = 0
+        cursor.description = [('id_empresa',), ('id_documento',), ('letra',), ('serie',), ('nro_doc',),
+                              ('fecha_comprobante',), ('id_articulo',), ('nro_linea',), ('id_cliente',)]
+
+        _merge_staged(cursor, "f.id_documento = %s", ('FCVTA',))
+        calls = [c.args[0] for c in cursor.execute.call_args_list]
+        borrado = next(c for c in calls if 'DELETE FROM silver.fact_ventas f' in c)
+        merge = next(c for c in calls if 'MERGE INTO silver.fact_ventas f' in c)
+
+        for sql in (borrado.split('NOT EXISTS', 1)[1], merge.split('WHEN', 1)[0]):
+            assert 'f.fecha_comprobante IS NOT DISTINCT FROM t.fecha_comprobante' in sql
+            # Ninguna columna de la clave con '=' (NULL = NULL no matchea)
+            assert not re.search(r'f\.\w+ = t\.', sql)
+
+    def test_rango_con_merge_no_borra_antes(self):
+        calls = _capture_sql(fecha_desde='2025-01-01', fecha_hasta='2025-01-31', id_empresa=2, merge=True)
+        assert not any("DELETE FROM silver.fact_ventas WHERE" in c for c in calls)
+        assert any('CREATE TEMP TABLE tmp_ventas_merge' in c for c in calls)
+        borrado = next(c for c in calls if 'DELETE FROM silver.fact_ventas f' in c)
+        assert 'TRUE AND f.fecha_comprobante >= %s AND f.fecha_comprobante <= %s AND f.id_empresa = %s' in borrado
+        assert "['2025-01-01', '2025-01-31', 2]" in borrado
+
+    def test_merge_por_defecto_desde_settings(self):
+        with patch(f'{self.MODULO}.settings') as mock_settings:
+            mock_settings.SILVER_SALES_MERGE = True
+            mock_settings.SILVER_SALES_ENGINE = 'sql'
+            calls = _capture_sql(fecha_desde='2025-01-01', fecha_hasta='2025-01-31')
+        assert any('MERGE INTO silver.fact_ventas' in c for c in calls)
+
+    def test_full_refresh_total_sigue_borrando(self):
+        calls = _capture_sql(full_refresh=True)
+        assert "call('DELETE FROM silver.fact_ventas')" in calls
+        assert not any('MERGE INTO' in c for c in calls)
+
+    def test_documentos_con_merge(self):
+        from layers.silver.transformers.sales_transformer import _replace_documents
+        cursor = MagicMock()
+        cursor.rowcount = 4
+        assert _replace_documents(cursor, merge=True) == (4, 4)
+        calls = [c.args[0] for c in cursor.execute.call_args_list]
+        assert any('INSERT INTO tmp_ventas_merge' in c for c in calls)
+        borrado = next(c for c in calls if 'DELETE FROM silver.fact_ventas f' in c)
+        assert 'SELECT 1 FROM tmp_documentos d' in borrado
+        assert 'NOT EXISTS (SELECT 1 FROM tmp_ventas_merge t' in borrado
+
+    def test_mes_con_merge(self):
+        from layers.silver.transformers.sales_transformer import _transform_month
+        cursor = MagicMock()
+        cursor.rowcount = 6
+        with patch(f'{self.MODULO}.archived_months', return_value=[]):
+            assert _transform_month(cursor, '2024-01-01', '2024-01-31', 3, merge=True) == 6
+        calls = [c.args for c in cursor.execute.call_args_list]
+        assert not any(c[0].startswith('DELETE FROM silver.fact_ventas WHERE') for c in calls)
+        borrado = next(c for c in calls if 'DELETE FROM silver.fact_ventas f' in c[0])
+        assert 'f.fecha_comprobante >= %s AND f.fecha_comprobante <= %s AND f.id_empresa = %s' in borrado[0]
+        assert borrado[1] == ('2024-01-01', '2024-01-31', 3)
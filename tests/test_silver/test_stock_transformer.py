@@ -2,7 +2,6 @@
 Tests para el transformer de stock (Silver).
 Verifica modos de carga y estructura SQL.
 """
-import pytest
 from unittest.mock import patch, MagicMock
 
 
@@ -67,3 +66,36 @@ class TestStockTransformerModes:
             transform_stock(full_refresh=True)
 
         mock_raw_conn.commit.assert_called()
+
+    def test_lee_snapshot_reconstruido(self):
+        """Debe leer los días completos con bronze.raw_stock_snapshot() (modo full o delta)."""
+        calls = _capture_sql(fecha_desde='2025-01-01', fecha_hasta='2025-01-31')
+        insert = next(c for c in calls if 'INSERT INTO silver.fact_stock' in c)
+        assert 'bronze.raw_stock_snapshot(' in insert
+        assert "'2025-01-01', '2025-01-31'" in insert
+
+    def test_cuenta_filas_desde_registro_de_dias(self):
+        """El conteo previo usa bronze.raw_stock_days (no escanea bronze.raw_stock)."""
+        calls = _capture_sql(full_refresh=True)
+        assert any('bronze.raw_stock_days' in c and 'rows_total' in c for c in calls)
+
+    def test_rango_lee_meses_archivados(self):
+        """Con un rango, cada mes archivado se carga en una tabla temporal y se aplica el mismo INSERT."""
+        from datetime import date
+        mock_conn, mock_cursor, _ = _make_mock_conn()
+        with patch('layers.silver.transformers.stock_transformer.engine') as mock_engine, \
+             patch('layers.silver.transformers.stock_transformer.archived_months',
+                   return_value=[(date(2024, 1, 1), '/a/2024-01.parquet')]) as mock_archived, \
+             patch('layers.silver.transformers.stock_transformer.restore_month') as mock_restore:
+            mock_engine.connect.return_value = mock_conn
+            from layers.silver.transformers.stock_transformer import transform_stock
+            transform_stock(fecha_desde='2024-01-01', fecha_hasta='2024-02-29')
+
+        mock_archived.assert_called_once_with(mock_cursor, 'bronze.raw_stock', '2024-01-01', '2024-02-29')
+        assert mock_restore.call_args.args[1:] == (
+            'bronze.raw_stock', '/a/2024-01.parquet', 'tmp_stock_archivo', '2024-01-01', '2024-02-29'
+        )
+        calls = [str(c) for c in mock_cursor.execute.call_args_list]
+        inserts = [c for c in calls if 'INSERT INTO silver.fact_stock' in c]
+        assert 'FROM tmp_stock_archivo' in inserts[1]
+        assert 'ON CONFLICT' in inserts[1]
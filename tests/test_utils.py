@@ -12,7 +12,6 @@ class TestGetMonthRange:
     def test_mes_actual_automatico(self):
         """Debe retornar el rango del mes actual cuando no se pasa parámetro."""
         from orchestrator import get_month_range
-        from datetime import date
         from calendar import monthrange
 
         # Llamar sin argumentos (mes actual)
@@ -83,3 +82,22 @@ class TestGetMonthRange:
         assert len(fecha_hasta) == 10
         assert fecha_desde[4] == '-'
         assert fecha_desde[7] == '-'
+
+
+class TestGetOption:
+    """Tests para la función get_option()."""
+
+    def test_opcion_presente(self):
+        """Debe retornar el valor de '--nombre=valor'."""
+        from orchestrator import get_option
+
+        with patch('sys.argv', ['orchestrator.py', 'bronze', 'stock', '2025-01-01', '2025-01-31', '--workers=8']):
+            assert get_option('workers') == '8'
+
+    def test_opcion_ausente_usa_default(self):
+        """Sin la opción debe retornar el default."""
+        from orchestrator import get_option
+
+        with patch('sys.argv', ['orchestrator.py', 'bronze', 'stock', '2025-01-01', '2025-01-31']):
+            assert get_option('workers') is None
+            assert get_option('workers', '1') == '1'